@@ -0,0 +1,165 @@
+import argparse
+import ipaddress
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.join(DIRETORIO, "..")
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ, DIRETORIO]
+
+import router as modulo_roteador
+from router import BackendRotasIpBatch, BackendRotasMemoria, EstadoRoteador, ProgramadorRotas, filtrar_enderecos
+from executar_benchmarks import AgendadorManual, montar_lsas
+from gerar_composer import gerar_grafo
+
+"""
+Mede o efeito da agregação de prefixos e da regra de anúncio sobre a FIB de um roteador em
+topologias geradas pelo gerar_composer.py. Para cada combinação de anúncio (todos os endereços
+ou só as redes de hosts) e agregação (ligada ou não), informa:
+- rotas: tamanho da FIB instalada por router1;
+- linhas_batch: linhas enviadas ao 'ip -batch' na instalação inicial (o custo no kernel cresce
+  com elas);
+- instalar: tempo, em memória, de montar as rotas desejadas, calcular o delta e formatar o lote;
+- reinstalar: o mesmo depois da queda do enlace até o vizinho por onde passa a maior parte dos
+  destinos, que passam para outros gateways.
+
+Com --kernel, os dois lotes também são aplicados com 'ip -batch' em um namespace de rede
+descartável (unshare -n, exige root), com os gateways alcançáveis pela interface lo, e o tempo
+de cada um é medido.
+
+Uso:
+    python benchmarks/benchmark_agregacao.py [--tamanhos 100,1000,10000] [--kernel]
+"""
+
+SCRIPT_KERNEL = """
+ip link set lo up && ip addr add 10.255.0.254/16 dev lo || exit 1
+ip -force -batch "$1" || exit 1
+inicio=$(date +%s%N); ip -force -batch "$2"; meio=$(date +%s%N); ip -force -batch "$3"; fim=$(date +%s%N)
+echo $((meio - inicio)) $((fim - meio))
+"""
+
+POOL_HOSTS = ipaddress.IPv4Network("10.128.0.0/9")
+
+
+def montar_estado(lsas, raiz, agregar):
+    vizinhos = {vizinho: f"10.255.0.{i % 250 + 1}" for i, vizinho in enumerate(lsas[raiz]["links"])}
+    estado = EstadoRoteador(raiz, vizinhos, programador_rotas=ProgramadorRotas(BackendRotasMemoria()),
+                            agendador_spf=AgendadorManual(), agregar_rotas=agregar)
+    for lsa in lsas.values():
+        estado.atualizar_tabela(lsa)
+    return estado
+
+
+def instalar(estado):
+    """
+    Returns:
+        tuple[float, list[str]]: Tempo para montar as rotas, calcular o delta e formatar o lote, e
+            as linhas do lote.
+    """
+    inicio = time.perf_counter()
+    desejadas = estado._rotas_desejadas()
+    adicionar, alterar, remover = estado._programador_rotas.calcular_delta(desejadas)
+    linhas = [BackendRotasIpBatch._formatar("replace", prefixo, gateway)
+              for prefixo, gateway in {**adicionar, **alterar}.items()]
+    linhas += [BackendRotasIpBatch._formatar("del", prefixo, gateway) for prefixo, gateway in remover.items()]
+    tempo = time.perf_counter() - inicio
+    estado._programador_rotas.sincronizar(desejadas)
+    return tempo, linhas
+
+
+def medir_kernel(lote_inicial, lote_mudanca):
+    """
+    Aplica os lotes em um namespace de rede novo.
+
+    Returns:
+        tuple[float, float]: Tempo do 'ip -batch' de cada lote, em segundos.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = []
+        for nome, linhas in (("vazio", []), ("inicial", lote_inicial), ("mudanca", lote_mudanca)):
+            caminho = os.path.join(diretorio, nome)
+            with open(caminho, "w") as arquivo:
+                arquivo.writelines(f"{linha}\n" for linha in linhas)
+            caminhos.append(caminho)
+        saida = subprocess.run(["unshare", "-n", "sh", "-c", SCRIPT_KERNEL, "sh", *caminhos],
+                               capture_output=True, text=True, check=True)
+    inicial, mudanca = saida.stdout.split()
+    return int(inicial) / 1e9, int(mudanca) / 1e9
+
+
+def medir(grafo, anunciar, agregar, kernel=False):
+    lsas = montar_lsas(grafo)
+    if anunciar == "hosts":
+        for lsa in lsas.values():
+            lsa["enderecos"] = filtrar_enderecos(lsa["enderecos"], [POOL_HOSTS])
+    raiz = "router1"
+    estado = montar_estado(lsas, raiz, agregar)
+    estado.recalcular_rotas()
+    estado._programador_rotas = ProgramadorRotas(BackendRotasMemoria())
+    tempo_instalar, lote_inicial = instalar(estado)
+    rotas = len(estado._programador_rotas.instaladas)
+
+    # Derruba o enlace até o vizinho com mais destinos para que eles troquem de gateway.
+    por_vizinho = {}
+    for gateway in estado._roteamento.values():
+        por_vizinho[gateway] = por_vizinho.get(gateway, 0) + 1
+    vizinho = max(por_vizinho, key=por_vizinho.get)
+    entrada = estado.obter_entrada(raiz)
+    links = {destino: custo for destino, custo in entrada["links"].items() if destino != vizinho}
+    instaladas = estado._programador_rotas.instaladas
+    estado.atualizar_tabela({"id_rota": raiz, "numero_sequencia": entrada["numero_sequencia"] + 1,
+                             "timestamp": 0.0, "enderecos": entrada["enderecos"], "links": links})
+    estado.recalcular_rotas()
+    # Volta o programador ao estado anterior à mudança para medir só o delta dela.
+    estado._programador_rotas = ProgramadorRotas(BackendRotasMemoria())
+    estado._programador_rotas._instaladas = instaladas
+    tempo_reinstalar, lote_mudanca = instalar(estado)
+    resultado = {"rotas": rotas, "linhas_batch": len(lote_inicial), "instalar": tempo_instalar,
+                 "linhas_reinstalar": len(lote_mudanca), "reinstalar": tempo_reinstalar}
+    if kernel:
+        resultado["kernel_instalar"], resultado["kernel_reinstalar"] = medir_kernel(lote_inicial, lote_mudanca)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamanho da FIB e custo de instalação com e sem agregação de prefixos.")
+    parser.add_argument("--tamanhos", default="100,1000,10000")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--kernel", action="store_true",
+                        help="Também aplica os lotes com 'ip -batch' em um namespace de rede descartável.")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    args = parser.parse_args()
+
+    resultados = []
+    with modulo_roteador.REGISTRO.silenciado():
+        for tamanho in (int(t) for t in args.tamanhos.split(",") if t):
+            grafo = gerar_grafo(tamanho, semente=args.semente)
+            for anunciar in ("todos", "hosts"):
+                for agregar in (False, True):
+                    resultado = medir(grafo, anunciar, agregar, args.kernel)
+                    resultados.append(dict(resultado, roteadores=tamanho, anunciar=anunciar, agregar=agregar))
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    cabecalho = (f"{'Roteadores':>10} {'Anúncio':>8} {'Agregação':>9} {'Rotas':>8} {'Linhas':>8} "
+                 f"{'Instalar (ms)':>14} {'Linhas (mudança)':>17} {'Reinstalar (ms)':>16}")
+    if args.kernel:
+        cabecalho += f" {'Kernel (ms)':>12} {'Kernel mudança (ms)':>20}"
+    print(cabecalho)
+    for r in resultados:
+        linha = (f"{r['roteadores']:>10} {r['anunciar']:>8} {'sim' if r['agregar'] else 'não':>9} {r['rotas']:>8} "
+                 f"{r['linhas_batch']:>8} {r['instalar'] * 1000:>14.1f} {r['linhas_reinstalar']:>17} "
+                 f"{r['reinstalar'] * 1000:>16.1f}")
+        if args.kernel:
+            linha += f" {r['kernel_instalar'] * 1000:>12.1f} {r['kernel_reinstalar'] * 1000:>20.1f}"
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
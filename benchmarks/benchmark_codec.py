@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "router"))
+
+from router import CodecBinario
+
+"""
+Compara a vazão de codificação e decodificação dos pacotes HELLO e LSA no caminho JSON
+atual e no codec binário.
+
+Para cada tamanho de pacote (quantidade de vizinhos/links e de endereços), mede quantos
+pacotes por segundo cada caminho codifica e decodifica e o tamanho em bytes gerado.
+
+Uso:
+    python benchmarks/benchmark_codec.py [--repeticoes N]
+"""
+
+
+def gerar_hello(quantidade_vizinhos):
+    return {
+        "tipo": "HELLO",
+        "id_rota": "router1",
+        "timestamp": 1700000000.123,
+        "ip_address": "10.10.1.10",
+        "vizinhos_conhecidos": [f"router{i + 2}" for i in range(quantidade_vizinhos)],
+        "codecs": ["bin1", "json"],
+    }
+
+
+def gerar_lsa(quantidade_links, quantidade_enderecos):
+    return {
+        "tipo": "LSA",
+        "id_rota": "router1",
+        "ip_address": "10.10.1.10",
+        "timestamp": 1700000000.123,
+        "numero_sequencia": 42,
+        "enderecos": [f"10.{i // 256}.{i % 256}.10" for i in range(quantidade_enderecos)],
+        "links": {f"router{i + 2}": (i % 10) + 1 for i in range(quantidade_links)},
+    }
+
+
+def medir(funcao, repeticoes):
+    """Retorna quantas chamadas por segundo a função suporta."""
+    tempo = min(timeit.repeat(funcao, number=repeticoes, repeat=3))
+    return repeticoes / tempo
+
+
+def comparar(nome, pacote, repeticoes):
+    mensagem_json = json.dumps(pacote).encode("utf-8")
+    mensagem_binaria = CodecBinario.codificar(pacote)
+    assert CodecBinario.decodificar(mensagem_binaria) == pacote
+
+    resultado = {
+        "pacote": nome,
+        "bytes_json": len(mensagem_json),
+        "bytes_binario": len(mensagem_binaria),
+        "codificar_json": medir(lambda: json.dumps(pacote).encode("utf-8"), repeticoes),
+        "codificar_binario": medir(lambda: CodecBinario.codificar(pacote), repeticoes),
+        "decodificar_json": medir(lambda: json.loads(mensagem_json.decode("utf-8")), repeticoes),
+        "decodificar_binario": medir(lambda: CodecBinario.decodificar(mensagem_binaria), repeticoes),
+    }
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a vazão do codec JSON e do codec binário.")
+    parser.add_argument("--repeticoes", type=int, default=20000)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    args = parser.parse_args()
+
+    casos = [
+        ("HELLO 3 vizinhos", gerar_hello(3)),
+        ("HELLO 50 vizinhos", gerar_hello(50)),
+        ("LSA 3 links / 4 endereços", gerar_lsa(3, 4)),
+        ("LSA 50 links / 50 endereços", gerar_lsa(50, 50)),
+        ("LSA 500 links / 500 endereços", gerar_lsa(500, 500)),
+    ]
+    resultados = [comparar(nome, pacote, args.repeticoes // (10 if "500" in nome else 1))
+                  for nome, pacote in casos]
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{'Pacote':32} {'Bytes JSON/bin':>16} {'Cod. JSON/bin (pkt/s)':>26} {'Dec. JSON/bin (pkt/s)':>26}")
+    for r in resultados:
+        print(f"{r['pacote']:32} {r['bytes_json']:>7}/{r['bytes_binario']:<8} "
+              f"{r['codificar_json']:>12.0f}/{r['codificar_binario']:<13.0f} "
+              f"{r['decodificar_json']:>12.0f}/{r['decodificar_binario']:<13.0f}")
+
+
+if __name__ == "__main__":
+    main()
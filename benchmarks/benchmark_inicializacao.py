@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from gerar_composer import escrever_topologia, gerar_grafo
+
+"""
+Compara o custo de inicialização de um roteador ao obter os custos dos seus enlaces:
+- grafo: importa o networkx e monta o grafo inteiro do conexoes_rede.csv (caminho antigo);
+- csv: percorre o conexoes_rede.csv completo sem montar o grafo (reserva, sem índice);
+- indice: lê só o índice do roteador gerado pelo gerar_composer.py (caminho atual).
+
+Cada medição roda em um processo novo, que importa o módulo do roteador e carrega os custos;
+o tempo inclui os imports e a memória é o pico de RSS do processo (VmHWM, que, ao contrário
+do ru_maxrss, não herda o pico do processo que o criou).
+
+Uso:
+    python benchmarks/benchmark_inicializacao.py [--tamanhos 15,1000,10000]
+"""
+
+CODIGO = """
+import sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {diretorio_roteador!r})
+import router
+modo, caminho, id_rota = {modo!r}, {caminho!r}, {id_rota!r}
+if modo == "grafo":
+    grafo = router.carregar_grafo_com_pesos(caminho)
+    custos = {{v: d["weight"] for v, d in grafo[id_rota].items() if not v.startswith(id_rota + "_")}}
+elif modo == "csv":
+    custos = router.extrair_custos_vizinhos(caminho, id_rota)
+else:
+    custos = router.carregar_custos_vizinhos(caminho)
+tempo = time.perf_counter() - inicio
+pico = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM:"))
+print(tempo, pico, len(custos), "networkx" in sys.modules)
+"""
+
+
+def medir(modo, caminho, id_rota, repeticoes):
+    """
+    Returns:
+        dict: Menor tempo de inicialização (s), pico de RSS (KiB), vizinhos lidos e se o networkx foi importado.
+    """
+    melhor = None
+    for _ in range(repeticoes):
+        codigo = CODIGO.format(diretorio_roteador=os.path.join(RAIZ, "router"), modo=modo,
+                               caminho=caminho, id_rota=id_rota)
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+        tempo, rss, vizinhos, networkx = saida.stdout.split()
+        resultado = {"tempo": float(tempo), "rss_kib": int(rss), "vizinhos": int(vizinhos),
+                     "networkx": networkx == "True"}
+        if melhor is None or resultado["tempo"] < melhor["tempo"]:
+            melhor = resultado
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e memória de inicialização do roteador por forma de carregar a topologia.")
+    parser.add_argument("--tamanhos", default="15,1000,10000")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    args = parser.parse_args()
+
+    resultados = []
+    for tamanho in (int(t) for t in args.tamanhos.split(",") if t):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_csv = os.path.join(diretorio, "conexoes_rede.csv")
+            diretorio_vizinhos = os.path.join(diretorio, "vizinhos")
+            escrever_topologia(gerar_grafo(tamanho, semente=1), 2, caminho_compose=os.devnull,
+                               caminho_csv=caminho_csv, diretorio_vizinhos=diretorio_vizinhos)
+            for modo, caminho in (("grafo", caminho_csv), ("csv", caminho_csv),
+                                  ("indice", os.path.join(diretorio_vizinhos, "router1.csv"))):
+                resultado = medir(modo, caminho, "router1", args.repeticoes)
+                resultados.append(dict(resultado, roteadores=tamanho, modo=modo))
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    print(f"{'Roteadores':>10} {'Modo':>8} {'Tempo (ms)':>11} {'RSS (MiB)':>10} {'Vizinhos':>9} {'networkx':>9}")
+    for r in resultados:
+        print(f"{r['roteadores']:>10} {r['modo']:>8} {r['tempo'] * 1000:>11.1f} {r['rss_kib'] / 1024:>10.1f} "
+              f"{r['vizinhos']:>9} {'sim' if r['networkx'] else 'não':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.join(DIRETORIO, "..")
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ, DIRETORIO]
+
+import router as modulo_roteador
+from router import BackendRotasMemoria, EstadoRoteador, ProgramadorRotas
+from executar_benchmarks import AgendadorManual, montar_lsas
+from executar_benchmarks import medir as medir_tempo
+from gerar_composer import gerar_grafo
+
+"""
+Compara a LSDB com dicionários (SPF incremental) com a LSDB compacta (lsdb_compacta: IDs
+internados e adjacências CSR em arrays) em topologias geradas pelo gerar_composer.py. Para cada
+tamanho e modo, informa:
+- bytes_por_roteador: memória alocada pelo EstadoRoteador de router1 com a LSDB completa e as
+  rotas calculadas (tracemalloc), dividida pelo número de roteadores. Os LSAs recebidos são os
+  mesmos nos dois modos; a diferença está nas estruturas do SPF;
+- spf_completo: SPF sobre a LSDB inteira (_calcular_rotas_minimas ou _calcular_rotas_csr);
+- mudanca_enlace: um LSA com o custo de um enlace alterado, do atualizar_tabela até as rotas
+  recalculadas em memória (SPF incremental no modo com dicionários, completo no compacto).
+
+Uso:
+    python benchmarks/benchmark_lsdb.py [--tamanhos 1000,10000,50000] [--repeticoes 5]
+"""
+
+
+def montar_estado(lsas, raiz, compacta):
+    vizinhos = {vizinho: f"10.255.0.{i % 250 + 1}" for i, vizinho in enumerate(lsas[raiz]["links"])}
+    estado = EstadoRoteador(raiz, vizinhos, programador_rotas=ProgramadorRotas(BackendRotasMemoria()),
+                            agendador_spf=AgendadorManual(), lsdb_compacta=compacta)
+    for lsa in lsas.values():
+        estado.atualizar_tabela(lsa)
+    estado.recalcular_rotas()
+    return estado
+
+
+def medir_memoria(lsas, raiz, compacta):
+    """Returns: int: Bytes alocados pelo estado completo, com as rotas calculadas."""
+    gc.collect()
+    tracemalloc.start()
+    estado = montar_estado(lsas, raiz, compacta)
+    gc.collect()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del estado
+    return memoria
+
+
+def medir(grafo, compacta, repeticoes, semente):
+    lsas = montar_lsas(grafo)
+    raiz = "router1"
+    memoria = medir_memoria(lsas, raiz, compacta)
+    estado = montar_estado(lsas, raiz, compacta)
+    tabela = estado.snapshot().entradas
+    if compacta:
+        spf = medir_tempo(estado._calcular_rotas_csr, repeticoes)
+    else:
+        spf = medir_tempo(lambda: estado._calcular_rotas_minimas(tabela), repeticoes)
+
+    aleatorio = random.Random(semente)
+    origens = [id_rota for id_rota, lsa in lsas.items() if lsa["links"]]
+    quantidade = 20
+
+    def mudar_enlaces():
+        for _ in range(quantidade):
+            origem = aleatorio.choice(origens)
+            entrada = estado.obter_entrada(origem)
+            links = dict(entrada["links"])
+            links[aleatorio.choice(list(links))] = aleatorio.randint(1, 10)
+            estado.atualizar_tabela({"id_rota": origem, "numero_sequencia": entrada["numero_sequencia"] + 1,
+                                     "timestamp": 0.0, "enderecos": entrada["enderecos"], "links": links})
+            estado.recalcular_rotas()
+
+    mudanca = medir_tempo(mudar_enlaces, repeticoes) / quantidade
+    return {"bytes_por_roteador": memoria / len(lsas), "spf_completo": spf, "mudanca_enlace": mudanca}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e tempo de SPF da LSDB com dicionários e da compacta.")
+    parser.add_argument("--tamanhos", default="1000,10000,50000")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    args = parser.parse_args()
+
+    resultados = []
+    with modulo_roteador.REGISTRO.silenciado():
+        for tamanho in (int(t) for t in args.tamanhos.split(",") if t):
+            grafo = gerar_grafo(tamanho, semente=args.semente)
+            for compacta in (False, True):
+                resultado = medir(grafo, compacta, args.repeticoes, args.semente)
+                resultados.append(dict(resultado, roteadores=tamanho, lsdb="compacta" if compacta else "dicionarios"))
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    print(f"{'Roteadores':>10} {'LSDB':>12} {'Bytes/roteador':>15} {'SPF completo (ms)':>18} {'Mudança de enlace (ms)':>23}")
+    for r in resultados:
+        print(f"{r['roteadores']:>10} {r['lsdb']:>12} {r['bytes_por_roteador']:>15.0f} "
+              f"{r['spf_completo'] * 1000:>18.2f} {r['mudanca_enlace'] * 1000:>23.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import argparse
+import csv
+import gc
+import heapq
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ]
+
+import router as modulo_roteador
+from router import (BackendRotasMemoria, CodecBinario, EstadoRoteador, ProgramadorRotas,
+                    carregar_grafo_com_pesos)
+from gerar_composer import POOL_ENLACES, POOL_HOSTS, AlocadorEnderecos, gerar_grafo
+
+"""
+Suíte de benchmarks do motor de roteamento, executada sem containers.
+
+Mede os caminhos quentes do roteador em topologias geradas pelo mesmo gerador Watts–Strogatz
+do gerar_composer.py, de 15 a 10.000 roteadores:
+- carregar_grafo_com_pesos: leitura do conexoes_rede.csv.
+- spf_completo: EstadoRoteador._calcular_rotas_minimas sobre a LSDB completa.
+- atualizar_roteamento: EstadoRoteador._atualizar_roteamento a partir da tabela de próximos saltos.
+- atualizar_tabela: caminho completo de um LSA aceito (LSDB, SPF incremental e instalação de
+  rotas em memória), medido por LSA.
+- codificar/decodificar: codec JSON e binário de um LSA típico.
+
+Cada caso é o menor tempo entre --repeticoes amostras de ao menos 20 ms (veja medir). Entre
+as amostras de cada caso é medida uma carga de referência fixa (um Dijkstra com dicionários e
+heapq, como os caminhos quentes do roteador), e a comparação usa a razão entre os dois: uma
+máquina mais lenta ou mais carregada durante a execução deixa lentos o caso e a referência
+juntos, e a razão não muda.
+
+Os resultados são gravados em JSON. Com --salvar-baseline, viram a nova linha de base (de
+cada caso, fica a execução de razão mediana entre --execucoes-baseline execuções); sem ele,
+os casos de CASOS_COMPARADOS (os caminhos quentes que a linha de base acompanha) são comparados
+com benchmarks/baseline.json, e a execução falha (código de saída 1) se algum ficar mais lento
+que a linha de base além de --limite. Os demais, e os que ficam abaixo de --tempo-minimo na
+linha de base, são só informados.
+
+Uso:
+    python benchmarks/executar_benchmarks.py
+    python benchmarks/executar_benchmarks.py --tamanhos 15,100,1000 --salvar-baseline
+"""
+
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Duração mínima de cada amostra de medir(), em segundos.
+DURACAO_AMOSTRA = 0.02
+# Casos que reprovam a execução quando regridem.
+CASOS_COMPARADOS = ("spf_completo", "atualizar_tabela", "atualizar_roteamento")
+
+
+def medir(funcao, repeticoes, duracao_amostra=DURACAO_AMOSTRA, entre_amostras=None):
+    """
+    Mede o tempo de uma execução da função pelo menor entre várias amostras. Cada amostra repete
+    a função quantas vezes forem necessárias para durar ao menos duracao_amostra, calibradas por
+    uma primeira execução descartada; assim, casos de poucos microssegundos não ficam à mercê da
+    resolução do relógio. Como no timeit, o coletor de lixo fica desligado durante as amostras:
+    nas topologias grandes, uma coleta completa percorre a LSDB inteira e cai em amostras ao acaso.
+
+    Args:
+        entre_amostras (callable): Chamada depois de cada amostra (veja medir_relativo).
+
+    Returns:
+        float: Menor tempo de uma execução, em segundos.
+    """
+    inicio = time.perf_counter()
+    funcao()
+    chamadas = max(1, math.ceil(duracao_amostra / max(time.perf_counter() - inicio, 1e-9)))
+    melhor = float("inf")
+    coletor_ligado = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for _ in range(chamadas):
+                funcao()
+            melhor = min(melhor, (time.perf_counter() - inicio) / chamadas)
+            if entre_amostras is not None:
+                entre_amostras()
+    finally:
+        if coletor_ligado:
+            gc.enable()
+    return melhor
+
+
+def _montar_referencia():
+    aleatorio = random.Random(0)
+    nos = [f"r{i}" for i in range(300)]
+    grafo = {no: {} for no in nos}
+    for i, no in enumerate(nos):
+        for vizinho in (nos[(i + 1) % len(nos)], aleatorio.choice(nos), aleatorio.choice(nos)):
+            if vizinho != no:
+                grafo[no][vizinho] = grafo[vizinho][no] = aleatorio.randint(1, 10)
+
+    def dijkstra():
+        distancias = {nos[0]: 0}
+        fila = [(0, nos[0])]
+        visitados = set()
+        while fila:
+            distancia, no = heapq.heappop(fila)
+            if no in visitados:
+                continue
+            visitados.add(no)
+            for vizinho, custo in grafo[no].items():
+                nova = distancia + custo
+                if nova < distancias.get(vizinho, float("inf")):
+                    distancias[vizinho] = nova
+                    heapq.heappush(fila, (nova, vizinho))
+        return distancias
+
+    return dijkstra
+
+
+REFERENCIA = _montar_referencia()
+
+
+def medir_relativo(funcao, repeticoes, divisor=1):
+    """
+    Mede a função como em medir(), intercalando uma amostra da carga de referência depois de cada
+    amostra dela, para que as duas sofram a mesma variação da máquina.
+
+    Args:
+        divisor (int): Operações feitas por chamada da função; o tempo é dado por operação.
+
+    Returns:
+        tuple[float, float]: Menor tempo da função (por operação) e da referência, em segundos.
+    """
+    referencia = []
+    tempo = medir(funcao, repeticoes,
+                  entre_amostras=lambda: referencia.append(medir(REFERENCIA, 1)))
+    return tempo / divisor, min(referencia)
+
+
+def montar_lsas(grafo, hosts_por_roteador=2):
+    """
+    Monta o LSA que cada roteador da topologia originaria, com os endereços distribuídos pelos
+    mesmos alocadores do gerar_composer.py.
+    """
+    alocador_hosts = AlocadorEnderecos(POOL_HOSTS, 24)
+    alocador_enlaces = AlocadorEnderecos(POOL_ENLACES, 29)
+    lsas = {}
+    for r in grafo.nodes():
+        lsas[f"router{r + 1}"] = {
+            "tipo": "LSA",
+            "id_rota": f"router{r + 1}",
+            "ip_address": "0.0.0.0",
+            "timestamp": 0.0,
+            "numero_sequencia": 1,
+            "enderecos": [alocador_hosts.sub_rede(r * hosts_por_roteador + h) for h in range(hosts_por_roteador)],
+            "links": {},
+        }
+    for indice, (u, v, dados) in enumerate(grafo.edges(data=True)):
+        ru, rv = f"router{u + 1}", f"router{v + 1}"
+        lsas[ru]["links"][rv] = dados["weight"]
+        lsas[rv]["links"][ru] = dados["weight"]
+        lsas[ru]["enderecos"].append(alocador_enlaces.endereco(indice, 0))
+        lsas[rv]["enderecos"].append(alocador_enlaces.endereco(indice, 1))
+    return lsas
+
+
+def escrever_csv(grafo, caminho, hosts_por_roteador=2):
+    with open(caminho, "w", newline="") as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(["Origem", "Destino", "Custo"])
+        for r in grafo.nodes():
+            for h in range(hosts_por_roteador):
+                writer.writerow([f"router{r + 1}_host{h + 1}", f"router{r + 1}", "-"])
+        for u, v, dados in grafo.edges(data=True):
+            writer.writerow([f"router{u + 1}", f"router{v + 1}", dados["weight"]])
+
+
+class AgendadorManual:
+    """Agendador de SPF que não executa nada; o SPF é chamado explicitamente depois da carga."""
+
+    def solicitar(self, tarefa):
+        pass
+
+
+def estado_completo(lsas, raiz):
+    """Cria um EstadoRoteador com a LSDB completa e as rotas já calculadas, sem agendador."""
+    vizinhos = {vizinho: f"10.255.0.{i % 250 + 1}" for i, vizinho in enumerate(lsas[raiz]["links"])}
+    estado = EstadoRoteador(raiz, vizinhos, programador_rotas=ProgramadorRotas(BackendRotasMemoria()),
+                            agendador_spf=AgendadorManual())
+    for lsa in lsas.values():
+        estado.atualizar_tabela(lsa)
+    estado.recalcular_rotas()
+    estado._agendador_spf = None
+    return estado
+
+
+def benchmark_tamanho(tamanho, repeticoes, semente):
+    resultados = {}
+    grafo = gerar_grafo(tamanho, semente=semente)
+    lsas = montar_lsas(grafo)
+    raiz = "router1"
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "conexoes_rede.csv")
+        escrever_csv(grafo, caminho)
+        resultados["carregar_grafo_com_pesos"] = medir_relativo(lambda: carregar_grafo_com_pesos(caminho), repeticoes)
+
+    estado = estado_completo(lsas, raiz)
+    tabela = estado.snapshot().entradas
+    resultados["spf_completo"] = medir_relativo(lambda: estado._calcular_rotas_minimas(tabela), repeticoes)
+
+    proximos_saltos = dict(estado._proximos_saltos)
+    resultados["atualizar_roteamento"] = medir_relativo(lambda: estado._atualizar_roteamento(proximos_saltos),
+                                                        repeticoes)
+
+    aleatorio = random.Random(semente)
+    origens = [id_rota for id_rota, lsa in lsas.items() if lsa["links"]]
+    quantidade = 50
+
+    def atualizar_tabela():
+        for _ in range(quantidade):
+            origem = aleatorio.choice(origens)
+            entrada = estado.obter_entrada(origem)
+            links = dict(entrada["links"])
+            vizinho = aleatorio.choice(list(links))
+            links[vizinho] = aleatorio.randint(1, 10)
+            estado.atualizar_tabela({
+                "id_rota": origem,
+                "numero_sequencia": entrada["numero_sequencia"] + 1,
+                "timestamp": 0.0,
+                "enderecos": entrada["enderecos"],
+                "links": links,
+            })
+
+    resultados["atualizar_tabela"] = medir_relativo(atualizar_tabela, repeticoes, quantidade)
+    return resultados
+
+
+def benchmark_codec(repeticoes):
+    lsa = {
+        "tipo": "LSA",
+        "id_rota": "router1",
+        "ip_address": "10.0.0.2",
+        "timestamp": 1700000000.0,
+        "numero_sequencia": 7,
+        "enderecos": ["10.128.0.0/24", "10.128.1.0/24", "10.0.0.2", "10.0.0.10", "10.0.0.18"],
+        "links": {"router2": 3, "router7": 8, "router15": 1},
+    }
+    quantidade = 5000
+    mensagem_json = json.dumps(lsa).encode("utf-8")
+    mensagem_binaria = CodecBinario.codificar(lsa)
+
+    def repetir(funcao):
+        def executar():
+            for _ in range(quantidade):
+                funcao()
+        return executar
+
+    return {
+        "codificar_json": medir_relativo(repetir(lambda: json.dumps(lsa).encode("utf-8")), repeticoes, quantidade),
+        "decodificar_json": medir_relativo(repetir(lambda: json.loads(mensagem_json.decode("utf-8"))), repeticoes,
+                                           quantidade),
+        "codificar_binario": medir_relativo(repetir(lambda: CodecBinario.codificar(lsa)), repeticoes, quantidade),
+        "decodificar_binario": medir_relativo(repetir(lambda: CodecBinario.decodificar(mensagem_binaria)), repeticoes,
+                                              quantidade),
+    }
+
+
+def executar(tamanhos, repeticoes, semente):
+    """
+    Returns:
+        tuple[dict[str, float], dict[str, float]]: Tempo de cada caso e da referência medida junto
+            com ele, em segundos, indexados por 'caso@tamanho'.
+    """
+    resultados = {}
+    referencias = {}
+    # O registro do roteador fica desligado para que a escrita dos eventos não entre na medição.
+    with modulo_roteador.REGISTRO.silenciado():
+        for caso, (tempo, referencia) in benchmark_codec(repeticoes).items():
+            resultados[f"{caso}@lsa"], referencias[f"{caso}@lsa"] = tempo, referencia
+        for tamanho in tamanhos:
+            inicio = time.perf_counter()
+            for caso, (tempo, referencia) in benchmark_tamanho(tamanho, repeticoes, semente).items():
+                resultados[f"{caso}@{tamanho}"], referencias[f"{caso}@{tamanho}"] = tempo, referencia
+            print(f"  {tamanho} roteadores medidos em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+    return resultados, referencias
+
+
+def mediana_execucoes(execucoes):
+    """
+    Combina várias execuções em uma linha de base: de cada caso, fica a execução em que a razão
+    entre o caso e a referência é a mediana, para que a linha de base não seja a de uma execução
+    que calhou de ser rápida ou lenta.
+
+    Args:
+        execucoes (list[tuple[dict, dict]]): Resultados e referências de cada execução.
+
+    Returns:
+        tuple[dict[str, float], dict[str, float]]: Resultados e referências combinados.
+    """
+    resultados, referencias = {}, {}
+    for caso in execucoes[0][0]:
+        ordenadas = sorted(execucoes, key=lambda execucao: execucao[0][caso] / execucao[1][caso])
+        mediana = ordenadas[len(ordenadas) // 2]
+        resultados[caso], referencias[caso] = mediana[0][caso], mediana[1][caso]
+    return resultados, referencias
+
+
+def casos_comparados(resultados, baseline, tempo_minimo=0.0):
+    """
+    Returns:
+        list[str]: Casos de CASOS_COMPARADOS com linha de base de ao menos tempo_minimo segundos.
+    """
+    return [caso for caso in resultados
+            if caso.split("@")[0] in CASOS_COMPARADOS and baseline.get(caso, 0) >= max(tempo_minimo, 1e-12)]
+
+
+def comparar(resultados, referencias, baseline, referencias_baseline, limite, tempo_minimo=0.0):
+    """
+    Compara os resultados com a linha de base, cada um dividido pela referência medida com ele.
+
+    Args:
+        tempo_minimo (float): Casos com linha de base abaixo deste tempo, em segundos, não são comparados.
+
+    Returns:
+        list[tuple[str, float, float, float]]: Casos que regrediram (caso, base, atual, variação).
+    """
+    regressoes = []
+    for caso in casos_comparados(resultados, baseline, tempo_minimo):
+        base, tempo = baseline[caso], resultados[caso]
+        variacao = (tempo / referencias[caso]) / (base / referencias_baseline[caso]) - 1
+        if variacao > limite:
+            regressoes.append((caso, base, tempo, variacao))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do motor de roteamento com acompanhamento de regressões.")
+    parser.add_argument("--tamanhos", default="15,100,1000,10000",
+                        help="Quantidades de roteadores, separadas por vírgula.")
+    parser.add_argument("--repeticoes", type=int, default=7,
+                        help="Amostras por caso; o resultado é a menor delas.")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar os resultados.")
+    parser.add_argument("--baseline", default=ARQUIVO_BASELINE)
+    parser.add_argument("--salvar-baseline", action="store_true",
+                        help="Grava os resultados como nova linha de base em vez de comparar.")
+    parser.add_argument("--limite", type=float, default=0.3,
+                        help="Aumento relativo de tempo tolerado antes de acusar regressão (0.3 = 30%%).")
+    parser.add_argument("--execucoes-baseline", type=int, default=3,
+                        help="Execuções combinadas pela mediana ao gravar a linha de base.")
+    parser.add_argument("--tempo-minimo", type=float, default=0.001,
+                        help="Tempo da linha de base, em segundos, a partir do qual um caso é comparado.")
+    args = parser.parse_args()
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t]
+    execucoes = args.execucoes_baseline if args.salvar_baseline else 1
+    resultados, referencias = mediana_execucoes(
+        [executar(tamanhos, args.repeticoes, args.semente) for _ in range(max(1, execucoes))])
+    relatorio = {
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+        "referencias": referencias,
+    }
+
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+
+    for caso, tempo in resultados.items():
+        print(f"{caso:36} {tempo * 1e6:14.1f} µs")
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w") as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+            arquivo.write("\n")
+        print(f"Linha de base gravada em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("Nenhuma linha de base encontrada; use --salvar-baseline para criar uma.")
+        return
+
+    with open(args.baseline) as arquivo:
+        dados_baseline = json.load(arquivo)
+    baseline = dados_baseline["resultados"]
+    if "referencias" not in dados_baseline:
+        print("Linha de base sem as medidas de referência; grave outra com --salvar-baseline.")
+        sys.exit(1)
+    regressoes = comparar(resultados, referencias, baseline, dados_baseline["referencias"], args.limite,
+                          args.tempo_minimo)
+    comparados = len(casos_comparados(resultados, baseline, args.tempo_minimo))
+    print(f"\n{comparados} de {len(resultados)} caso(s) comparados com a linha de base "
+          f"({', '.join(CASOS_COMPARADOS)}, a partir de {args.tempo_minimo * 1e3:g} ms).")
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} caso(s) mais lento(s) que a linha de base (limite {args.limite:.0%}):")
+        for caso, base, tempo, variacao in regressoes:
+            print(f"  {caso:36} {base * 1e6:12.1f} µs -> {tempo * 1e6:12.1f} µs (+{variacao:.0%} descontada a referência)")
+        sys.exit(1)
+    print(f"\n✅ Nenhuma regressão acima de {args.limite:.0%} em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.join(DIRETORIO, "..")
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ, DIRETORIO]
+
+import router as modulo_roteador
+from router import (BackendRotasMemoria, CodecPacotes, Histograma, ProgramadorRotas, Roteador,
+                    calcular_checksum_lsa)
+from executar_benchmarks import montar_lsas
+from gerar_composer import gerar_grafo
+
+"""
+Gerador de carga UDP para o caminho de recepção do roteador.
+
+Sobe um Roteador ('router1') na interface de loopback, com as interfaces fixas, as rotas
+instaladas só em memória e os envios apenas contados (nada sai da máquina), e o alimenta pelo
+próprio receber_pacotes, a partir de outro processo, com HELLOs dos vizinhos e LSAs de todos os
+roteadores de uma topologia gerada pelo gerar_composer.py. A carga é aplicada em estágios de
+taxa crescente (--taxas-lsa), e cada estágio informa:
+- pacotes enviados e processados por segundo (a taxa sustentada é a processada);
+- descartes: pacotes enviados que o roteador nunca leu, e quantos deles o kernel contou como
+  descartados por buffer de recepção cheio;
+- percentis de latência da decodificação, da atualização da LSDB, da aceitação de um lote de
+  LSAs (LSDB e reencaminhamento), do SPF e da instalação de rotas;
+- tamanho dos lotes lidos do socket e o RSS do processo ao longo do tempo.
+
+O padrão de números de sequência dos LSAs (--padrao) escolhe o caminho exercitado:
+- crescente: todo LSA é novo; uma fração (--mudancas) muda o custo de um link e exige SPF;
+- repetido: cada LSA chega em várias cópias, como no flooding por vários vizinhos;
+- aleatorio: números de sequência fora de ordem, com LSAs antigos misturados aos novos;
+- delta: LSAs delta sobre o anterior, cada um mudando o custo de um link, com um LSA completo
+  a cada 32.
+O tamanho dos LSAs cresce com --hosts-por-roteador (endereços anunciados) e com o grau da
+topologia.
+
+Uso:
+    python benchmarks/gerador_carga.py [--roteadores 200] [--taxas-lsa 1000,5000,20000,50000]
+    python benchmarks/gerador_carga.py --padrao delta --codec json --duracao 5 --json
+"""
+
+PADROES = ("crescente", "repetido", "aleatorio", "delta")
+COPIAS_REPETIDO = 4
+INTERVALO_COMPLETO_DELTA = 32
+LATENCIAS = ("decodificacao_segundos", "atualizar_tabela_segundos", "aceitar_lsas_segundos",
+             "spf_segundos", "aplicar_rotas_segundos")
+
+
+class TransporteContador:
+    """
+    Transporte que só conta o que o roteador enviaria, para que a carga meça a recepção sem
+    depender de vizinhos reais.
+
+    Atributos:
+        pacotes (int): Pacotes enviados.
+        bytes (int): Bytes enviados.
+    """
+    __slots__ = ["pacotes", "bytes"]
+
+    def __init__(self):
+        self.pacotes = 0
+        self.bytes = 0
+
+    def enviar(self, dados: bytes, destino: tuple):
+        self.pacotes += 1
+        self.bytes += len(dados)
+
+
+class BackendRotasDescarte(BackendRotasMemoria):
+    """Backend em memória que não guarda o histórico de lotes, para não inflar o RSS medido."""
+    __slots__ = []
+
+    def executar(self, operacoes: list[tuple]):
+        sucesso = super().executar(operacoes)
+        self.lotes.clear()
+        return sucesso
+
+
+class HistogramaAmostrado(Histograma):
+    """
+    Histograma que também guarda cada observação até a próxima leitura, para percentis exatos.
+
+    Atributos:
+        amostras (list[float]): Observações desde a última chamada de retirar().
+    """
+    __slots__ = ["amostras"]
+
+    def __init__(self, limites: tuple):
+        super().__init__(limites)
+        self.amostras = []
+
+    def observar(self, valor: float):
+        super().observar(valor)
+        self.amostras.append(valor)
+
+    def retirar(self):
+        amostras, self.amostras = self.amostras, []
+        return amostras
+
+
+class RoteadorInstrumentado(Roteador):
+    """
+    Roteador que mede cada aceitação de lote de LSAs (atualização da LSDB e reencaminhamento) e
+    guarda o instante do fim do último lote recebido, de onde sai a taxa processada.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fim_ultimo_lote = 0.0
+        metricas = self._metricas
+        for nome in LATENCIAS:
+            histograma = metricas.histogramas.get(nome)
+            metricas.histogramas[nome] = HistogramaAmostrado(histograma.limites if histograma
+                                                             else metricas.LIMITES_LATENCIA)
+        metricas.histogramas["lote_recepcao"] = HistogramaAmostrado(metricas.LIMITES_LOTE)
+
+    def _aceitar_lsas(self, area: int, novos: list[tuple[dict, tuple]]):
+        inicio = time.perf_counter()
+        super()._aceitar_lsas(area, novos)
+        self._metricas.observar("aceitar_lsas_segundos", time.perf_counter() - inicio)
+
+    def processar_lote(self, datagramas: list[tuple[bytes, tuple]]):
+        super().processar_lote(datagramas)
+        self.fim_ultimo_lote = time.perf_counter()
+
+
+def percentis(amostras: list[float], escala: float = 1.0):
+    """
+    Returns:
+        dict | None: p50, p90, p99 e máximo das amostras multiplicadas por escala, ou None sem amostras.
+    """
+    if not amostras:
+        return None
+    ordenadas = sorted(amostras)
+    ultimo = len(ordenadas) - 1
+    return {nome: ordenadas[min(ultimo, int(fracao * len(ordenadas)))] * escala
+            for nome, fracao in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))}
+
+
+def ler_rss():
+    """Returns: int: RSS atual do processo, em KiB (0 se /proc não estiver disponível)."""
+    try:
+        with open("/proc/self/status") as arquivo:
+            return next(int(linha.split()[1]) for linha in arquivo if linha.startswith("VmRSS:"))
+    except (OSError, StopIteration):
+        return 0
+
+
+def ip_vizinho(indice: int):
+    return f"10.255.{indice // 250}.{indice % 250 + 1}"
+
+
+def montar_topologia(roteadores: int, hosts_por_roteador: int, semente: int):
+    """
+    Returns:
+        tuple[dict[str, dict], dict[str, int]]: LSA de cada roteador da topologia gerada e custo
+            do enlace de router1 até cada vizinho.
+    """
+    lsas = montar_lsas(gerar_grafo(roteadores, semente=semente), hosts_por_roteador)
+    return lsas, dict(lsas["router1"]["links"])
+
+
+def montar_carga(config: dict, estagio: int, taxa_lsa: float):
+    """
+    Monta e codifica, antes de a medição começar, os datagramas de um estágio na ordem de envio.
+
+    Returns:
+        tuple[list[tuple[float, bytes]], dict]: Instante de envio (relativo ao início) e dados de
+            cada datagrama, e o resumo da carga (quantidades e tamanho médio dos LSAs).
+    """
+    aleatorio = random.Random(config["semente"] * 1000 + estagio)
+    lsas, vizinhos = montar_topologia(config["roteadores"], config["hosts_por_roteador"], config["semente"])
+    binario = config["codec"] == "binario"
+    codec = CodecPacotes("binario" if binario else "json")
+    duracao = config["duracao"]
+
+    datagramas = []
+    taxa_hello = config["taxa_hello"]
+    hellos = [codec.codificar({"tipo": "HELLO", "id_rota": vizinho, "ip_address": ip_vizinho(i),
+                               "timestamp": time.time(), "vizinhos_conhecidos": ["router1"],
+                               "codecs": codec.codecs_suportados()}, binario)
+              for i, vizinho in enumerate(vizinhos)]
+    if hellos and taxa_hello > 0:
+        datagramas.extend((i / taxa_hello, hellos[i % len(hellos)]) for i in range(int(taxa_hello * duracao)))
+
+    origens = sorted(id_rota for id_rota in lsas if id_rota != "router1")
+    inicio_sequencia = (estagio + 1) * 1_000_000
+    contagem = {id_rota: 0 for id_rota in origens}
+    codificados = {}
+    tamanhos = []
+    padrao = config["padrao"]
+    quantidade = int(taxa_lsa * duracao)
+    i = 0
+    while i < quantidade:
+        id_rota = aleatorio.choice(origens)
+        lsa = lsas[id_rota]
+        k = contagem[id_rota]
+        contagem[id_rota] += 1
+        if padrao == "aleatorio":
+            numero_sequencia = inicio_sequencia + max(0, k - aleatorio.randrange(8))
+        else:
+            numero_sequencia = inicio_sequencia + k
+        dados = codificados.get((id_rota, numero_sequencia))
+        if dados is None:
+            links = lsa["links"]
+            completo = padrao != "delta" or k % INTERVALO_COMPLETO_DELTA == 0 or not links
+            if links and (not completo or aleatorio.random() < config["mudancas"]):
+                vizinho = aleatorio.choice(sorted(links))
+                links = lsa["links"] = dict(links, **{vizinho: aleatorio.randint(1, 10)})
+            pacote = {"tipo": "LSA", "id_rota": id_rota, "ip_address": "0.0.0.0", "timestamp": time.time(),
+                      "numero_sequencia": numero_sequencia, "enderecos": lsa["enderecos"], "links": links,
+                      "checksum": calcular_checksum_lsa(lsa["enderecos"], links)}
+            if not completo:
+                pacote.update(base=numero_sequencia - 1, enderecos=[], links={vizinho: links[vizinho]})
+            dados = codificados[(id_rota, numero_sequencia)] = codec.codificar(pacote, binario)
+        for _ in range(COPIAS_REPETIDO if padrao == "repetido" else 1):
+            if i < quantidade:
+                datagramas.append((i / taxa_lsa, dados))
+                tamanhos.append(len(dados))
+                i += 1
+    datagramas.sort(key=lambda item: item[0])
+    resumo = {"hellos": len(datagramas) - len(tamanhos), "lsas": len(tamanhos),
+              "bytes_lsa_medio": sum(tamanhos) / len(tamanhos) if tamanhos else 0}
+    return datagramas, resumo
+
+
+def gerar(config: dict, estagio: int, taxa_lsa: float, pronto, iniciar, enviados, resumo_fila):
+    """
+    Processo gerador: codifica a carga do estágio, espera o sinal de início e envia os
+    datagramas nos instantes previstos, atualizando o contador de enviados.
+    """
+    datagramas, resumo = montar_carga(config, estagio, taxa_lsa)
+    resumo_fila.put(resumo)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    destino = ("127.0.0.1", config["porta"])
+    pronto.set()
+    iniciar.wait()
+    inicio = time.perf_counter()
+    for indice, (instante, dados) in enumerate(datagramas):
+        atraso = inicio + instante - time.perf_counter()
+        if atraso > 0.001:
+            time.sleep(atraso)
+        try:
+            sock.sendto(dados, destino)
+        except OSError:
+            continue
+        if indice & 255 == 255:
+            enviados.value = indice + 1
+    enviados.value = len(datagramas)
+    sock.close()
+
+
+class Medicao:
+    """
+    Acompanha o roteador durante um estágio: contadores de pacotes, descartes do kernel,
+    latências e RSS, lidos a cada intervalo.
+
+    Atributos:
+        _roteador (RoteadorInstrumentado): Roteador medido.
+        amostras (dict[str, list[float]]): Latências acumuladas no estágio, por nome.
+        lotes (list[float]): Tamanhos dos lotes lidos do socket no estágio.
+        serie (list[dict]): Uma linha por intervalo.
+    """
+    __slots__ = ["_roteador", "amostras", "lotes", "serie"]
+
+    def __init__(self, roteador: RoteadorInstrumentado):
+        self._roteador = roteador
+        self.amostras = {nome: [] for nome in LATENCIAS}
+        self.lotes = []
+        self.serie = []
+
+    def recebidos(self):
+        return sum(valor for (nome, _), valor in list(self._roteador._metricas.contadores.items())
+                   if nome == "pacotes_recebidos_total")
+
+    def descartes_kernel(self):
+        for nome, _, _, funcao in self._roteador._metricas._medidores:
+            if nome == "descartes_kernel_total":
+                return funcao()
+        return 0
+
+    def coletar(self):
+        """Retira as amostras novas dos histogramas e devolve as deste intervalo."""
+        histogramas = self._roteador._metricas.histogramas
+        intervalo = {}
+        for nome in LATENCIAS:
+            amostras = histogramas[nome].retirar()
+            self.amostras[nome].extend(amostras)
+            intervalo[nome] = amostras
+        self.lotes.extend(histogramas["lote_recepcao"].retirar())
+        return intervalo
+
+
+def medir_estagio(roteador, config: dict, estagio: int, taxa_lsa: float, imprimir: bool):
+    """
+    Executa um estágio de carga e devolve o resumo dele.
+
+    Returns:
+        dict: Taxas enviada e processada, descartes, percentis de latência e RSS do estágio.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    pronto, iniciar = contexto.Event(), contexto.Event()
+    enviados = contexto.Value("q", 0, lock=False)
+    resumo_fila = contexto.Queue()
+    processo = contexto.Process(target=gerar, args=(config, estagio, taxa_lsa, pronto, iniciar, enviados, resumo_fila),
+                                daemon=True)
+    processo.start()
+    resumo_carga = resumo_fila.get()
+    pronto.wait()
+
+    medicao = Medicao(roteador)
+    medicao.coletar()
+    recebidos_inicio = recebidos_antes = medicao.recebidos()
+    descartes_inicio = medicao.descartes_kernel()
+    rss_inicio = ler_rss()
+    enviados_antes = 0
+    inicio = anterior = time.perf_counter()
+    iniciar.set()
+    parado_desde = None
+    while True:
+        time.sleep(config["intervalo"])
+        agora = time.perf_counter()
+        recebidos = medicao.recebidos()
+        enviados_agora = enviados.value
+        latencias = medicao.coletar()
+        linha = {
+            "t": agora - inicio,
+            "enviados_por_s": (enviados_agora - enviados_antes) / (agora - anterior),
+            "processados_por_s": (recebidos - recebidos_antes) / (agora - anterior),
+            "descartes_kernel": medicao.descartes_kernel() - descartes_inicio,
+            "decodificacao_p99_us": (percentis(latencias["decodificacao_segundos"], 1e6) or {}).get("p99"),
+            "spf_p99_ms": (percentis(latencias["spf_segundos"], 1e3) or {}).get("p99"),
+            "rss_kib": ler_rss(),
+        }
+        medicao.serie.append(linha)
+        if imprimir:
+            print(f"  {linha['t']:6.1f}s  enviados {linha['enviados_por_s']:>9.0f}/s  "
+                  f"processados {linha['processados_por_s']:>9.0f}/s  descartes kernel {linha['descartes_kernel']:>8}  "
+                  f"decod p99 {formatar(linha['decodificacao_p99_us'], 'us')}  "
+                  f"SPF p99 {formatar(linha['spf_p99_ms'], 'ms')}  RSS {linha['rss_kib'] / 1024:.1f} MiB")
+        # Depois do fim do envio, espera a fila do socket esvaziar (nenhum pacote novo lido).
+        if not processo.is_alive():
+            if recebidos == recebidos_antes:
+                parado_desde = parado_desde if parado_desde is not None else agora
+                if agora - parado_desde >= config["intervalo"]:
+                    break
+            else:
+                parado_desde = None
+        enviados_antes, recebidos_antes, anterior = enviados_agora, recebidos, agora
+    processo.join()
+    duracao = max(roteador.fim_ultimo_lote, inicio + config["duracao"]) - inicio
+
+    total_enviados = enviados.value
+    total_recebidos = medicao.recebidos() - recebidos_inicio
+    perdidos = max(0, total_enviados - total_recebidos)
+    return {
+        "estagio": estagio,
+        "taxa_lsa": taxa_lsa,
+        "taxa_hello": config["taxa_hello"],
+        **resumo_carga,
+        "enviados": total_enviados,
+        "processados": total_recebidos,
+        "taxa_enviada": total_enviados / config["duracao"],
+        "taxa_processada": total_recebidos / duracao if duracao > 0 else 0.0,
+        "descartados": perdidos,
+        "taxa_descarte": perdidos / total_enviados if total_enviados else 0.0,
+        "descartes_kernel": medicao.descartes_kernel() - descartes_inicio,
+        "latencias_us": {nome.removesuffix("_segundos"): percentis(amostras, 1e6)
+                         for nome, amostras in medicao.amostras.items()},
+        "spf_execucoes": len(medicao.amostras["spf_segundos"]),
+        "lote": percentis(medicao.lotes),
+        "rss_inicio_kib": rss_inicio,
+        "rss_fim_kib": ler_rss(),
+        "serie": medicao.serie,
+    }
+
+
+def formatar(valor, unidade: str):
+    return f"{'-':>8}" if valor is None else f"{valor:>6.1f}{unidade}"
+
+
+def criar_roteador(config: dict):
+    """
+    Cria o roteador medido e inicia a recepção e as tarefas periódicas dele.
+
+    Returns:
+        tuple[RoteadorInstrumentado, TransporteContador]: Roteador e o transporte que conta os envios.
+    """
+    _, vizinhos = montar_topologia(config["roteadores"], config["hosts_por_roteador"], config["semente"])
+    transporte = TransporteContador()
+    roteador = RoteadorInstrumentado(
+        "router1", porta_comunicacao=config["porta"],
+        interfaces=[{"interface": "lo", "address": "127.0.0.1", "broadcast": "127.255.255.255"}],
+        custos_enlaces=vizinhos, programador_rotas=ProgramadorRotas(BackendRotasDescarte()),
+        transporte=transporte, modo_codec="auto" if config["codec"] == "binario" else "json",
+        buffer_recepcao=config["buffer_recepcao"], tamanho_lote=config["tamanho_lote"],
+        semente=config["semente"])
+    threading.Thread(target=roteador.receber_pacotes, daemon=True).start()
+    roteador.iniciar_comunicacao()
+    return roteador, transporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga UDP sintética sobre o caminho de recepção de um roteador.")
+    parser.add_argument("--roteadores", type=int, default=200,
+                        help="Tamanho da topologia; os LSAs vêm de todos os roteadores exceto router1.")
+    parser.add_argument("--hosts-por-roteador", type=int, default=2,
+                        help="Redes de hosts por roteador (aumenta os endereços de cada LSA).")
+    parser.add_argument("--taxas-lsa", default="1000,5000,20000,50000", help="LSAs por segundo em cada estágio.")
+    parser.add_argument("--taxa-hello", type=float, default=100, help="HELLOs por segundo, somados entre os vizinhos.")
+    parser.add_argument("--padrao", choices=PADROES, default="crescente", help="Padrão dos números de sequência.")
+    parser.add_argument("--mudancas", type=float, default=0.1,
+                        help="Fração dos LSAs novos que muda o custo de um link (e exige SPF).")
+    parser.add_argument("--duracao", type=float, default=10, help="Duração do envio em cada estágio, em segundos.")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Intervalo entre as leituras, em segundos.")
+    parser.add_argument("--codec", choices=["binario", "json"], default="binario")
+    parser.add_argument("--porta", type=int, default=15000)
+    parser.add_argument("--buffer-recepcao", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--tamanho-lote", type=int, default=256)
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON.")
+    args = parser.parse_args()
+
+    config = {"roteadores": args.roteadores, "hosts_por_roteador": args.hosts_por_roteador,
+              "taxa_hello": args.taxa_hello, "padrao": args.padrao, "mudancas": args.mudancas,
+              "duracao": args.duracao, "intervalo": args.intervalo, "codec": args.codec, "porta": args.porta,
+              "buffer_recepcao": args.buffer_recepcao, "tamanho_lote": args.tamanho_lote, "semente": args.semente}
+    resultados = []
+    with modulo_roteador.REGISTRO.silenciado():
+        roteador, transporte = criar_roteador(config)
+        for estagio, taxa in enumerate(float(t) for t in args.taxas_lsa.split(",") if t):
+            if not args.json:
+                print(f"Estágio {estagio}: {taxa:.0f} LSAs/s + {args.taxa_hello:.0f} HELLOs/s ({args.padrao}, {args.codec})")
+            resultado = medir_estagio(roteador, config, estagio, taxa, not args.json)
+            resultado["enviados_roteador"] = transporte.pacotes
+            resultados.append(resultado)
+        roteador.parar_comunicacao()
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+
+    print(f"\n{'LSAs/s':>8} {'Enviados/s':>11} {'Processados/s':>14} {'Descarte':>9} {'Kernel':>8} "
+          f"{'Bytes LSA':>10} {'Decod p50/p99 (us)':>19} {'LSDB p99 (us)':>14} {'Lote LSAs p99 (us)':>19} "
+          f"{'SPF p50/p99 (ms)':>17} {'RSS (MiB)':>16}")
+    for r in resultados:
+        latencias = r["latencias_us"]
+        decod = latencias["decodificacao"] or {}
+        lsdb = latencias["atualizar_tabela"] or {}
+        aceitar = latencias["aceitar_lsas"] or {}
+        spf = latencias["spf"] or {}
+        print(f"{r['taxa_lsa']:>8.0f} {r['taxa_enviada']:>11.0f} {r['taxa_processada']:>14.0f} "
+              f"{r['taxa_descarte']:>9.2%} {r['descartes_kernel']:>8} {r['bytes_lsa_medio']:>10.0f} "
+              f"{decod.get('p50', 0):>9.1f}/{decod.get('p99', 0):<9.1f} {lsdb.get('p99', 0):>14.1f} "
+              f"{aceitar.get('p99', 0):>19.1f} {spf.get('p50', 0) / 1000:>8.2f}/{spf.get('p99', 0) / 1000:<8.2f} "
+              f"{r['rss_inicio_kib'] / 1024:>7.1f}->{r['rss_fim_kib'] / 1024:<7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
-import networkx as nx
-import random
-import yaml
-import matplotlib.pyplot as plt
+import argparse
 import csv
+import ipaddress
+import json
+import os
+import random
+import time
+
+import networkx as nx
 
 """
 Este script automatiza a criação de uma topologia de rede simulada, incluindo roteadores e hosts,
@@ -10,141 +14,521 @@ utilizando containers Docker. Ele gera automaticamente:
 
 - Um arquivo 'docker-compose.yml' com a configuração de redes e containers.
 - Um arquivo CSV ('conexoes_rede.csv') descrevendo as conexões entre dispositivos.
-- Uma imagem PNG ('Topologia_rede.png') visualizando a topologia da rede.
+- Um índice de vizinhos por roteador ('router/vizinhos/routerN.csv', colunas Vizinho,Custo e,
+  com áreas, Area), montado no container como /app/vizinhos.csv, para que o roteador leia só os
+  próprios enlaces.
+- Uma imagem PNG ('Topologia_rede.png') visualizando a topologia da rede (só em topologias pequenas).
+
+Com --saida namespaces, no lugar do compose são gerados um script ('rede_namespaces.sh') que
+monta a mesma topologia em namespaces de rede do Linux, ligados por pares veth, e um manifesto
+('router/namespaces.json') com o namespace, o índice de vizinhos e o ambiente de cada roteador,
+lido pelo supervisor.py, que executa todos os roteadores em um único processo.
 
 Funcionalidades:
 -----------------
-- Criação de grafo com roteadores e links aleatórios.
+- Criação de grafo com roteadores e links aleatórios (Watts–Strogatz), com tamanho, grau,
+  probabilidade de religação e semente configuráveis pela linha de comando, opcionalmente
+  dividido em áreas ligadas por um backbone.
 - Associação de hosts a cada roteador com sub-redes individuais.
 - Geração de conexões ponto-a-ponto entre roteadores com endereçamento IP.
-- Exportação de um arquivo docker-compose.yml com a configuração da rede.
-- Exportação de um arquivo CSV simplificado com informações das conexões.
+- Endereços tirados de pools configuráveis (por padrão /24 para hosts e /29 para enlaces), com
+  verificação de capacidade antes de escrever qualquer arquivo.
+- Exportação do docker-compose.yml e do CSV em streaming, serviço por serviço, sem montar o
+  compose inteiro em memória; 10.000 roteadores são gerados em poucos segundos.
 - Visualização gráfica da topologia da rede em arquivo de imagem.
+
+Uso:
+    python gerar_composer.py
+    python gerar_composer.py --roteadores 10000 --grau 4 --semente 7
+    python gerar_composer.py --roteadores 500 --prefixo-enlaces 30 --sem-imagem
+    python gerar_composer.py --roteadores 2000 --areas 8 --agregar-rotas --sem-imagem
+    python gerar_composer.py --roteadores 500 --saida namespaces --sem-imagem
 """
 
-# CONFIGURAÇÕES
+# CONFIGURAÇÕES PADRÃO
 num_roteadores = 15
 hosts_por_roteador = 2
+POOL_HOSTS = "10.128.0.0/9"
+POOL_ENLACES = "10.0.0.0/10"
+LIMITE_IMAGEM = 100
+SEMENTE_PADRAO = 1
 
 
-grafo = nx.connected_watts_strogatz_graph(num_roteadores, k=2, p=0.7)
-for (u, v) in grafo.edges():
-    grafo.edges[u, v]['weight'] = random.randint(1, 10)
+def gerar_grafo(num_roteadores, k=2, p=0.7, semente=None, areas=1, bordas_por_area=2):
+    """
+    Gera um grafo conectado de Watts–Strogatz com pesos aleatórios de 1 a 10 nas arestas.
+    Também é usado pelo simulador, para que as topologias simuladas sigam o mesmo gerador.
 
-compose = {
-    'version': '3.8',
-    'services': {},
-    'networks': {}
-}
+    Com areas > 1, os roteadores são divididos em blocos contíguos, um por área (1, 2, ...),
+    cada um com o próprio Watts–Strogatz; o atributo 'area' de nós e enlaces guarda a área.
+    Até bordas_por_area roteadores de cada área viram bordas e são ligados em anel por enlaces
+    do backbone (área 0), que assim é contíguo, como o roteamento por áreas exige.
+    """
+    aleatorio = random.Random(semente)
+    if areas <= 1:
+        grafo = nx.connected_watts_strogatz_graph(num_roteadores, k=k, p=p, seed=semente)
+    else:
+        grafo = gerar_grafo_areas(num_roteadores, k, p, aleatorio, areas, bordas_por_area)
+    for (u, v) in grafo.edges():
+        grafo.edges[u, v]['weight'] = aleatorio.randint(1, 10)
+    return grafo
 
-subrede_base = 1
-pontoaponto_base = 1
 
-# CSV simplificado: Origem, Destino, Custo
-with open("router/conexoes_rede.csv", mode='w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['Origem', 'Destino', 'Custo'])
+def gerar_grafo_areas(num_roteadores, k, p, aleatorio: random.Random, areas, bordas_por_area):
+    """
+    Monta a topologia dividida em áreas descrita em gerar_grafo (sem os pesos).
 
-    # Criar roteadores e hosts
-    for r in grafo.nodes():
-        router_name = f"router{r+1}"  
-        router_networks = []
+    Raises:
+        ValueError: Se houver mais áreas do que roteadores.
+    """
+    if areas > num_roteadores:
+        raise ValueError(f"{areas} áreas não cabem em {num_roteadores} roteadores")
+    grafo = nx.Graph()
+    bordas = []
+    inicio = 0
+    for area in range(1, areas + 1):
+        tamanho = num_roteadores // areas + (1 if area <= num_roteadores % areas else 0)
+        if tamanho > k:
+            bloco = nx.connected_watts_strogatz_graph(tamanho, k=k, p=p, seed=aleatorio.randrange(2 ** 32))
+        else:
+            bloco = nx.path_graph(tamanho)
+        grafo.add_nodes_from(range(inicio, inicio + tamanho), area=area)
+        grafo.add_edges_from(((inicio + u, inicio + v) for u, v in bloco.edges()), area=area)
+        bordas.extend(sorted(aleatorio.sample(range(inicio, inicio + tamanho), min(bordas_por_area, tamanho))))
+        inicio += tamanho
+    for u, v in zip(bordas, bordas[1:] + bordas[:1]):
+        if u != v and not grafo.has_edge(u, v):
+            grafo.add_edge(u, v, area=0)
+    return grafo
+
+
+class AlocadorEnderecos:
+    """
+    Divide um pool de endereços em sub-redes de tamanho fixo, acessadas por índice: a sub-rede i
+    é calculada direto do endereço base, sem percorrer as anteriores nem guardá-las em memória.
+
+    Os endereços dos dispositivos dentro de cada sub-rede seguem o tamanho dela:
+    - /31: os dois endereços (enlace ponto-a-ponto, RFC 3021);
+    - /30: os dois endereços utilizáveis;
+    - /29 ou maior: a partir do terceiro endereço, deixando o primeiro utilizável para o
+      gateway que o Docker reserva para a bridge de cada rede.
+
+    Atributos:
+        pool (ipaddress.IPv4Network): Bloco de onde as sub-redes são tiradas.
+        prefixo (int): Tamanho de prefixo de cada sub-rede.
+        capacidade (int): Quantidade de sub-redes disponíveis no pool.
+        _base (int): Primeiro endereço do pool, como inteiro.
+        _passo (int): Quantidade de endereços em cada sub-rede.
+        _primeiro (int): Deslocamento do primeiro endereço de dispositivo na sub-rede.
+    """
+    __slots__ = ["pool", "prefixo", "capacidade", "_base", "_passo", "_primeiro"]
+
+    def __init__(self, pool: str, prefixo: int):
+        self.pool = ipaddress.IPv4Network(pool)
+        if not self.pool.prefixlen <= prefixo <= 31:
+            raise ValueError(f"Prefixo /{prefixo} não cabe no pool {self.pool}")
+        self.prefixo = prefixo
+        self.capacidade = 2 ** (prefixo - self.pool.prefixlen)
+        self._base = int(self.pool.network_address)
+        self._passo = 2 ** (32 - prefixo)
+        self._primeiro = 0 if prefixo == 31 else 1 if prefixo == 30 else 2
+
+    @property
+    def dispositivos_por_rede(self):
+        return self._passo - self._primeiro - (0 if self.prefixo == 31 else 1)
+
+    def reservar(self, quantidade: int, descricao: str):
+        """
+        Confere se o pool comporta a quantidade de sub-redes pedida.
+
+        Raises:
+            ValueError: Se o pool não tiver sub-redes suficientes.
+        """
+        if quantidade > self.capacidade:
+            raise ValueError(f"O pool {self.pool} comporta {self.capacidade} redes /{self.prefixo}, "
+                             f"mas são necessárias {quantidade} para {descricao}")
+
+    def sub_rede(self, indice: int):
+        """
+        Returns:
+            str: A sub-rede de número indice, no formato 'a.b.c.d/p'.
+        """
+        return f"{ipaddress.IPv4Address(self._base + indice * self._passo)}/{self.prefixo}"
+
+    def endereco(self, indice: int, dispositivo: int):
+        """
+        Returns:
+            str: O endereço do dispositivo de número dispositivo (0, 1, ...) na sub-rede indice.
+        """
+        return str(ipaddress.IPv4Address(self._base + indice * self._passo + self._primeiro + dispositivo))
+
+    def broadcast(self, indice: int):
+        return str(ipaddress.IPv4Address(self._base + (indice + 1) * self._passo - 1))
+
+
+def escrever_servico(arquivo, nome, build, rede_ips, ambiente=None, volumes=None, sysctls=None):
+    """
+    Escreve um serviço do compose no mesmo formato que o yaml.dump gerava.
+
+    Args:
+        arquivo: Arquivo de saída.
+        nome (str): Nome do serviço e do container.
+        build (str): Diretório de build.
+        rede_ips (list[tuple[str, str]]): Redes do serviço e o IP em cada uma.
+        ambiente (dict[str, str]): Variáveis de ambiente.
+        volumes (list[str]): Volumes montados.
+        sysctls (dict[str, str]): Parâmetros de kernel do namespace de rede do container.
+    """
+    linhas = [f"  {nome}:", f"    build: {build}", f"    container_name: {nome}"]
+    if ambiente:
+        linhas.append("    environment:")
+        linhas.extend(f"      {chave}: {valor}" for chave, valor in ambiente.items())
+    if volumes:
+        linhas.append("    volumes:")
+        linhas.extend(f"    - {volume}" for volume in volumes)
+    if sysctls:
+        linhas.append("    sysctls:")
+        linhas.extend(f"      {chave}: {valor}" for chave, valor in sysctls.items())
+    linhas.append("    cap_add:")
+    linhas.append("    - NET_ADMIN")
+    linhas.append("    networks:")
+    for rede, ip in rede_ips:
+        linhas.append(f"      {rede}:")
+        linhas.append(f"        ipv4_address: {ip}")
+    arquivo.write("\n".join(linhas))
+    arquivo.write("\n")
+
+
+def escrever_rede(arquivo, nome, sub_rede):
+    arquivo.write(f"  {nome}:\n    driver: bridge\n    ipam:\n      config:\n      - subnet: {sub_rede}\n")
+
+
+def preparar_enlaces(grafo):
+    """
+    Returns:
+        tuple: Roteadores, se o grafo tem áreas, a posição de cada roteador, os enlaces
+            (u, v, dados) e, por roteador, os enlaces dele como (índice do enlace, posição 0 ou 1).
+    """
+    roteadores = list(grafo.nodes())
+    com_areas = any("area" in dados for _, dados in grafo.nodes(data=True))
+    indice_roteador = {r: i for i, r in enumerate(roteadores)}
+    enlaces = list(grafo.edges(data=True))
+    enlaces_roteador = {r: [] for r in roteadores}
+    for i, (u, v, _) in enumerate(enlaces):
+        enlaces_roteador[u].append((i, 0))
+        enlaces_roteador[v].append((i, 1))
+    return roteadores, com_areas, indice_roteador, enlaces, enlaces_roteador
+
+
+def escrever_vizinhos(diretorio_vizinhos, router_name, enlaces, enlaces_do_roteador, com_areas):
+    """
+    Escreve o índice de vizinhos do roteador.
+
+    Returns:
+        str: Caminho do índice.
+    """
+    caminho = os.path.join(diretorio_vizinhos, f"{router_name}.csv")
+    with open(caminho, "w") as indice:
+        indice.write("Vizinho,Custo,Area\n" if com_areas else "Vizinho,Custo\n")
+        for i, posicao in enlaces_do_roteador:
+            u, v, d = enlaces[i]
+            area = f",{d['area']}" if com_areas else ""
+            indice.write(f"router{(v if posicao == 0 else u) + 1},{d['weight']}{area}\n")
+    return caminho
+
+
+def escrever_topologia(grafo, hosts_por_roteador, alocador_hosts: AlocadorEnderecos = None,
+                       alocador_enlaces: AlocadorEnderecos = None, caminho_compose="docker-compose.yml",
+                       caminho_csv="router/conexoes_rede.csv", diretorio_vizinhos="router/vizinhos",
+                       ambiente_roteadores=None):
+    """
+    Escreve o 'docker-compose.yml', o 'router/conexoes_rede.csv' e o índice de vizinhos de cada
+    roteador em diretorio_vizinhos. ambiente_roteadores são variáveis extras repassadas a todos
+    os roteadores. Se o grafo tiver áreas (veja gerar_grafo), o índice ganha a coluna Area e cada
+    roteador, a variável AREA.
+
+    O compose e o CSV são escritos em streaming. Como as sub-redes são calculadas pelo índice
+    (a rede de host h do roteador r é a de número r * hosts_por_roteador + h, e a rede do enlace
+    i é a de número i), a seção 'networks' é escrita depois da 'services' sem guardar as
+    atribuições feitas na primeira.
+
+    Raises:
+        ValueError: Se algum pool não comportar a topologia.
+    """
+    alocador_hosts = alocador_hosts or AlocadorEnderecos(POOL_HOSTS, 24)
+    alocador_enlaces = alocador_enlaces or AlocadorEnderecos(POOL_ENLACES, 29)
+
+    roteadores, com_areas, indice_roteador, enlaces, enlaces_roteador = preparar_enlaces(grafo)
+    alocador_hosts.reservar(len(roteadores) * hosts_por_roteador, "as redes de hosts")
+    alocador_enlaces.reservar(len(enlaces), "os enlaces entre roteadores")
 
+    def nome_enlace(i):
+        u, v, _ = enlaces[i]
+        return f"router{u+1}_router{v+1}_net"
+
+    # O compose resolve os volumes a partir do diretório dele.
+    diretorio_compose = os.path.dirname(os.path.abspath(caminho_compose))
+    os.makedirs(diretorio_vizinhos, exist_ok=True)
+    with open(caminho_compose, "w") as compose, open(caminho_csv, mode='w', newline='') as csvfile:
+        # CSV simplificado: Origem, Destino, Custo
+        writer = csv.writer(csvfile)
+        writer.writerow(['Origem', 'Destino', 'Custo'])
+        compose.write("version: '3.8'\nservices:\n")
+
+        # Criar roteadores e hosts
+        for r in roteadores:
+            router_name = f"router{r+1}"
+            router_networks = []
+
+            for h in range(hosts_por_roteador):
+                indice = indice_roteador[r] * hosts_por_roteador + h
+                host_name = f"{router_name}_host{h+1}"
+                net_name = f"{router_name}_host{h+1}_net"
+                ip_host = alocador_hosts.endereco(indice, 0)
+                ip_router = alocador_hosts.endereco(indice, 1)
+
+                escrever_servico(compose, host_name, "./host", [(net_name, ip_host)],
+                                 ambiente={"GATEWAY": ip_router})
+                router_networks.append((net_name, ip_router))
+                writer.writerow([host_name, router_name, '-'])
+
+            for i, posicao in enlaces_roteador[r]:
+                router_networks.append((nome_enlace(i), alocador_enlaces.endereco(i, posicao)))
+            caminho_vizinhos = escrever_vizinhos(diretorio_vizinhos, router_name, enlaces, enlaces_roteador[r],
+                                                 com_areas)
+
+            ambiente = {"CONTAINER_NAME": router_name, "REDES_HOSTS": str(alocador_hosts.pool)}
+            if com_areas:
+                ambiente["AREA"] = grafo.nodes[r]["area"]
+            escrever_servico(compose, router_name, "./router", router_networks,
+                             ambiente={**ambiente, **(ambiente_roteadores or {})},
+                             volumes=["./router/router.py:/app/router.py",
+                                      f"./{os.path.relpath(caminho_vizinhos, diretorio_compose)}:/app/vizinhos.csv:ro"],
+                             sysctls={"net.ipv4.fib_multipath_hash_policy": 1})
+
+        # Conexões ponto-a-ponto entre roteadores
+        for (u, v, d) in enlaces:
+            writer.writerow([f"router{u+1}", f"router{v+1}", d['weight']])
+
+        compose.write("networks:\n")
+        for r in roteadores:
+            for h in range(hosts_por_roteador):
+                escrever_rede(compose, f"router{r+1}_host{h+1}_net",
+                              alocador_hosts.sub_rede(indice_roteador[r] * hosts_por_roteador + h))
+        for i in range(len(enlaces)):
+            escrever_rede(compose, nome_enlace(i), alocador_enlaces.sub_rede(i))
+
+    print(f"✅ {caminho_compose} gerado!")
+
+
+def escrever_namespaces(grafo, hosts_por_roteador, alocador_hosts: AlocadorEnderecos = None,
+                        alocador_enlaces: AlocadorEnderecos = None, caminho_script="rede_namespaces.sh",
+                        caminho_manifesto="router/namespaces.json", caminho_csv="router/conexoes_rede.csv",
+                        diretorio_vizinhos="router/vizinhos", ambiente_roteadores=None):
+    """
+    Escreve a alternativa ao compose com namespaces de rede: o script que cria (ou, com o
+    argumento 'remover', apaga) um namespace por roteador e por host, ligados por pares veth com
+    os mesmos endereços que o compose usaria, e o manifesto lido pelo supervisor.py. O
+    conexoes_rede.csv e o índice de vizinhos são os mesmos de escrever_topologia.
+
+    Dentro do namespace de um roteador, a interface do enlace i se chama e{i} e a do host h,
+    h{h}; nos hosts, eth0, com a rota padrão pelo roteador. Os comandos de cada namespace vão em
+    um único 'ip -batch', então a topologia inteira sobe com poucos processos.
+
+    Raises:
+        ValueError: Se algum pool não comportar a topologia.
+    """
+    alocador_hosts = alocador_hosts or AlocadorEnderecos(POOL_HOSTS, 24)
+    alocador_enlaces = alocador_enlaces or AlocadorEnderecos(POOL_ENLACES, 29)
+
+    roteadores, com_areas, indice_roteador, enlaces, enlaces_roteador = preparar_enlaces(grafo)
+    alocador_hosts.reservar(len(roteadores) * hosts_por_roteador, "as redes de hosts")
+    alocador_enlaces.reservar(len(enlaces), "os enlaces entre roteadores")
+    diretorio_manifesto = os.path.dirname(os.path.abspath(caminho_manifesto))
+    nomes = [f"router{r+1}" for r in roteadores]
+    namespaces = [f"{nome}_host{h}" if h else nome for nome in nomes for h in range(hosts_por_roteador + 1)]
+
+    os.makedirs(diretorio_vizinhos, exist_ok=True)
+    manifesto = {"roteadores": [], "hosts": []}
+    with open(caminho_script, "w") as script, open(caminho_csv, mode='w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Origem', 'Destino', 'Custo'])
+        script.write(f"#!/bin/sh\n# Gerado pelo gerar_composer.py: {len(roteadores)} roteadores e "
+                     f"{len(roteadores) * hosts_por_roteador} hosts em namespaces de rede (exige root).\n"
+                     f"#   sh {os.path.basename(caminho_script)} [criar|remover]\nset -e\n")
+        script.write("if [ \"${1:-criar}\" = remover ]; then\nip -force -batch - <<'FIM'\n")
+        script.writelines(f"netns del {nome}\n" for nome in namespaces)
+        script.write("FIM\nexit 0\nfi\n\nip -batch - <<'FIM'\n")
+        script.writelines(f"netns add {nome}\n" for nome in namespaces)
+        for nome in nomes:
+            script.writelines(f"link add h{h + 1} netns {nome} type veth peer name eth0 netns {nome}_host{h + 1}\n"
+                              for h in range(hosts_por_roteador))
+        for i, (u, v, _) in enumerate(enlaces):
+            script.write(f"link add e{i} netns router{u+1} type veth peer name e{i} netns router{v+1}\n")
+        script.write("FIM\n")
+
+        for r, router_name in zip(roteadores, nomes):
+            comandos = ["link set lo up"]
+            ips = []
+            for h in range(hosts_por_roteador):
+                indice = indice_roteador[r] * hosts_por_roteador + h
+                host_name = f"{router_name}_host{h+1}"
+                ip_host = alocador_hosts.endereco(indice, 0)
+                ip_router = alocador_hosts.endereco(indice, 1)
+                comandos += [f"addr add {ip_router}/{alocador_hosts.prefixo} brd + dev h{h + 1}", f"link set h{h + 1} up"]
+                ips.append(ip_router)
+                script.write(f"ip -n {host_name} -batch - <<'FIM'\nlink set lo up\n"
+                             f"addr add {ip_host}/{alocador_hosts.prefixo} brd + dev eth0\nlink set eth0 up\n"
+                             f"route add default via {ip_router}\nFIM\n")
+                manifesto["hosts"].append({"id": host_name, "namespace": host_name, "ips": [ip_host],
+                                           "gateway": ip_router})
+                writer.writerow([host_name, router_name, '-'])
+            for i, posicao in enlaces_roteador[r]:
+                ip_enlace = alocador_enlaces.endereco(i, posicao)
+                comandos += [f"addr add {ip_enlace}/{alocador_enlaces.prefixo} brd + dev e{i}", f"link set e{i} up"]
+                ips.append(ip_enlace)
+            script.write(f"ip -n {router_name} -batch - <<'FIM'\n" + "\n".join(comandos) + "\nFIM\n")
+            script.write(f"ip netns exec {router_name} sysctl -qw net.ipv4.ip_forward=1 "
+                         f"net.ipv4.fib_multipath_hash_policy=1\n")
+
+            caminho_vizinhos = escrever_vizinhos(diretorio_vizinhos, router_name, enlaces, enlaces_roteador[r],
+                                                 com_areas)
+            ambiente = {"REDES_HOSTS": str(alocador_hosts.pool)}
+            if com_areas:
+                ambiente["AREA"] = str(grafo.nodes[r]["area"])
+            manifesto["roteadores"].append({
+                "id": router_name, "namespace": router_name,
+                "vizinhos": os.path.relpath(os.path.abspath(caminho_vizinhos), diretorio_manifesto),
+                "ambiente": {**ambiente, **{chave: str(valor) for chave, valor in (ambiente_roteadores or {}).items()}},
+                "ips": ips})
+
+        for (u, v, d) in enlaces:
+            writer.writerow([f"router{u+1}", f"router{v+1}", d['weight']])
+
+    with open(caminho_manifesto, "w") as arquivo:
+        json.dump(manifesto, arquivo, indent=1)
+    os.chmod(caminho_script, 0o755)
+    print(f"✅ {caminho_script} e {caminho_manifesto} gerados!")
+
+
+def desenhar_topologia(grafo, hosts_por_roteador, caminho="Topologia_rede.png"):
+    """
+    Gera a imagem 'Topologia_rede.png' da topologia.
+    """
+    import matplotlib.pyplot as plt
+
+    # Criar imagem da topologia
+    visual_grafo = nx.Graph()
+    for r in grafo.nodes():
+        router_name = f"router{r+1:02d}"
+        visual_grafo.add_node(router_name, type='router')
         for h in range(hosts_por_roteador):
-            host_name = f"{router_name}_host{h+1}"  
-            net_name = f"{router_name}_host{h+1}_net"
-            subnet = f"192.168.{subrede_base}.0/24"
-            ip_host = f"192.168.{subrede_base}.2"
-            ip_router = f"192.168.{subrede_base}.10"
-
-            # Host
-            compose['services'][host_name] = {
-                'build': './host',
-                'container_name': host_name,
-                'cap_add': ['NET_ADMIN'],
-                'networks': {
-                    net_name: {'ipv4_address': ip_host}
-                }
-            }
-
-            # Rede
-            compose['networks'][net_name] = {
-                'driver': 'bridge',
-                'ipam': {'config': [{'subnet': subnet}]}
-            }
-
-            router_networks.append({net_name: {'ipv4_address': ip_router}})
-            writer.writerow([host_name, router_name, '-'])
-            subrede_base += 1
-
-        # Roteador
-        compose['services'][router_name] = {
-            'build': './router',
-            'container_name': router_name,
-            'environment': {
-                'CONTAINER_NAME': f"router{r+1}",
-            },
-            'volumes': ['./router/router.py:/app/router.py'],
-            'cap_add': ['NET_ADMIN'],
-            'networks': {}
-        }
-        for net in router_networks:
-            compose['services'][router_name]['networks'].update(net)
-
-    # Conexões ponto-a-ponto entre roteadores
-    for (u, v, d) in grafo.edges(data=True):
-        router_u = f"router{u+1}"  
-        router_v = f"router{v+1}"  
-        net_name = f"{router_u}_{router_v}_net"
-        subnet = f"10.10.{pontoaponto_base}.0/24"
-        ip_u = f"10.10.{pontoaponto_base}.10"
-        ip_v = f"10.10.{pontoaponto_base}.2"
-
-        compose['networks'][net_name] = {
-            'driver': 'bridge',
-            'ipam': {'config': [{'subnet': subnet}]}
-        }
-
-        compose['services'][router_u]['networks'][net_name] = {'ipv4_address': ip_u}
-        compose['services'][router_v]['networks'][net_name] = {'ipv4_address': ip_v}
-
-        writer.writerow([router_u, router_v, d['weight']])
-        pontoaponto_base += 1
-
-# Salvar docker-compose.yml
-with open('docker-compose.yml', 'w') as f:
-    yaml.dump(compose, f, sort_keys=False)
-print("✅ docker-compose.yml gerado!")
-
-# Criar imagem da topologia
-visual_grafo = nx.Graph()
-for r in grafo.nodes():
-    router_name = f"router{r+1:02d}"
-    visual_grafo.add_node(router_name, type='router')
-    for h in range(hosts_por_roteador):
-        host_name = f"{router_name}_host{h+1:02d}"
-        visual_grafo.add_node(host_name, type='host')
-        visual_grafo.add_edge(router_name, host_name)
-
-for (u, v) in grafo.edges():
-    visual_grafo.add_edge(f"router{u+1:02d}", f"router{v+1:02d}")
-
-node_colors = [
-    'lightgreen' if data['type'] == 'router' else 'lightblue'
-    for _, data in visual_grafo.nodes(data=True)
-]
-
-plt.figure(figsize=(10, 8))
-pos = nx.spring_layout(visual_grafo, seed=42)
-nx.draw(
-    visual_grafo,
-    pos,
-    with_labels=True,
-    node_color=node_colors,
-    node_size=1500,
-    font_size=10,
-    edge_color='gray'
-)
-plt.title("Topologia de Rede com Subredes e IPs")
-plt.savefig("Topologia_rede.png", dpi=300)
+            host_name = f"{router_name}_host{h+1:02d}"
+            visual_grafo.add_node(host_name, type='host')
+            visual_grafo.add_edge(router_name, host_name)
+
+    for (u, v) in grafo.edges():
+        visual_grafo.add_edge(f"router{u+1:02d}", f"router{v+1:02d}")
+
+    node_colors = [
+        'lightgreen' if data['type'] == 'router' else 'lightblue'
+        for _, data in visual_grafo.nodes(data=True)
+    ]
+
+    plt.figure(figsize=(10, 8))
+    pos = nx.spring_layout(visual_grafo, seed=42)
+    nx.draw(
+        visual_grafo,
+        pos,
+        with_labels=True,
+        node_color=node_colors,
+        node_size=1500,
+        font_size=10,
+        edge_color='gray'
+    )
+    plt.title("Topologia de Rede com Subredes e IPs")
+    plt.savefig(caminho, dpi=300)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o docker-compose.yml e o conexoes_rede.csv de uma topologia.")
+    parser.add_argument("--roteadores", type=int, default=num_roteadores)
+    parser.add_argument("--hosts-por-roteador", type=int, default=hosts_por_roteador)
+    parser.add_argument("--grau", type=int, default=2, help="Parâmetro k do Watts–Strogatz.")
+    parser.add_argument("--prob-religacao", type=float, default=0.7, help="Parâmetro p do Watts–Strogatz.")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO,
+                        help="Semente da topologia e dos custos; a mesma semente gera os mesmos arquivos "
+                             "(padrão: %(default)s, a do docker-compose.yml versionado).")
+    parser.add_argument("--areas", type=int, default=1,
+                        help="Divide os roteadores em áreas ligadas por um backbone (1: sem áreas).")
+    parser.add_argument("--bordas-por-area", type=int, default=2,
+                        help="Roteadores de borda de cada área ligados ao backbone.")
+    parser.add_argument("--pool-hosts", default=POOL_HOSTS, help="Bloco de onde saem as redes de hosts.")
+    parser.add_argument("--prefixo-hosts", type=int, default=24)
+    parser.add_argument("--pool-enlaces", default=POOL_ENLACES, help="Bloco de onde saem as redes dos enlaces.")
+    parser.add_argument("--prefixo-enlaces", type=int, default=29, choices=[29, 30, 31],
+                        help="/29 deixa um endereço para o gateway da bridge do Docker; /30 e /31 "
+                             "só servem para ambientes que não reservam esse endereço.")
+    parser.add_argument("--saida", choices=["compose", "namespaces"], default="compose",
+                        help="'namespaces' gera o script de namespaces de rede e o manifesto do supervisor.py "
+                             "no lugar do docker-compose.yml.")
+    parser.add_argument("--compose", default="docker-compose.yml")
+    parser.add_argument("--script-namespaces", default="rede_namespaces.sh")
+    parser.add_argument("--manifesto", default="router/namespaces.json",
+                        help="Manifesto dos roteadores lido pelo supervisor.py (com --saida namespaces).")
+    parser.add_argument("--csv", default="router/conexoes_rede.csv")
+    parser.add_argument("--vizinhos", default="router/vizinhos",
+                        help="Diretório onde gravar o índice de vizinhos de cada roteador.")
+    parser.add_argument("--agregar-rotas", action="store_true",
+                        help="Roteadores instalam os prefixos agregados em supernets por gateway.")
+    parser.add_argument("--anunciar", choices=["todos", "hosts"], default="todos",
+                        help="'hosts' faz os roteadores anunciarem só as redes de hosts, sem os IPs dos enlaces.")
+    parser.add_argument("--imagem", default="Topologia_rede.png")
+    parser.add_argument("--sem-imagem", action="store_true",
+                        help=f"Não gera a imagem (ela já é omitida acima de {LIMITE_IMAGEM} roteadores).")
+    args = parser.parse_args()
+
+    try:
+        alocador_hosts = AlocadorEnderecos(args.pool_hosts, args.prefixo_hosts)
+        alocador_enlaces = AlocadorEnderecos(args.pool_enlaces, args.prefixo_enlaces)
+        if alocador_hosts.dispositivos_por_rede < 2:
+            raise ValueError(f"Redes de hosts /{args.prefixo_hosts} não comportam o host e o roteador")
+        if alocador_hosts.pool.overlaps(alocador_enlaces.pool):
+            raise ValueError("Os pools de hosts e de enlaces se sobrepõem")
+    except ValueError as e:
+        parser.error(str(e))
+    if args.prefixo_enlaces > 29 and args.saida == "compose":
+        print(f"⚠️  Enlaces /{args.prefixo_enlaces}: a bridge do Docker reserva um endereço por rede "
+              f"como gateway, então o compose gerado só sobe em redes que não o reservem.")
+
+    ambiente_roteadores = {}
+    if args.agregar_rotas:
+        ambiente_roteadores["AGREGAR_ROTAS"] = "1"
+    if args.anunciar == "hosts":
+        ambiente_roteadores["REDES_ANUNCIADAS"] = str(alocador_hosts.pool)
+
+    inicio = time.perf_counter()
+    try:
+        grafo = gerar_grafo(args.roteadores, k=args.grau, p=args.prob_religacao, semente=args.semente,
+                            areas=args.areas, bordas_por_area=args.bordas_por_area)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        if args.saida == "namespaces":
+            escrever_namespaces(grafo, args.hosts_por_roteador, alocador_hosts, alocador_enlaces,
+                                args.script_namespaces, args.manifesto, args.csv, args.vizinhos, ambiente_roteadores)
+        else:
+            escrever_topologia(grafo, args.hosts_por_roteador, alocador_hosts, alocador_enlaces, args.compose,
+                               args.csv, args.vizinhos, ambiente_roteadores)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{args.roteadores} roteadores e {grafo.number_of_edges()} enlaces em {time.perf_counter() - inicio:.1f}s")
+
+    if args.sem_imagem or args.roteadores > LIMITE_IMAGEM:
+        print("Imagem da topologia não gerada.")
+    else:
+        desenhar_topologia(grafo, args.hosts_por_roteador, args.imagem)
+
 
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,25 @@ import json
 import subprocess
 import psutil
 import os
-import networkx as nx
 import csv
 import traceback
 import ipaddress
+import heapq
+import asyncio
+import re
+import struct
+import zlib
+import types
+import bisect
+import http.server
+import random
+import sys
+import signal
+import atexit
+import array
+import collections
+import collections.abc
+import contextlib
 
 """ 
 Este script simula o funcionamento básico de um protocolo de roteamento entre roteadores em uma rede IP.
@@ -17,17 +32,24 @@ FUNCIONALIDADES:
 --------------------
 - Carregamento de um grafo de rede com pesos a partir de arquivo CSV.
 - Emissão periódica de pacotes HELLO para descoberta e manutenção de vizinhos.
-- Emissão periódica de pacotes LSA (Link-State Advertisement) com informações de topologia.
+- Emissão de pacotes LSA (Link-State Advertisement) com informações de topologia, originados quando
+  os vizinhos ou endereços mudam e reanunciados em intervalos longos, com envelhecimento na LSDB.
 - Cálculo das rotas mais curtas entre roteadores usando o algoritmo de Dijkstra.
 - Atualização e aplicação dinâmica de rotas na tabela de roteamento do sistema.
-- Prints de depuração comentados, descomente caso precise analisar algo mais a fundo.
+- Registro de eventos com níveis por componente (veja RegistroEventos): os eventos por pacote ficam
+  em DEBUG, guardados em um anel em memória que pode ser despejado com SIGUSR1.
 """
 def carregar_grafo_com_pesos(csv_path):
     """ 
     Carrega um grafo a partir de um arquivo CSV com as colunas 'Origem', 'Destino' e 'Custo'.
     O custo é considerado como o peso da aresta entre os nós.       
     Se o custo for '-', considera-se que a conexão é entre um host e um roteador, com peso 1.
+
+    O roteador em si não usa mais o grafo completo (veja carregar_custos_vizinhos); a função
+    fica para as ferramentas que analisam a topologia inteira, e o networkx só é importado aqui.
     """
+    import networkx as nx
+
     G = nx.Graph()
     with open(csv_path, newline='') as csvfile:
         leitor = csv.DictReader(csvfile)
@@ -42,315 +64,4149 @@ def carregar_grafo_com_pesos(csv_path):
     return G
 
 
-class EstadoRoteador:
+def carregar_custos_vizinhos(caminho: str):
     """
-    Representa o estado de roteamento de um roteador em uma rede.
+    Lê o índice de vizinhos de um roteador gerado pelo gerar_composer.py (colunas 'Vizinho' e
+    'Custo', uma linha por enlace). A leitura é proporcional ao grau do roteador, e não ao
+    tamanho da topologia.
+
+    Returns:
+        dict[str, int]: Custo do enlace até cada vizinho.
+    """
+    with open(caminho, newline='') as arquivo:
+        return {linha['Vizinho']: int(linha['Custo']) for linha in csv.DictReader(arquivo)}
+
+
+def carregar_areas_enlaces(caminho: str):
+    """
+    Lê a coluna 'Area' do índice de vizinhos, escrita pelo gerar_composer.py quando a topologia
+    é dividida em áreas.
+
+    Returns:
+        dict[str, int]: Área de cada enlace, por vizinho; vazio se o índice não tiver a coluna.
+    """
+    with open(caminho, newline='') as arquivo:
+        return {linha['Vizinho']: int(linha['Area']) for linha in csv.DictReader(arquivo) if linha.get('Area')}
+
+
+def extrair_custos_vizinhos(csv_path: str, id_rota: str):
+    """
+    Obtém os custos dos enlaces de um roteador direto do conexoes_rede.csv completo, linha a
+    linha e sem montar o grafo. É o caminho de reserva quando não há índice por roteador.
+
+    Returns:
+        dict[str, int]: Custo do enlace até cada roteador vizinho.
+    """
+    custos = {}
+    with open(csv_path, newline='') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            if linha['Custo'] == '-':
+                continue
+            if linha['Origem'] == id_rota:
+                custos[linha['Destino']] = int(linha['Custo'])
+            elif linha['Destino'] == id_rota:
+                custos[linha['Origem']] = int(linha['Custo'])
+    return custos
+
+
+def calcular_checksum_lsa(enderecos: list[str], links: dict[str, int], resumos: dict[str, int] = None):
+    """
+    Calcula o checksum do conteúdo de um LSA (endereços, links e, nos roteadores de borda, as
+    rotas resumidas), independente do número de sequência e da ordem dos links. Dois LSAs com o
+    mesmo checksum anunciam a mesma topologia.
+
+    Returns:
+        int: CRC32 do conteúdo.
+    """
+    conteudo = ",".join(enderecos) + "|" + ",".join(f"{vizinho}={custo}" for vizinho, custo in sorted(links.items()))
+    if resumos:
+        conteudo += "|" + ",".join(f"{prefixo}={custo}" for prefixo, custo in sorted(resumos.items()))
+    return zlib.crc32(conteudo.encode("utf-8"))
+
+
+def validar_base_delta(pacote: dict):
+    """
+    Confere a base de um LSA delta: ela tem de ser um número de sequência anterior ao do próprio
+    delta. Uma base igual ou posterior não corresponde a nenhum LSA que o originador possa ter
+    anunciado antes e faria a cadeia de bases de um lote (veja Roteador.processar_lote) andar em
+    círculos.
+
+    Raises:
+        ValueError: Se a base não for um inteiro menor que o número de sequência.
+    """
+    if "base" not in pacote:
+        return
+    base, numero_sequencia = pacote["base"], pacote.get("numero_sequencia")
+    if (type(base) is not int or type(numero_sequencia) is not int or base < 0
+            or base >= numero_sequencia):
+        raise ValueError(f"LSA delta com base {base!r} inválida para a sequência {numero_sequencia!r}")
+
+
+def diferenca_links(antigos: dict[str, int], novos: dict[str, int]):
+    """
+    Compara dois conjuntos de links de um mesmo roteador.
+
+    Returns:
+        dict[str, int | None]: Vizinhos cujo enlace surgiu, sumiu ou mudou de custo, com o custo
+            anterior (None para enlaces novos).
+    """
+    alterados = {vizinho: custo for vizinho, custo in antigos.items() if novos.get(vizinho) != custo}
+    alterados.update((vizinho, None) for vizinho in novos if vizinho not in antigos)
+    return alterados
+
+
+def filtrar_enderecos(enderecos: list[str], redes_anunciadas: list[ipaddress.IPv4Network] = None):
+    """
+    Aplica a regra de anúncio do roteador: só os endereços contidos em algum dos blocos de
+    redes_anunciadas entram no LSA. Sem blocos, todos os endereços são anunciados.
+
+    Returns:
+        list[str]: Endereços anunciados, na ordem original.
+    """
+    if not redes_anunciadas:
+        return list(enderecos)
+    anunciados = []
+    for endereco in enderecos:
+        rede = ipaddress.IPv4Network(endereco, strict=False)
+        if any(rede.subnet_of(bloco) for bloco in redes_anunciadas):
+            anunciados.append(endereco)
+    return anunciados
+
+
+def _bloco_prefixo(prefixo: str):
+    """Converte '10.0.0.0/24' ou '10.0.0.2' no par (primeiro endereço como inteiro, tamanho do prefixo)."""
+    ip, barra, tamanho = prefixo.partition("/")
+    tamanho = int(tamanho) if barra else 32
+    inicio = int.from_bytes(socket.inet_aton(ip), "big")
+    return inicio & ~((1 << (32 - tamanho)) - 1) & 0xFFFFFFFF, tamanho
+
+
+def _agrupar_blocos(blocos):
+    """
+    Junta blocos (início, tamanho) no menor conjunto de prefixos que cobre exatamente os
+    mesmos endereços: descarta os contidos em outro e funde pares de irmãos no prefixo pai.
+    """
+    pilha = []
+    for inicio, tamanho in sorted(blocos):
+        if pilha:
+            inicio_topo, tamanho_topo = pilha[-1]
+            if inicio < inicio_topo + (1 << (32 - tamanho_topo)):
+                continue
+        pilha.append((inicio, tamanho))
+        while len(pilha) > 1:
+            (inicio_a, tamanho_a), (inicio_b, tamanho_b) = pilha[-2], pilha[-1]
+            if tamanho_a != tamanho_b or tamanho_a == 0:
+                break
+            largura = 1 << (32 - tamanho_a)
+            if inicio_a & (2 * largura - 1) or inicio_b != inicio_a + largura:
+                break
+            pilha[-2:] = [(inicio_a, tamanho_a - 1)]
+    return pilha
+
+
+def agregar_prefixos(rotas: dict):
+    """
+    Troca prefixos contíguos com o mesmo gateway pelos supernets que os cobrem exatamente
+    (10.128.0.0/24 e 10.128.1.0/24 via A viram 10.128.0.0/23 via A). Como cada supernet cobre
+    só endereços que já iam para o mesmo gateway, o encaminhamento não muda. Gateways cujos
+    prefixos se sobrepõem aos de outro gateway ficam sem agregação, porque ali o resultado
+    depende da preferência pelo prefixo mais longo.
+
+    Args:
+        rotas (dict[str, str | tuple[str]]): Prefixo -> gateway.
+
+    Returns:
+        dict[str, str | tuple[str]]: Rotas agregadas. Prefixos que não se juntaram a nenhum
+            outro mantêm a grafia original.
+    """
+    originais = {}
+    por_gateway = {}
+    for prefixo, gateway in rotas.items():
+        bloco = _bloco_prefixo(prefixo)
+        originais.setdefault(bloco, prefixo)
+        por_gateway.setdefault(gateway, []).append(bloco)
+
+    agrupados = {gateway: _agrupar_blocos(blocos) for gateway, blocos in por_gateway.items()}
+
+    conflitantes = set()
+    fim_externo = -1
+    gateway_externo = None
+    todos = [(inicio, tamanho, gateway) for gateway, blocos in agrupados.items() for inicio, tamanho in blocos]
+    todos.sort(key=lambda bloco: (bloco[0], bloco[1]))
+    for inicio, tamanho, gateway in todos:
+        if inicio < fim_externo:
+            conflitantes.update((gateway, gateway_externo))
+            continue
+        fim_externo = inicio + (1 << (32 - tamanho))
+        gateway_externo = gateway
+
+    agregadas = {}
+    for gateway, blocos in agrupados.items():
+        if gateway in conflitantes:
+            agregadas.update((prefixo, gateway) for prefixo, atual in rotas.items() if atual == gateway)
+            continue
+        for bloco in blocos:
+            prefixo = originais.get(bloco)
+            if prefixo is None:
+                prefixo = f"{socket.inet_ntoa(bloco[0].to_bytes(4, 'big'))}/{bloco[1]}"
+            agregadas[prefixo] = gateway
+    return agregadas
+
+
+def resumir_prefixos(custos: dict[str, int], excluir: list[str] = ()):
+    """
+    Monta as rotas resumidas que um roteador de borda anuncia em uma área: os prefixos viram o
+    menor conjunto de supernets que os cobre exatamente, e cada supernet leva o maior custo entre
+    os prefixos que ele cobre (como os intervalos de área do OSPF). Prefixos cobertos pelos de
+    excluir (os da própria área de destino) não são anunciados.
+
+    Args:
+        custos (dict[str, int]): Custo até cada prefixo.
+        excluir (list[str]): Prefixos já alcançáveis dentro da área de destino.
+
+    Returns:
+        dict[str, int]: Prefixo resumido -> custo. Prefixos que não se juntaram a nenhum outro
+            mantêm a grafia original.
+    """
+    cobertura = _agrupar_blocos(_bloco_prefixo(prefixo) for prefixo in excluir)
+    inicios = [inicio for inicio, _ in cobertura]
+    originais = {}
+    for prefixo, custo in custos.items():
+        bloco = _bloco_prefixo(prefixo)
+        posicao = bisect.bisect_right(inicios, bloco[0]) - 1
+        if posicao >= 0:
+            inicio, tamanho = cobertura[posicao]
+            if bloco[0] + (1 << (32 - bloco[1])) <= inicio + (1 << (32 - tamanho)):
+                continue
+        if bloco not in originais or custo > originais[bloco][1]:
+            originais[bloco] = (prefixo, custo)
+
+    blocos = sorted(originais)
+    resumos = {}
+    indice = 0
+    for inicio, tamanho in _agrupar_blocos(blocos):
+        fim = inicio + (1 << (32 - tamanho))
+        custo = 0
+        while indice < len(blocos) and blocos[indice][0] < fim:
+            custo = max(custo, originais[blocos[indice]][1])
+            indice += 1
+        original = originais.get((inicio, tamanho))
+        prefixo = original[0] if original else f"{socket.inet_ntoa(inicio.to_bytes(4, 'big'))}/{tamanho}"
+        resumos[prefixo] = custo
+    return resumos
+
+
+SO_RCVBUFFORCE = getattr(socket, "SO_RCVBUFFORCE", 33)
+SO_SNDBUFFORCE = getattr(socket, "SO_SNDBUFFORCE", 32)
+CLONE_NEWNET = getattr(os, "CLONE_NEWNET", 0x40000000)
+DIRETORIO_NETNS = "/run/netns"
 
-    Esta classe mantém uma tabela de roteamento com informações recebidas de outros roteadores
-    e calcula os melhores caminhos até cada destino, aplicando as rotas no sistema.
+
+def ler_descartes_udp(sock: socket.socket):
+    """
+    Lê em /proc/net/udp quantos datagramas o kernel descartou para o socket por falta de espaço
+    no buffer de recepção. Esses descartes acontecem antes de o processo ver o pacote.
+
+    Returns:
+        int | None: Total de descartes, ou None se a informação não estiver disponível.
+    """
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+        with open("/proc/net/udp") as arquivo:
+            next(arquivo)
+            for linha in arquivo:
+                campos = linha.split()
+                if campos[9] == inode:
+                    return int(campos[-1])
+    except (OSError, ValueError, IndexError, StopIteration):
+        pass
+    return None
+
+
+def _setns(fd: int):
+    if hasattr(os, "setns"):
+        os.setns(fd, CLONE_NEWNET)
+        return
+    import ctypes
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.setns(fd, CLONE_NEWNET) != 0:
+        numero = ctypes.get_errno()
+        raise OSError(numero, os.strerror(numero))
+
+
+@contextlib.contextmanager
+def em_namespace(nome: str = None):
+    """
+    Executa o bloco com a thread atual no namespace de rede nome (criado com 'ip netns add') e a
+    devolve ao namespace original na saída. Sockets abertos e consultas às interfaces feitas
+    dentro do bloco ficam no namespace; o restante do processo não é afetado. Sem nome, o bloco
+    roda no namespace atual.
+
+    Raises:
+        OSError: Se o namespace não existir ou faltar CAP_SYS_ADMIN.
+    """
+    if not nome:
+        yield
+        return
+    original = os.open("/proc/thread-self/ns/net", os.O_RDONLY)
+    try:
+        destino = os.open(os.path.join(DIRETORIO_NETNS, nome), os.O_RDONLY)
+        try:
+            _setns(destino)
+        finally:
+            os.close(destino)
+        try:
+            yield
+        finally:
+            _setns(original)
+    finally:
+        os.close(original)
+
+
+class RegistroEventos:
+    """
+    Registro de eventos com níveis, filtros por componente e escrita fora do caminho crítico.
+
+    Cada evento é guardado sem formatação (a mensagem e os argumentos, como no operador %) em
+    um anel em memória com os mais recentes e, se passar do nível de saída do componente e da
+    amostragem, em uma fila que uma thread daemon esvazia em lotes, com uma única escrita por
+    lote. Quem registra nunca espera pela escrita: com a fila cheia, o evento é descartado e
+    contado. O anel só é formatado quando despejado (despejar(), SIGUSR1 ou /eventos).
 
     Atributos:
-        _id_rota (str): Identificador único deste roteador.
-        _dados_vizinhos (dict[str, str]): Mapeia o ID dos roteadores vizinhos para seus respectivos IPs.
-        _tabela_roteamento (dict): Armazena as entradas de roteamento conhecidas.
-        _roteamento (dict): Guarda as rotas calculadas (destino -> próximo salto).
+        _nivel (int): Nível mínimo de saída dos componentes sem nível próprio.
+        _niveis (dict[str, int]): Nível de saída por componente.
+        _nivel_anel (int): Nível mínimo dos eventos guardados no anel.
+        _limiares (dict[str, int]): Menor nível que interessa a cada componente (saída ou anel),
+            consultado pelos canais antes de montar o evento.
+        _amostragem (dict[str, int]): Para cada componente, grava na saída um a cada N eventos
+            abaixo de AVISO.
+        _contagens (dict[str, int]): Eventos vistos por componente amostrado.
+        _json (bool): Escreve uma linha JSON por evento em vez de texto.
+        _anel (collections.deque): Eventos mais recentes.
+        _pendentes (collections.deque): Eventos aguardando a escrita.
+        _limite_pendentes (int): Tamanho máximo da fila de escrita.
+        _saida: Arquivo de saída; None usa o sys.stdout do momento da escrita.
+        _intervalo (float): Intervalo máximo, em segundos, entre duas escritas.
+        _acordar (threading.Event): Antecipa a escrita (eventos de ERRO e encerramento).
+        _escritor (threading.Thread): Thread que esvazia a fila, criada no primeiro evento.
+        _trava (threading.Lock): Serializa as escritas.
+        _canais (dict[tuple, CanalRegistro]): Canais já criados, por (componente, roteador).
+        descartados (int): Eventos perdidos com a fila de escrita cheia.
+        amostrados (int): Eventos omitidos da saída pela amostragem.
+        _descartados_informados (int): Descartes já informados na saída.
     """
-    __slots__ = ["_tabela_roteamento", "_id_rota",
-                 "_dados_vizinhos", "_roteamento"]
+    __slots__ = ["_nivel", "_niveis", "_nivel_anel", "_limiares", "_amostragem", "_contagens", "_json",
+                 "_anel", "_pendentes", "_limite_pendentes", "_saida", "_intervalo", "_acordar", "_escritor",
+                 "_trava", "_canais", "descartados", "amostrados", "_descartados_informados"]
 
-    def __init__(self, id_rota: str, dados_vizinhos: dict[str, str]):
+    DEBUG = 10
+    INFO = 20
+    AVISO = 30
+    ERRO = 40
+    DESLIGADO = 100
+    NIVEIS = {"DEBUG": DEBUG, "INFO": INFO, "AVISO": AVISO, "ERRO": ERRO, "DESLIGADO": DESLIGADO}
+    NOMES = {valor: nome for nome, valor in NIVEIS.items()}
 
-        self._id_rota = id_rota
-        self._tabela_roteamento = {}
-        self._dados_vizinhos = dados_vizinhos
-        self._roteamento = {}
+    def __init__(self, nivel: str = "INFO", nivel_anel: str = "DEBUG", tamanho_anel: int = 10000,
+                 formato: str = "texto", amostragem: str = "", limite_pendentes: int = 10000,
+                 intervalo: float = 0.2, saida=None):
+        self._limiares = {}
+        self._contagens = {}
+        self._canais = {}
+        self._anel = collections.deque(maxlen=tamanho_anel)
+        self._pendentes = collections.deque()
+        self._limite_pendentes = limite_pendentes
+        self._saida = saida
+        self._intervalo = intervalo
+        self._acordar = threading.Event()
+        self._escritor = None
+        self._trava = threading.Lock()
+        self.descartados = 0
+        self.amostrados = 0
+        self._descartados_informados = 0
+        self.configurar(nivel, nivel_anel, formato=formato, amostragem=amostragem)
 
-    def _criar_entrada_tabela(self, numero_seq, timestamp, enderecos, links):
+    @classmethod
+    def _nivel_de(cls, nome):
+        if isinstance(nome, int):
+            return nome
+        try:
+            return cls.NIVEIS[nome.strip().upper()]
+        except KeyError:
+            raise ValueError(f"Nível de log desconhecido: {nome}") from None
+
+    @staticmethod
+    def _pares(especificacao: str):
+        """Separa 'a=1,b=2' em pares (chave, valor); itens sem '=' têm chave None."""
+        for item in (especificacao or "").split(","):
+            if item.strip():
+                chave, _, valor = item.rpartition("=")
+                yield chave.strip() or None, valor.strip()
+
+    def configurar(self, nivel=None, nivel_anel=None, tamanho_anel: int = None, formato: str = None,
+                   amostragem: str = None, saida=None):
         """
-        Cria uma entrada padronizada para a tabela de roteamento.
+        Altera a configuração em uso; parâmetros omitidos ficam como estão.
 
         Args:
-            numero_seq (int): Número de sequência da atualização.
-            timestamp (float): Marca temporal da atualização.
-            enderecos (list): Lista de endereços IP associados ao roteador.
-            links (dict): Dicionário de vizinhos com seus custos de link.
+            nivel: Nível padrão e, opcionalmente, por componente, como em 'INFO,lsa=DEBUG,hello=AVISO'.
+            nivel_anel: Nível mínimo dos eventos guardados no anel ('DESLIGADO' dispensa o anel).
+            tamanho_anel (int): Quantos eventos recentes o anel guarda.
+            formato (str): 'texto' ou 'json'.
+            amostragem (str): Taxas por componente, como em 'hello=100,lsa=10'.
+            saida: Arquivo onde os eventos são escritos.
+        """
+        if nivel is not None:
+            self._nivel, self._niveis = self.INFO, {}
+            for componente, valor in self._pares(nivel) if isinstance(nivel, str) else [(None, nivel)]:
+                if componente is None:
+                    self._nivel = self._nivel_de(valor)
+                else:
+                    self._niveis[componente] = self._nivel_de(valor)
+        if nivel_anel is not None:
+            self._nivel_anel = self._nivel_de(nivel_anel)
+        if tamanho_anel is not None:
+            self._anel = collections.deque(self._anel, maxlen=tamanho_anel)
+        if formato is not None:
+            if formato not in ("texto", "json"):
+                raise ValueError(f"Formato de log desconhecido: {formato}")
+            self._json = formato == "json"
+        if amostragem is not None:
+            self._amostragem = {componente: max(1, int(taxa)) for componente, taxa in self._pares(amostragem)
+                                if componente is not None}
+            self._contagens = {}
+        if saida is not None:
+            self._saida = saida
+        for componente in self._limiares:
+            self._limiares[componente] = self._limiar(componente)
+
+    def _limiar(self, componente: str):
+        return min(self._niveis.get(componente, self._nivel), self._nivel_anel)
 
+    def canal(self, componente: str, roteador: str = None):
+        """
         Returns:
-            dict: Estrutura de entrada para a tabela de roteamento.
+            CanalRegistro: Canal do componente, identificado nos eventos pelo roteador.
+        """
+        chave = (componente, roteador)
+        canal = self._canais.get(chave)
+        if canal is None:
+            if componente not in self._limiares:
+                self._limiares[componente] = self._limiar(componente)
+            canal = self._canais[chave] = CanalRegistro(self, componente, roteador)
+        return canal
+
+    def registrar(self, nivel: int, componente: str, roteador: str, mensagem: str, args: tuple = (),
+                  detalhe: str = None):
+        evento = (time.time(), nivel, componente, roteador, mensagem, args, detalhe)
+        if nivel >= self._nivel_anel:
+            self._anel.append(evento)
+        if nivel < self._niveis.get(componente, self._nivel):
+            return
+        taxa = self._amostragem.get(componente)
+        if taxa is not None and nivel < self.AVISO:
+            contagem = self._contagens[componente] = self._contagens.get(componente, 0) + 1
+            if contagem % taxa:
+                self.amostrados += 1
+                return
+        if len(self._pendentes) >= self._limite_pendentes:
+            self.descartados += 1
+            return
+        self._pendentes.append(evento)
+        if self._escritor is None:
+            self._iniciar_escritor()
+        if nivel >= self.ERRO:
+            self._acordar.set()
+
+    def _iniciar_escritor(self):
+        with self._trava:
+            if self._escritor is not None:
+                return
+            self._escritor = threading.Thread(target=self._escrever_periodicamente, daemon=True)
+            self._escritor.start()
+        atexit.register(self.drenar)
+
+    def _escrever_periodicamente(self):
+        while True:
+            self._acordar.wait(self._intervalo)
+            self._acordar.clear()
+            self.drenar()
+
+    def formatar(self, evento: tuple):
+        """
+        Returns:
+            str: O evento como uma linha de texto ou JSON (mais o traceback, se houver).
+        """
+        tempo, nivel, componente, roteador, mensagem, args, detalhe = evento
+        try:
+            texto = mensagem % args if args else mensagem
+        except (TypeError, ValueError):
+            texto = f"{mensagem} {args!r}"
+        if self._json:
+            dados = {"tempo": round(tempo, 6), "nivel": self.NOMES.get(nivel, nivel), "componente": componente,
+                     "roteador": roteador, "mensagem": texto}
+            if detalhe:
+                dados["detalhe"] = detalhe
+            return json.dumps(dados, ensure_ascii=False)
+        linha = (f"{time.strftime('%H:%M:%S', time.localtime(tempo))}.{int(tempo * 1000) % 1000:03d} "
+                 f"{self.NOMES.get(nivel, nivel):<5} " + (f"[{roteador}] " if roteador else "")
+                 + f"{componente}: {texto}")
+        return f"{linha}\n{detalhe.rstrip()}" if detalhe else linha
+
+    def drenar(self):
+        """Escreve de uma vez os eventos pendentes e informa os descartes desde a última escrita."""
+        with self._trava:
+            linhas = []
+            while True:
+                try:
+                    linhas.append(self.formatar(self._pendentes.popleft()))
+                except IndexError:
+                    break
+            descartados = self.descartados - self._descartados_informados
+            if descartados:
+                self._descartados_informados = self.descartados
+                linhas.append(self.formatar((time.time(), self.AVISO, "log", None,
+                                             "%d eventos descartados com a fila de escrita cheia", (descartados,),
+                                             None)))
+            if linhas:
+                self._escrever(self._saida or sys.stdout, linhas)
+
+    @staticmethod
+    def _escrever(saida, linhas: list[str]):
+        try:
+            saida.write("\n".join(linhas) + "\n")
+            saida.flush()
+        except (OSError, ValueError):
+            pass
+
+    def recentes(self, quantidade: int = None):
+        """
+        Returns:
+            list[dict]: Os eventos do anel, do mais antigo ao mais recente, já formatados.
+        """
+        eventos = list(self._anel)
+        if quantidade is not None:
+            eventos = eventos[-quantidade:] if quantidade > 0 else []
+        return [dict(tempo=evento[0], nivel=self.NOMES.get(evento[1], evento[1]), componente=evento[2],
+                     roteador=evento[3], linha=self.formatar(evento)) for evento in eventos]
+
+    def despejar(self, saida=None):
+        """Escreve o conteúdo do anel, por padrão no stderr, sem interferir na fila de escrita."""
+        eventos = list(self._anel)
+        linhas = [f"--- {len(eventos)} eventos recentes ---", *map(self.formatar, eventos), "--- fim dos eventos ---"]
+        with self._trava:
+            self._escrever(saida or sys.stderr, linhas)
+
+    def instalar_sinal(self, numero=getattr(signal, "SIGUSR1", None)):
+        """Faz o sinal despejar o anel. Só pode ser chamado na thread principal."""
+        if numero is not None:
+            signal.signal(numero, lambda *_: threading.Thread(target=self.despejar, daemon=True).start())
+
+    @contextlib.contextmanager
+    def silenciado(self):
+        """Desliga a saída e o anel durante o bloco, por exemplo em simulações e benchmarks."""
+        anterior = (self._nivel, self._niveis, self._nivel_anel)
+        self._nivel, self._niveis, self._nivel_anel = self.DESLIGADO, {}, self.DESLIGADO
+        self.configurar()
+        try:
+            yield self
+        finally:
+            self._nivel, self._niveis, self._nivel_anel = anterior
+            self.configurar()
+
+
+class CanalRegistro:
+    """
+    Ponto de registro de um componente. O nível é conferido antes de qualquer trabalho, então
+    um evento filtrado custa uma consulta a dicionário, sem formatação.
+
+    Atributos:
+        _registro (RegistroEventos): Registro que recebe os eventos.
+        componente (str): Nome do componente, usado nos filtros.
+        roteador (str | None): Roteador que origina os eventos.
+    """
+    __slots__ = ["_registro", "componente", "roteador"]
+
+    def __init__(self, registro: RegistroEventos, componente: str, roteador: str = None):
+        self._registro = registro
+        self.componente = componente
+        self.roteador = roteador
+
+    def ativo(self, nivel: int):
+        return nivel >= self._registro._limiares[self.componente]
+
+    def debug(self, mensagem: str, *args):
+        if self._registro._limiares[self.componente] <= RegistroEventos.DEBUG:
+            self._registro.registrar(RegistroEventos.DEBUG, self.componente, self.roteador, mensagem, args)
+
+    def info(self, mensagem: str, *args):
+        if self._registro._limiares[self.componente] <= RegistroEventos.INFO:
+            self._registro.registrar(RegistroEventos.INFO, self.componente, self.roteador, mensagem, args)
+
+    def aviso(self, mensagem: str, *args):
+        if self._registro._limiares[self.componente] <= RegistroEventos.AVISO:
+            self._registro.registrar(RegistroEventos.AVISO, self.componente, self.roteador, mensagem, args)
+
+    def erro(self, mensagem: str, *args):
+        if self._registro._limiares[self.componente] <= RegistroEventos.ERRO:
+            self._registro.registrar(RegistroEventos.ERRO, self.componente, self.roteador, mensagem, args)
+
+    def excecao(self, mensagem: str, *args):
+        """Registra um ERRO com o traceback da exceção em tratamento."""
+        if self._registro._limiares[self.componente] <= RegistroEventos.ERRO:
+            self._registro.registrar(RegistroEventos.ERRO, self.componente, self.roteador, mensagem, args,
+                                     traceback.format_exc())
+
+
+REGISTRO = RegistroEventos()
+
+
+class BackendRotasIpBatch:
+    """
+    Backend de programação de rotas que envia um lote inteiro de operações ao kernel
+    em uma única chamada 'ip -force -batch -', em vez de um processo por rota.
+
+    Atributos:
+        _comando_ip (list[str]): Comando base usado para invocar o iproute2.
+    """
+    __slots__ = ["_comando_ip"]
+
+    _log = REGISTRO.canal("rotas")
+    _FALHA_LINHA = re.compile(r"Command failed -:(\d+)")
+
+    def __init__(self, comando_ip: list[str] = None):
+        self._comando_ip = comando_ip or ["ip"]
+
+    def executar(self, operacoes: list[tuple]):
+        """
+        Executa um lote de operações de rota.
+
+        Args:
+            operacoes (list[tuple]): Operações no formato (acao, prefixo, gateway), onde acao é
+                'replace' ou 'del' e gateway é um IP ou, em rotas multipath, uma tupla de IPs.
+
+        Returns:
+            list[bool]: Indica, para cada operação, se ela foi aplicada com sucesso.
+        """
+        if not operacoes:
+            return []
+        linhas = [self._formatar(acao, prefixo, gateway) for acao, prefixo, gateway in operacoes]
+        try:
+            resultado = subprocess.run(
+                self._comando_ip + ["-force", "-batch", "-"],
+                input="\n".join(linhas) + "\n", capture_output=True, text=True)
+        except OSError as e:
+            self._log.erro("Falha ao executar ip -batch: %s", e)
+            return [False] * len(operacoes)
+
+        sucesso = [True] * len(operacoes)
+        if resultado.returncode != 0:
+            for numero in self._FALHA_LINHA.findall(resultado.stderr):
+                indice = int(numero) - 1
+                if 0 <= indice < len(sucesso):
+                    sucesso[indice] = False
+                    self._log.erro("Falha: %s", linhas[indice])
+        return sucesso
+
+    @staticmethod
+    def _formatar(acao: str, prefixo: str, gateway):
+        if isinstance(gateway, str):
+            return f"route {acao} {prefixo} via {gateway}"
+        if acao == "del":
+            return f"route del {prefixo}"
+        return f"route {acao} {prefixo} " + " ".join(f"nexthop via {ip}" for ip in gateway)
+
+
+class BackendRotasMemoria:
+    """
+    Backend de programação de rotas mantido apenas em memória, usado em testes e simulações.
+
+    Atributos:
+        rotas (dict[str, str]): Rotas instaladas (prefixo -> gateway).
+        lotes (list[list[tuple]]): Histórico de lotes recebidos, na ordem em que foram executados.
+        falhas (set[str]): Prefixos cujas operações devem falhar, para simular erros do kernel.
+    """
+    __slots__ = ["rotas", "lotes", "falhas"]
+
+    def __init__(self):
+        self.rotas = {}
+        self.lotes = []
+        self.falhas = set()
+
+    def executar(self, operacoes: list[tuple]):
+        self.lotes.append(list(operacoes))
+        sucesso = []
+        for acao, prefixo, gateway in operacoes:
+            if prefixo in self.falhas:
+                sucesso.append(False)
+                continue
+            if acao == "del":
+                self.rotas.pop(prefixo, None)
+            else:
+                self.rotas[prefixo] = gateway
+            sucesso.append(True)
+        return sucesso
+
+
+class ProgramadorRotas:
+    """
+    Camada de programação de rotas que lembra o que já está instalado no kernel e envia
+    apenas a diferença entre duas tabelas calculadas, em um único lote.
+
+    Os gateways são um IP ou, em rotas multipath (ECMP), uma tupla ordenada de IPs; trocar o
+    conjunto de caminhos de um prefixo conta como alteração da rota.
+
+    Atributos:
+        _backend: Objeto com o método executar(operacoes) que aplica o lote no sistema.
+        _instaladas (dict[str, str | tuple[str]]): Rotas atualmente instaladas (prefixo -> gateway).
+    """
+    __slots__ = ["_backend", "_instaladas"]
+
+    def __init__(self, backend=None):
+        self._backend = backend if backend is not None else BackendRotasIpBatch()
+        self._instaladas = {}
+
+    def calcular_delta(self, desejadas: dict[str, str]):
+        """
+        Compara as rotas desejadas com as instaladas.
+
+        Args:
+            desejadas (dict[str, str]): Rotas que devem estar instaladas (prefixo -> gateway).
+
+        Returns:
+            tuple[dict, dict, dict]: Rotas a adicionar, a alterar e a remover.
+        """
+        adicionar = {}
+        alterar = {}
+        for prefixo, gateway in desejadas.items():
+            atual = self._instaladas.get(prefixo)
+            if atual is None:
+                adicionar[prefixo] = gateway
+            elif atual != gateway:
+                alterar[prefixo] = gateway
+        remover = {prefixo: gateway for prefixo, gateway in self._instaladas.items()
+                   if prefixo not in desejadas}
+        return adicionar, alterar, remover
+
+    def sincronizar(self, desejadas: dict[str, str]):
+        """
+        Leva o kernel ao estado desejado enviando só as rotas novas, alteradas e removidas.
+
+        Args:
+            desejadas (dict[str, str]): Rotas que devem estar instaladas (prefixo -> gateway).
+
+        Returns:
+            tuple[dict, dict, dict]: Rotas adicionadas, alteradas e removidas neste lote.
+        """
+        adicionar, alterar, remover = self.calcular_delta(desejadas)
+        # As remoções vão por último: quando prefixos são trocados pelo supernet que os cobre
+        # (ou o contrário), a rota nova já está no kernel antes de a antiga sair.
+        operacoes = [("replace", prefixo, gateway) for prefixo, gateway in adicionar.items()]
+        operacoes += [("replace", prefixo, gateway) for prefixo, gateway in alterar.items()]
+        operacoes += [("del", prefixo, gateway) for prefixo, gateway in remover.items()]
+        if not operacoes:
+            return adicionar, alterar, remover
+
+        for (acao, prefixo, gateway), ok in zip(operacoes, self._backend.executar(operacoes)):
+            if not ok:
+                continue
+            if acao == "del":
+                self._instaladas.pop(prefixo, None)
+            else:
+                self._instaladas[prefixo] = gateway
+        return adicionar, alterar, remover
+
+    def restaurar(self, rotas: dict):
+        """
+        Retoma as rotas gravadas antes de um reinício. Elas são reenviadas ao kernel em um único
+        lote ('replace' não muda nada se a rota ainda estiver lá) e passam a ser a base do
+        próximo delta, então as que deixarem de valer são removidas pela sincronização normal.
+
+        Args:
+            rotas (dict[str, str | tuple[str]]): Rotas instaladas antes do reinício (prefixo -> gateway).
+        """
+        operacoes = [("replace", prefixo, gateway) for prefixo, gateway in rotas.items()]
+        if not operacoes:
+            return
+        for (_, prefixo, gateway), ok in zip(operacoes, self._backend.executar(operacoes)):
+            if ok:
+                self._instaladas[prefixo] = gateway
+
+    @property
+    def instaladas(self):
+        return dict(self._instaladas)
+
+
+class TemporizadorThreads:
+    """
+    Temporizador padrão baseado em threads. Executa uma função após um atraso, em uma
+    thread própria, e informa o tempo monotônico atual.
+    """
+    __slots__ = []
+
+    def agora(self):
+        return time.monotonic()
+
+    def agendar(self, atraso: float, funcao, *args):
+        """
+        Agenda a execução de uma função.
+
+        Args:
+            atraso (float): Tempo de espera, em segundos.
+            funcao (callable): Função a ser executada.
+
+        Returns:
+            threading.Timer: Objeto com o método cancel() para desfazer o agendamento.
+        """
+        temporizador = threading.Timer(atraso, funcao, args)
+        temporizador.daemon = True
+        temporizador.start()
+        return temporizador
+
+
+class AgendadorSPF:
+    """
+    Agrupa rajadas de LSAs em uma única execução do SPF, no estilo do spf-throttle do OSPF.
+
+    A primeira solicitação após um período calmo espera apenas o atraso inicial. Solicitações
+    que chegam logo depois de uma execução esperam o tempo de espera atual, que dobra a cada
+    rajada até o máximo configurado e volta ao valor inicial quando a rede se estabiliza.
+    Enquanto uma execução está pendente, novas solicitações são apenas contadas como agrupadas;
+    tarefas diferentes solicitadas nesse meio-tempo (o SPF de cada área de um roteador de borda)
+    rodam todas na mesma execução, na ordem em que foram pedidas.
+
+    Atributos:
+        _atraso_inicial (float): Atraso, em segundos, da primeira execução após um período calmo.
+        _espera (float): Tempo de espera inicial entre duas execuções consecutivas.
+        _espera_maxima (float): Limite superior do tempo de espera entre execuções.
+        _espera_atual (float): Tempo de espera em vigor, ajustado pelo recuo exponencial.
+        _temporizador: Objeto com os métodos agora() e agendar(atraso, funcao).
+        _tarefas (dict[callable, None]): Funções que executam o SPF e a instalação de rotas,
+            pendentes para a próxima execução.
+        _pendente (bool): Indica se já existe uma execução agendada.
+        _ultima_execucao (float): Momento em que a última execução começou.
+        solicitacoes (int): Total de solicitações recebidas.
+        execucoes (int): Total de execuções realizadas.
+        agrupadas (int): Solicitações absorvidas por uma execução já agendada.
+    """
+    __slots__ = ["_atraso_inicial", "_espera", "_espera_maxima", "_espera_atual",
+                 "_temporizador", "_tarefas", "_pendente", "_ultima_execucao",
+                 "_trava", "_trava_execucao", "solicitacoes", "execucoes", "agrupadas"]
+
+    _log = REGISTRO.canal("spf")
+
+    def __init__(self, atraso_inicial: float = 0.05, espera: float = 0.2, espera_maxima: float = 5.0, temporizador=None):
+        self._atraso_inicial = atraso_inicial
+        self._espera = espera
+        self._espera_maxima = espera_maxima
+        self._espera_atual = espera
+        self._temporizador = temporizador if temporizador is not None else TemporizadorThreads()
+        self._tarefas = {}
+        self._pendente = False
+        self._ultima_execucao = None
+        self._trava = threading.Lock()
+        self._trava_execucao = threading.Lock()
+        self.solicitacoes = 0
+        self.execucoes = 0
+        self.agrupadas = 0
+
+    def definir_temporizador(self, temporizador):
+        """
+        Troca o temporizador usado para agendar as execuções (por exemplo, pelo do loop asyncio).
+        """
+        self._temporizador = temporizador
+
+    def solicitar(self, tarefa):
+        """
+        Pede uma execução do SPF. Se já houver uma execução pendente, a solicitação é agrupada a ela.
+
+        Args:
+            tarefa (callable): Função que executa o SPF e a instalação de rotas.
+        """
+        with self._trava:
+            self.solicitacoes += 1
+            self._tarefas[tarefa] = None
+            if self._pendente:
+                self.agrupadas += 1
+                return
+            self._pendente = True
+
+            agora = self._temporizador.agora()
+            if self._ultima_execucao is None or agora - self._ultima_execucao > self._espera_atual:
+                self._espera_atual = self._espera
+                atraso = self._atraso_inicial
+            else:
+                atraso = max(0.0, self._ultima_execucao + self._espera_atual - agora)
+                self._espera_atual = min(self._espera_atual * 2, self._espera_maxima)
+
+        self._temporizador.agendar(atraso, self._executar)
+
+    def _executar(self):
+        """Executa as tarefas pendentes, garantindo que duas execuções nunca ocorram ao mesmo tempo."""
+        with self._trava_execucao:
+            with self._trava:
+                self._pendente = False
+                self._ultima_execucao = self._temporizador.agora()
+                self.execucoes += 1
+                tarefas = list(self._tarefas)
+                self._tarefas.clear()
+            for tarefa in tarefas:
+                try:
+                    tarefa()
+                except Exception as e:
+                    self._log.excecao("Erro na execução do SPF: %s", e)
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: Contadores de solicitações, execuções e solicitações agrupadas.
         """
         return {
-            "numero_sequencia": numero_seq,
-            "timestamp": timestamp,
+            "solicitacoes": self.solicitacoes,
+            "execucoes": self.execucoes,
+            "agrupadas": self.agrupadas,
+        }
+
+
+class Histograma:
+    """
+    Histograma de latências com baldes fixos, no formato cumulativo do Prometheus na exportação.
+
+    Atributos:
+        limites (tuple[float]): Limite superior de cada balde, em segundos.
+        contagens (list[int]): Observações por balde; a última posição conta as acima do maior limite.
+        soma (float): Soma das observações.
+        total (int): Quantidade de observações.
+    """
+    __slots__ = ["limites", "contagens", "soma", "total"]
+
+    def __init__(self, limites: tuple):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Metricas:
+    """
+    Contadores e histogramas de latência de um roteador, exportados no formato texto do Prometheus.
+
+    O registro não usa travas: é um incremento em dicionário ou lista, barato o bastante para
+    ficar ligado sob flooding. Sob o GIL, incrementos concorrentes de threads diferentes podem,
+    raramente, se perder, o que é aceitável para métricas. Valores que já existem em outros
+    objetos (tamanho da LSDB, rotas instaladas, estatísticas do agendador de SPF) são lidos só
+    na exportação, por medidores registrados com registrar_medidor().
+
+    Atributos:
+        _id_rota (str): Roteador, usado como rótulo de todas as séries.
+        contadores (dict[tuple[str, str], int]): Valor de cada contador por (nome, tipo de pacote).
+        histogramas (dict[str, Histograma]): Histogramas de latência por nome.
+        _medidores (list[tuple[str, str, str, callable]]): (nome, tipo, ajuda, função) lidos na exportação.
+    """
+    LIMITES_LATENCIA = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+    LIMITES_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+    DESCRICOES = {
+        "pacotes_recebidos_total": "Pacotes recebidos, por tipo.",
+        "bytes_recebidos_total": "Bytes recebidos, por tipo de pacote.",
+        "pacotes_enviados_total": "Pacotes enviados, por tipo.",
+        "bytes_enviados_total": "Bytes enviados, por tipo de pacote.",
+        "erros_pacotes_total": "Erros de recepção e datagramas descartados por erro de decodificação ou processamento.",
+        "lsas_agrupados_total": "LSAs descartados por chegarem no mesmo lote que um LSA mais novo do mesmo roteador.",
+        "rotas_programadas_total": "Operações de rota enviadas ao kernel, por ação.",
+        "decodificacao_segundos": "Tempo de decodificação de cada datagrama.",
+        "atualizar_tabela_segundos": "Tempo de EstadoRoteador.atualizar_tabela por LSA.",
+        "spf_segundos": "Duração de cada execução do SPF.",
+        "aplicar_rotas_segundos": "Duração de cada instalação de rotas.",
+        "lote_recepcao": "Datagramas lidos do socket a cada despertar da recepção.",
+    }
+
+    __slots__ = ["_id_rota", "contadores", "histogramas", "_medidores"]
+
+    def __init__(self, id_rota: str):
+        self._id_rota = id_rota
+        self.contadores = {}
+        self.histogramas = {nome: Histograma(self.LIMITES_LATENCIA)
+                            for nome in self.DESCRICOES if nome.endswith("_segundos")}
+        self.histogramas["lote_recepcao"] = Histograma(self.LIMITES_LOTE)
+        self._medidores = []
+
+    def contar(self, nome: str, tipo: str, quantidade: int = 1):
+        chave = (nome, tipo)
+        self.contadores[chave] = self.contadores.get(chave, 0) + quantidade
+
+    def contar_pacote(self, sentido: str, tipo: str, tamanho: int):
+        """Conta um pacote e seus bytes; sentido é 'recebidos' ou 'enviados'."""
+        self.contar(f"pacotes_{sentido}_total", tipo)
+        self.contar(f"bytes_{sentido}_total", tipo, tamanho)
+
+    def observar(self, nome: str, valor: float):
+        self.histogramas[nome].observar(valor)
+
+    def registrar_medidor(self, nome: str, tipo: str, ajuda: str, funcao):
+        """
+        Registra um valor lido apenas na exportação.
+
+        Args:
+            nome (str): Nome da série, sem o prefixo 'roteador_'.
+            tipo (str): 'gauge' ou 'counter'.
+            ajuda (str): Descrição da série.
+            funcao (callable): Função sem argumentos que devolve o valor atual.
+        """
+        self._medidores.append((nome, tipo, ajuda, funcao))
+
+    def exportar(self):
+        """
+        Returns:
+            dict: Contadores, histogramas e medidores em uma estrutura serializável em JSON.
+        """
+        contadores = {}
+        for (nome, tipo), valor in list(self.contadores.items()):
+            contadores.setdefault(nome, {})[tipo] = valor
+        return {
+            "contadores": contadores,
+            "histogramas": {nome: {"limites": list(h.limites), "contagens": list(h.contagens),
+                                   "soma": h.soma, "total": h.total}
+                            for nome, h in self.histogramas.items()},
+            "medidores": {nome: funcao() for nome, _, _, funcao in self._medidores},
+        }
+
+    def exportar_prometheus(self):
+        """
+        Returns:
+            str: Todas as séries no formato texto de exposição do Prometheus.
+        """
+        rotulo = f'roteador="{self._id_rota}"'
+        linhas = []
+        por_nome = {}
+        for (nome, tipo), valor in list(self.contadores.items()):
+            por_nome.setdefault(nome, []).append((tipo, valor))
+        for nome in sorted(por_nome):
+            linhas.append(f"# HELP roteador_{nome} {self.DESCRICOES.get(nome, nome)}")
+            linhas.append(f"# TYPE roteador_{nome} counter")
+            for tipo, valor in sorted(por_nome[nome]):
+                linhas.append(f'roteador_{nome}{{{rotulo},tipo="{tipo}"}} {valor}')
+
+        for nome, histograma in self.histogramas.items():
+            linhas.append(f"# HELP roteador_{nome} {self.DESCRICOES[nome]}")
+            linhas.append(f"# TYPE roteador_{nome} histogram")
+            acumulado = 0
+            for limite, contagem in zip(histograma.limites, histograma.contagens):
+                acumulado += contagem
+                linhas.append(f'roteador_{nome}_bucket{{{rotulo},le="{limite:g}"}} {acumulado}')
+            linhas.append(f'roteador_{nome}_bucket{{{rotulo},le="+Inf"}} {histograma.total}')
+            linhas.append(f"roteador_{nome}_sum{{{rotulo}}} {histograma.soma}")
+            linhas.append(f"roteador_{nome}_count{{{rotulo}}} {histograma.total}")
+
+        for nome, tipo, ajuda, funcao in self._medidores:
+            linhas.append(f"# HELP roteador_{nome} {ajuda}")
+            linhas.append(f"# TYPE roteador_{nome} {tipo}")
+            linhas.append(f"roteador_{nome}{{{rotulo}}} {funcao()}")
+        return "\n".join(linhas) + "\n"
+
+
+class SnapshotLSDB:
+    """
+    Cópia versionada e somente leitura da LSDB.
+
+    Um snapshot publicado nunca é alterado, nem as entradas dentro dele: cada LSA aceito substitui
+    a entrada inteira na tabela de trabalho, e uma nova versão é publicada a partir dela quando
+    alguém precisa ler. O SPF, a instalação de rotas e a introspecção trabalham sobre um snapshot
+    sem travas, e todas as leituras de uma mesma execução enxergam a mesma versão.
+
+    Atributos:
+        versao (int): Número da versão; cresce a cada escrita na LSDB.
+        entradas (types.MappingProxyType): Entradas da LSDB por roteador, somente leitura.
+    """
+    __slots__ = ["versao", "entradas"]
+
+    def __init__(self, versao: int = 0, entradas: dict = None):
+        self.versao = versao
+        self.entradas = types.MappingProxyType(entradas if entradas is not None else {})
+
+
+class GrafoCSR:
+    """
+    Topologia de uma LSDB com os IDs de roteador internados em inteiros e as adjacências em
+    arrays no formato CSR, com o SPF executado sobre buffers alocados uma única vez.
+
+    Cada roteador tem um bloco contíguo em destinos/custos, com folga. Mudar o custo de um
+    enlace ou removê-lo altera o bloco no lugar; um enlace novo só move o bloco para o fim dos
+    arrays quando a folga acaba, e o espaço abandonado é recuperado por uma compactação quando
+    passa da metade dos arrays.
+
+    O SPF não aloca estruturas por nó: distâncias, anteriores e saltos ficam em arrays do tamanho
+    do grafo, e um valor só vale na execução atual se a geração do nó for a dela, o que dispensa
+    limpar os arrays a cada execução. A fila de prioridade guarda inteiros (distância << 32 |
+    índice) em vez de tuplas. Empates são resolvidos pelo menor ID de roteador anterior e os
+    saltos ECMP são os mesmos de EstadoRoteador._calcular_saltos_ecmp, então o resultado é o do
+    SPF com dicionários (os custos dos links são positivos).
+
+    Atributos:
+        ids (list[str]): ID de cada roteador, por índice.
+        indices (dict[str, int]): Índice de cada ID.
+        _inicio (array.array): Posição do bloco de cada nó em destinos e custos.
+        _grau (array.array): Enlaces de cada nó.
+        _capacidade (array.array): Tamanho do bloco de cada nó.
+        destinos (array.array): Nó de destino de cada enlace.
+        custos (array.array): Custo de cada enlace.
+        _abandonadas (int): Posições de blocos movidos, recuperadas na compactação.
+        distancias (array.array): Custo do caminho mínimo até cada nó, na última execução.
+        anteriores (array.array): Nó anterior de cada nó na árvore de caminhos mínimos.
+        saltos (array.array): Próximo salto até cada nó.
+        _geracao (array.array): Execução em que cada nó recebeu uma distância.
+        _fechado (array.array): Execução em que cada nó saiu da fila com a distância final.
+        _execucao (int): Número da execução atual do SPF.
+        ordem (array.array): Nós alcançados, na ordem em que saíram da fila (a raiz primeiro).
+        alcancados (int): Quantos nós de ordem valem na última execução.
+    """
+    __slots__ = ["ids", "indices", "_inicio", "_grau", "_capacidade", "destinos", "custos", "_abandonadas",
+                 "distancias", "anteriores", "saltos", "_geracao", "_fechado", "_execucao", "ordem", "alcancados"]
+
+    CAPACIDADE_MINIMA = 4
+    _MASCARA = 0xFFFFFFFF
+
+    def __init__(self):
+        self.ids = []
+        self.indices = {}
+        self._inicio = array.array("l")
+        self._grau = array.array("l")
+        self._capacidade = array.array("l")
+        self.destinos = array.array("l")
+        self.custos = array.array("l")
+        self._abandonadas = 0
+        self.distancias = array.array("q")
+        self.anteriores = array.array("l")
+        self.saltos = array.array("l")
+        self._geracao = array.array("L")
+        self._fechado = array.array("L")
+        self._execucao = 0
+        self.ordem = array.array("l")
+        self.alcancados = 0
+
+    def indice(self, id_rota: str):
+        """Devolve o índice do roteador, internando o ID na primeira vez em que ele aparece."""
+        indice = self.indices.get(id_rota)
+        if indice is None:
+            indice = self.indices[id_rota] = len(self.ids)
+            self.ids.append(id_rota)
+            for buffer in (self._inicio, self._grau, self._capacidade, self.distancias, self.anteriores,
+                           self.saltos, self._geracao, self._fechado, self.ordem):
+                buffer.append(0)
+        return indice
+
+    def atualizar_links(self, id_rota: str, alterados, links_novos: dict[str, int]):
+        """
+        Aplica no lugar os enlaces de um roteador que mudaram.
+
+        Args:
+            id_rota (str): Roteador que anunciou os links.
+            alterados (Iterable[str]): Vizinhos cujos enlaces mudaram (veja diferenca_links).
+            links_novos (dict[str, int]): Links anunciados agora pelo roteador.
+        """
+        origem = self.indice(id_rota)
+        for vizinho in alterados:
+            self._definir(origem, self.indice(vizinho), links_novos.get(vizinho))
+
+    def _definir(self, origem: int, destino: int, custo):
+        inicio = self._inicio[origem]
+        grau = self._grau[origem]
+        destinos = self.destinos
+        for posicao in range(inicio, inicio + grau):
+            if destinos[posicao] != destino:
+                continue
+            if custo is not None:
+                self.custos[posicao] = custo
+                return
+            ultimo = inicio + grau - 1
+            destinos[posicao] = destinos[ultimo]
+            self.custos[posicao] = self.custos[ultimo]
+            self._grau[origem] = grau - 1
+            return
+        if custo is None:
+            return
+        if grau == self._capacidade[origem]:
+            inicio = self._mover(origem, max(self.CAPACIDADE_MINIMA, 2 * grau))
+        self.destinos[inicio + grau] = destino
+        self.custos[inicio + grau] = custo
+        self._grau[origem] = grau + 1
+
+    def _mover(self, no: int, capacidade: int):
+        """Move o bloco do nó para o fim dos arrays com a nova capacidade; devolve o novo início."""
+        inicio, grau = self._inicio[no], self._grau[no]
+        folga = array.array("l", [0]) * (capacidade - grau)
+        novo = len(self.destinos)
+        self.destinos.extend(self.destinos[inicio:inicio + grau])
+        self.destinos.extend(folga)
+        self.custos.extend(self.custos[inicio:inicio + grau])
+        self.custos.extend(folga)
+        self._abandonadas += self._capacidade[no]
+        self._inicio[no] = novo
+        self._capacidade[no] = capacidade
+        if 2 * self._abandonadas > len(self.destinos):
+            self._compactar()
+        return self._inicio[no]
+
+    def _compactar(self):
+        destinos = array.array("l")
+        custos = array.array("l")
+        for no in range(len(self.ids)):
+            inicio, capacidade = self._inicio[no], self._capacidade[no]
+            self._inicio[no] = len(destinos)
+            destinos.extend(self.destinos[inicio:inicio + capacidade])
+            custos.extend(self.custos[inicio:inicio + capacidade])
+        self.destinos = destinos
+        self.custos = custos
+        self._abandonadas = 0
+
+    def calcular(self, raiz: str, max_caminhos: int = 1):
+        """
+        Executa o SPF a partir da raiz.
+
+        Args:
+            raiz (str): Roteador de origem.
+            max_caminhos (int): Máximo de próximos saltos de mesmo custo por destino; 1 desliga o ECMP.
+
+        Returns:
+            tuple[dict[str, str], dict[str, tuple[str]]]: Próximo salto de cada destino alcançável
+                e, só para os destinos com mais de um, os próximos saltos de mesmo custo em ordem de ID.
+        """
+        origem = self.indice(raiz)
+        self._execucao += 1
+        execucao = self._execucao
+        ids = self.ids
+        inicio_blocos, graus, destinos, custos = self._inicio, self._grau, self.destinos, self.custos
+        distancias, anteriores, saltos = self.distancias, self.anteriores, self.saltos
+        geracao, fechado, ordem = self._geracao, self._fechado, self.ordem
+        mascara = self._MASCARA
+        ecmp = max_caminhos > 1
+        # Saltos de mesmo custo dos nós com mais de um: conjunto enquanto o nó está na fila e
+        # tupla ordenada depois que ele sai. Um nó ausente tem um único salto, o de saltos[].
+        multiplos = {}
+
+        geracao[origem] = execucao
+        distancias[origem] = 0
+        anteriores[origem] = -1
+        saltos[origem] = -1
+        fila = [origem]
+        alcancados = 0
+        while fila:
+            chave = heapq.heappop(fila)
+            no = chave & mascara
+            distancia = chave >> 32
+            if fechado[no] == execucao or distancia != distancias[no]:
+                continue
+            fechado[no] = execucao
+            ordem[alcancados] = no
+            alcancados += 1
+            conjunto = multiplos.get(no)
+            if conjunto is not None and type(conjunto) is set:
+                conjunto = multiplos[no] = tuple(sorted(conjunto)[:max_caminhos])
+            salto = saltos[no]
+            inicio = inicio_blocos[no]
+            for posicao in range(inicio, inicio + graus[no]):
+                vizinho = destinos[posicao]
+                if fechado[vizinho] == execucao:
+                    continue
+                nova_dist = distancia + custos[posicao]
+                salto_vizinho = vizinho if no == origem else salto
+                if geracao[vizinho] != execucao or nova_dist < distancias[vizinho]:
+                    geracao[vizinho] = execucao
+                    distancias[vizinho] = nova_dist
+                    anteriores[vizinho] = no
+                    saltos[vizinho] = salto_vizinho
+                    heapq.heappush(fila, nova_dist << 32 | vizinho)
+                    if ecmp:
+                        if conjunto is None:
+                            multiplos.pop(vizinho, None)
+                        else:
+                            multiplos[vizinho] = conjunto
+                elif nova_dist == distancias[vizinho]:
+                    if ecmp:
+                        atual = multiplos.get(vizinho)
+                        parcial = conjunto if conjunto is not None else (ids[salto_vizinho],)
+                        if atual is None:
+                            if conjunto is not None or saltos[vizinho] != salto_vizinho:
+                                multiplos[vizinho] = {ids[saltos[vizinho]], *parcial}
+                        elif type(atual) is set:
+                            atual.update(parcial)
+                        elif atual != parcial:
+                            multiplos[vizinho] = set(atual).union(parcial)
+                    if ids[no] < ids[anteriores[vizinho]]:
+                        anteriores[vizinho] = no
+                        saltos[vizinho] = salto_vizinho
+        self.alcancados = alcancados
+        proximos_saltos = {ids[ordem[i]]: ids[saltos[ordem[i]]] for i in range(1, alcancados)}
+        return proximos_saltos, {ids[no]: saltos_no for no, saltos_no in multiplos.items()}
+
+
+class DistanciasCSR(collections.abc.Mapping):
+    """
+    Visão somente leitura, por ID de roteador, das distâncias da última execução do SPF de um
+    GrafoCSR, no lugar do dicionário de distâncias do SPF com dicionários. Vale até a próxima
+    execução; quem lê deve estar sob a mesma trava do SPF.
+
+    Atributos:
+        _grafo (GrafoCSR): Grafo cujas distâncias são expostas.
+    """
+    __slots__ = ["_grafo"]
+
+    def __init__(self, grafo: GrafoCSR):
+        self._grafo = grafo
+
+    def __getitem__(self, id_rota: str):
+        grafo = self._grafo
+        indice = grafo.indices.get(id_rota)
+        if indice is None or grafo._fechado[indice] != grafo._execucao:
+            raise KeyError(id_rota)
+        return grafo.distancias[indice]
+
+    def __iter__(self):
+        grafo = self._grafo
+        return (grafo.ids[grafo.ordem[i]] for i in range(grafo.alcancados))
+
+    def __len__(self):
+        return self._grafo.alcancados
+
+    def items(self):
+        grafo = self._grafo
+        ids, ordem, distancias = grafo.ids, grafo.ordem, grafo.distancias
+        return [(ids[ordem[i]], distancias[ordem[i]]) for i in range(grafo.alcancados)]
+
+
+class PersistenciaEstado:
+    """
+    Guarda em um arquivo local o estado usado no reinício a quente do roteador (LSDB, rotas
+    instaladas, vizinhos e número de sequência do último LSA originado).
+
+    As gravações são agrupadas: a primeira mudança agenda uma escrita para intervalo segundos
+    depois, e as mudanças seguintes até lá entram nela. O arquivo é escrito em um temporário e
+    renomeado, então um reinício no meio da escrita encontra a versão anterior inteira.
+
+    Atributos:
+        _caminho (str): Arquivo do estado.
+        _coletar (callable): Devolve o dicionário a gravar.
+        _intervalo (float): Atraso, em segundos, entre a primeira mudança e a gravação.
+        _temporizador: Objeto com os métodos agora() e agendar(atraso, funcao).
+        _pendente (bool): Indica se já existe uma gravação agendada.
+        gravacoes (int): Total de gravações feitas.
+    """
+    __slots__ = ["_caminho", "_coletar", "_intervalo", "_temporizador", "_pendente", "_trava", "gravacoes"]
+
+    VERSAO = 1
+    _log = REGISTRO.canal("estado")
+
+    def __init__(self, caminho: str, coletar, intervalo: float = 1.0, temporizador=None):
+        self._caminho = caminho
+        self._coletar = coletar
+        self._intervalo = intervalo
+        self._temporizador = temporizador if temporizador is not None else TemporizadorThreads()
+        self._pendente = False
+        self._trava = threading.Lock()
+        self.gravacoes = 0
+
+    def solicitar(self):
+        """Agenda uma gravação, se ainda não houver uma pendente."""
+        with self._trava:
+            if self._pendente:
+                return
+            self._pendente = True
+        self._temporizador.agendar(self._intervalo, self._gravar_agendado)
+
+    def _gravar_agendado(self):
+        with self._trava:
+            self._pendente = False
+        self.gravar()
+
+    def gravar(self):
+        """Grava o estado atual imediatamente."""
+        dados = dict(self._coletar(), versao=self.VERSAO, salvo_em=time.time())
+        temporario = f"{self._caminho}.tmp"
+        try:
+            with open(temporario, "w") as arquivo:
+                json.dump(dados, arquivo, separators=(",", ":"))
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, self._caminho)
+            self.gravacoes += 1
+        except (OSError, TypeError, ValueError) as e:
+            self._log.erro("Falha ao gravar o estado em %s: %s", self._caminho, e)
+
+    def carregar(self):
+        """
+        Returns:
+            dict | None: Estado gravado, ou None se o arquivo não existir, estiver corrompido ou
+                for de outra versão do formato.
+        """
+        try:
+            with open(self._caminho) as arquivo:
+                dados = json.load(arquivo)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._log.aviso("Estado em %s ignorado: %s", self._caminho, e)
+            return None
+        if not isinstance(dados, dict) or dados.get("versao") != self.VERSAO:
+            return None
+        return dados
+
+
+class EstadoRoteador:
+    """
+    Representa o estado de roteamento de um roteador em uma rede.
+
+    Esta classe mantém uma tabela de roteamento com informações recebidas de outros roteadores
+    e calcula os melhores caminhos até cada destino, aplicando as rotas no sistema.
+
+    O cálculo de caminhos mínimos usa Dijkstra com fila de prioridade. Depois do primeiro
+    cálculo completo, cada LSA aceito recalcula apenas a parte da árvore de caminhos mínimos
+    afetada pelos links que mudaram (SPF incremental). Empates de custo são resolvidos sempre
+    pelo menor ID de roteador anterior, de modo que o cálculo incremental e o completo
+    produzem exatamente o mesmo resultado.
+
+    Com max_caminhos > 1, além da árvore, cada destino guarda todos os próximos saltos de mesmo
+    custo (ECMP), até max_caminhos, e as rotas são instaladas com vários 'nexthop'.
+
+    Com agregar_rotas, os prefixos contíguos que saem pelo mesmo gateway são instalados como um
+    único supernet (veja agregar_prefixos), o que reduz a FIB e o tamanho dos lotes de rotas.
+
+    Cada instância guarda a LSDB de uma única área. Os LSAs dos roteadores de borda podem trazer
+    rotas resumidas ('resumos': prefixo -> custo a partir da borda), que viram rotas entre áreas
+    pelo caminho de menor custo total até alguma borda; um prefixo anunciado dentro da área
+    sempre vence um resumo. Com usar_resumos=False (o SPF de uma área comum em um roteador de
+    borda, que aprende as outras áreas pelo backbone) os resumos são ignorados.
+
+    Além dos LSAs completos, a LSDB aceita LSAs delta (com 'base'), que trazem só os links e
+    endereços incluídos, alterados ou removidos desde o LSA de número de sequência base. O delta
+    só é aplicado sobre essa base e se o resultado conferir com o checksum do conteúdo completo;
+    senão ele é recusado para que o LSA completo seja pedido ao vizinho. Os enlaces alterados
+    pelos deltas são guardados até o próximo SPF, que não precisa comparar os links inteiros.
+
+    Com lsdb_compacta, a topologia usada pelo SPF fica em um GrafoCSR (IDs internados em inteiros
+    e adjacências em arrays) em vez dos dicionários do SPF incremental, e cada SPF é completo,
+    sobre buffers pré-alocados. As rotas calculadas são as mesmas; ganha-se memória e tempo de
+    SPF completo em LSDBs grandes.
+
+    A LSDB é copy-on-write: a recepção de LSAs altera apenas a tabela de trabalho, sob uma trava
+    curta, e o SPF lê um SnapshotLSDB publicado a partir dela. A recepção nunca espera por um SPF
+    ou por uma instalação de rotas em andamento; os SPFs são serializados por uma trava própria.
+
+    Atributos:
+        _id_rota (str): Identificador único deste roteador.
+        _area (int): Área desta LSDB (0 é o backbone).
+        _usar_resumos (bool): Instala rotas entre áreas a partir dos resumos das bordas.
+        _dados_vizinhos (dict[str, str]): Mapeia o ID dos roteadores vizinhos para seus respectivos IPs.
+        _tabela_roteamento (dict): Tabela de trabalho com as entradas de roteamento conhecidas. Só é
+            acessada pelos escritores; as entradas são substituídas, nunca alteradas.
+        _versao (int): Versão da tabela de trabalho; cresce a cada escrita.
+        _snapshot (SnapshotLSDB): Último snapshot publicado.
+        _snapshot_spf (SnapshotLSDB): Snapshot usado no último SPF; base das rotas instaladas.
+        _roteamento (dict): Guarda as rotas calculadas (destino -> próximo salto).
+        _spf_incremental (bool): Habilita o recálculo incremental da árvore de caminhos mínimos.
+        _distancias (dict[str, int]): Custo do caminho mínimo até cada roteador alcançável.
+        _anteriores (dict[str, str]): Nó anterior de cada roteador na árvore de caminhos mínimos.
+        _proximos_saltos (dict[str, str]): Próximo salto até cada roteador, preenchido durante o SPF.
+        _filhos (dict[str, set[str]]): Filhos de cada nó na árvore de caminhos mínimos.
+        _links_entrada (dict[str, dict[str, int]]): Índice reverso dos links (destino -> origem -> custo).
+        _max_caminhos (int): Máximo de próximos saltos de mesmo custo por destino; 1 desliga o ECMP.
+        _saltos_ecmp (dict[str, tuple[str]]): Próximos saltos de mesmo custo de cada destino, em ordem de ID.
+        _agregar_rotas (bool): Agrega os prefixos por gateway antes de programar o kernel.
+        _spf_valido (bool): Indica se já existe uma árvore completa para servir de base ao SPF incremental.
+        _grafo (GrafoCSR | None): Topologia compacta usada pelo SPF com lsdb_compacta; None no modo
+            com dicionários.
+        _programador_rotas (ProgramadorRotas): Instala no kernel apenas a diferença entre as tabelas calculadas.
+        _agendador_spf (AgendadorSPF): Agrupa rajadas de LSAs em uma única execução do SPF. Se for None,
+            o SPF roda imediatamente a cada LSA aceito.
+        _pendentes (set[str]): Roteadores com LSA alterado desde o último SPF.
+        _arestas_pendentes (dict[str, dict[str, int | None]]): Para os roteadores pendentes que só
+            receberam deltas desde o último SPF, os enlaces alterados e o custo de cada um no
+            último SPF. Os demais têm os links comparados por inteiro.
+        _trava (threading.Lock): Protege a tabela de trabalho; só é mantida durante escritas e publicações.
+        _trava_spf (threading.Lock): Serializa as execuções do SPF e da instalação de rotas.
+        _temporizador: Relógio usado para medir a idade das entradas da LSDB.
+        _idade_maxima (float): Tempo, em segundos, sem reanúncio após o qual um LSA é descartado.
+        _metricas (Metricas): Recebe as latências de atualizar_tabela, do SPF e da instalação de rotas.
+        _ao_alterar (callable): Chamada depois de cada SPF com instalação de rotas (por exemplo, para
+            gravar o estado em disco).
+        _gateways_retomada (dict[str, str]): IPs dos vizinhos gravados antes de um reinício, usados
+            enquanto as adjacências ainda não voltaram.
+        _log (CanalRegistro): Eventos da LSDB.
+        _log_rotas (CanalRegistro): Eventos da instalação de rotas.
+        refrescos (int): LSAs aceitos com o mesmo conteúdo da entrada atual (sem SPF).
+        expirados (int): LSAs descartados por idade.
+        deltas (int): LSAs delta aplicados.
+        deltas_sem_base (int): LSAs delta recusados por falta da base ou por checksum divergente.
+    """
+    __slots__ = ["_tabela_roteamento", "_id_rota", "_area", "_usar_resumos",
+                 "_dados_vizinhos", "_roteamento", "_spf_incremental",
+                 "_distancias", "_anteriores", "_proximos_saltos", "_filhos",
+                 "_links_entrada", "_max_caminhos", "_saltos_ecmp", "_agregar_rotas", "_spf_valido", "_grafo", "_programador_rotas",
+                 "_agendador_spf", "_pendentes", "_arestas_pendentes", "_trava", "_trava_spf",
+                 "_versao", "_snapshot", "_snapshot_spf",
+                 "_temporizador", "_idade_maxima", "_metricas", "_ao_alterar", "_gateways_retomada",
+                 "_log", "_log_rotas", "refrescos", "expirados", "deltas", "deltas_sem_base"]
+
+    def __init__(self, id_rota: str, dados_vizinhos: dict[str, str], spf_incremental: bool = True,
+                 programador_rotas: ProgramadorRotas = None, agendador_spf: AgendadorSPF = None,
+                 temporizador=None, idade_maxima: float = 3600, metricas: Metricas = None,
+                 max_caminhos: int = 4, agregar_rotas: bool = False, ao_alterar=None,
+                 area: int = 0, usar_resumos: bool = True, lsdb_compacta: bool = False):
+
+        self._id_rota = id_rota
+        self._area = area
+        self._usar_resumos = usar_resumos
+        self._tabela_roteamento = {}
+        self._dados_vizinhos = dados_vizinhos
+        self._roteamento = {}
+        self._spf_incremental = spf_incremental
+        self._distancias = {}
+        self._anteriores = {}
+        self._proximos_saltos = {}
+        self._filhos = {}
+        self._links_entrada = {}
+        self._max_caminhos = max(1, max_caminhos)
+        self._saltos_ecmp = {}
+        self._agregar_rotas = agregar_rotas
+        self._spf_valido = False
+        self._grafo = None
+        if lsdb_compacta:
+            self._grafo = GrafoCSR()
+            self._distancias = DistanciasCSR(self._grafo)
+        self._programador_rotas = programador_rotas if programador_rotas is not None else ProgramadorRotas()
+        self._agendador_spf = agendador_spf
+        self._pendentes = set()
+        self._arestas_pendentes = {}
+        self._trava = threading.Lock()
+        self._trava_spf = threading.Lock()
+        self._versao = 0
+        self._snapshot = self._snapshot_spf = SnapshotLSDB()
+        self._temporizador = temporizador if temporizador is not None else TemporizadorThreads()
+        self._idade_maxima = idade_maxima
+        self._metricas = metricas
+        self._ao_alterar = ao_alterar
+        self._gateways_retomada = {}
+        self._log = REGISTRO.canal("lsdb", id_rota)
+        self._log_rotas = REGISTRO.canal("rotas", id_rota)
+        self.refrescos = 0
+        self.expirados = 0
+        self.deltas = 0
+        self.deltas_sem_base = 0
+
+    def _criar_entrada_tabela(self, numero_seq, timestamp, enderecos, links, checksum=None, recebido_em=0,
+                              resumos=None):
+        """
+        Cria uma entrada padronizada para a tabela de roteamento.
+
+        Args:
+            numero_seq (int): Número de sequência da atualização.
+            timestamp (float): Marca temporal da atualização.
+            enderecos (list): Lista de endereços IP associados ao roteador.
+            links (dict): Dicionário de vizinhos com seus custos de link.
+            checksum (int): Checksum do conteúdo do LSA, se o originador o enviou.
+            recebido_em (float): Instante, no relógio do temporizador, em que o LSA foi aceito.
+            resumos (dict[str, int]): Rotas resumidas anunciadas por um roteador de borda.
+
+        Returns:
+            dict: Estrutura de entrada para a tabela de roteamento.
+        """
+        return {
+            "numero_sequencia": numero_seq,
+            "timestamp": timestamp,
+            "enderecos": enderecos,
+            "links": links,
+            "checksum": checksum,
+            "recebido_em": recebido_em,
+            "resumos": resumos,
+        }
+
+    def atualizar_tabela(self, pacote):
+        """
+        Atualiza a tabela de roteamento com base em um pacote recebido. A LSDB é atualizada
+        na hora; o SPF e a instalação de rotas são agendados (ou executados na hora, se não
+        houver agendador).
+
+        Um reanúncio com o mesmo checksum da entrada atual só renova o número de sequência e a
+        idade da entrada, sem SPF.
+
+        Args:
+            pacote (dict): Pacote contendo informações de roteamento de outro roteador.
+
+        Returns:
+            bool | None: True se a tabela foi atualizada, False se o pacote foi ignorado e None se
+                ele era um delta sem a base na LSDB (é preciso pedir o LSA completo).
+        """
+        if self._metricas is None:
+            return self._atualizar_tabela(pacote)
+        inicio = time.perf_counter()
+        try:
+            return self._atualizar_tabela(pacote)
+        finally:
+            self._metricas.observar("atualizar_tabela_segundos", time.perf_counter() - inicio)
+
+    def _atualizar_tabela(self, pacote):
+        with self._trava:
+            aceito, alterado = self._aplicar_lsa(pacote, self._temporizador.agora())
+        if alterado:
+            self._solicitar_spf()
+        return aceito
+
+    def atualizar_tabela_lote(self, pacotes: list[dict]):
+        """
+        Aplica vários LSAs de uma vez: a trava da LSDB é tomada uma única vez e, se algum deles
+        mudou a topologia, um único SPF é solicitado para o lote inteiro.
+
+        Args:
+            pacotes (list[dict]): LSAs recebidos, no máximo um por roteador de origem (ou um LSA
+                seguido dos deltas sobre ele), em ordem de número de sequência.
+
+        Returns:
+            list[bool | None]: Para cada pacote, True se ele foi aceito na LSDB e None se era um
+                delta sem a base (veja atualizar_tabela).
+        """
+        if not pacotes:
+            return []
+        inicio = time.perf_counter()
+        alterado = False
+        resultados = []
+        with self._trava:
+            agora = self._temporizador.agora()
+            for pacote in pacotes:
+                aceito, mudou = self._aplicar_lsa(pacote, agora)
+                resultados.append(aceito)
+                alterado = alterado or mudou
+        if self._metricas is not None:
+            por_lsa = (time.perf_counter() - inicio) / len(pacotes)
+            for _ in pacotes:
+                self._metricas.observar("atualizar_tabela_segundos", por_lsa)
+        if alterado:
+            self._solicitar_spf()
+        return resultados
+
+    def _aplicar_lsa(self, pacote, agora):
+        """
+        Grava um LSA na tabela de trabalho. Deve ser chamado com self._trava adquirida.
+
+        Returns:
+            tuple[bool | None, bool]: Se o LSA foi aceito (None para um delta sem base) e se ele
+                mudou a topologia (exige SPF).
+        """
+        id_rota = pacote["id_rota"]
+        numero_seq = pacote["numero_sequencia"]
+        checksum = pacote.get("checksum")
+
+        entrada = self._tabela_roteamento.get(id_rota)
+        if entrada and numero_seq <= entrada["numero_sequencia"]:
+            self._log.debug("LSA de %s ignorado (sequência antiga %s)", id_rota, numero_seq)
+            return False, False
+        if "base" in pacote:
+            return self._aplicar_delta(pacote, entrada, agora)
+
+        self._versao += 1
+        if entrada and checksum is not None and checksum == entrada["checksum"]:
+            self._tabela_roteamento[id_rota] = dict(
+                entrada, numero_sequencia=numero_seq, timestamp=pacote["timestamp"], recebido_em=agora)
+            self.refrescos += 1
+            return True, False
+
+        self._log.debug("Atualizando tabela de roteamento com id_rota %s e seq %s", id_rota, numero_seq)
+        self._tabela_roteamento[id_rota] = self._criar_entrada_tabela(
+            numero_seq, pacote["timestamp"], pacote["enderecos"], pacote["links"], checksum, agora,
+            pacote.get("resumos") or None
+        )
+        self._pendentes.add(id_rota)
+        self._arestas_pendentes.pop(id_rota, None)
+        self._descobrir_vizinhos(pacote["links"])
+        return True, True
+
+    def _aplicar_delta(self, pacote, entrada, agora):
+        """
+        Aplica um LSA delta sobre a entrada atual, que deve ser a base dele. A entrada nova é uma
+        cópia da atual com as mudanças, como nos LSAs completos. Deve ser chamado com self._trava
+        adquirida.
+
+        Returns:
+            tuple[bool | None, bool]: Como em _aplicar_lsa().
+        """
+        id_rota = pacote["id_rota"]
+        numero_seq = pacote["numero_sequencia"]
+        try:
+            validar_base_delta(pacote)
+        except ValueError as e:
+            self._log.aviso("Delta de %s descartado: %s", id_rota, e)
+            return False, False
+        if entrada is None or entrada["numero_sequencia"] != pacote["base"]:
+            self.deltas_sem_base += 1
+            self._log.debug("Delta de %s (seq %s) sem a base %s", id_rota, numero_seq, pacote["base"])
+            return None, False
+
+        links = entrada["links"]
+        alterados = {}
+        removidos = pacote.get("links_removidos", ())
+        if pacote["links"] or removidos:
+            links = dict(links)
+            for vizinho in removidos:
+                if vizinho in links:
+                    alterados[vizinho] = links.pop(vizinho)
+            for vizinho, custo in pacote["links"].items():
+                anterior = links.get(vizinho)
+                if anterior != custo:
+                    alterados[vizinho] = anterior
+                    links[vizinho] = custo
+        enderecos = entrada["enderecos"]
+        if pacote["enderecos"] or pacote.get("enderecos_removidos"):
+            enderecos = sorted(set(enderecos).difference(pacote.get("enderecos_removidos", ()))
+                               .union(pacote["enderecos"]))
+        resumos = (pacote["resumos"] or None) if "resumos" in pacote else entrada["resumos"]
+        checksum = pacote.get("checksum")
+        if checksum is not None and calcular_checksum_lsa(enderecos, links, resumos) != checksum:
+            self.deltas_sem_base += 1
+            self._log.aviso("Delta de %s (seq %s) não confere com a base %s", id_rota, numero_seq, pacote["base"])
+            return None, False
+
+        self._versao += 1
+        self.deltas += 1
+        self._tabela_roteamento[id_rota] = self._criar_entrada_tabela(
+            numero_seq, pacote["timestamp"], enderecos, links, checksum, agora, resumos)
+        if not alterados and enderecos is entrada["enderecos"] and resumos == entrada["resumos"]:
+            return True, False
+        if id_rota not in self._pendentes:
+            self._pendentes.add(id_rota)
+            self._arestas_pendentes[id_rota] = {}
+        arestas = self._arestas_pendentes.get(id_rota)
+        if arestas is not None:
+            # Fica o custo do último SPF: um enlace alterado por vários deltas só conta uma vez.
+            for vizinho, custo in alterados.items():
+                arestas.setdefault(vizinho, custo)
+        self._descobrir_vizinhos(pacote["links"])
+        return True, True
+
+    def _descobrir_vizinhos(self, links: dict[str, int]):
+        for vizinho in links:
+            if vizinho not in self._tabela_roteamento:
+                self._log.debug("Novo roteador descoberto: %s", vizinho)
+                self._tabela_roteamento[vizinho] = self._criar_entrada_tabela(-1, 0, [], {})
+
+    def _solicitar_spf(self):
+        if self._agendador_spf is not None:
+            self._agendador_spf.solicitar(self.recalcular_rotas)
+        else:
+            self.recalcular_rotas()
+
+    def expirar_lsas(self):
+        """
+        Descarta os LSAs de outros roteadores que não foram reanunciados dentro da idade máxima.
+        A entrada volta a ser um roteador conhecido sem links nem endereços, e o SPF remove as
+        rotas que dependiam dela.
+
+        Returns:
+            list[str]: Roteadores cujos LSAs expiraram.
+        """
+        limite = self._temporizador.agora() - self._idade_maxima
+        with self._trava:
+            expirados = [id_rota for id_rota, entrada in self._tabela_roteamento.items()
+                         if id_rota != self._id_rota and entrada["numero_sequencia"] >= 0
+                         and entrada["recebido_em"] < limite]
+            for id_rota in expirados:
+                self._log.info("LSA de %s expirou por idade", id_rota)
+                self._tabela_roteamento[id_rota] = self._criar_entrada_tabela(-1, 0, [], {})
+                self._pendentes.add(id_rota)
+                self._arestas_pendentes.pop(id_rota, None)
+            if expirados:
+                self._versao += 1
+            self.expirados += len(expirados)
+
+        if expirados:
+            if self._agendador_spf is not None:
+                self._agendador_spf.solicitar(self.recalcular_rotas)
+            else:
+                self.recalcular_rotas()
+        return expirados
+
+    def snapshot(self):
+        """
+        Devolve o snapshot mais recente da LSDB, publicando uma nova versão se houve escritas
+        desde a última publicação. A trava de escrita só é mantida durante a cópia.
+
+        Returns:
+            SnapshotLSDB: Versão consistente e somente leitura da LSDB.
+        """
+        with self._trava:
+            return self._publicar()
+
+    def _publicar(self):
+        if self._snapshot.versao != self._versao:
+            self._snapshot = SnapshotLSDB(self._versao, dict(self._tabela_roteamento))
+        return self._snapshot
+
+    def obter_entrada(self, id_rota: str):
+        """
+        Devolve a entrada atual de um roteador na LSDB, ou None. A entrada não deve ser alterada.
+        """
+        return self._tabela_roteamento.get(id_rota)
+
+    def tamanho_lsdb(self):
+        return len(self._tabela_roteamento)
+
+    def exportar(self):
+        """
+        Returns:
+            dict: Versão da LSDB usada no último SPF, próximos saltos, distâncias e rotas instaladas.
+        """
+        with self._trava_spf:
+            return {
+                "versao_lsdb": self._snapshot_spf.versao,
+                "proximos_saltos": dict(self._roteamento),
+                "distancias": dict(self._distancias),
+                "saltos_ecmp": {destino: list(saltos) for destino, saltos in self._saltos_ecmp.items()
+                                if len(saltos) > 1},
+                "rotas_instaladas": dict(self._programador_rotas.instaladas),
+            }
+
+    def alteracoes_pendentes(self):
+        """
+        Returns:
+            list[str]: Roteadores cujos links ou resumos mudaram desde o último SPF (reanúncios com
+            o mesmo conteúdo não contam).
+        """
+        with self._trava:
+            anteriores = self._snapshot_spf.entradas
+            vazia = {"links": {}, "resumos": None}
+            return [id_rota for id_rota in self._pendentes
+                    if (self._tabela_roteamento[id_rota]["links"], self._tabela_roteamento[id_rota]["resumos"])
+                    != (anteriores.get(id_rota, vazia)["links"], anteriores.get(id_rota, vazia)["resumos"])]
+
+    def lsas_armazenados(self, ids: list[str] = None):
+        """
+        Reconstrói os LSAs guardados na LSDB, para sincronizar um vizinho recém-descoberto ou
+        responder a um pedido de LSAs completos.
+
+        Args:
+            ids (list[str]): Roteadores cujos LSAs são pedidos; None devolve todos.
+
+        Returns:
+            list[dict]: Um pacote LSA completo por roteador com LSA válido na tabela.
+        """
+        entradas = self.snapshot().entradas
+        if ids is not None:
+            entradas = {id_rota: entradas[id_rota] for id_rota in ids if id_rota in entradas}
+        return [{
+            "tipo": "LSA",
+            "id_rota": id_rota,
+            "ip_address": "0.0.0.0",
+            "timestamp": entrada["timestamp"],
+            "numero_sequencia": entrada["numero_sequencia"],
+            "enderecos": list(entrada["enderecos"]),
+            "links": dict(entrada["links"]),
+            **({"checksum": entrada["checksum"]} if entrada["checksum"] is not None else {}),
+            **({"area": self._area} if self._area else {}),
+            **({"resumos": dict(entrada["resumos"])} if entrada["resumos"] else {}),
+        } for id_rota, entrada in entradas.items() if entrada["numero_sequencia"] >= 0]
+
+    def recalcular_rotas(self):
+        """
+        Executa o SPF sobre todas as alterações acumuladas desde a última execução e
+        aplica as rotas resultantes no sistema.
+        """
+        with self._trava_spf:
+            with self._trava:
+                pendentes = self._pendentes
+                if not pendentes and self._spf_valido:
+                    return
+                arestas_pendentes = self._arestas_pendentes
+                self._pendentes = set()
+                self._arestas_pendentes = {}
+                snapshot = self._publicar()
+
+            anteriores = self._snapshot_spf.entradas
+            tabela = snapshot.entradas
+            alteracoes = {}
+            for id_rota in pendentes:
+                links_novos = tabela[id_rota]["links"]
+                alterados = arestas_pendentes.get(id_rota)
+                if alterados is None:
+                    alterados = diferenca_links(anteriores[id_rota]["links"] if id_rota in anteriores else {},
+                                                links_novos)
+                self._indexar_links(id_rota, alterados, links_novos)
+                alteracoes[id_rota] = alterados
+
+            inicio = time.perf_counter()
+            rotas = self._calcular_rotas(tabela, alteracoes)
+            self._snapshot_spf = snapshot
+            self._atualizar_roteamento(rotas)
+            meio = time.perf_counter()
+            self._aplicar_rotas()
+            if self._metricas is not None:
+                self._metricas.observar("spf_segundos", meio - inicio)
+                self._metricas.observar("aplicar_rotas_segundos", time.perf_counter() - meio)
+        if self._ao_alterar is not None:
+            self._ao_alterar()
+
+    def exportar_persistencia(self):
+        """
+        Returns:
+            dict: LSAs válidos da LSDB, com a idade de cada um no relógio do temporizador, e as
+                rotas instaladas, em um formato serializável em JSON.
+        """
+        agora = self._temporizador.agora()
+        lsdb = {id_rota: {"numero_sequencia": entrada["numero_sequencia"], "timestamp": entrada["timestamp"],
+                          "enderecos": list(entrada["enderecos"]), "links": dict(entrada["links"]),
+                          "checksum": entrada["checksum"], "idade": max(0.0, agora - entrada["recebido_em"]),
+                          **({"resumos": dict(entrada["resumos"])} if entrada["resumos"] else {})}
+                for id_rota, entrada in self.snapshot().entradas.items() if entrada["numero_sequencia"] >= 0}
+        rotas = {prefixo: list(gateway) if isinstance(gateway, tuple) else gateway
+                 for prefixo, gateway in self._programador_rotas.instaladas.items()}
+        return {"lsdb": lsdb, "rotas": rotas}
+
+    def restaurar(self, lsdb: dict, rotas: dict, gateways: dict[str, str], decorrido: float = 0.0):
+        """
+        Carrega a LSDB e as rotas gravadas antes de um reinício e recalcula as rotas a partir
+        delas, sem esperar pelos vizinhos. Até encerrar_retomada(), os vizinhos que ainda não
+        refizeram a adjacência continuam servindo de gateway pelo IP gravado.
+
+        Args:
+            lsdb (dict): LSAs no formato de exportar_persistencia().
+            rotas (dict): Rotas instaladas antes do reinício.
+            gateways (dict[str, str]): IP de cada vizinho antes do reinício.
+            decorrido (float): Tempo, em segundos, entre a gravação e agora; soma-se à idade dos LSAs.
+        """
+        agora = self._temporizador.agora()
+        with self._trava:
+            for id_rota, lsa in lsdb.items():
+                self._tabela_roteamento[id_rota] = self._criar_entrada_tabela(
+                    lsa["numero_sequencia"], lsa["timestamp"], lsa["enderecos"], lsa["links"],
+                    lsa.get("checksum"), agora - lsa.get("idade", 0.0) - decorrido, lsa.get("resumos"))
+                self._pendentes.add(id_rota)
+                self._arestas_pendentes.pop(id_rota, None)
+            for lsa in lsdb.values():
+                for vizinho in lsa["links"]:
+                    if vizinho not in self._tabela_roteamento:
+                        self._tabela_roteamento[vizinho] = self._criar_entrada_tabela(-1, 0, [], {})
+            self._versao += 1
+        self._gateways_retomada = dict(gateways)
+        self._programador_rotas.restaurar({prefixo: tuple(gateway) if isinstance(gateway, list) else gateway
+                                           for prefixo, gateway in rotas.items()})
+        self.recalcular_rotas()
+
+    def encerrar_retomada(self):
+        """
+        Deixa de usar os gateways gravados antes do reinício e reinstala as rotas só com as
+        adjacências atuais.
+        """
+        if not self._gateways_retomada:
+            return
+        with self._trava_spf:
+            self._gateways_retomada = {}
+            if self._spf_valido:
+                self._aplicar_rotas()
+
+    def _indexar_links(self, id_rota, alterados, links_novos):
+        """
+        Mantém o índice reverso de links usado para reconectar partes da árvore no SPF incremental.
+
+        Args:
+            id_rota (str): Roteador que anunciou os links.
+            alterados (dict): Enlaces do roteador que mudaram desde o último SPF (veja diferenca_links).
+            links_novos (dict): Links anunciados agora pelo roteador.
+        """
+        if self._grafo is not None:
+            self._grafo.atualizar_links(id_rota, alterados, links_novos)
+            return
+        for vizinho in alterados:
+            custo = links_novos.get(vizinho)
+            if custo is not None:
+                self._links_entrada.setdefault(vizinho, {})[id_rota] = custo
+            else:
+                entrada = self._links_entrada.get(vizinho)
+                if entrada is not None:
+                    entrada.pop(id_rota, None)
+
+    def _calcular_rotas(self, tabela, alteracoes: dict):
+        """
+        Escolhe entre o SPF incremental e o completo e devolve a tabela de próximos saltos.
+
+        Args:
+            tabela (Mapping): Entradas do snapshot da LSDB sobre o qual o SPF roda.
+            alteracoes (dict): Mapeia cada roteador cujo LSA mudou para os enlaces dele que mudaram,
+                com o custo anterior de cada um (None para enlaces novos).
+
+        Returns:
+            dict: Mapeia cada destino alcançável ao próximo salto.
+        """
+        if self._grafo is not None:
+            return self._calcular_rotas_csr()
+        if self._spf_incremental and self._spf_valido:
+            return self._calcular_rotas_incrementais(tabela, alteracoes)
+        return self._calcular_rotas_minimas(tabela)
+
+    def _calcular_rotas_csr(self):
+        """
+        SPF completo sobre o GrafoCSR; as distâncias ficam nos buffers do grafo, expostas por
+        _distancias.
+
+        Returns:
+            dict: Mapeia cada destino alcançável ao próximo salto.
+        """
+        proximos_saltos, self._saltos_ecmp = self._grafo.calcular(self._id_rota, self._max_caminhos)
+        self._proximos_saltos = proximos_saltos
+        self._spf_valido = True
+        return proximos_saltos
+
+    def _calcular_rotas_minimas(self, tabela):
+        """
+        Calcula as rotas de menor custo para cada destino conhecido usando o algoritmo de Dijkstra
+        com fila de prioridade. O próximo salto de cada destino, e com ECMP os saltos de mesmo custo,
+        são preenchidos durante a própria busca.
+
+        Args:
+            tabela (Mapping): Entradas do snapshot da LSDB.
+
+        Returns:
+            dict: Mapeia cada destino alcançável ao próximo salto.
+        """
+        raiz = self._id_rota
+        distancias = {raiz: 0}
+        anteriores = {raiz: None}
+        proximos_saltos = {}
+        visitados = set()
+        fila = [(0, raiz)]
+        limite = self._max_caminhos
+        ecmp = limite > 1
+        # Saltos de mesmo custo de cada nó: conjunto enquanto dois ou mais caminhos mínimos chegam
+        # a ele e o nó ainda está na fila, tupla ordenada depois que ele sai, como no GrafoCSR.
+        saltos_ecmp = {}
+        conjunto = None
+
+        while fila:
+            distancia, no_atual = heapq.heappop(fila)
+            if no_atual in visitados:
+                continue
+            visitados.add(no_atual)
+            if ecmp:
+                conjunto = saltos_ecmp.get(no_atual)
+                if type(conjunto) is set:
+                    conjunto = saltos_ecmp[no_atual] = tuple(sorted(conjunto)[:limite])
+
+            entrada = tabela.get(no_atual)
+            if entrada is None:
+                continue
+            salto = proximos_saltos.get(no_atual)
+
+            for vizinho, custo in entrada["links"].items():
+                if vizinho in visitados or vizinho not in tabela:
+                    continue
+                nova_dist = distancia + custo
+                dist_atual = distancias.get(vizinho)
+                if dist_atual is None or nova_dist < dist_atual:
+                    distancias[vizinho] = nova_dist
+                    anteriores[vizinho] = no_atual
+                    proximos_saltos[vizinho] = vizinho if salto is None else salto
+                    heapq.heappush(fila, (nova_dist, vizinho))
+                    if ecmp:
+                        saltos_ecmp[vizinho] = (vizinho,) if salto is None else conjunto
+                elif nova_dist == dist_atual:
+                    if ecmp:
+                        parcial = (vizinho,) if salto is None else conjunto
+                        atual = saltos_ecmp[vizinho]
+                        if type(atual) is set:
+                            atual.update(parcial)
+                        elif atual != parcial:
+                            saltos_ecmp[vizinho] = set(atual).union(parcial)
+                    if no_atual < anteriores[vizinho]:
+                        anteriores[vizinho] = no_atual
+                        proximos_saltos[vizinho] = vizinho if salto is None else salto
+
+        filhos = {}
+        for no, anterior in anteriores.items():
+            if anterior is not None:
+                filhos.setdefault(anterior, set()).add(no)
+
+        self._distancias = distancias
+        self._anteriores = anteriores
+        self._proximos_saltos = proximos_saltos
+        self._filhos = filhos
+        self._spf_valido = True
+        if ecmp:
+            self._saltos_ecmp = saltos_ecmp
+        return proximos_saltos
+
+    def _calcular_rotas_incrementais(self, tabela, alteracoes: dict):
+        """
+        Recalcula apenas a parte da árvore de caminhos mínimos afetada pelos LSAs alterados.
+
+        Links que pioraram ou sumiram invalidam a subárvore que dependia deles; essa subárvore é
+        reconectada a partir dos nós que não foram afetados. Links que melhoraram ou surgiram são
+        relaxados diretamente. Só os enlaces alterados são visitados; os demais links de um
+        roteador alterado já foram relaxados em um SPF anterior. O resultado é idêntico ao de
+        _calcular_rotas_minimas().
+
+        Args:
+            tabela (Mapping): Entradas do snapshot da LSDB.
+            alteracoes (dict): Mapeia cada roteador cujo LSA mudou para os enlaces dele que mudaram,
+                com o custo anterior de cada um (None para enlaces novos).
+
+        Returns:
+            dict: Mapeia cada destino alcançável ao próximo salto.
+        """
+        raiz = self._id_rota
+        distancias = self._distancias
+        anteriores = self._anteriores
+        filhos = self._filhos
+        fila = []
+        modificados = set()
+
+        def trocar_anterior(no, anterior):
+            antigo = anteriores.get(no)
+            if antigo is not None:
+                filhos[antigo].discard(no)
+            anteriores[no] = anterior
+            if anterior is not None:
+                filhos.setdefault(anterior, set()).add(no)
+            modificados.add(no)
+
+        def relaxar(origem, destino, custo):
+            if destino == raiz or destino not in tabela:
+                return
+            nova_dist = distancias[origem] + custo
+            dist_atual = distancias.get(destino)
+            if dist_atual is None or nova_dist < dist_atual:
+                distancias[destino] = nova_dist
+                trocar_anterior(destino, origem)
+                heapq.heappush(fila, (nova_dist, destino))
+            elif nova_dist == dist_atual and origem < anteriores[destino]:
+                trocar_anterior(destino, origem)
+
+        invalidos = set()
+        for origem, alterados in alteracoes.items():
+            links_novos = tabela[origem]["links"] if origem in tabela else {}
+            for destino, custo_antigo in alterados.items():
+                if custo_antigo is None:
+                    continue
+                custo_novo = links_novos.get(destino)
+                if (custo_novo is None or custo_novo > custo_antigo) and anteriores.get(destino) == origem:
+                    pendentes = [destino]
+                    while pendentes:
+                        no = pendentes.pop()
+                        if no not in invalidos:
+                            invalidos.add(no)
+                            pendentes.extend(filhos.get(no, ()))
+
+        for no in invalidos:
+            distancias.pop(no, None)
+            trocar_anterior(no, None)
+        for no in invalidos:
+            for origem, custo in self._links_entrada.get(no, {}).items():
+                if origem in distancias:
+                    relaxar(origem, no, custo)
+
+        for origem, alterados in alteracoes.items():
+            if origem in distancias and origem in tabela:
+                links_novos = tabela[origem]["links"]
+                for destino in alterados:
+                    custo = links_novos.get(destino)
+                    if custo is not None:
+                        relaxar(origem, destino, custo)
+
+        finalizados = set()
+        while fila:
+            distancia, no_atual = heapq.heappop(fila)
+            if no_atual in finalizados or distancia > distancias.get(no_atual, distancia):
+                continue
+            finalizados.add(no_atual)
+            for vizinho, custo in tabela[no_atual]["links"].items():
+                relaxar(no_atual, vizinho, custo)
+
+        proximos_saltos = self._proximos_saltos
+        afetados = set()
+        pendentes = list(modificados)
+        while pendentes:
+            no = pendentes.pop()
+            if no not in afetados:
+                afetados.add(no)
+                pendentes.extend(filhos.get(no, ()))
+
+        for no in sorted(afetados, key=lambda n: distancias.get(n, float('inf'))):
+            anterior = anteriores.get(no)
+            if no not in distancias or anterior is None:
+                proximos_saltos.pop(no, None)
+                anteriores.pop(no, None)
+            elif anterior == raiz:
+                proximos_saltos[no] = no
+            else:
+                proximos_saltos[no] = proximos_saltos[anterior]
+
+        if self._max_caminhos > 1:
+            sementes = set(afetados)
+            for alterados in alteracoes.values():
+                sementes.update(alterados)
+            self._calcular_saltos_ecmp(tabela, sementes)
+        return proximos_saltos
+
+    def _calcular_saltos_ecmp(self, tabela, sementes):
+        """
+        Atualiza, depois de um SPF incremental, os próximos saltos de mesmo custo dos destinos
+        afetados: os saltos de um nó são a união dos saltos de cada vizinho de entrada que está num
+        caminho mínimo até ele. Ficam os max_caminhos de menor ID, então o resultado só depende das
+        distâncias, e não da árvore, e é o mesmo calculado pelo SPF completo.
+
+        Args:
+            tabela (Mapping): Entradas do snapshot da LSDB.
+            sementes (set[str]): Nós cujos saltos podem ter mudado; a mudança só é propagada aos
+                vizinhos de quem de fato mudou.
+        """
+        raiz = self._id_rota
+        distancias = self._distancias
+        saltos = self._saltos_ecmp
+        links_entrada = self._links_entrada
+        limite = self._max_caminhos
+
+        # Nós que ficaram inalcançáveis perdem os saltos antes de tudo, para que os vizinhos
+        # alcançáveis afetados entrem na fila ordenada por distância abaixo.
+        pendentes = [no for no in sementes if no not in distancias]
+        vistos = set(pendentes)
+        while pendentes:
+            no = pendentes.pop()
+            saltos.pop(no, None)
+            for vizinho in (tabela[no]["links"] if no in tabela else ()):
+                if vizinho in distancias:
+                    sementes.add(vizinho)
+                elif vizinho not in vistos:
+                    vistos.add(vizinho)
+                    pendentes.append(vizinho)
+        # Um nó cuja distância mudou pode deixar de estar (ou passar a estar) no caminho mínimo
+        # dos vizinhos, inclusive dos que agora ficaram mais perto da raiz do que ele; por
+        # isso os vizinhos das sementes entram na fila desde o início.
+        for no in [no for no in sementes if no in distancias]:
+            sementes.update(vizinho for vizinho in tabela[no]["links"] if vizinho in distancias)
+        fila = [(distancias[no], no) for no in sementes if no in distancias]
+        heapq.heapify(fila)
+
+        processados = set()
+        while fila:
+            distancia, no = heapq.heappop(fila)
+            if no in processados:
+                continue
+            processados.add(no)
+            if no == raiz:
+                continue
+            # Quase sempre há um único vizinho no caminho mínimo; nesse caso a tupla dele é
+            # reaproveitada e só a união de dois ou mais conjuntos paga a ordenação.
+            novos = None
+            uniao = None
+            for origem, custo in links_entrada.get(no, {}).items():
+                dist_origem = distancias.get(origem)
+                if dist_origem is None or dist_origem + custo != distancia:
+                    continue
+                parcial = (no,) if origem == raiz else saltos.get(origem, ())
+                if novos is None:
+                    novos = parcial
+                elif parcial != novos:
+                    if uniao is None:
+                        uniao = set(novos)
+                    uniao.update(parcial)
+            if uniao is not None:
+                novos = tuple(sorted(uniao)[:limite])
+            elif novos is None:
+                novos = ()
+            if saltos.get(no) == novos:
+                continue
+            saltos[no] = novos
+            for vizinho in tabela[no]["links"]:
+                if vizinho in distancias and vizinho not in processados:
+                    heapq.heappush(fila, (distancias[vizinho], vizinho))
+
+    def _atualizar_roteamento(self, proximos_saltos: dict):
+        """
+        Atualiza a tabela de roteamento com base na tabela de próximos saltos calculada pelo SPF.
+
+        Args:
+            proximos_saltos (dict): Dicionário que mapeia destinos ao próximo salto no caminho mínimo.
+        """
+        self._roteamento = dict(sorted(proximos_saltos.items()))
+
+    def _rotas_desejadas(self):
+        """
+        Monta as rotas de kernel correspondentes à tabela de roteamento calculada e, se houver
+        bordas com resumos alcançáveis, as rotas para as outras áreas.
+
+        Returns:
+            dict[str, str | tuple[str]]: Mapeia cada endereço de destino ao IP do gateway ou, se
+                houver mais de um caminho de mesmo custo, à tupla ordenada dos IPs dos gateways.
+        """
+        desejadas = {}
+        tabela = self._snapshot_spf.entradas
+        ecmp = self._saltos_ecmp if self._max_caminhos > 1 else {}
+        ips_vizinhos = self._dados_vizinhos
+        if self._gateways_retomada:
+            ips_vizinhos = dict(self._gateways_retomada, **self._dados_vizinhos)
+        for destino, gateway in self._roteamento.items():
+            saltos = ecmp.get(destino)
+            if saltos and len(saltos) > 1:
+                ips = sorted({ips_vizinhos[salto] for salto in saltos if salto in ips_vizinhos})
+                ip_gateway = ips[0] if len(ips) == 1 else tuple(ips) if ips else None
+            else:
+                ip_gateway = ips_vizinhos.get(gateway)
+            if ip_gateway is None:
+                continue
+            for ip_destino in tabela[destino]["enderecos"]:
+                desejadas[ip_destino] = ip_gateway
+        if self._usar_resumos:
+            for prefixo, (_, bordas) in self._melhores_resumos(tabela, desejadas).items():
+                ips = set()
+                for borda in bordas:
+                    for salto in ecmp.get(borda) or (self._roteamento.get(borda),):
+                        if salto in ips_vizinhos:
+                            ips.add(ips_vizinhos[salto])
+                if ips:
+                    ips = sorted(ips)[:self._max_caminhos]
+                    desejadas[prefixo] = ips[0] if len(ips) == 1 else tuple(ips)
+        if self._agregar_rotas:
+            return agregar_prefixos(desejadas)
+        return desejadas
+
+    def _melhores_resumos(self, tabela, intra_area):
+        """
+        Escolhe, para cada prefixo resumido que não é alcançável dentro da área, as bordas de
+        menor custo total (distância até a borda mais o custo anunciado por ela).
+
+        Returns:
+            dict[str, tuple[int, list[str]]]: Prefixo -> (custo total, bordas empatadas).
+        """
+        melhores = {}
+        for borda, distancia in self._distancias.items():
+            if borda == self._id_rota:
+                continue
+            resumos = tabela[borda]["resumos"] if borda in tabela else None
+            if not resumos:
+                continue
+            for prefixo, custo in resumos.items():
+                if prefixo in intra_area:
+                    continue
+                total = distancia + custo
+                atual = melhores.get(prefixo)
+                if atual is None or total < atual[0]:
+                    melhores[prefixo] = (total, [borda])
+                elif total == atual[0]:
+                    atual[1].append(borda)
+        return melhores
+
+    def destinos(self, incluir_resumos: bool = False):
+        """
+        Custo, segundo o último SPF, até cada prefixo alcançável nesta área; é a base dos resumos
+        que um roteador de borda anuncia nas outras áreas.
+
+        Args:
+            incluir_resumos (bool): Inclui os prefixos aprendidos pelos resumos de outras bordas.
+
+        Returns:
+            dict[str, int]: Prefixo -> custo a partir deste roteador.
+        """
+        with self._trava_spf:
+            tabela = self._snapshot_spf.entradas
+            custos = {}
+            for destino, distancia in self._distancias.items():
+                entrada = tabela.get(destino)
+                if entrada is None:
+                    continue
+                for prefixo in entrada["enderecos"]:
+                    if prefixo not in custos or distancia < custos[prefixo]:
+                        custos[prefixo] = distancia
+            if incluir_resumos and self._usar_resumos:
+                for prefixo, (total, _) in self._melhores_resumos(tabela, custos).items():
+                    custos[prefixo] = total
+            return custos
+
+    def _aplicar_rotas(self):
+        """
+        Aplica as rotas calculadas ao sistema operacional, enviando em um único lote apenas as
+        rotas novas, alteradas e as de destinos que deixaram de ser alcançáveis.
+        """
+        self._log_rotas.debug("Rotas calculadas: %d destinos", len(self._roteamento))
+        adicionadas, alteradas, removidas = self._programador_rotas.sincronizar(self._rotas_desejadas())
+        if self._metricas is not None:
+            self._metricas.contar("rotas_programadas_total", "adicionar", len(adicionadas))
+            self._metricas.contar("rotas_programadas_total", "alterar", len(alteradas))
+            self._metricas.contar("rotas_programadas_total", "remover", len(removidas))
+        if self._log_rotas.ativo(RegistroEventos.DEBUG):
+            for acao, rotas in (("Aplicando", adicionadas), ("Alterando", alteradas), ("Removendo", removidas)):
+                for ip_destino, ip_gateway in rotas.items():
+                    self._log_rotas.debug("%s rota: %s via %s", acao, ip_destino, ip_gateway)
+        if adicionadas or alteradas or removidas:
+            self._log_rotas.info("Rotas programadas: %d novas, %d alteradas, %d removidas",
+                                 len(adicionadas), len(alteradas), len(removidas))
+
+class ProgramadorRotasArea:
+    """
+    Programador de rotas entregue ao EstadoRoteador de uma área quando o roteador participa de
+    várias: as rotas calculadas na área vão para o CoordenadorAreas, que as junta às das outras
+    áreas antes de programar o kernel.
+
+    Atributos:
+        _coordenador (CoordenadorAreas): Dono do ProgramadorRotas real.
+        _area (int): Área cujas rotas passam por este programador.
+    """
+    __slots__ = ["_coordenador", "_area"]
+
+    def __init__(self, coordenador: "CoordenadorAreas", area: int):
+        self._coordenador = coordenador
+        self._area = area
+
+    def calcular_delta(self, desejadas: dict):
+        return self._coordenador.calcular_delta(self._area, desejadas)
+
+    def sincronizar(self, desejadas: dict):
+        return self._coordenador.sincronizar_area(self._area, desejadas)
+
+    def restaurar(self, rotas: dict):
+        self._coordenador.restaurar(rotas)
+
+    @property
+    def instaladas(self):
+        return self._coordenador.instaladas
+
+
+class CoordenadorAreas:
+    """
+    Liga as áreas de um roteador que participa de mais de uma (um roteador de borda, ou ABR,
+    quando uma delas é o backbone, a área 0).
+
+    Cada área tem a própria LSDB e o próprio SPF (um EstadoRoteador); o coordenador junta as
+    rotas de todas em uma única FIB, com as das áreas comuns por cima das do backbone (rotas de
+    dentro da área vencem rotas entre áreas), e monta os resumos que a borda anuncia:
+    - no backbone, os prefixos alcançáveis dentro das suas outras áreas;
+    - em cada área comum, os prefixos alcançáveis pelo backbone e pelas suas outras áreas,
+      menos os que a própria área já alcança.
+    Os resumos são agregados em supernets (veja resumir_prefixos).
+
+    Como no OSPF sem enlaces virtuais, o backbone precisa ser contíguo; o gerar_composer.py
+    monta as topologias com áreas desse jeito.
+
+    Atributos:
+        _programador (ProgramadorRotas): Programa a FIB combinada no kernel.
+        _agregar_rotas (bool): Agrega a FIB combinada por gateway (veja agregar_prefixos).
+        _estados (dict[int, EstadoRoteador]): LSDB e SPF de cada área.
+        _rotas_area (dict[int, dict]): Últimas rotas calculadas em cada área.
+        _aguardando (set[int]): Áreas cujas rotas ainda não chegaram depois de um reinício a
+            quente; até lá o kernel fica com as rotas restauradas.
+        _trava (threading.Lock): Serializa a combinação e a programação das rotas.
+    """
+    __slots__ = ["_programador", "_agregar_rotas", "_estados", "_rotas_area", "_aguardando", "_trava"]
+
+    def __init__(self, programador_rotas: ProgramadorRotas = None, agregar_rotas: bool = False):
+        self._programador = programador_rotas if programador_rotas is not None else ProgramadorRotas()
+        self._agregar_rotas = agregar_rotas
+        self._estados = {}
+        self._rotas_area = {}
+        self._aguardando = set()
+        self._trava = threading.Lock()
+
+    def programador_area(self, area: int):
+        return ProgramadorRotasArea(self, area)
+
+    def registrar(self, area: int, estado: "EstadoRoteador"):
+        self._estados[area] = estado
+
+    @property
+    def borda(self):
+        return 0 in self._estados and len(self._estados) > 1
+
+    @property
+    def instaladas(self):
+        return self._programador.instaladas
+
+    def _combinar(self, area: int, desejadas: dict):
+        """Deve ser chamado com self._trava adquirida."""
+        rotas_area = {**self._rotas_area, area: desejadas}
+        combinadas = {}
+        for atual in sorted(rotas_area, key=lambda a: (a != 0, a)):
+            combinadas.update(rotas_area[atual])
+        return agregar_prefixos(combinadas) if self._agregar_rotas else combinadas
+
+    def calcular_delta(self, area: int, desejadas: dict):
+        with self._trava:
+            return self._programador.calcular_delta(self._combinar(area, desejadas))
+
+    def sincronizar_area(self, area: int, desejadas: dict):
+        """
+        Guarda as rotas calculadas em uma área e programa a FIB combinada.
+
+        Returns:
+            tuple[dict, dict, dict]: Rotas adicionadas, alteradas e removidas no kernel.
+        """
+        with self._trava:
+            self._rotas_area[area] = desejadas
+            if self._aguardando:
+                self._aguardando.discard(area)
+                if self._aguardando:
+                    return {}, {}, {}
+            return self._programador.sincronizar(self._combinar(area, desejadas))
+
+    def aguardar(self, areas):
+        """Adia a programação do kernel até que cada uma das áreas informadas tenha calculado suas rotas."""
+        with self._trava:
+            self._aguardando = set(areas)
+
+    def restaurar(self, rotas: dict):
+        with self._trava:
+            self._programador.restaurar(rotas)
+
+    def resumos(self, area: int):
+        """
+        Returns:
+            dict[str, int] | None: Rotas resumidas que este roteador anuncia na área, ou None se
+                ele não for uma borda.
+        """
+        if not self.borda or area not in self._estados:
+            return None
+        custos = {}
+        for outra, estado in self._estados.items():
+            if outra == area:
+                continue
+            for prefixo, custo in estado.destinos(incluir_resumos=outra == 0).items():
+                if prefixo not in custos or custo < custos[prefixo]:
+                    custos[prefixo] = custo
+        excluir = [] if area == 0 else list(self._estados[area].destinos())
+        return resumir_prefixos(custos, excluir)
+
+
+class CodecBinario:
+    """
+    Codec binário versionado para os pacotes HELLO, LSA, ECO e LSA_REQ.
+
+    Formato (ordem de bytes de rede):
+        Cabeçalho (10 bytes): assinatura 'RL' (2), versão (1), tipo (1), tamanho do corpo (2)
+        e CRC32 do corpo (4).
+        Listas de IDs de roteador: quantidade (2) e modo (1). No modo 0, todos os nomes seguem o
+        formato 'routerN' gerado pelo gerar_composer.py e são gravados como inteiros de 32 bits;
+        no modo 1, cada nome é gravado como tamanho (1) e texto em UTF-8.
+        Endereços IPv4: endereço (4) e tamanho do prefixo (1); 255 indica endereço sem prefixo.
+        Custos dos links: inteiros de 16 bits, na mesma ordem da lista de vizinhos.
+        ECO: marca temporal (8), indicador de resposta (1) e a lista com o vizinho de destino.
+        LSA_REQ: a lista dos roteadores cujos LSAs completos são pedidos.
+        Campos opcionais ficam ao final do corpo como TLVs: tipo (1), tamanho (2), valor. Os HELLOs
+        levam os codecs suportados (TLV 1) e os LSAs, o checksum do conteúdo (TLV 2), a área (TLV 3,
+        inteiro de 32 bits, omitido no backbone, também usado pelo LSA_REQ) e os resumos de um
+        roteador de borda (TLV 4, endereço (5) e custo (4) por prefixo). Um LSA delta leva ainda o
+        número de sequência da base (TLV 5, 32 bits), os vizinhos dos links removidos (TLV 6, lista
+        de IDs) e os endereços removidos (TLV 7, 5 bytes cada); nele, a lista de endereços e os links
+        do corpo são só os acrescentados ou alterados, e o TLV 4 vai mesmo vazio quando os resumos
+        mudaram para nenhum.
+
+    As codificações de IDs e endereços são guardadas em cache, já que os mesmos nomes e
+    prefixos se repetem em todos os pacotes de uma topologia.
+
+    Pacotes que não cabem no formato (por exemplo, endereços que não são IPv4) geram ValueError,
+    para que o chamador use JSON como alternativa.
+    """
+    __slots__ = []
+
+    ASSINATURA = b"RL"
+    VERSAO = 1
+    TIPOS = {"HELLO": 1, "LSA": 2, "ECO": 3, "LSA_REQ": 4}
+    NOMES_TIPOS = {valor: nome for nome, valor in TIPOS.items()}
+
+    TLV_CODECS = 1
+    TLV_CHECKSUM = 2
+    TLV_AREA = 3
+    TLV_RESUMOS = 4
+    TLV_BASE = 5
+    TLV_LINKS_REMOVIDOS = 6
+    TLV_ENDERECOS_REMOVIDOS = 7
+
+    _CABECALHO = struct.Struct("!2sBBHI")
+    _HELLO = struct.Struct("!d")
+    _LSA = struct.Struct("!dI")
+    _ECO = struct.Struct("!d?")
+    _LISTA = struct.Struct("!HB")
+    _CONTADOR = struct.Struct("!H")
+    _ENDERECO = struct.Struct("!4sB")
+    _TLV = struct.Struct("!BH")
+    _CHECKSUM = struct.Struct("!I")
+    _AREA = struct.Struct("!I")
+    _BASE = struct.Struct("!I")
+    _CUSTO_RESUMO = struct.Struct("!I")
+    _SEM_PREFIXO = 255
+    _PADRAO_ID = re.compile(r"router(0|[1-9][0-9]{0,8})")
+    _BITS_CODECS = {"bin1": 2, "json": 1}
+    _LIMITE_CACHE = 65536
+
+    _numeros_ids = {}
+    _enderecos_codificados = {}
+    _enderecos_decodificados = {}
+
+    @classmethod
+    def _numero_id(cls, id_rota: str):
+        numero = cls._numeros_ids.get(id_rota, False)
+        if numero is False:
+            casamento = cls._PADRAO_ID.fullmatch(id_rota)
+            numero = int(casamento.group(1)) if casamento and int(casamento.group(1)) < 2 ** 32 else None
+            if len(cls._numeros_ids) >= cls._LIMITE_CACHE:
+                cls._numeros_ids.clear()
+            cls._numeros_ids[id_rota] = numero
+        return numero
+
+    @classmethod
+    def _codificar_ids(cls, ids: list, partes: list):
+        numeros = [cls._numero_id(id_rota) for id_rota in ids]
+        if None not in numeros:
+            partes.append(cls._LISTA.pack(len(numeros), 0))
+            partes.append(struct.pack(f"!{len(numeros)}I", *numeros))
+            return
+        partes.append(cls._LISTA.pack(len(ids), 1))
+        for id_rota in ids:
+            nome = id_rota.encode("utf-8")
+            if len(nome) > 255:
+                raise ValueError(f"ID de roteador muito longo: {id_rota}")
+            partes.append(bytes((len(nome),)))
+            partes.append(nome)
+
+    @classmethod
+    def _decodificar_ids(cls, dados: memoryview, pos: int):
+        quantidade, modo = cls._LISTA.unpack_from(dados, pos)
+        pos += cls._LISTA.size
+        if modo == 0:
+            numeros = struct.unpack_from(f"!{quantidade}I", dados, pos)
+            return [f"router{numero}" for numero in numeros], pos + 4 * quantidade
+        ids = []
+        for _ in range(quantidade):
+            tamanho = dados[pos]
+            ids.append(bytes(dados[pos + 1:pos + 1 + tamanho]).decode("utf-8"))
+            pos += 1 + tamanho
+        return ids, pos
+
+    @classmethod
+    def _codificar_endereco(cls, endereco: str):
+        codificado = cls._enderecos_codificados.get(endereco)
+        if codificado is None:
+            ip, barra, prefixo = endereco.partition("/")
+            tamanho = int(prefixo) if barra else cls._SEM_PREFIXO
+            try:
+                codificado = cls._ENDERECO.pack(socket.inet_aton(ip), tamanho)
+            except OSError:
+                raise ValueError(f"Endereço IPv4 inválido: {endereco}")
+            if len(cls._enderecos_codificados) >= cls._LIMITE_CACHE:
+                cls._enderecos_codificados.clear()
+            cls._enderecos_codificados[endereco] = codificado
+        return codificado
+
+    @classmethod
+    def _decodificar_endereco(cls, codificado: bytes):
+        endereco = cls._enderecos_decodificados.get(codificado)
+        if endereco is None:
+            endereco = socket.inet_ntoa(codificado[:4])
+            if codificado[4] != cls._SEM_PREFIXO:
+                endereco = f"{endereco}/{codificado[4]}"
+            if len(cls._enderecos_decodificados) >= cls._LIMITE_CACHE:
+                cls._enderecos_decodificados.clear()
+            cls._enderecos_decodificados[codificado] = endereco
+        return endereco
+
+    @classmethod
+    def codificar(cls, pacote: dict):
+        """
+        Codifica um pacote HELLO, LSA, ECO ou LSA_REQ.
+
+        Args:
+            pacote (dict): Pacote no mesmo formato usado pelo caminho JSON.
+
+        Returns:
+            bytes: Pacote codificado.
+        """
+        tipo = cls.TIPOS.get(pacote.get("tipo"))
+        if tipo is None:
+            raise ValueError(f"Tipo de pacote sem codificação binária: {pacote.get('tipo')}")
+
+        partes = []
+        cls._codificar_ids([pacote["id_rota"]], partes)
+        partes.append(cls._codificar_endereco(pacote.get("ip_address", "0.0.0.0")))
+
+        if tipo == 1:
+            partes.append(cls._HELLO.pack(pacote["timestamp"]))
+            cls._codificar_ids(pacote.get("vizinhos_conhecidos", []), partes)
+            if "codecs" in pacote:
+                bits = 0
+                for codec in pacote["codecs"]:
+                    bits |= cls._BITS_CODECS.get(codec, 0)
+                partes.append(cls._TLV.pack(cls.TLV_CODECS, 1))
+                partes.append(bytes((bits,)))
+        elif tipo == 3:
+            partes.append(cls._ECO.pack(pacote["timestamp"], pacote["resposta"]))
+            cls._codificar_ids([pacote["destino"]], partes)
+        elif tipo == 4:
+            cls._codificar_ids(pacote["pedidos"], partes)
+            if pacote.get("area"):
+                partes.append(cls._TLV.pack(cls.TLV_AREA, cls._AREA.size))
+                partes.append(cls._AREA.pack(pacote["area"]))
+        else:
+            partes.append(cls._LSA.pack(pacote["timestamp"], pacote["numero_sequencia"]))
+            enderecos = pacote["enderecos"]
+            partes.append(cls._CONTADOR.pack(len(enderecos)))
+            partes.extend(cls._codificar_endereco(endereco) for endereco in enderecos)
+            links = pacote["links"]
+            cls._codificar_ids(list(links), partes)
+            partes.append(struct.pack(f"!{len(links)}H", *links.values()))
+            if "checksum" in pacote:
+                partes.append(cls._TLV.pack(cls.TLV_CHECKSUM, cls._CHECKSUM.size))
+                partes.append(cls._CHECKSUM.pack(pacote["checksum"]))
+            if pacote.get("area"):
+                partes.append(cls._TLV.pack(cls.TLV_AREA, cls._AREA.size))
+                partes.append(cls._AREA.pack(pacote["area"]))
+            resumos = pacote.get("resumos")
+            if resumos or (resumos is not None and "base" in pacote):
+                tamanho = len(resumos) * (cls._ENDERECO.size + cls._CUSTO_RESUMO.size)
+                if tamanho > 0xFFFF:
+                    raise ValueError("Resumos demais para o formato binário")
+                partes.append(cls._TLV.pack(cls.TLV_RESUMOS, tamanho))
+                for prefixo, custo in resumos.items():
+                    partes.append(cls._codificar_endereco(prefixo))
+                    partes.append(cls._CUSTO_RESUMO.pack(custo))
+            if "base" in pacote:
+                partes.append(cls._TLV.pack(cls.TLV_BASE, cls._BASE.size))
+                partes.append(cls._BASE.pack(pacote["base"]))
+            if pacote.get("links_removidos"):
+                ids = []
+                cls._codificar_ids(pacote["links_removidos"], ids)
+                ids = b"".join(ids)
+                partes.append(cls._TLV.pack(cls.TLV_LINKS_REMOVIDOS, len(ids)))
+                partes.append(ids)
+            if pacote.get("enderecos_removidos"):
+                removidos = [cls._codificar_endereco(endereco) for endereco in pacote["enderecos_removidos"]]
+                partes.append(cls._TLV.pack(cls.TLV_ENDERECOS_REMOVIDOS, cls._ENDERECO.size * len(removidos)))
+                partes.extend(removidos)
+
+        corpo = b"".join(partes)
+        if len(corpo) > 0xFFFF:
+            raise ValueError("Pacote grande demais para o formato binário")
+        cabecalho = cls._CABECALHO.pack(cls.ASSINATURA, cls.VERSAO, tipo, len(corpo), zlib.crc32(corpo))
+        return cabecalho + corpo
+
+    @classmethod
+    def decodificar(cls, dados: bytes):
+        """
+        Decodifica um pacote binário, validando assinatura, versão, tamanho e checksum.
+
+        Args:
+            dados (bytes): Datagrama recebido.
+
+        Returns:
+            dict: Pacote no mesmo formato produzido pelo caminho JSON.
+        """
+        if len(dados) < cls._CABECALHO.size:
+            raise ValueError("Pacote binário truncado")
+        assinatura, versao, tipo, tamanho, checksum = cls._CABECALHO.unpack_from(dados)
+        if assinatura != cls.ASSINATURA:
+            raise ValueError("Assinatura de pacote binário inválida")
+        if versao != cls.VERSAO:
+            raise ValueError(f"Versão de pacote binário não suportada: {versao}")
+        corpo = memoryview(dados)[cls._CABECALHO.size:]
+        if len(corpo) != tamanho:
+            raise ValueError("Tamanho de pacote binário inconsistente")
+        if zlib.crc32(corpo) != checksum:
+            raise ValueError("Checksum de pacote binário inválido")
+
+        nome_tipo = cls.NOMES_TIPOS.get(tipo)
+        if nome_tipo is None:
+            raise ValueError(f"Tipo de pacote binário desconhecido: {tipo}")
+
+        try:
+            (id_rota,), pos = cls._decodificar_ids(corpo, 0)
+            ip_address = cls._decodificar_endereco(bytes(corpo[pos:pos + 5]))
+            pos += cls._ENDERECO.size
+            pacote = {"tipo": nome_tipo, "id_rota": id_rota}
+
+            if tipo == 1:
+                (pacote["timestamp"],) = cls._HELLO.unpack_from(corpo, pos)
+                pos += cls._HELLO.size
+                pacote["ip_address"] = ip_address
+                pacote["vizinhos_conhecidos"], pos = cls._decodificar_ids(corpo, pos)
+            elif tipo == 3:
+                pacote["timestamp"], pacote["resposta"] = cls._ECO.unpack_from(corpo, pos)
+                pos += cls._ECO.size
+                (pacote["destino"],), pos = cls._decodificar_ids(corpo, pos)
+            elif tipo == 4:
+                pacote["pedidos"], pos = cls._decodificar_ids(corpo, pos)
+            else:
+                pacote["ip_address"] = ip_address
+                pacote["timestamp"], pacote["numero_sequencia"] = cls._LSA.unpack_from(corpo, pos)
+                pos += cls._LSA.size
+                (quantidade,) = cls._CONTADOR.unpack_from(corpo, pos)
+                pos += cls._CONTADOR.size
+                fim = pos + 5 * quantidade
+                bloco = bytes(corpo[pos:fim])
+                pacote["enderecos"] = [cls._decodificar_endereco(bloco[i:i + 5])
+                                       for i in range(0, len(bloco), 5)]
+                pos = fim
+                vizinhos, pos = cls._decodificar_ids(corpo, pos)
+                custos = struct.unpack_from(f"!{len(vizinhos)}H", corpo, pos)
+                pos += 2 * len(vizinhos)
+                pacote["links"] = dict(zip(vizinhos, custos))
+
+            while pos < len(corpo):
+                tipo_tlv, tamanho_tlv = cls._TLV.unpack_from(corpo, pos)
+                pos += cls._TLV.size
+                valor = corpo[pos:pos + tamanho_tlv]
+                pos += tamanho_tlv
+                if tipo_tlv == cls.TLV_CODECS and tamanho_tlv == 1:
+                    pacote["codecs"] = [codec for codec, bit in cls._BITS_CODECS.items() if valor[0] & bit]
+                elif tipo_tlv == cls.TLV_CHECKSUM and tamanho_tlv == cls._CHECKSUM.size:
+                    (pacote["checksum"],) = cls._CHECKSUM.unpack_from(valor)
+                elif tipo_tlv == cls.TLV_AREA and tamanho_tlv == cls._AREA.size:
+                    (pacote["area"],) = cls._AREA.unpack_from(valor)
+                elif tipo_tlv == cls.TLV_RESUMOS:
+                    passo = cls._ENDERECO.size + cls._CUSTO_RESUMO.size
+                    bloco = bytes(valor)
+                    pacote["resumos"] = {
+                        cls._decodificar_endereco(bloco[i:i + cls._ENDERECO.size]):
+                            cls._CUSTO_RESUMO.unpack_from(bloco, i + cls._ENDERECO.size)[0]
+                        for i in range(0, len(bloco) - passo + 1, passo)}
+                elif tipo_tlv == cls.TLV_BASE and tamanho_tlv == cls._BASE.size:
+                    (pacote["base"],) = cls._BASE.unpack_from(valor)
+                elif tipo_tlv == cls.TLV_LINKS_REMOVIDOS:
+                    pacote["links_removidos"], _ = cls._decodificar_ids(valor, 0)
+                elif tipo_tlv == cls.TLV_ENDERECOS_REMOVIDOS:
+                    bloco = bytes(valor)
+                    pacote["enderecos_removidos"] = [cls._decodificar_endereco(bloco[i:i + cls._ENDERECO.size])
+                                                     for i in range(0, len(bloco), cls._ENDERECO.size)]
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"Pacote binário malformado: {e}")
+        validar_base_delta(pacote)
+        return pacote
+
+
+class CodecPacotes:
+    """
+    Escolhe entre JSON e o codec binário ao enviar e detecta o formato ao receber.
+
+    Modos:
+        'json': envia e anuncia apenas JSON.
+        'binario': envia sempre no formato binário.
+        'auto': anuncia os dois formatos nos HELLOs e usa o binário com cada vizinho que
+            também o anunciou; JSON continua sendo o formato de partida e de fallback.
+
+    Atributos:
+        _modo (str): Modo de negociação.
+    """
+    __slots__ = ["_modo"]
+
+    JSON = "json"
+    BINARIO = "bin1"
+    MODOS = ("auto", "json", "binario")
+
+    def __init__(self, modo: str = "auto"):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de codec inválido: {modo}")
+        self._modo = modo
+
+    def codecs_suportados(self):
+        """
+        Returns:
+            list[str]: Codecs anunciados nos HELLOs deste roteador.
+        """
+        if self._modo == "json":
+            return [self.JSON]
+        return [self.BINARIO, self.JSON]
+
+    def usar_binario(self, codecs_vizinhos):
+        """
+        Decide se um pacote destinado a um ou mais vizinhos pode usar o formato binário.
+
+        Args:
+            codecs_vizinhos (list[set[str]]): Codecs anunciados por cada destinatário.
+
+        Returns:
+            bool: True se todos os destinatários entendem o formato binário.
+        """
+        if self._modo == "json":
+            return False
+        if self._modo == "binario":
+            return True
+        return bool(codecs_vizinhos) and all(self.BINARIO in codecs for codecs in codecs_vizinhos)
+
+    def codificar(self, pacote: dict, binario: bool):
+        """
+        Codifica um pacote no formato escolhido, recorrendo a JSON se o binário não for possível.
+
+        Args:
+            pacote (dict): Pacote a ser codificado.
+            binario (bool): Indica se o formato binário deve ser usado.
+
+        Returns:
+            bytes: Pacote codificado.
+        """
+        if binario:
+            try:
+                return CodecBinario.codificar(pacote)
+            except (ValueError, KeyError, struct.error):
+                pass
+        return json.dumps(pacote).encode("utf-8")
+
+    def decodificar(self, dados: bytes):
+        """
+        Decodifica um datagrama, detectando se está em JSON ou no formato binário.
+
+        Args:
+            dados (bytes): Datagrama recebido.
+
+        Returns:
+            dict: Pacote decodificado.
+        """
+        if dados[:2] == CodecBinario.ASSINATURA:
+            return CodecBinario.decodificar(dados)
+        pacote = json.loads(dados.decode("utf-8"))
+        if isinstance(pacote, dict) and pacote.get("tipo") == "LSA":
+            validar_base_delta(pacote)
+        return pacote
+
+
+class TransporteUDP:
+    """
+    Transporte de envio baseado em um único socket UDP com broadcast habilitado, compartilhado
+    por todos os emissores do roteador em vez de um socket por interface ou por encaminhamento.
+
+    Atributos:
+        _sock (socket.socket): Socket usado para todos os envios; pode ser o próprio socket de
+            recepção do roteador.
+    """
+    __slots__ = ["_sock"]
+
+    def __init__(self, sock: socket.socket = None):
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._sock = sock
+
+    def enviar(self, dados: bytes, destino: tuple):
+        self._sock.sendto(dados, destino)
+
+
+class TemporizadorAsyncio:
+    """
+    Temporizador que agenda funções no loop de eventos asyncio, sem criar threads.
+
+    Atributos:
+        _loop (asyncio.AbstractEventLoop): Loop onde as funções são executadas.
+    """
+    __slots__ = ["_loop"]
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def agora(self):
+        return self._loop.time()
+
+    def agendar(self, atraso: float, funcao, *args):
+        return self._loop.call_later(atraso, funcao, *args)
+
+
+class EntradaRoda:
+    """
+    Função agendada em uma RodaTemporizacao.
+
+    Atributos:
+        tique (int): Tique da roda em que a função deve ser executada.
+        funcao (callable): Função agendada.
+        args (tuple): Argumentos da função.
+        cancelada (bool): Indica se o agendamento foi desfeito.
+    """
+    __slots__ = ["tique", "funcao", "args", "cancelada"]
+
+    def __init__(self, tique: int, funcao, args: tuple):
+        self.tique = tique
+        self.funcao = funcao
+        self.args = args
+        self.cancelada = False
+
+    def cancel(self):
+        self.cancelada = True
+
+
+class TarefaPeriodica:
+    """
+    Tarefa repetida por uma RodaTemporizacao, com jitter a cada repetição.
+
+    Atributos:
+        _roda (RodaTemporizacao): Roda que executa a tarefa.
+        _funcao (callable): Função executada a cada repetição.
+        _intervalo (float): Intervalo entre repetições, antes do jitter.
+        _adaptativa (bool): Se True, o valor devolvido pela função é o próximo intervalo.
+        _entrada (EntradaRoda): Próxima execução agendada.
+        _cancelada (bool): Indica se a tarefa foi encerrada.
+    """
+    __slots__ = ["_roda", "_funcao", "_intervalo", "_adaptativa", "_entrada", "_cancelada"]
+
+    def __init__(self, roda: "RodaTemporizacao", funcao, intervalo: float, adaptativa: bool = False):
+        self._roda = roda
+        self._funcao = funcao
+        self._intervalo = intervalo
+        self._adaptativa = adaptativa
+        self._entrada = None
+        self._cancelada = False
+
+    def agendar(self, atraso: float):
+        """Agenda a próxima execução para daqui a atraso segundos, substituindo a anterior."""
+        if self._entrada is not None:
+            self._entrada.cancel()
+        if not self._cancelada:
+            self._entrada = self._roda.agendar(atraso, self._executar)
+
+    def antecipar(self, atraso: float):
+        """
+        Adianta a próxima execução para daqui a atraso segundos, se ela estiver marcada para
+        depois.
+        """
+        if self._entrada is None or self._entrada.cancelada or \
+                self._entrada.tique > self._roda.tique_de(self._roda.agora() + atraso):
+            self.agendar(atraso)
+
+    def _executar(self):
+        self._entrada = None
+        intervalo = self._intervalo
+        try:
+            resultado = self._funcao()
+            if self._adaptativa and resultado:
+                intervalo = self._intervalo = resultado
+        except Exception as e:
+            self._roda._log.excecao("Erro na tarefa periódica %s: %s",
+                                    getattr(self._funcao, '__qualname__', self._funcao), e)
+        if not self._cancelada and self._entrada is None:
+            self.agendar(self._roda.com_jitter(intervalo))
+
+    def cancel(self):
+        self._cancelada = True
+        if self._entrada is not None:
+            self._entrada.cancel()
+
+
+class RodaTemporizacao:
+    """
+    Roda de temporização (hashed timing wheel) que concentra as tarefas periódicas do roteador
+    (HELLOs, conferência dos LSAs, manutenção) em um único temporizador, no lugar de uma thread
+    ou tarefa com 'sleep' para cada uma.
+
+    O tempo é dividido em tiques de resolucao segundos, e cada agendamento entra na casa
+    tique % tamanho, em O(1). Só há um disparo agendado no temporizador de base, para o próximo
+    tique com alguma entrada; os tiques vazios são pulados com um mapa de bits das casas
+    ocupadas. Cada repetição de uma tarefa periódica recebe um jitter aleatório (intervalo
+    reduzido em até jitter), para que roteadores iniciados juntos não emitam em rajadas
+    sincronizadas.
+
+    Também serve como temporizador (agora() e agendar()) para os outros componentes.
+
+    Atributos:
+        _base: Temporizador que fornece o relógio e executa o disparo da roda.
+        _resolucao (float): Duração de um tique, em segundos.
+        _casas (list[list[EntradaRoda]]): Entradas de cada casa da roda.
+        _ocupadas (int): Mapa de bits das casas com alguma entrada.
+        _tique_atual (int): Último tique processado.
+        _pendentes (int): Entradas na roda, inclusive as canceladas ainda não descartadas.
+        _disparo: Disparo agendado no temporizador de base.
+        _tique_disparo (int): Tique para o qual _disparo está agendado.
+        _jitter (float): Fração máxima de redução aleatória dos intervalos periódicos.
+        _aleatorio (random.Random): Fonte do jitter.
+        _trava (threading.RLock): Protege a roda entre as threads que agendam e o disparo.
+        disparos (int): Vezes em que a roda foi acionada pelo temporizador de base.
+    """
+    __slots__ = ["_base", "_resolucao", "_casas", "_ocupadas", "_tique_atual", "_pendentes", "_disparo", "_tique_disparo",
+                 "_jitter", "_aleatorio", "_trava", "disparos"]
+
+    _log = REGISTRO.canal("temporizacao")
+
+    def __init__(self, temporizador=None, resolucao: float = 0.01, tamanho: int = 512, jitter: float = 0.25,
+                 aleatorio: random.Random = None):
+        self._base = temporizador if temporizador is not None else TemporizadorThreads()
+        self._resolucao = resolucao
+        self._casas = [[] for _ in range(tamanho)]
+        self._ocupadas = 0
+        self._tique_atual = int(self._base.agora() // resolucao)
+        self._pendentes = 0
+        self._disparo = None
+        self._tique_disparo = None
+        self._jitter = jitter
+        self._aleatorio = aleatorio if aleatorio is not None else random.Random()
+        self._trava = threading.RLock()
+        self.disparos = 0
+
+    def agora(self):
+        return self._base.agora()
+
+    def tique_de(self, instante: float):
+        """Primeiro tique que começa em instante ou depois dele."""
+        return -int(-instante // self._resolucao)
+
+    def com_jitter(self, intervalo: float):
+        return intervalo * (1 - self._jitter * self._aleatorio.random())
+
+    def definir_temporizador(self, temporizador):
+        """
+        Troca o temporizador de base (por exemplo, pelo loop asyncio), mantendo o tempo que falta
+        para cada entrada já agendada.
+        """
+        with self._trava:
+            agora_antigo = self._base.agora()
+            entradas = [e for casa in self._casas for e in casa if not e.cancelada]
+            if self._disparo is not None:
+                self._disparo.cancel()
+            self._base = temporizador
+            self._disparo = self._tique_disparo = None
+            self._casas = [[] for _ in self._casas]
+            self._ocupadas = 0
+            self._pendentes = 0
+            agora = temporizador.agora()
+            self._tique_atual = int(agora // self._resolucao)
+            for entrada in entradas:
+                restante = max(0.0, entrada.tique * self._resolucao - agora_antigo)
+                entrada.tique = max(self.tique_de(agora + restante), self._tique_atual + 1)
+                self._inserir(entrada)
+            self._armar()
+
+    def agendar(self, atraso: float, funcao, *args):
+        """
+        Returns:
+            EntradaRoda: Agendamento, com o método cancel() para desfazê-lo.
+        """
+        with self._trava:
+            entrada = EntradaRoda(max(self.tique_de(self._base.agora() + atraso), self._tique_atual + 1),
+                                  funcao, args)
+            self._inserir(entrada)
+            if self._tique_disparo is None or entrada.tique < self._tique_disparo:
+                self._armar()
+            return entrada
+
+    def periodico(self, intervalo: float, funcao, primeiro: float = None, adaptativa: bool = False):
+        """
+        Executa funcao a cada intervalo segundos (com jitter). Com adaptativa, o valor devolvido
+        por funcao, se houver, passa a ser o intervalo seguinte.
+
+        Args:
+            primeiro (float): Atraso da primeira execução; se omitido, é sorteado no primeiro intervalo.
+
+        Returns:
+            TarefaPeriodica: Tarefa, com o método cancel() para encerrá-la.
+        """
+        tarefa = TarefaPeriodica(self, funcao, intervalo, adaptativa)
+        tarefa.agendar(self._aleatorio.uniform(0, intervalo) if primeiro is None else primeiro)
+        return tarefa
+
+    def _inserir(self, entrada: EntradaRoda):
+        """Deve ser chamado com self._trava adquirida."""
+        casa = entrada.tique % len(self._casas)
+        self._casas[casa].append(entrada)
+        self._ocupadas |= 1 << casa
+        self._pendentes += 1
+
+    def _proximo_tique(self):
+        """
+        Deve ser chamado com self._trava adquirida.
+
+        Returns:
+            int | None: Menor tique com entrada válida na roda.
+        """
+        if not self._pendentes:
+            return None
+        tamanho = len(self._casas)
+        inicio = (self._tique_atual + 1) % tamanho
+        # Casas ocupadas na ordem em que a roda vai passar por elas, a partir do próximo tique.
+        ordem = ((self._ocupadas >> inicio) | (self._ocupadas << (tamanho - inicio))) & ((1 << tamanho) - 1)
+        melhor = None
+        while ordem:
+            deslocamento = (ordem & -ordem).bit_length() - 1
+            ordem &= ordem - 1
+            tique = self._tique_atual + 1 + deslocamento
+            casa = self._casas[tique % tamanho]
+            vivas = [e for e in casa if not e.cancelada]
+            self._pendentes -= len(casa) - len(vivas)
+            casa[:] = vivas
+            if not vivas:
+                self._ocupadas &= ~(1 << (tique % tamanho))
+            for entrada in vivas:
+                if melhor is None or entrada.tique < melhor:
+                    melhor = entrada.tique
+            if melhor is not None and melhor <= tique:
+                break
+        return melhor
+
+    def _armar(self):
+        """Deve ser chamado com self._trava adquirida. Agenda o disparo para o próximo tique ocupado."""
+        tique = self._proximo_tique()
+        if tique == self._tique_disparo:
+            return
+        if self._disparo is not None:
+            self._disparo.cancel()
+            self._disparo = None
+        self._tique_disparo = tique
+        if tique is not None:
+            atraso = max(0.0, tique * self._resolucao - self._base.agora())
+            self._disparo = self._base.agendar(atraso, self._disparar, tique)
+
+    def _disparar(self, tique_agendado: int):
+        """Executa as entradas de todos os tiques vencidos e rearma o disparo."""
+        vencidas = []
+        with self._trava:
+            if tique_agendado != self._tique_disparo:
+                return
+            self.disparos += 1
+            self._disparo = self._tique_disparo = None
+            ate = max(tique_agendado, int(self._base.agora() // self._resolucao))
+            tamanho = len(self._casas)
+            inicio = (self._tique_atual + 1) % tamanho
+            ordem = ((self._ocupadas >> inicio) | (self._ocupadas << (tamanho - inicio))) & \
+                ((1 << min(ate - self._tique_atual, tamanho)) - 1)
+            while ordem:
+                deslocamento = (ordem & -ordem).bit_length() - 1
+                ordem &= ordem - 1
+                tique = self._tique_atual + 1 + deslocamento
+                casa = self._casas[tique % tamanho]
+                restantes = []
+                for entrada in casa:
+                    if entrada.cancelada:
+                        self._pendentes -= 1
+                    elif entrada.tique <= ate:
+                        vencidas.append(entrada)
+                        self._pendentes -= 1
+                    else:
+                        restantes.append(entrada)
+                casa[:] = restantes
+                if not restantes:
+                    self._ocupadas &= ~(1 << (tique % tamanho))
+            self._tique_atual = ate
+        vencidas.sort(key=lambda e: e.tique)
+        for entrada in vencidas:
+            if entrada.cancelada:
+                continue
+            try:
+                entrada.funcao(*entrada.args)
+            except Exception as e:
+                self._log.excecao("Erro em função agendada na roda de temporização: %s", e)
+        with self._trava:
+            self._armar()
+
+    def cancelar_todos(self):
+        """Desfaz todos os agendamentos, por exemplo ao desligar o roteador."""
+        with self._trava:
+            for casa in self._casas:
+                for entrada in casa:
+                    entrada.cancel()
+                casa.clear()
+            self._ocupadas = 0
+            self._pendentes = 0
+            if self._disparo is not None:
+                self._disparo.cancel()
+            self._disparo = self._tique_disparo = None
+
+
+class EmissorPacoteHello:
+    """
+    Classe responsável por emitir periodicamente pacotes do tipo HELLO para os roteadores vizinhos
+    em uma rede de roteamento.
+
+    A classe gerencia o envio desses pacotes via broadcast em todas as interfaces configuradas,
+    permitindo que os vizinhos saibam que este roteador está ativo e compartilha informações
+    básicas sobre si.
+
+    As interfaces de redes de hosts (endereço no formato de rede, 'a.b.c.d/p') são passivas: não
+    recebem HELLOs, pois não há roteadores nelas. O HELLO de cada interface lista só os vizinhos
+    ouvidos nela.
+
+    O intervalo é adaptativo, no estilo do Trickle: começa em intervalo_rapido e dobra a cada
+    envio até intervalo_envio enquanto há adjacência se formando (um vizinho em INICIAL ou menos
+    vizinhos ativos que os esperados), e até intervalo_maximo com todas as adjacências ativas. Um
+    vizinho novo ou uma adjacência desfeita (veja acelerar()) volta ao intervalo rápido.
+
+    Atributos:
+        _id_rota (str): Identificador único do roteador.
+        _interfaces (list[dict[str, str]]): Lista de interfaces de rede, onde cada interface é um
+            dicionário contendo pelo menos os campos 'address' e 'broadcast'.
+        _vizinhos (dict[str, Adjacencia]): Adjacências conhecidas, em qualquer estado, por ID do
+            vizinho.
+        _intervalo_envio (int): Intervalo, em segundos, entre HELLOs enquanto há adjacências se
+            formando.
+        _intervalo_rapido (float): Primeiro intervalo depois de uma mudança na vizinhança.
+        _intervalo_maximo (float): Intervalo entre HELLOs com a vizinhança estável.
+        _intervalo_atual (float): Intervalo até o próximo HELLO periódico.
+        _esperados (int): Quantidade de vizinhos configurados (enlaces com custo conhecido).
+        _tarefa (TarefaPeriodica): Tarefa que envia os HELLOs periódicos.
+        _interface_por_ip (dict[str, str]): Broadcast da interface onde cada IP de vizinho foi
+            ouvido.
+        _porta_comunicacao (int): Porta UDP utilizada para envio dos pacotes HELLO.
+        _codec (CodecPacotes): Codec usado para serializar os pacotes.
+        _codecs_vizinhos (dict[str, set[str]]): Codecs anunciados por cada vizinho.
+        _transporte: Objeto com o método enviar(dados, destino) usado para todos os envios.
+        _metricas (Metricas): Contabiliza os pacotes enviados, se informado.
+        _log (CanalRegistro): Eventos dos HELLOs e ecos.
+    """
+    __slots__ = ["_id_rota", "_interfaces", "_vizinhos",
+                 "_intervalo_envio", "_intervalo_rapido", "_intervalo_maximo", "_intervalo_atual", "_esperados",
+                 "_tarefa", "_interface_por_ip", "_porta_comunicacao", "_codec", "_codecs_vizinhos",
+                 "_transporte", "_metricas", "_log"]
+
+    def __init__(self, id_rota: str, interfaces: list[dict[str, str]], vizinhos: dict[str, "Adjacencia"], intervalo_envio: int = 10, porta_comunicacao: int = 5000,
+                 codec: CodecPacotes = None, codecs_vizinhos: dict[str, set[str]] = None, transporte=None,
+                 metricas: Metricas = None, intervalo_rapido: float = None, intervalo_maximo: float = None,
+                 esperados: int = 0):
+    
+        self._id_rota = id_rota
+        self._log = REGISTRO.canal("hello", id_rota)
+        self._interfaces = interfaces
+        self._vizinhos = vizinhos
+        self._intervalo_envio = intervalo_envio
+        self._intervalo_rapido = min(intervalo_rapido if intervalo_rapido is not None else intervalo_envio / 10,
+                                     intervalo_envio)
+        self._intervalo_maximo = max(intervalo_maximo if intervalo_maximo is not None else intervalo_envio,
+                                     intervalo_envio)
+        self._intervalo_atual = self._intervalo_rapido
+        self._esperados = esperados
+        self._tarefa = None
+        self._interface_por_ip = {}
+        self._porta_comunicacao = porta_comunicacao
+        self._codec = codec if codec is not None else CodecPacotes()
+        self._codecs_vizinhos = codecs_vizinhos if codecs_vizinhos is not None else {}
+        self._transporte = transporte if transporte is not None else TransporteUDP()
+        self._metricas = metricas
+
+    @property
+    def intervalo_atual(self):
+        return self._intervalo_atual
+
+    def definir_transporte(self, transporte):
+        self._transporte = transporte
+
+    def _enviar(self, mensagem: bytes, destino: tuple, tipo: str):
+        self._transporte.enviar(mensagem, destino)
+        if self._metricas is not None:
+            self._metricas.contar_pacote("enviados", tipo, len(mensagem) if isinstance(mensagem, bytes) else 0)
+
+    def _gerar_pacote_hello(self, ip_address: str, vizinhos_conhecidos: list[str] = None):
+        """
+        Gera um pacote do tipo HELLO contendo as informações do roteador e seus vizinhos.
+
+        Parâmetros:
+        ip_address (str): Endereço IP da interface de envio do pacote.
+        vizinhos_conhecidos (list[str]): Vizinhos listados no HELLO; se omitido, todos.
+
+        Retorna:
+        dict: Pacote do tipo HELLO.
+        """
+        return {
+            "tipo": "HELLO",
+            "id_rota": self._id_rota,
+            "timestamp": time.time(),
+            "ip_address": ip_address,
+            "vizinhos_conhecidos": list(self._vizinhos) if vizinhos_conhecidos is None else vizinhos_conhecidos,
+            "codecs": self._codec.codecs_suportados(),
+        }
+
+    def _interface_do_vizinho(self, ip: str):
+        """
+        Returns:
+            str: Broadcast da interface que compartilha o enlace com o IP: a de maior prefixo em
+                comum com ele (enlaces distintos são redes distintas).
+        """
+        broadcast = self._interface_por_ip.get(ip)
+        if broadcast is None:
+            numero = int(ipaddress.IPv4Address(ip))
+            broadcast = max((interface["broadcast"] for interface in self._interfaces if "broadcast" in interface),
+                            key=lambda b: 32 - (numero ^ int(ipaddress.IPv4Address(b))).bit_length(), default="")
+            self._interface_por_ip[ip] = broadcast
+        return broadcast
+
+    def enviar_hello(self, ip_address: str, broadcast_ip: str, vizinhos: list[str] = None):
+        """
+        Envia um pacote HELLO via broadcast por uma interface.
+
+        Parâmetros:
+        ip_address (str): Endereço IP da interface.
+        broadcast_ip (str): Endereço de broadcast para o envio dos pacotes.
+        vizinhos (list[str]): Vizinhos ouvidos nesta interface; se omitido, todos.
+        """
+        pacote = self._gerar_pacote_hello(ip_address, vizinhos)
+        binario = self._codec.usar_binario(
+            [self._codecs_vizinhos.get(vizinho, ()) for vizinho in pacote["vizinhos_conhecidos"]])
+        mensagem = self._codec.codificar(pacote, binario)
+
+        try:
+            self._enviar(mensagem, (broadcast_ip, self._porta_comunicacao), "HELLO")
+            self._log.debug("Pacote HELLO enviado para %s", broadcast_ip)
+        except Exception as e:
+            self._log.erro("Erro ao enviar HELLO: %s", e)
+
+    def enviar_hellos(self):
+        """
+        Envia um pacote HELLO por cada interface configurada com broadcast, exceto as passivas.
+        """
+        por_interface = {}
+        for id_vizinho, adjacencia in list(self._vizinhos.items()):
+            por_interface.setdefault(self._interface_do_vizinho(adjacencia.ip), []).append(id_vizinho)
+        for interface in self._interfaces:
+            if "broadcast" in interface and "/" not in interface["address"]:
+                self.enviar_hello(interface["address"], interface["broadcast"],
+                                  por_interface.get(interface["broadcast"], []))
+
+    def _estavel(self):
+        adjacencias = list(self._vizinhos.values())
+        ativas = sum(1 for a in adjacencias if a.estado == GerenciadorVizinhos.ATIVA)
+        return ativas == len(adjacencias) and ativas >= self._esperados
+
+    def emitir(self):
+        """
+        Envia os HELLOs periódicos e recua o intervalo.
+
+        Returns:
+            float: Intervalo até o próximo envio.
+        """
+        self.enviar_hellos()
+        limite = self._intervalo_maximo if self._estavel() else self._intervalo_envio
+        self._intervalo_atual = min(max(self._intervalo_atual * 2, self._intervalo_rapido), limite)
+        return self._intervalo_atual
+
+    def acelerar(self):
+        """Volta ao intervalo rápido depois de uma mudança na vizinhança."""
+        self._intervalo_atual = self._intervalo_rapido
+        if self._tarefa is not None:
+            self._tarefa.antecipar(self._intervalo_rapido)
+
+    def enviar_eco(self, vizinho_id: str, ip_vizinho: str, pacote: dict = None):
+        """
+        Envia uma sonda de eco para um vizinho ou, se pacote for informado, devolve ao vizinho a
+        sonda recebida dele. A sonda leva a marca temporal de envio, o que permite medir o RTT.
+        """
+        if pacote is None:
+            pacote = {"tipo": "ECO", "id_rota": self._id_rota, "destino": vizinho_id,
+                      "timestamp": time.time(), "resposta": False}
+        else:
+            pacote = dict(pacote, resposta=True)
+        binario = self._codec.usar_binario([self._codecs_vizinhos.get(vizinho_id, ())])
+        try:
+            self._enviar(self._codec.codificar(pacote, binario), (ip_vizinho, self._porta_comunicacao), "ECO")
+        except Exception as e:
+            self._log.erro("Erro ao enviar ECO para %s: %s", vizinho_id, e)
+
+    def iniciar_emissao(self, roda: "RodaTemporizacao", primeiro: float = None):
+        """
+        Registra o envio periódico de HELLOs por todas as interfaces na roda de temporização.
+
+        Returns:
+            TarefaPeriodica: Tarefa dos HELLOs.
+        """
+        self._tarefa = roda.periodico(self._intervalo_atual, self.emitir, primeiro, adaptativa=True)
+        return self._tarefa
+
+
+class EmissorPacoteLSA:
+    
+    __slots__ = ["_id_rota", "_vizinhos_ip", "_vizinhos_custo", "_intervalo_envio",
+                 "_porta_comunicacao", "_numero_sequencia", "_iniciado", "_lsdb", "_interfaces",
+                 "_codec", "_codecs_vizinhos", "_transporte", "_intervalo_refresh", "_intervalo_minimo",
+                 "_temporizador", "_trava", "_conteudo_anunciado", "_ultima_origem", "_origem_agendada",
+                 "_metricas", "_redes_anunciadas", "_retomada", "_ao_originar", "_area", "_areas_enlaces",
+                 "_anunciar_enderecos", "_resumos", "_deltas", "_base_delta", "_pedidos", "_log",
+                 "originados", "deltas_originados", "pedidos_enviados", "pedidos_atendidos"]
+
+    def __init__(self, id_rota: str, vizinhos_ip: dict[str, str], vizinhos_custo: dict[str, int],interfaces: list[dict[str, str]], lsdb: EstadoRoteador, intervalo_envio: int = 30, porta_comunicacao: int = 5000,
+                 codec: CodecPacotes = None, codecs_vizinhos: dict[str, set[str]] = None, transporte=None,
+                 intervalo_refresh: float = 1800, intervalo_minimo: float = 1.0, temporizador=None,
+                 metricas: Metricas = None, redes_anunciadas: list[ipaddress.IPv4Network] = None,
+                 ao_originar=None, area: int = 0, areas_enlaces: dict[str, int] = None,
+                 anunciar_enderecos: bool = True, resumos=None, deltas: bool = True):
+        """
+        O LSA só é originado quando os vizinhos ou os endereços mudam, ou quando o último anúncio
+        fica mais velho que intervalo_refresh. A cada intervalo_envio o emissor apenas confere se
+        algo mudou; duas originações seguidas ficam separadas por pelo menos intervalo_minimo.
+
+        redes_anunciadas restringe os endereços das interfaces que entram no LSA (veja
+        filtrar_enderecos); se omitido, todos são anunciados. ao_originar é chamada depois de cada
+        LSA originado.
+
+        Com areas_enlaces (área de cada enlace, por vizinho), o emissor cuida só do LSA da área
+        informada: anuncia os enlaces dessa área e inunda e sincroniza apenas os vizinhos ligados
+        por eles. anunciar_enderecos=False deixa os endereços fora do LSA (eles vão no da área
+        principal do roteador), e resumos, se informada, devolve as rotas resumidas que um
+        roteador de borda anuncia na área.
+
+        Com deltas, uma mudança de conteúdo é anunciada como LSA delta sobre o último LSA
+        originado (só os links e endereços que mudaram), quando ele é menor que o LSA completo.
+        O primeiro LSA, os reanúncios periódicos e o primeiro LSA depois de um salto na numeração
+        (reinício ou avancar_sequencia) vão sempre completos. Um vizinho sem a base pede o LSA
+        completo com um LSA_REQ (veja pedir_lsas e responder_pedido).
+        """
+        self._id_rota = id_rota
+        self._log = REGISTRO.canal("lsa", id_rota)
+        self._vizinhos_ip = vizinhos_ip
+        self._vizinhos_custo = vizinhos_custo
+        self._intervalo_envio = intervalo_envio
+        self._porta_comunicacao = porta_comunicacao
+        self._numero_sequencia = 0
+        self._iniciado = False
+        self._lsdb = lsdb
+        self._interfaces = interfaces
+        self._codec = codec if codec is not None else CodecPacotes()
+        self._codecs_vizinhos = codecs_vizinhos if codecs_vizinhos is not None else {}
+        self._transporte = transporte if transporte is not None else TransporteUDP()
+        self._intervalo_refresh = intervalo_refresh
+        self._intervalo_minimo = intervalo_minimo
+        self._temporizador = temporizador if temporizador is not None else TemporizadorThreads()
+        self._trava = threading.RLock()
+        self._conteudo_anunciado = None
+        self._ultima_origem = None
+        self._origem_agendada = False
+        self._metricas = metricas
+        self._redes_anunciadas = redes_anunciadas
+        self._retomada = None
+        self._ao_originar = ao_originar
+        self._area = area
+        self._areas_enlaces = areas_enlaces
+        self._anunciar_enderecos = anunciar_enderecos
+        self._resumos = resumos
+        self._deltas = deltas
+        self._base_delta = None
+        self._pedidos = {}
+        self.originados = 0
+        self.deltas_originados = 0
+        self.pedidos_enviados = 0
+        self.pedidos_atendidos = 0
+
+    def definir_transporte(self, transporte):
+        self._transporte = transporte
+
+    @property
+    def numero_sequencia(self):
+        return self._numero_sequencia
+
+    def _enderecos_anunciados(self):
+        if not self._anunciar_enderecos:
+            return []
+        # Em ordem canônica, a mesma que a LSDB reconstrói ao aplicar um delta, para que o
+        # checksum do conteúdo confira dos dois lados.
+        return sorted(set(filtrar_enderecos([item["address"] for item in self._interfaces], self._redes_anunciadas)))
+
+    def _da_area(self, vizinhos: dict):
+        """Restringe um dicionário indexado por vizinho aos vizinhos ligados por enlaces desta área."""
+        if self._areas_enlaces is None:
+            return vizinhos
+        return {vizinho: valor for vizinho, valor in list(vizinhos.items())
+                if self._areas_enlaces.get(vizinho) == self._area}
+
+    def _conteudo_atual(self):
+        resumos = self._resumos() if self._resumos is not None else None
+        return self._enderecos_anunciados(), dict(self._da_area(self._vizinhos_custo)), resumos or None
+
+    def _enviar(self, mensagem: bytes, destino: tuple, tipo: str = "LSA"):
+        self._transporte.enviar(mensagem, destino)
+        if self._metricas is not None:
+            self._metricas.contar_pacote("enviados", tipo, len(mensagem) if isinstance(mensagem, bytes) else 0)
+
+    def definir_temporizador(self, temporizador):
+        self._temporizador = temporizador
+
+    def _mensagem_para(self, pacote: dict, vizinho_id: str, mensagens: dict):
+        """
+        Devolve o pacote codificado no formato negociado com o vizinho, codificando
+        no máximo uma vez por formato.
+
+        Args:
+            pacote (dict): Pacote LSA a ser enviado.
+            vizinho_id (str): Vizinho de destino.
+            mensagens (dict[bool, bytes]): Cache das codificações já feitas para este pacote.
+
+        Returns:
+            bytes: Pacote codificado.
+        """
+        binario = self._codec.usar_binario([self._codecs_vizinhos.get(vizinho_id, ())])
+        mensagem = mensagens.get(binario)
+        if mensagem is None:
+            mensagem = mensagens[binario] = self._codec.codificar(pacote, binario)
+        return mensagem
+
+    def originar_lsa(self):
+        """
+        Gera um novo LSA, aplica-o na própria LSDB e o envia para TODOS os vizinhos.
+        Diferente do encaminhar_vizinhos() que evita o remetente original.
+        """
+        with self._trava:
+            conteudo = self._conteudo_atual()
+            pacote = self._gerar_pacote_lsa(conteudo)
+            if self._lsdb.atualizar_tabela(pacote) is None:
+                # A própria LSDB não tinha a base (não deveria acontecer): vai o LSA completo.
+                pacote = self._gerar_pacote_lsa(conteudo, delta=False)
+                self._lsdb.atualizar_tabela(pacote)
+            self._conteudo_anunciado = conteudo
+            self._base_delta = self._numero_sequencia
+            self._ultima_origem = self._temporizador.agora()
+            self.originados += 1
+            if "base" in pacote:
+                self.deltas_originados += 1
+            mensagens = {}
+
+            if self._ao_originar is not None:
+                self._ao_originar()
+
+            for vizinho_id, ip_vizinho in list(self._da_area(self._vizinhos_ip).items()):
+                try:
+                    self._enviar(self._mensagem_para(pacote, vizinho_id, mensagens),
+                                 (ip_vizinho, self._porta_comunicacao))
+                    self._log.debug("Enviado para %s (%s)", vizinho_id, ip_vizinho)
+                except Exception as e:
+                    self._log.erro("Erro ao enviar LSA para %s: %s", vizinho_id, e)
+
+    def originar_se_necessario(self):
+        """
+        Origina um LSA se os vizinhos ou endereços mudaram desde o último anúncio, ou se o
+        último anúncio passou do intervalo de reanúncio. Uma mudança dentro do intervalo mínimo
+        é anunciada uma única vez, quando o intervalo termina.
+
+        Returns:
+            bool: True se um LSA foi originado agora.
+        """
+        with self._trava:
+            agora = self._temporizador.agora()
+            if self._retomada is not None and self._aguardando_retomada(agora):
+                return False
+            if self._ultima_origem is not None:
+                decorrido = agora - self._ultima_origem
+                if not self._conteudo_mudou() and decorrido < self._intervalo_refresh:
+                    return False
+                if decorrido < self._intervalo_minimo:
+                    if not self._origem_agendada:
+                        self._origem_agendada = True
+                        self._temporizador.agendar(self._intervalo_minimo - decorrido, self._originar_adiado)
+                    return False
+            self.originar_lsa()
+            return True
+
+    def retomar(self, numero_sequencia: int, vizinhos: list[str], duracao: float, ao_concluir=None):
+        """
+        Prepara um reinício a quente: a numeração continua do último LSA originado antes do
+        reinício e nenhum LSA é originado até que todos os vizinhos anteriores refaçam a
+        adjacência (ou até duracao segundos depois da primeira conferência). Assim a rede não
+        recebe um LSA parcial, sem os enlaces que ainda não voltaram, e o LSA restaurado na LSDB
+        continua valendo enquanto isso.
+
+        Args:
+            numero_sequencia (int): Número de sequência do último LSA originado antes do reinício.
+            vizinhos (list[str]): Vizinhos anunciados no último LSA.
+            duracao (float): Espera máxima, em segundos, pelos vizinhos.
+            ao_concluir (callable): Chamada quando a espera termina.
+        """
+        with self._trava:
+            self._numero_sequencia = max(self._numero_sequencia, numero_sequencia)
+            self._retomada = (set(vizinhos), duracao, None, ao_concluir)
+
+    def _aguardando_retomada(self, agora: float):
+        """Deve ser chamado com self._trava adquirida."""
+        vizinhos, duracao, prazo, ao_concluir = self._retomada
+        if prazo is None:
+            prazo = agora + duracao
+            self._retomada = (vizinhos, duracao, prazo, ao_concluir)
+        faltando = vizinhos.difference(self._vizinhos_custo)
+        if faltando and agora < prazo:
+            return True
+        self._retomada = None
+        if faltando:
+            self._log.aviso("Retomada encerrada por tempo; vizinhos ausentes: %s", sorted(faltando))
+        else:
+            self._log.info("Retomada concluída: todos os vizinhos anteriores voltaram")
+        if ao_concluir is not None:
+            ao_concluir()
+        return False
+
+    def _conteudo_mudou(self):
+        return self._conteudo_atual() != self._conteudo_anunciado
+
+    def _originar_adiado(self):
+        with self._trava:
+            self._origem_agendada = False
+            if self._conteudo_mudou():
+                self.originar_lsa()
+
+    def avancar_sequencia(self, numero_sequencia: int):
+        """
+        Chamado quando a rede devolve um LSA deste roteador mais novo que o último originado
+        (por exemplo, depois de um reinício): continua a numeração a partir dele e reanuncia
+        o conteúdo atual, para que a cópia antiga seja substituída em toda a rede.
+        """
+        with self._trava:
+            if numero_sequencia > self._numero_sequencia:
+                self._numero_sequencia = numero_sequencia
+                if self._retomada is None:
+                    self.originar_lsa()
+
+    def sincronizar_vizinho(self, vizinho_id: str):
+        """
+        Envia a LSDB inteira para um vizinho recém-descoberto. Como os LSAs só são reanunciados
+        em intervalos longos, sem isso o vizinho só conheceria a topologia no próximo reanúncio
+        de cada roteador.
+        """
+        ip_vizinho = self._da_area(self._vizinhos_ip).get(vizinho_id)
+        if ip_vizinho is None:
+            return
+        lsas = self._lsdb.lsas_armazenados()
+        for pacote in lsas:
+            try:
+                self._enviar(self._mensagem_para(pacote, vizinho_id, {}),
+                             (ip_vizinho, self._porta_comunicacao))
+            except Exception as e:
+                self._log.erro("Erro ao sincronizar %s: %s", vizinho_id, e)
+                return
+        self._log.info("LSDB (%d LSAs) enviada para %s (%s)", len(lsas), vizinho_id, ip_vizinho)
+
+    def encaminhar_vizinhos(self, pacote, *ips_remetentes):
+        """
+        Encaminha o LSA para todos os vizinhos exceto os remetentes informados (o originador e
+        o vizinho de quem o datagrama chegou).
+        """
+        mensagens = {}
+        
+        for vizinho_id, ip_vizinho in list(self._da_area(self._vizinhos_ip).items()):
+            if ip_vizinho not in ips_remetentes:
+                try:
+                    self._enviar(self._mensagem_para(pacote, vizinho_id, mensagens),
+                                 (ip_vizinho, self._porta_comunicacao))
+                    self._log.debug("LSA encaminhado para %s (%s)", vizinho_id, ip_vizinho)
+                except Exception as e:
+                    self._log.erro("Erro ao encaminhar para %s: %s", vizinho_id, e)
+
+    def _gerar_pacote_lsa(self, conteudo: tuple, delta: bool = True):
+        """
+        Gera um novo LSA com o conteúdo informado: um delta sobre o último LSA originado, se
+        possível e menor, ou o LSA completo.
+
+        Args:
+            conteudo (tuple): Endereços, links e resumos, como em _conteudo_atual().
+            delta (bool): Permite gerar um delta.
+        """
+        enderecos, links, resumos = conteudo
+        pacote = {
+            "tipo": "LSA",
+            "id_rota": self._id_rota,
+            "ip_address": self._interfaces[0]["address"] if self._interfaces else "0.0.0.0",
+            "timestamp": time.time(),
+            "numero_sequencia": self._numero_sequencia + 1,
             "enderecos": enderecos,
             "links": links,
+            "checksum": calcular_checksum_lsa(enderecos, links, resumos),
         }
+        if self._area:
+            pacote["area"] = self._area
+        if resumos:
+            pacote["resumos"] = resumos
+        if (delta and self._deltas and self._conteudo_anunciado is not None and conteudo != self._conteudo_anunciado
+                and self._base_delta == self._numero_sequencia):
+            enderecos_antes, links_antes, resumos_antes = self._conteudo_anunciado
+            alterados = diferenca_links(links_antes, links)
+            novos = sorted(set(enderecos).difference(enderecos_antes))
+            removidos = sorted(set(enderecos_antes).difference(enderecos))
+            if len(alterados) + len(novos) + len(removidos) < len(links) + len(enderecos):
+                pacote.update(base=self._numero_sequencia, enderecos=novos,
+                              links={vizinho: links[vizinho] for vizinho in alterados if vizinho in links})
+                pacote.pop("resumos", None)
+                if removidos:
+                    pacote["enderecos_removidos"] = removidos
+                if len(pacote["links"]) < len(alterados):
+                    pacote["links_removidos"] = [vizinho for vizinho in alterados if vizinho not in links]
+                if resumos != resumos_antes:
+                    pacote["resumos"] = resumos or {}
+        self._numero_sequencia += 1
+        self._log.debug("Gerado LSA %s(seq %s)", "delta " if "base" in pacote else "", self._numero_sequencia)
+        return pacote
 
-    def atualizar_tabela(self, pacote):
+    def pedir_lsas(self, ip_vizinho: str, pedidos: dict[str, int]):
         """
-        Atualiza a tabela de roteamento com base em um pacote recebido.
+        Pede a um vizinho os LSAs completos de roteadores cujos deltas chegaram sem a base. Um
+        roteador já pedido há menos de intervalo_minimo, para o mesmo número de sequência ou
+        um maior, não é pedido de novo (as cópias de um delta chegam por vários vizinhos).
 
         Args:
-            pacote (dict): Pacote contendo informações de roteamento de outro roteador.
+            ip_vizinho (str): IP do vizinho de quem o delta chegou.
+            pedidos (dict[str, int]): Número de sequência do delta recusado, por roteador.
 
         Returns:
-            bool: True se a tabela foi atualizada, False se o pacote foi ignorado.
+            list[str]: Roteadores efetivamente pedidos.
         """
-        id_rota = pacote["id_rota"]
-        numero_seq = pacote["numero_sequencia"]
-
-        entrada = self._tabela_roteamento.get(id_rota)
-        if entrada and numero_seq <= entrada["numero_sequencia"]:
-            #print(f"Pacote ignorado (sequência antiga): {pacote}")
-            return False
-
-        print(f"Atualizando tabela de roteamento com id_rota {id_rota} e seq {numero_seq}")
-        self._tabela_roteamento[id_rota] = self._criar_entrada_tabela(
-            numero_seq, pacote["timestamp"], pacote["enderecos"], pacote["links"]
-        )
-
-        for vizinho in pacote["links"].keys():
-            if vizinho not in self._tabela_roteamento:
-                print(f"Novo roteador descoberto: {vizinho}")
-                self._tabela_roteamento[vizinho] = self._criar_entrada_tabela(-1, 0, [], {})
+        agora = self._temporizador.agora()
+        with self._trava:
+            ids = []
+            for id_rota, numero_sequencia in pedidos.items():
+                anterior = self._pedidos.get(id_rota)
+                if anterior is not None and anterior[0] >= numero_sequencia and agora - anterior[1] < self._intervalo_minimo:
+                    continue
+                self._pedidos[id_rota] = (numero_sequencia, agora)
+                ids.append(id_rota)
+        if not ids:
+            return ids
+        pacote = {"tipo": "LSA_REQ", "id_rota": self._id_rota, "pedidos": ids}
+        if self._area:
+            pacote["area"] = self._area
+        vizinho_id = next((vizinho for vizinho, ip in list(self._vizinhos_ip.items()) if ip == ip_vizinho), None)
+        try:
+            self._enviar(self._mensagem_para(pacote, vizinho_id, {}), (ip_vizinho, self._porta_comunicacao), "LSA_REQ")
+            self.pedidos_enviados += 1
+            self._log.debug("Pedidos LSAs completos de %s a %s", ids, ip_vizinho)
+        except Exception as e:
+            self._log.erro("Erro ao pedir LSAs a %s: %s", ip_vizinho, e)
+        return ids
 
-        rotas = self._calcular_rotas_minimas()
-        self._atualizar_roteamento(rotas)
-        self._aplicar_rotas()
-        return True
+    def responder_pedido(self, vizinho_id: str, ids: list[str]):
+        """Envia a um vizinho ativo desta área os LSAs completos pedidos, tirados da LSDB."""
+        ip_vizinho = self._da_area(self._vizinhos_ip).get(vizinho_id)
+        if ip_vizinho is None:
+            return
+        self.pedidos_atendidos += 1
+        for pacote in self._lsdb.lsas_armazenados(ids):
+            try:
+                self._enviar(self._mensagem_para(pacote, vizinho_id, {}), (ip_vizinho, self._porta_comunicacao))
+            except Exception as e:
+                self._log.erro("Erro ao responder pedido de %s: %s", vizinho_id, e)
+                return
 
-    def _calcular_rotas_minimas(self):
+    def iniciar_emissao(self, roda: "RodaTemporizacao", primeiro: float = None):
         """
-        Calcula as rotas de menor custo para cada destino conhecido usando o algoritmo de Dijkstra.
+        Registra na roda de temporização a conferência periódica da necessidade de originar um LSA.
 
         Returns:
-            dict: Mapeia cada destino ao seu nó anterior no caminho mínimo.
+            TarefaPeriodica: Tarefa da conferência, ou None se o emissor já tiver sido iniciado.
         """
-        distancias = {n: float('inf') for n in self._tabela_roteamento}
-        anteriores = {n: None for n in self._tabela_roteamento}
-        visitados = set()
+        if self._iniciado:
+            return None
+        self._iniciado = True
+        self._log.info("Emissor LSA iniciado (área %s)", self._area)
+        return roda.periodico(self._intervalo_envio, self.originar_se_necessario, primeiro)
 
-        distancias[self._id_rota] = 0
 
-        while len(visitados) < len(self._tabela_roteamento):
-            no_atual = min((n for n in distancias if n not in visitados),
-                        key=lambda n: distancias[n], default=None)
+class Adjacencia:
+    """
+    Estado de um vizinho no GerenciadorVizinhos.
 
-            if no_atual is None:
-                break
+    Atributos:
+        id_rota (str): ID do vizinho.
+        ip (str): IP do vizinho no enlace compartilhado.
+        custo (int): Custo do enlace até o vizinho.
+        estado (str): GerenciadorVizinhos.INICIAL ou GerenciadorVizinhos.ATIVA.
+        expira_em (float): Prazo para o próximo HELLO antes de o vizinho ser considerado morto.
+        eco_expira_em (float): Prazo para a próxima resposta de eco (infinito sem eco).
+        agendado_em (float): Prazo da entrada válida deste vizinho no heap de prazos.
+        rtt (float): RTT da última resposta de eco, em segundos.
+    """
+    __slots__ = ["id_rota", "ip", "custo", "estado", "expira_em", "eco_expira_em", "agendado_em", "rtt"]
 
-            visitados.add(no_atual)
-            vizinhos = self._tabela_roteamento[no_atual]["links"]
+    def __init__(self, id_rota: str, ip: str, custo: int, estado: str):
+        self.id_rota = id_rota
+        self.ip = ip
+        self.custo = custo
+        self.estado = estado
+        self.expira_em = float("inf")
+        self.eco_expira_em = float("inf")
+        self.agendado_em = None
+        self.rtt = None
 
-            for vizinho, custo in vizinhos.items():
-                if vizinho in visitados:
-                    continue
-                nova_dist = distancias[no_atual] + custo
-                if nova_dist < distancias[vizinho]:
-                    distancias[vizinho] = nova_dist
-                    anteriores[vizinho] = no_atual
+    def prazo(self):
+        return min(self.expira_em, self.eco_expira_em)
+
+
+class GerenciadorVizinhos:
+    """
+    Máquina de estados das adjacências e detecção de falha dos vizinhos.
+
+    Estados:
+        INICIAL: recebemos HELLOs do vizinho, mas ele ainda não nos lista em vizinhos_conhecidos.
+        ATIVA: comunicação nos dois sentidos; o enlace é anunciado no LSA e usado nas rotas.
+
+    Um vizinho sem HELLO dentro do intervalo morto é removido. Com o eco habilitado, cada vizinho
+    ativo também recebe uma sonda a cada intervalo_eco, e a adjacência cai após multiplicador_eco
+    sondas sem resposta, detectando falhas em frações de segundo, como o modo eco do BFD.
+
+    Os prazos ficam em um único heap com remoção preguiçosa: um HELLO ou uma resposta de eco só
+    atualiza o prazo da adjacência, em O(1). Quando a entrada do heap vence, o verificador confere o
+    prazo atual e reinsere a entrada se o vizinho ainda estiver vivo. Há um único temporizador
+    agendado, para o prazo mais próximo, e um único temporizador de envio de ecos, qualquer que
+    seja o número de vizinhos.
+
+    Atributos:
+        _id_rota (str): ID deste roteador.
+        _adjacencias (dict[str, Adjacencia]): Vizinhos ouvidos, em qualquer estado.
+        _custos (dict[str, int]): Custo dos vizinhos ativos (links anunciados no LSA).
+        _ips (dict[str, str]): IP dos vizinhos ativos (próximos saltos e destino do flooding).
+        _codecs (dict[str, set[str]]): Codecs anunciados por cada vizinho ouvido.
+        _intervalo_morto (float): Tempo sem HELLO após o qual o vizinho é removido.
+        _intervalo_eco (float): Intervalo entre sondas de eco; None desabilita o eco.
+        _multiplicador_eco (int): Sondas seguidas sem resposta que derrubam a adjacência.
+        _temporizador: Relógio e agendador dos prazos.
+        _emissor_hello (EmissorPacoteHello): Envia os HELLOs disparados por mudança de estado e os ecos.
+        _ao_ativar: Função chamada com o ID do vizinho quando a adjacência fica ativa ou muda de custo/IP.
+        _ao_desfazer: Função chamada com o ID do vizinho quando a adjacência deixa de estar ativa.
+        _prazos (list): Heap de (prazo, ID do vizinho).
+        _verificacao: Temporizador agendado para o prazo mais próximo.
+        _prazo_verificacao (float): Instante para o qual _verificacao está agendado.
+        _eco_agendado (bool): Indica se o envio periódico de ecos está agendado.
+        _hello_agendado (bool): Indica se um HELLO disparado já está agendado.
+        _trava (threading.RLock): Protege as adjacências entre a recepção e os temporizadores.
+        _log (CanalRegistro): Eventos das adjacências.
+        quedas (int): Adjacências desfeitas por falta de HELLO ou de eco.
+    """
+    INICIAL = "INICIAL"
+    ATIVA = "ATIVA"
+
+    __slots__ = ["_id_rota", "_adjacencias", "_custos", "_ips", "_codecs", "_intervalo_morto",
+                 "_intervalo_eco", "_multiplicador_eco", "_temporizador", "_emissor_hello",
+                 "_ao_ativar", "_ao_desfazer", "_prazos", "_verificacao", "_prazo_verificacao",
+                 "_eco_agendado", "_hello_agendado", "_trava", "_log", "quedas"]
+
+    def __init__(self, id_rota: str, custos: dict[str, int], ips: dict[str, str], codecs: dict[str, set[str]],
+                 intervalo_morto: float = 40, intervalo_eco: float = None, multiplicador_eco: int = 3,
+                 temporizador=None, emissor_hello: "EmissorPacoteHello" = None, ao_ativar=None, ao_desfazer=None):
+        self._id_rota = id_rota
+        self._log = REGISTRO.canal("vizinhos", id_rota)
+        self._adjacencias = {}
+        self._custos = custos
+        self._ips = ips
+        self._codecs = codecs
+        self._intervalo_morto = intervalo_morto
+        self._intervalo_eco = intervalo_eco
+        self._multiplicador_eco = multiplicador_eco
+        self._temporizador = temporizador if temporizador is not None else TemporizadorThreads()
+        self._emissor_hello = emissor_hello
+        self._ao_ativar = ao_ativar
+        self._ao_desfazer = ao_desfazer
+        self._prazos = []
+        self._verificacao = None
+        self._prazo_verificacao = float("inf")
+        self._eco_agendado = False
+        self._hello_agendado = False
+        self._trava = threading.RLock()
+        self.quedas = 0
 
-        return anteriores
+    def definir_temporizador(self, temporizador):
+        self._temporizador = temporizador
 
+    @property
+    def adjacencias(self):
+        return self._adjacencias
 
-    def _atualizar_roteamento(self, caminhos: dict):
+    def receber_hello(self, id_vizinho: str, ip: str, custo: int, bidirecional: bool, codecs: set[str]):
         """
-        Atualiza a tabela de roteamento com base nos caminhos calculados.
+        Atualiza a adjacência com um HELLO recebido e aplica as transições de estado.
 
         Args:
-            caminhos (dict): Dicionário que mapeia destinos ao nó anterior no caminho mínimo.
+            id_vizinho (str): Roteador que enviou o HELLO.
+            ip (str): IP do vizinho no enlace.
+            custo (int): Custo do enlace até o vizinho.
+            bidirecional (bool): Se o HELLO lista este roteador entre os vizinhos conhecidos.
+            codecs (set[str]): Codecs anunciados pelo vizinho.
         """
-        self._roteamento.clear()
-        for destino, gateway in caminhos.items():
-            if destino != self._id_rota:
-                pulo = destino
-                while pulo and caminhos[pulo] != self._id_rota:
-                    pulo = caminhos[pulo]
-                if pulo:
-                    self._roteamento[destino] = pulo
-        self._roteamento = dict(sorted(self._roteamento.items()))
+        agora = self._temporizador.agora()
+        ativado = desfeito = False
+        with self._trava:
+            self._codecs[id_vizinho] = codecs
+            adjacencia = self._adjacencias.get(id_vizinho)
+            if adjacencia is None:
+                adjacencia = self._adjacencias[id_vizinho] = Adjacencia(id_vizinho, ip, custo, self.INICIAL)
+                self._log.info("Vizinho %s (%s) em estado %s", id_vizinho, ip, self.INICIAL)
+                adjacencia.expira_em = agora + self._intervalo_morto
+                self._agendar_prazo(adjacencia, adjacencia.expira_em)
+                self._solicitar_hello(acelerar=True)
+            adjacencia.expira_em = agora + self._intervalo_morto
 
-    def _aplicar_rotas(self):
+            if adjacencia.estado == self.ATIVA and not bidirecional:
+                self._log.info("Vizinho %s deixou de nos listar; adjacência volta a %s", id_vizinho, self.INICIAL)
+                self._desativar(adjacencia)
+                self._solicitar_hello(acelerar=True)
+                desfeito = True
+            elif adjacencia.estado == self.INICIAL and bidirecional:
+                adjacencia.ip, adjacencia.custo = ip, custo
+                self._ativar(adjacencia, agora)
+                self._solicitar_hello()
+                ativado = True
+            elif adjacencia.estado == self.ATIVA and (adjacencia.ip != ip or adjacencia.custo != custo):
+                adjacencia.ip, adjacencia.custo = ip, custo
+                self._custos[id_vizinho] = custo
+                self._ips[id_vizinho] = ip
+                ativado = True
+
+        if desfeito and self._ao_desfazer is not None:
+            self._ao_desfazer(id_vizinho)
+        if ativado and self._ao_ativar is not None:
+            self._ao_ativar(id_vizinho)
+
+    def receber_eco(self, pacote: dict):
         """
-        Aplica as rotas calculadas ao sistema operacional via comandos 'ip route'.
+        Renova o prazo de eco de um vizinho com a resposta a uma sonda enviada por este roteador.
         """
-        # print("Tabela de roteamento atual:")
-        # for destino, dados in self._tabela_roteamento.items():
-        #     print(f"  {destino}: {dados}")
-        
-        print("\nRotas calculadas:")
-        for destino, gateway in self._roteamento.items():
-            print(f"  {destino} -> {gateway}")
-            
-            if gateway in self._dados_vizinhos:
-                ip_gateway = self._dados_vizinhos[gateway]
-                for ip_destino in self._tabela_roteamento[destino]["enderecos"]:
-                    print(f"  Aplicando rota: {ip_destino} via {ip_gateway}")
-                    comando = ["ip", "route", "replace", ip_destino, "via", ip_gateway]
-                    try:
-                        subprocess.run(comando, check=True)
-                        print("    ✅ Sucesso")
-                    except subprocess.CalledProcessError as e:
-                        print(f"    ❌ Falha: {e}")
-                        
-class EmissorPacoteHello:
-    """
-    Classe responsável por emitir periodicamente pacotes do tipo HELLO para os roteadores vizinhos
-    em uma rede de roteamento.
+        with self._trava:
+            adjacencia = self._adjacencias.get(pacote["destino"])
+            if adjacencia is None or adjacencia.estado != self.ATIVA or self._intervalo_eco is None:
+                return
+            adjacencia.eco_expira_em = self._temporizador.agora() + self._intervalo_eco * self._multiplicador_eco
+            adjacencia.rtt = time.time() - pacote["timestamp"]
 
-    A classe gerencia o envio desses pacotes via broadcast em todas as interfaces configuradas,
-    permitindo que os vizinhos saibam que este roteador está ativo e compartilha informações básicas sobre si.
+    def _ativar(self, adjacencia: Adjacencia, agora: float):
+        adjacencia.estado = self.ATIVA
+        self._custos[adjacencia.id_rota] = adjacencia.custo
+        self._ips[adjacencia.id_rota] = adjacencia.ip
+        self._log.info("Adjacência com %s (%s) %s, custo %s", adjacencia.id_rota, adjacencia.ip, self.ATIVA,
+                       adjacencia.custo)
+        if self._intervalo_eco is not None:
+            # O primeiro prazo dá uma rodada extra de folga para o vizinho começar a responder.
+            adjacencia.eco_expira_em = agora + self._intervalo_eco * (self._multiplicador_eco + 1)
+            self._agendar_prazo(adjacencia, adjacencia.prazo())
+            if not self._eco_agendado:
+                self._eco_agendado = True
+                self._temporizador.agendar(self._intervalo_eco, self._enviar_ecos)
 
-    Atributos:
-        _id_rota (str): Identificador único do roteador.
-        _interfaces (list[dict[str, str]]): Lista de interfaces de rede, onde cada interface é um dicionário contendo pelo menos os campos 'address' e 'broadcast'.
-        _vizinhos (dict[str, str]): Dicionário dos vizinhos conhecidos, onde a chave é o ID do roteador vizinho.
-        _intervalo_envio (int): Intervalo, em segundos, entre o envio de pacotes HELLO.
-        _porta_comunicacao (int): Porta UDP utilizada para envio dos pacotes HELLO.
-    """
-    __slots__ = ["_id_rota", "_interfaces", "_vizinhos",
-                 "_intervalo_envio", "_porta_comunicacao"]
+    def _desativar(self, adjacencia: Adjacencia):
+        adjacencia.estado = self.INICIAL
+        adjacencia.eco_expira_em = float("inf")
+        self._custos.pop(adjacencia.id_rota, None)
+        self._ips.pop(adjacencia.id_rota, None)
 
-    def __init__(self, id_rota: str, interfaces: list[dict[str, str]], vizinhos: dict[str, str], intervalo_envio: int = 10, porta_comunicacao: int = 5000):
-    
-        self._id_rota = id_rota
-        self._interfaces = interfaces
-        self._vizinhos = vizinhos
-        self._intervalo_envio = intervalo_envio
-        self._porta_comunicacao = porta_comunicacao
+    def _agendar_prazo(self, adjacencia: Adjacencia, prazo: float):
+        """
+        Insere o prazo da adjacência no heap. Entradas anteriores da mesma adjacência passam a
+        ser ignoradas, e o temporizador é adiantado se este for o prazo mais próximo.
+        """
+        adjacencia.agendado_em = prazo
+        heapq.heappush(self._prazos, (prazo, adjacencia.id_rota))
+        if prazo < self._prazo_verificacao:
+            if self._verificacao is not None:
+                self._verificacao.cancel()
+            self._prazo_verificacao = prazo
+            self._verificacao = self._temporizador.agendar(
+                max(0.0, prazo - self._temporizador.agora()), self._verificar_prazos)
 
-    def _gerar_pacote_hello(self, ip_address: str):
+    def _verificar_prazos(self):
         """
-        Gera um pacote do tipo HELLO contendo as informações do roteador e seus vizinhos.
+        Desfaz as adjacências cujo prazo venceu e reagenda as que receberam HELLO ou eco a tempo.
+        """
+        desfeitos = []
+        with self._trava:
+            agora = self._temporizador.agora()
+            self._verificacao = None
+            self._prazo_verificacao = float("inf")
+            prazos = self._prazos
+            while prazos and prazos[0][0] <= agora:
+                prazo_entrada, id_vizinho = heapq.heappop(prazos)
+                adjacencia = self._adjacencias.get(id_vizinho)
+                if adjacencia is None or adjacencia.agendado_em != prazo_entrada:
+                    continue
+                prazo = adjacencia.prazo()
+                if prazo > agora:
+                    adjacencia.agendado_em = prazo
+                    heapq.heappush(prazos, (prazo, id_vizinho))
+                    continue
+                motivo = "HELLO" if adjacencia.expira_em <= agora else "eco"
+                self._log.aviso("Vizinho %s sem %s dentro do prazo; adjacência desfeita", id_vizinho, motivo)
+                if adjacencia.estado == self.ATIVA:
+                    self._desativar(adjacencia)
+                    desfeitos.append(id_vizinho)
+                del self._adjacencias[id_vizinho]
+                self._codecs.pop(id_vizinho, None)
+                self.quedas += 1
+                if self._emissor_hello is not None:
+                    self._emissor_hello.acelerar()
+            if prazos:
+                self._prazo_verificacao = prazos[0][0]
+                self._verificacao = self._temporizador.agendar(
+                    max(0.0, prazos[0][0] - agora), self._verificar_prazos)
 
-        Parâmetros:
-        ip_address (str): Endereço IP da interface de envio do pacote.
+        if self._ao_desfazer is not None:
+            for id_vizinho in desfeitos:
+                self._ao_desfazer(id_vizinho)
 
-        Retorna:
-        dict: Pacote do tipo HELLO.
+    def _enviar_ecos(self):
         """
-        return {
-            "tipo": "HELLO",
-            "id_rota": self._id_rota,
-            "timestamp": time.time(),
-            "ip_address": ip_address,
-            "vizinhos_conhecidos": list(self._vizinhos.keys()),
-        }
-
-    def _enviar_broadcast(self, ip_address: str, broadcast_ip: str):
+        Envia uma sonda de eco para cada vizinho ativo e reagenda o próximo envio enquanto houver
+        algum.
         """
-        Envia pacotes HELLO periodicamente para os vizinhos via broadcast.
+        with self._trava:
+            ativos = [(a.id_rota, a.ip) for a in self._adjacencias.values() if a.estado == self.ATIVA]
+            self._eco_agendado = bool(ativos)
+            if ativos:
+                self._temporizador.agendar(self._intervalo_eco, self._enviar_ecos)
+        for id_vizinho, ip in ativos:
+            self._emissor_hello.enviar_eco(id_vizinho, ip)
 
-        Parâmetros:
-        ip_address (str): Endereço IP da interface.
-        broadcast_ip (str): Endereço de broadcast para o envio dos pacotes.
+    def _solicitar_hello(self, acelerar: bool = False):
         """
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        Agenda um HELLO imediato após mudanças de estado, para que o vizinho veja a comunicação
+        nos dois sentidos sem esperar o próximo HELLO periódico. Várias mudanças seguidas geram
+        um único envio. Com acelerar, os HELLOs periódicos também voltam ao intervalo rápido.
+        """
+        if self._emissor_hello is not None and acelerar:
+            self._emissor_hello.acelerar()
+        if self._emissor_hello is not None and not self._hello_agendado:
+            self._hello_agendado = True
+            self._temporizador.agendar(0, self._enviar_hello_disparado)
 
-        while True:
-            pacote = self._gerar_pacote_hello(ip_address)
-            mensagem = json.dumps(pacote).encode("utf-8")
+    def _enviar_hello_disparado(self):
+        with self._trava:
+            self._hello_agendado = False
+        self._emissor_hello.enviar_hellos()
 
-            try:
-                sock.sendto(mensagem, (broadcast_ip, self._porta_comunicacao))
-                print(f"[{self._id_rota}] Pacote HELLO enviado para {broadcast_ip}")
-            except Exception as e:
-                
-                print(f"[{self._id_rota}] Erro ao enviar HELLO: {e}")
 
-            time.sleep(self._intervalo_envio)
+class ManipuladorMetricas(http.server.BaseHTTPRequestHandler):
+    """
+    Responde às rotas do ServidorMetricas a partir do roteador associado ao servidor HTTP.
+    """
 
-    def iniciar_emissao(self):
-        """
-        Inicia o envio de pacotes HELLO para os vizinhos através das interfaces configuradas.
-        """
-        for interface in self._interfaces:
-            if "broadcast" in interface:
-                ip = interface["address"]
-                broadcast = interface["broadcast"]
-                thread = threading.Thread(
-                    target=self._enviar_broadcast, args=(ip, broadcast), daemon=True)
-                thread.start()
+    def do_GET(self):
+        roteador = self.server.roteador
+        caminho = self.path.split("?", 1)[0]
+        if caminho == "/metrics":
+            corpo = roteador._metricas.exportar_prometheus().encode("utf-8")
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+        elif caminho == "/eventos":
+            corpo = json.dumps(REGISTRO.recentes(), indent=2, ensure_ascii=False).encode("utf-8")
+            tipo = "application/json"
+        elif caminho in ("/lsdb", "/rotas", "/vizinhos", "/metricas.json"):
+            exportar = {"/lsdb": roteador.exportar_lsdb, "/rotas": roteador.exportar_rotas,
+                        "/vizinhos": roteador.exportar_vizinhos,
+                        "/metricas.json": roteador._metricas.exportar}[caminho]
+            corpo = json.dumps(exportar(), indent=2, sort_keys=True).encode("utf-8")
+            tipo = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
 
+    def log_message(self, formato, *args):
+        pass
 
-class EmissorPacoteLSA:
-    
-    __slots__ = ["_id_rota", "_vizinhos_ip", "_vizinhos_custo", "_intervalo_envio",
-                 "_porta_comunicacao", "_numero_sequencia", "_iniciado", "_lsdb", "_interfaces"]
 
-    def __init__(self, id_rota: str, vizinhos_ip: dict[str, str], vizinhos_custo: dict[str, int],interfaces: list[dict[str, str]], lsdb: EstadoRoteador, intervalo_envio: int = 30, porta_comunicacao: int = 5000):
-        self._id_rota = id_rota
-        self._vizinhos_ip = vizinhos_ip
-        self._vizinhos_custo = vizinhos_custo
-        self._intervalo_envio = intervalo_envio
-        self._porta_comunicacao = porta_comunicacao
-        self._numero_sequencia = 0
-        self._iniciado = False
-        self._lsdb = lsdb
-        self._interfaces = interfaces
+class ServidorMetricas:
+    """
+    Endpoint HTTP local com as métricas do roteador em formato Prometheus (/metrics) e dumps em
+    JSON da LSDB (/lsdb), das rotas (/rotas), dos vizinhos (/vizinhos), das métricas
+    (/metricas.json) e dos eventos recentes do anel de log (/eventos). Roda em threads próprias
+    e só lê snapshots, sem bloquear a recepção.
 
-    def _enviar_para_vizinhos(self):
-            """
-            Envia pacotes LSA periodicamente para TODOS os vizinhos.
-            Diferente do encaminhar_vizinhos() que evita o remetente original.
-            """
-            while True:
-                try:
-                    pacote = self._gerar_pacote_lsa()
-                    mensagem = json.dumps(pacote).encode("utf-8")
-                    
-                    self._lsdb.atualizar_tabela(pacote)
-                    
-                    for vizinho_id, ip_vizinho in self._vizinhos_ip.items():
-                        try:
-                            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-                                sock.sendto(mensagem, (ip_vizinho, self._porta_comunicacao))
-                                print(f"[LSA] Enviado para {vizinho_id} ({ip_vizinho})")
-                        except Exception as e:
-                            print(f"Erro ao enviar LSA para {vizinho_id}: {e}")
-                    
-                    time.sleep(self._intervalo_envio)
-                    
-                except Exception as e:
-                    print(f"Erro grave no envio periódico de LSA: {e}")
-                    time.sleep(5)  
+    Atributos:
+        _roteador (Roteador): Roteador exposto.
+        _endereco (tuple[str, int]): Endereço e porta de escuta.
+        _servidor (http.server.ThreadingHTTPServer): Servidor HTTP, criado em iniciar().
+    """
+    __slots__ = ["_roteador", "_endereco", "_servidor"]
 
-    def encaminhar_vizinhos(self, pacote, ip_remetente):
-        """Encaminha o LSA para todos os vizinhos exceto o remetente original."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        mensagem = json.dumps(pacote).encode("utf-8")
-        
-        for vizinho_id, ip_vizinho in self._vizinhos_ip.items():
-            if ip_vizinho != ip_remetente:
-                try:
-                    sock.sendto(mensagem, (ip_vizinho, self._porta_comunicacao))
-                    print(f"[{self._id_rota}] LSA encaminhado para {vizinho_id} ({ip_vizinho})")
-                except Exception as e:
-                    print(f"[{self._id_rota}] Erro ao encaminhar para {vizinho_id}: {e}")
+    def __init__(self, roteador: "Roteador", porta: int, endereco: str = "127.0.0.1"):
+        self._roteador = roteador
+        self._endereco = (endereco, porta)
+        self._servidor = None
 
-    def _gerar_pacote_lsa(self):
-        """Gera um novo LSA com informações atualizadas."""
-        self._numero_sequencia += 1
-        
-        pacote = {
-            "tipo": "LSA",
-            "id_rota": self._id_rota,
-            "ip_address": self._interfaces[0]["address"] if self._interfaces else "0.0.0.0",
-            "timestamp": time.time(),
-            "numero_sequencia": self._numero_sequencia,
-            "enderecos": [item["address"] for item in self._interfaces],
-            "links": self._vizinhos_custo.copy()
-        }
-    
-        # print(f"[{self._id_rota}] Gerado LSA (seq {self._numero_sequencia}): {pacote}")
-        return pacote
+    def iniciar(self):
+        self._servidor = http.server.ThreadingHTTPServer(self._endereco, ManipuladorMetricas)
+        self._servidor.daemon_threads = True
+        self._servidor.roteador = self._roteador
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        self._roteador._log.info("Métricas disponíveis em http://%s:%s/metrics", *self._endereco)
 
-    def iniciar_emissao(self):
-        """Inicia o envio periódico de LSAs em thread separada."""
-        if not self._iniciado:
-            threading.Thread(target=self._enviar_para_vizinhos, daemon=True).start()
-            self._iniciado = True
-            print("Emissor LSA iniciado!")
+    def encerrar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
 
 
 class Roteador:
@@ -373,37 +4229,337 @@ class Roteador:
         _interfaces (list[dict[str, str]]): Lista de interfaces de rede do roteador.
     """
 
-    def __init__(self, router_id: str, porta_comunicacao: int = 5000, intervalo_envio: int = 10):
+    def __init__(self, router_id: str, porta_comunicacao: int = 5000, intervalo_envio: int = 10,
+                 spf_atraso_inicial: float = 0.05, spf_espera: float = 0.2, spf_espera_maxima: float = 5.0,
+                 modo_codec: str = "auto", interfaces: list[dict[str, str]] = None, grafo=None,
+                 programador_rotas: ProgramadorRotas = None, temporizador=None, transporte=None, codec=None,
+                 intervalo_refresh_lsa: float = 1800, idade_maxima_lsa: float = 3600,
+                 intervalo_morto: float = None, intervalo_eco: float = None, multiplicador_eco: int = 3,
+                 porta_metricas: int = None, endereco_metricas: str = "127.0.0.1", buffer_recepcao: int = 4 * 1024 * 1024, tamanho_lote: int = 256,
+                 redes_hosts: list[str] = None, custos_enlaces: dict[str, int] = None,
+                 arquivo_vizinhos: str = "vizinhos.csv", max_caminhos_ecmp: int = 4,
+                 agregar_rotas: bool = False, redes_anunciadas: list[str] = None,
+                 arquivo_estado: str = None, intervalo_persistencia: float = 1.0,
+                 area: int = 0, areas_enlaces: dict[str, int] = None,
+                 intervalo_hello_rapido: float = None, intervalo_hello_maximo: float = None, semente: int = None,
+                 lsa_delta: bool = True, lsdb_compacta: bool = False, namespace: str = None):
+        """
+        Os parâmetros interfaces, custos_enlaces (ou grafo), programador_rotas, temporizador,
+        transporte e codec permitem substituir a descoberta de interfaces via psutil, a leitura
+        dos custos dos enlaces, o 'ip route', o relógio, os sockets UDP e o codec, por exemplo
+        para simular muitos roteadores em um único processo. Quando omitidos, o roteador usa o
+        sistema real e lê os custos de arquivo_vizinhos (o índice do próprio roteador gerado pelo
+        gerar_composer.py) ou, se ele não existir, do conexoes_rede.csv completo.
+
+        intervalo_refresh_lsa é o intervalo de reanúncio de um LSA sem mudanças, e
+        idade_maxima_lsa, a idade a partir da qual um LSA não reanunciado é descartado da LSDB.
+
+        intervalo_morto é o tempo sem HELLO após o qual um vizinho é removido (padrão: quatro
+        intervalos de envio). intervalo_eco habilita as sondas de eco para detecção rápida de falhas.
+
+        porta_metricas habilita o endpoint HTTP com as métricas (/metrics) e os dumps em JSON
+        da LSDB (/lsdb), das rotas (/rotas) e dos vizinhos (/vizinhos). Ele escuta em
+        endereco_metricas, por padrão só na interface de loopback: os dumps expõem a topologia
+        inteira e não devem ficar abertos nas redes roteadas. Use "0.0.0.0" para coletá-los de fora.
+
+        buffer_recepcao é o SO_RCVBUF pedido para o socket UDP, e tamanho_lote, o máximo de
+        datagramas lidos e processados juntos a cada despertar da recepção.
+
+        redes_hosts são os blocos de onde saem as redes de hosts (variável REDES_HOSTS escrita pelo
+        gerar_composer.py); interfaces nesses blocos são anunciadas como a sub-rede inteira.
+
+        max_caminhos_ecmp limita quantos caminhos de mesmo custo são instalados por destino
+        (1 instala um único gateway, como antes do ECMP).
+
+        agregar_rotas instala os prefixos aprendidos agregados em supernets por gateway, e
+        redes_anunciadas (blocos CIDR) limita quais endereços das interfaces este roteador anuncia;
+        sem ela, todos são anunciados.
+
+        arquivo_estado habilita o reinício a quente: a LSDB, as rotas instaladas, os vizinhos e o
+        número de sequência são gravados nele (no máximo uma vez a cada intervalo_persistencia
+        segundos) e, se o arquivo existir na partida, o roteador volta com eles. As rotas gravadas
+        continuam instaladas e o LSA próprio não é reoriginado até que os vizinhos anteriores
+        refaçam as adjacências ou termine o intervalo morto.
+
+        area é a área principal do roteador, a que recebe os endereços dele, e areas_enlaces, a
+        área de cada enlace, por vizinho (coluna 'Area' do arquivo_vizinhos; enlaces sem área ficam
+        na principal). Um roteador com enlaces em mais de uma área mantém uma LSDB e um SPF por
+        área (veja CoordenadorAreas); sem áreas, tudo fica na área 0, como antes.
+
+        Os HELLOs, a conferência dos LSAs e a manutenção rodam em uma única RodaTemporizacao, com
+        jitter sorteado a partir de semente. O intervalo dos HELLOs vai de intervalo_hello_rapido
+        (padrão: um décimo de intervalo_envio) enquanto as adjacências se formam até
+        intervalo_hello_maximo (padrão: um terço do intervalo morto) com a vizinhança estável.
+
+        lsa_delta anuncia as mudanças do LSA próprio como deltas sobre o LSA anterior em vez do
+        LSA completo; os deltas recebidos são aceitos com ou sem ela.
+
+        lsdb_compacta roda o SPF de cada área sobre um GrafoCSR (veja EstadoRoteador).
+
+        namespace é o namespace de rede do roteador quando vários roteadores dividem um processo
+        (veja supervisor.py): as interfaces, os sockets e o endpoint de métricas são criados nele
+        e as rotas são instaladas com 'ip -n'. Sem ele, vale o namespace do processo, como em um
+        container.
+        """
         self._router_id = router_id
+        self._namespace = namespace
+        if namespace and programador_rotas is None:
+            programador_rotas = ProgramadorRotas(BackendRotasIpBatch(["ip", "-n", namespace]))
+        self._log = REGISTRO.canal("roteador", router_id)
+        self._log_hello = REGISTRO.canal("hello", router_id)
+        self._log_lsa = REGISTRO.canal("lsa", router_id)
+        self._area = area
+        self._persistencia = None
+        self._buffer_recepcao = buffer_recepcao
+        self._tamanho_lote = tamanho_lote
+        self._metricas = Metricas(router_id)
+        self._porta_metricas = porta_metricas
+        self._endereco_metricas = endereco_metricas
+        self._servidor_metricas = None
         self._porta_comunicacao = porta_comunicacao
         self._intervalo_envio = intervalo_envio
-        self._interfaces = self.obter_interfaces_com_broadcast()
+        self._interfaces_do_sistema = interfaces is None
+        self._redes_hosts = [ipaddress.IPv4Network(rede) for rede in (redes_hosts or ["192.168.0.0/16"])]
+        self._interfaces = interfaces if interfaces is not None else self.obter_interfaces_com_broadcast()
         self._vizinhos = {} 
         self._vizinhos_reconhecidos = {}
-        self._estado_roteador = EstadoRoteador(router_id, self._vizinhos_reconhecidos)
-        self._grafo = carregar_grafo_com_pesos("conexoes_rede.csv")
+        self._codec = codec if codec is not None else CodecPacotes(modo_codec)
+        self._codecs_vizinhos = {}
+        self._agendador_spf = AgendadorSPF(spf_atraso_inicial, spf_espera, spf_espera_maxima, temporizador)
+        self._roda = RodaTemporizacao(temporizador, aleatorio=random.Random(semente))
+        self._tarefas = []
+        if custos_enlaces is None and grafo is not None:
+            custos_enlaces = {vizinho: dados["weight"] for vizinho, dados in grafo[router_id].items()}
+        self._custos_enlaces = custos_enlaces if custos_enlaces is not None else self._carregar_custos(arquivo_vizinhos)
+        if areas_enlaces is None and grafo is not None:
+            areas_enlaces = {vizinho: dados["area"] for vizinho, dados in grafo[router_id].items() if "area" in dados}
+        if areas_enlaces is None and custos_enlaces is None and os.path.exists(arquivo_vizinhos):
+            areas_enlaces = carregar_areas_enlaces(arquivo_vizinhos)
+        self._areas_enlaces = {vizinho: (areas_enlaces or {}).get(vizinho, area) for vizinho in self._custos_enlaces}
+        areas = sorted({area, *self._areas_enlaces.values()})
+        self._coordenador_areas = None
+        if areas != [0]:
+            self._coordenador_areas = CoordenadorAreas(programador_rotas, agregar_rotas)
+        self._estados_area = {}
+        for area_atual in areas:
+            self._estados_area[area_atual] = EstadoRoteador(
+                router_id, self._vizinhos_reconhecidos,
+                programador_rotas=(programador_rotas if self._coordenador_areas is None
+                                   else self._coordenador_areas.programador_area(area_atual)),
+                agendador_spf=self._agendador_spf, temporizador=temporizador, idade_maxima=idade_maxima_lsa,
+                metricas=self._metricas, max_caminhos=max_caminhos_ecmp,
+                agregar_rotas=agregar_rotas and self._coordenador_areas is None,
+                ao_alterar=lambda area_atual=area_atual: self._spf_area_concluido(area_atual),
+                area=area_atual, usar_resumos=area_atual == 0 or 0 not in areas or len(areas) == 1,
+                lsdb_compacta=lsdb_compacta)
+            if self._coordenador_areas is not None:
+                self._coordenador_areas.registrar(area_atual, self._estados_area[area_atual])
+        self._estado_roteador = self._estados_area[area]
+        if transporte is None:
+            with em_namespace(namespace):
+                transporte = TransporteUDP()
+        self._transporte = transporte
+        intervalo_morto = intervalo_morto if intervalo_morto is not None else 4 * intervalo_envio
+        self._gerenciador_vizinhos = GerenciadorVizinhos(
+            router_id, self._vizinhos, self._vizinhos_reconhecidos, self._codecs_vizinhos,
+            intervalo_morto,
+            intervalo_eco, multiplicador_eco, temporizador,
+            ao_ativar=self._adjacencia_ativada, ao_desfazer=self._adjacencia_desfeita)
         self._emissor_hello = EmissorPacoteHello(
-            router_id, self._interfaces, self._vizinhos, intervalo_envio, porta_comunicacao)
-        self._emissor_lsa = EmissorPacoteLSA(router_id, self._vizinhos_reconhecidos, self._vizinhos, self._interfaces, self._estado_roteador, intervalo_envio, porta_comunicacao)
+            router_id, self._interfaces, self._gerenciador_vizinhos.adjacencias, intervalo_envio, porta_comunicacao,
+            self._codec, self._codecs_vizinhos, self._transporte, self._metricas, intervalo_hello_rapido,
+            intervalo_hello_maximo if intervalo_hello_maximo is not None else intervalo_morto / 3,
+            esperados=len(self._custos_enlaces))
+        self._gerenciador_vizinhos._emissor_hello = self._emissor_hello
+        self._emissores_lsa = {}
+        for area_atual, estado in self._estados_area.items():
+            self._emissores_lsa[area_atual] = EmissorPacoteLSA(
+                router_id, self._vizinhos_reconhecidos, self._vizinhos, self._interfaces, estado, intervalo_envio,
+                porta_comunicacao, self._codec, self._codecs_vizinhos, self._transporte,
+                intervalo_refresh_lsa, temporizador=temporizador, metricas=self._metricas,
+                redes_anunciadas=[ipaddress.IPv4Network(rede) for rede in (redes_anunciadas or [])],
+                ao_originar=self._estado_alterado, area=area_atual,
+                areas_enlaces=self._areas_enlaces if self._coordenador_areas is not None else None,
+                anunciar_enderecos=area_atual == area,
+                resumos=(None if self._coordenador_areas is None
+                         else lambda area_atual=area_atual: self._coordenador_areas.resumos(area_atual)),
+                deltas=lsa_delta)
+        self._emissor_lsa = self._emissores_lsa[area]
+        if arquivo_estado:
+            self._persistencia = PersistenciaEstado(arquivo_estado, self._estado_persistente, intervalo_persistencia,
+                                                    temporizador)
+            self._restaurar_estado(idade_maxima_lsa, intervalo_morto)
+        self._registrar_medidores()
+
+    def _estado_alterado(self):
+        if self._persistencia is not None:
+            self._persistencia.solicitar()
+
+    def _spf_area_concluido(self, area: int):
+        """Depois do SPF de uma área, uma borda confere se os resumos anunciados nas outras mudaram."""
+        self._estado_alterado()
+        if self._coordenador_areas is not None and self._coordenador_areas.borda:
+            for outra, emissor in self._emissores_lsa.items():
+                if outra != area:
+                    emissor.originar_se_necessario()
+
+    def _estado_persistente(self):
+        """
+        Returns:
+            dict: Estado gravado para o reinício a quente.
+        """
+        dados = self._estado_roteador.exportar_persistencia()
+        dados.update(id_rota=self._router_id, numero_sequencia=self._emissor_lsa.numero_sequencia,
+                     vizinhos=dict(self._estado_roteador._gateways_retomada, **self._vizinhos_reconhecidos))
+        if self._coordenador_areas is not None:
+            dados["area"] = self._area
+            dados["areas"] = {str(area): {"lsdb": estado.exportar_persistencia()["lsdb"],
+                                          "numero_sequencia": self._emissores_lsa[area].numero_sequencia}
+                              for area, estado in self._estados_area.items() if area != self._area}
+        return dados
+
+    def _restaurar_estado(self, idade_maxima: float, espera_vizinhos: float):
+        """
+        Retoma o estado gravado antes de um reinício, se ele for deste roteador e não for mais
+        velho que a idade máxima dos LSAs.
+
+        Returns:
+            bool: True se o estado foi restaurado.
+        """
+        dados = self._persistencia.carregar()
+        if dados is None:
+            return False
+        decorrido = max(0.0, time.time() - dados.get("salvo_em", 0))
+        if (dados.get("id_rota") != self._router_id or dados.get("area", 0) != self._area
+                or decorrido > idade_maxima):
+            self._log.aviso("Estado gravado ignorado (de %s, área %s, %.0fs atrás)",
+                            dados.get("id_rota"), dados.get("area", 0), decorrido)
+            return False
+        por_area = {int(area): gravado for area, gravado in dados.get("areas", {}).items()
+                    if int(area) in self._estados_area}
+        por_area[self._area] = dados
+        for area, gravado in por_area.items():
+            proprio = gravado["lsdb"].get(self._router_id)
+            self._emissores_lsa[area].retomar(gravado["numero_sequencia"], list(proprio["links"]) if proprio else [],
+                                              espera_vizinhos, self._estados_area[area].encerrar_retomada)
+        if self._coordenador_areas is not None:
+            self._coordenador_areas.aguardar(por_area)
+        # A área principal, que traz as rotas instaladas, é restaurada por último: as outras só
+        # guardam as rotas delas no coordenador, e o kernel é sincronizado uma única vez no fim.
+        for area, gravado in sorted(por_area.items(), key=lambda item: item[0] == self._area):
+            self._estados_area[area].restaurar(gravado["lsdb"], dados["rotas"] if area == self._area else {},
+                                               dados["vizinhos"], decorrido)
+        self._log.info("Estado restaurado: %d LSAs, %d rotas, seq %s (gravado %.1fs atrás)",
+                       len(dados["lsdb"]), len(dados["rotas"]), dados["numero_sequencia"], decorrido)
+        return True
+
+    def _carregar_custos(self, arquivo_vizinhos: str):
+        if os.path.exists(arquivo_vizinhos):
+            return carregar_custos_vizinhos(arquivo_vizinhos)
+        self._log.aviso("%s não encontrado; lendo conexoes_rede.csv", arquivo_vizinhos)
+        return extrair_custos_vizinhos("conexoes_rede.csv", self._router_id)
+
+    def _registrar_medidores(self):
+        """Registra os valores lidos de outros objetos apenas quando as métricas são exportadas."""
+        estado = self._estado_roteador
+        estados = list(self._estados_area.values())
+        medidores = [
+            ("lsdb_entradas", "gauge", "Entradas nas LSDBs de todas as áreas.",
+             lambda: sum(e.tamanho_lsdb() for e in estados)),
+            ("lsdb_versao", "gauge", "Versão atual da LSDB da área principal.", lambda: estado._versao),
+            ("lsa_refrescos_total", "counter", "LSAs aceitos sem mudança de conteúdo (sem SPF).",
+             lambda: sum(e.refrescos for e in estados)),
+            ("lsa_expirados_total", "counter", "LSAs descartados por idade.", lambda: sum(e.expirados for e in estados)),
+            ("lsa_originados_total", "counter", "LSAs originados por este roteador.",
+             lambda: sum(emissor.originados for emissor in self._emissores_lsa.values())),
+            ("lsa_deltas_originados_total", "counter", "LSAs originados como delta sobre o anterior.",
+             lambda: sum(emissor.deltas_originados for emissor in self._emissores_lsa.values())),
+            ("lsa_deltas_aplicados_total", "counter", "LSAs delta recebidos e aplicados na LSDB.",
+             lambda: sum(e.deltas for e in estados)),
+            ("lsa_deltas_sem_base_total", "counter", "LSAs delta recusados por falta da base (ou checksum).",
+             lambda: sum(e.deltas_sem_base for e in estados)),
+            ("lsa_pedidos_enviados_total", "counter", "Pedidos de LSA completo (LSA_REQ) enviados.",
+             lambda: sum(emissor.pedidos_enviados for emissor in self._emissores_lsa.values())),
+            ("lsa_pedidos_atendidos_total", "counter", "Pedidos de LSA completo atendidos.",
+             lambda: sum(emissor.pedidos_atendidos for emissor in self._emissores_lsa.values())),
+            ("areas", "gauge", "Áreas em que o roteador participa.", lambda: len(estados)),
+            ("hello_intervalo_segundos", "gauge", "Intervalo atual entre HELLOs periódicos.",
+             lambda: self._emissor_hello.intervalo_atual),
+            ("roda_disparos_total", "counter", "Despertares da roda de temporização.", lambda: self._roda.disparos),
+            ("log_descartados_total", "counter", "Eventos de log perdidos com a fila de escrita cheia.",
+             lambda: REGISTRO.descartados),
+            ("log_amostrados_total", "counter", "Eventos de log omitidos da saída pela amostragem.",
+             lambda: REGISTRO.amostrados),
+            ("rotas_instaladas", "gauge", "Rotas instaladas no kernel.", lambda: len(estado._programador_rotas.instaladas)),
+            ("vizinhos_ativos", "gauge", "Adjacências ativas.", lambda: len(self._vizinhos_reconhecidos)),
+            ("adjacencias_desfeitas_total", "counter", "Adjacências desfeitas por falta de HELLO ou eco.",
+             lambda: self._gerenciador_vizinhos.quedas),
+            ("spf_solicitacoes_total", "counter", "Pedidos de SPF recebidos pelo agendador.", lambda: self._agendador_spf.solicitacoes),
+            ("spf_execucoes_total", "counter", "Execuções do SPF.", lambda: self._agendador_spf.execucoes),
+            ("spf_agrupadas_total", "counter", "Pedidos de SPF absorvidos por uma execução já agendada.",
+             lambda: self._agendador_spf.agrupadas),
+        ]
+        if self._persistencia is not None:
+            medidores.append(("estado_gravacoes_total", "counter", "Gravações do estado para reinício a quente.",
+                              lambda: self._persistencia.gravacoes))
+        for medidor in medidores:
+            self._metricas.registrar_medidor(*medidor)
+
+    def exportar_lsdb(self):
+        """
+        Returns:
+            dict: Versão e entradas do snapshot atual da LSDB.
+        """
+        snapshot = self._estado_roteador.snapshot()
+        lsdb = {"roteador": self._router_id, "versao": snapshot.versao, "entradas": dict(snapshot.entradas)}
+        if self._coordenador_areas is not None:
+            lsdb["area"] = self._area
+            lsdb["areas"] = {}
+            for area, estado in self._estados_area.items():
+                snapshot = estado.snapshot()
+                lsdb["areas"][area] = {"versao": snapshot.versao, "entradas": dict(snapshot.entradas)}
+        return lsdb
+
+    def exportar_rotas(self):
+        """
+        Returns:
+            dict: Resultado do último SPF e rotas instaladas.
+        """
+        rotas = dict(self._estado_roteador.exportar(), roteador=self._router_id)
+        if self._coordenador_areas is not None:
+            rotas["areas"] = {area: estado.exportar() for area, estado in self._estados_area.items()}
+        return rotas
+
+    def exportar_vizinhos(self):
+        """
+        Returns:
+            dict: Estado, IP, custo e RTT do eco de cada adjacência.
+        """
+        return {"roteador": self._router_id, "vizinhos": {
+            id_vizinho: {"estado": a.estado, "ip": a.ip, "custo": a.custo, "rtt": a.rtt}
+            for id_vizinho, a in list(self._gerenciador_vizinhos.adjacencias.items())}}
 
     def obter_interfaces_com_broadcast(self):
         """
         Obtém uma lista das interfaces de rede do sistema que possuem endereços IPv4 e
         informações de broadcast associadas.
-        Para interfaces com IPs que começam com "192.168.", a função converte o endereço IP
-        para o endereço da rede /24 correspondente (exemplo: 192.168.1.10 vira 192.168.1.0/24).
+        Para interfaces de hosts (IPs dentro de redes_hosts), a função converte o endereço IP
+        para o endereço da rede correspondente, com a máscara da interface (exemplo:
+        10.128.0.3 com máscara /24 vira 10.128.0.0/24).
         """
         interfaces = []
-        for nome, snics in psutil.net_if_addrs().items():
+        with em_namespace(self._namespace):
+            enderecos = psutil.net_if_addrs()
+        for nome, snics in enderecos.items():
             for snic in snics:
                 if snic.family == socket.AF_INET:
                     ip = snic.address
                     broadcast = snic.broadcast
 
-                    if(snic.address.startswith("192.168.")):
-                        ip = ipaddress.ip_address(ip)
-                        rede = ipaddress.IPv4Network(f"{ip}/24", strict=False)
-                        ip = f"{rede.network_address}/24"
+                    endereco = ipaddress.IPv4Address(ip)
+                    if any(endereco in rede for rede in self._redes_hosts):
+                        rede = ipaddress.IPv4Network(f"{ip}/{snic.netmask or '255.255.255.0'}", strict=False)
+                        ip = str(rede)
 
                     if ip and broadcast:
                         interfaces.append({
@@ -413,12 +4569,23 @@ class Roteador:
                         })
         return interfaces
 
-    def iniciar_comunicacao(self):
-        # Inicializa o envio de pacotes HELLO e LSA em threads separadas
-        threading.Thread(
-            target=self._emissor_hello.iniciar_emissao, daemon=True).start()
-        threading.Thread(
-            target=self._emissor_lsa.iniciar_emissao, daemon=True).start()
+    def iniciar_comunicacao(self, fase: float = None):
+        """
+        Registra na roda de temporização os HELLOs, a conferência dos LSAs de cada área e a
+        manutenção. Sem fase, cada tarefa começa em um instante sorteado do seu primeiro intervalo.
+        """
+        self._tarefas.append(self._emissor_hello.iniciar_emissao(self._roda, fase))
+        for emissor in self._emissores_lsa.values():
+            self._tarefas.append(emissor.iniciar_emissao(self._roda, fase))
+        self._tarefas.append(self._roda.periodico(self._intervalo_envio, self.manutencao, fase))
+
+    def parar_comunicacao(self):
+        """Encerra as tarefas periódicas, como em um desligamento do roteador."""
+        for tarefa in self._tarefas:
+            if tarefa is not None:
+                tarefa.cancel()
+        self._tarefas = []
+        self._roda.cancelar_todos()
 
     def processar_pacote(self, pacote):
         """
@@ -430,75 +4597,365 @@ class Roteador:
             self._processar_hello(pacote)
         elif tipo_pacote == "LSA":
             self._processar_lsa(pacote)
+        elif tipo_pacote == "ECO":
+            self._processar_eco(pacote)
+        elif tipo_pacote == "LSA_REQ":
+            self._processar_pedido_lsa(pacote)
             
     def _processar_hello(self, pacote):
         """Processa pacotes HELLO recebidos."""
         try:
             id_emissor = pacote["id_rota"]
             if id_emissor != self._router_id:  
-                print(f"[{self._router_id}] Recebido HELLO de {id_emissor}")
+                self._log_hello.debug("Recebido HELLO de %s", id_emissor)
                 
-                if self._grafo.has_edge(id_emissor, self._router_id):
-                    custo = self._grafo[id_emissor][self._router_id]["weight"]
-                    self._vizinhos[id_emissor] = custo
-                    
-                    if "ip_address" in pacote:
-                        self._vizinhos_reconhecidos[id_emissor] = pacote["ip_address"]
-                        print(f"[{self._router_id}] Registrado vizinho {id_emissor} - IP: {pacote['ip_address']}, Custo: {custo}")
+                custo = self._custos_enlaces.get(id_emissor)
+                if custo is not None and "ip_address" in pacote:
+                    self._gerenciador_vizinhos.receber_hello(
+                        id_emissor, pacote["ip_address"], custo,
+                        self._router_id in pacote.get("vizinhos_conhecidos", ()),
+                        set(pacote.get("codecs", [CodecPacotes.JSON])))
         except Exception as e:
-            print(f"[{self._router_id}] Erro ao processar HELLO: {e}")
-            traceback.print_exc()
-            
-    def _processar_lsa(self, pacote):
-        """Processa pacotes LSA recebidos."""
-        id_emissor = pacote["id_rota"]
-        
-        if id_emissor == self._router_id:
-            return
-        
-        print(f"[{self._router_id}] Recebido LSA de {id_emissor} (seq: {pacote['numero_sequencia']})")
-        
-        entrada_atual = self._estado_roteador._tabela_roteamento.get(id_emissor, {})
-        seq_atual = entrada_atual.get("numero_sequencia", -1)
-        seq_recebido = pacote["numero_sequencia"]
-        
-        if seq_recebido > seq_atual:
-            print(f"[{self._router_id}] Atualizando tabela com LSA de {id_emissor}")
-            self._estado_roteador.atualizar_tabela(pacote)
+            self._log_hello.excecao("Erro ao processar HELLO: %s", e)
+
+    def _emissor_do_enlace(self, id_vizinho: str):
+        return self._emissores_lsa[self._areas_enlaces.get(id_vizinho, self._area)]
+
+    def _adjacencia_ativada(self, id_vizinho: str):
+        """Anuncia o novo enlace e envia ao vizinho a LSDB da área do enlace."""
+        emissor = self._emissor_do_enlace(id_vizinho)
+        emissor.originar_se_necessario()
+        emissor.sincronizar_vizinho(id_vizinho)
+
+    def _adjacencia_desfeita(self, id_vizinho: str):
+        """Retira o enlace do LSA; o SPF disparado pelo novo LSA remove as rotas pelo vizinho."""
+        self._emissor_do_enlace(id_vizinho).originar_se_necessario()
+
+    def _processar_eco(self, pacote):
+        """Devolve as sondas de eco dos vizinhos ativos e entrega as respostas às nossas sondas."""
+        if pacote.get("resposta"):
+            if pacote["id_rota"] == self._router_id:
+                self._gerenciador_vizinhos.receber_eco(pacote)
+        elif pacote.get("destino") == self._router_id:
+            ip_vizinho = self._vizinhos_reconhecidos.get(pacote["id_rota"])
+            if ip_vizinho is not None:
+                self._emissor_hello.enviar_eco(pacote["id_rota"], ip_vizinho, pacote)
             
-            ip_remetente = pacote.get("ip_address")
-            if ip_remetente:
-                print(f"[{self._router_id}] Encaminhando LSA para outros vizinhos")
-                self._emissor_lsa.encaminhar_vizinhos(pacote, ip_remetente)
+    def _processar_pedido_lsa(self, pacote):
+        """Responde a um vizinho que recebeu um delta sem a base com os LSAs completos pedidos."""
+        emissor = self._emissores_lsa.get(pacote.get("area", 0))
+        if emissor is not None and pacote.get("id_rota") != self._router_id:
+            self._log_lsa.debug("Pedido de LSAs %s por %s", pacote.get("pedidos"), pacote.get("id_rota"))
+            emissor.responder_pedido(pacote["id_rota"], pacote.get("pedidos", []))
+
+    def _processar_lsa(self, pacote, endereco: tuple = None):
+        """Processa um pacote LSA recebido."""
+        self._processar_lsas([(pacote, endereco)])
+
+    def _processar_lsas(self, recebidos: list[tuple[dict, tuple]]):
+        """
+        Aplica na LSDB, em uma única atualização, os LSAs de um lote (no máximo um por
+        originador e área, ou um LSA seguido dos deltas sobre ele) e encaminha aos outros vizinhos da área os que foram aceitos. LSAs de
+        áreas das quais o roteador não participa são descartados.
+
+        Args:
+            recebidos (list[tuple[dict, tuple]]): Pares (LSA, endereço de quem o enviou).
+        """
+        por_area = {}
+        for pacote, endereco in recebidos:
+            id_emissor = pacote["id_rota"]
+            area = pacote.get("area", 0)
+            if area not in self._estados_area:
+                self._log_lsa.debug("LSA de %s da área %s ignorado", id_emissor, area)
+                continue
+            if id_emissor == self._router_id:
+                self._emissores_lsa[area].avancar_sequencia(pacote["numero_sequencia"])
+                continue
+            self._log_lsa.debug("Recebido LSA de %s (seq: %s)", id_emissor, pacote["numero_sequencia"])
+            por_area.setdefault(area, []).append((pacote, endereco))
+        for area, novos in por_area.items():
+            self._aceitar_lsas(area, novos)
+
+    def _aceitar_lsas(self, area: int, novos: list[tuple[dict, tuple]]):
+        aceitos = self._estados_area[area].atualizar_tabela_lote([pacote for pacote, _ in novos])
+        pedidos = {}
+        for (pacote, endereco), aceito in zip(novos, aceitos):
+            if aceito is None:
+                # Delta sem a base: não é encaminhado, e o LSA completo é pedido a quem o enviou.
+                ip_remetente = endereco[0] if endereco else pacote.get("ip_address")
+                if ip_remetente:
+                    pedidos.setdefault(ip_remetente, {})[pacote["id_rota"]] = pacote["numero_sequencia"]
+                continue
+            if not aceito:
+                self._log_lsa.debug("LSA antigo ignorado (%s seq %s)", pacote["id_rota"], pacote["numero_sequencia"])
+                continue
+            remetentes = [ip for ip in (pacote.get("ip_address"), endereco[0] if endereco else None) if ip]
+            if remetentes:
+                self._log_lsa.debug("Encaminhando LSA de %s para outros vizinhos", pacote["id_rota"])
+                self._emissores_lsa[area].encaminhar_vizinhos(pacote, *remetentes)
             else:
-                print(f"[{self._router_id}] LSA sem IP remetente, não encaminhado")
-        else:
-            print(f"[{self._router_id}] LSA antigo ignorado (seq {seq_recebido} <= {seq_atual})")
+                self._log_lsa.aviso("LSA de %s sem IP remetente, não encaminhado", pacote["id_rota"])
+        for ip_remetente, por_roteador in pedidos.items():
+            self._emissores_lsa[area].pedir_lsas(ip_remetente, por_roteador)
 
-    def receber_pacotes(self):
+    def manutencao(self):
+        """
+        Tarefas periódicas do roteador: descarta LSAs vencidos da LSDB e, quando as interfaces vêm
+        do sistema, relê os endereços locais para que uma mudança gere um novo LSA.
+        """
+        for estado in self._estados_area.values():
+            estado.expirar_lsas()
+        if self._interfaces_do_sistema:
+            interfaces = self.obter_interfaces_com_broadcast()
+            if interfaces != self._interfaces:
+                self._interfaces[:] = interfaces
+                self._emissor_hello._interface_por_ip.clear()
+                self._emissor_lsa.originar_se_necessario()
+
+    def processar_datagrama(self, data: bytes, address: tuple):
+        """
+        Decodifica um datagrama recebido e o processa.
+        """
+        self.processar_lote([(data, address)])
+
+    def _decodificar(self, data: bytes):
+        """
+        Returns:
+            dict | None: Pacote decodificado, ou None se o datagrama for inválido.
+        """
+        try:
+            inicio = time.perf_counter()
+            pacote = self._codec.decodificar(data)
+            self._metricas.observar("decodificacao_segundos", time.perf_counter() - inicio)
+        except Exception as e:
+            self._metricas.contar("erros_pacotes_total", "decodificacao")
+            self._log.aviso("Erro ao decodificar pacote: %s", e)
+            return None
+        if pacote is not None:
+            self._metricas.contar_pacote("recebidos", pacote.get("tipo", "?"),
+                                         len(data) if isinstance(data, bytes) else 0)
+        return pacote
+
+    def processar_lote(self, datagramas: list[tuple[bytes, tuple]]):
+        """
+        Processa de uma vez os datagramas lidos em um mesmo despertar do socket. HELLO e ECO
+        são tratados na ordem de chegada; dos LSAs, fica só o de maior número de sequência de
+        cada originador (em cada área), precedido dos LSAs do lote que formam a cadeia de bases
+        dele quando ele é um delta, e o conjunto passa por uma única atualização da LSDB e um
+        único SPF.
+
+        Args:
+            datagramas (list[tuple[bytes, tuple]]): Pares (dados, endereço de origem).
+        """
+        self._metricas.observar("lote_recepcao", len(datagramas))
+        lsas = {}
+        copias = {}
+        for data, address in datagramas:
+            pacote = self._decodificar(data)
+            if pacote is None:
+                continue
+            if pacote.get("tipo") == "LSA":
+                try:
+                    chave = (pacote.get("area", 0), pacote["id_rota"])
+                    por_sequencia = lsas.setdefault(chave, {})
+                    numero_sequencia = int(pacote["numero_sequencia"])
+                    atual = por_sequencia.get(numero_sequencia)
+                    # Entre cópias do mesmo LSA, a completa vale mais: não depende de base.
+                    if atual is None or ("base" in atual[0] and "base" not in pacote):
+                        por_sequencia[numero_sequencia] = (pacote, address)
+                    copias[chave] = copias.get(chave, 0) + 1
+                except (KeyError, TypeError) as e:
+                    self._metricas.contar("erros_pacotes_total", "processamento")
+                    self._log_lsa.aviso("LSA inválido: %s", e)
+                continue
+            try:
+                self.processar_pacote(pacote)
+            except Exception as e:
+                self._metricas.contar("erros_pacotes_total", "processamento")
+                self._log.excecao("Erro ao processar pacote: %s", e)
+
+        if lsas:
+            recebidos = []
+            for chave, por_sequencia in lsas.items():
+                cadeia = []
+                numero_sequencia = max(por_sequencia)
+                while numero_sequencia in por_sequencia:
+                    cadeia.append(por_sequencia[numero_sequencia])
+                    base = cadeia[-1][0].get("base")
+                    # Só bases anteriores: a cadeia fica estritamente decrescente e termina.
+                    if not isinstance(base, int) or base >= numero_sequencia:
+                        break
+                    numero_sequencia = base
+                recebidos.extend(reversed(cadeia))
+                for _ in range(copias[chave] - len(cadeia)):
+                    self._metricas.contar("lsas_agrupados_total", "LSA")
+            try:
+                self._processar_lsas(recebidos)
+            except Exception as e:
+                self._metricas.contar("erros_pacotes_total", "processamento")
+                self._log_lsa.excecao("Erro ao processar LSAs: %s", e)
+
+    def _abrir_socket(self):
         """
-        Método responsável por ouvir pacotes na rede e processá-los.
+        Abre o socket UDP de recepção com o buffer de recepção ampliado. SO_RCVBUFFORCE
+        (que exige CAP_NET_ADMIN, já concedido aos roteadores) ignora o teto net.core.rmem_max;
+        sem a permissão, vale o SO_RCVBUF comum, limitado pelo teto.
         """
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        with em_namespace(self._namespace):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._ampliar_buffer(sock, SO_RCVBUFFORCE, socket.SO_RCVBUF)
         sock.bind(("", self._porta_comunicacao))
+        self._log.info("Buffer de recepção: %d bytes", sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+        self._metricas.registrar_medidor(
+            "buffer_recepcao_bytes", "gauge", "Tamanho efetivo do buffer de recepção do socket UDP.",
+            lambda: sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+        self._metricas.registrar_medidor(
+            "descartes_kernel_total", "counter", "Datagramas descartados pelo kernel com o buffer de recepção cheio.",
+            lambda: self._descartes_kernel(sock))
+        return sock
+
+    def _ampliar_buffer(self, sock: socket.socket, opcao_forcada: int, opcao: int):
+        if self._buffer_recepcao:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, opcao_forcada, self._buffer_recepcao)
+            except OSError:
+                sock.setsockopt(socket.SOL_SOCKET, opcao, self._buffer_recepcao)
+
+    def _descartes_kernel(self, sock: socket.socket):
+        # /proc/net/udp só lista os sockets do namespace de quem lê.
+        with em_namespace(self._namespace):
+            return ler_descartes_udp(sock) or 0
+
+    def _ler_lote(self, sock: socket.socket, primeiro: tuple = None):
+        """
+        Lê sem bloquear todos os datagramas já enfileirados no socket, até tamanho_lote.
+
+        Returns:
+            list[tuple[bytes, tuple]]: Pares (dados, endereço de origem).
+        """
+        lote = [] if primeiro is None else [primeiro]
+        while len(lote) < self._tamanho_lote:
+            try:
+                lote.append(sock.recvfrom(65535, socket.MSG_DONTWAIT))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                self._erro_recepcao(e)
+                break
+        return lote
+
+    def _erro_recepcao(self, erro: OSError):
+        self._metricas.contar("erros_pacotes_total", "recepcao")
+        self._log.excecao("Erro ao receber pacote: %s", erro)
+
+    def receber_pacotes(self):
+        """
+        Método responsável por ouvir pacotes na rede e processá-los. Cada despertar bloqueia
+        só até o primeiro datagrama e então esvazia a fila do socket em um lote.
+        """
+        sock = self._abrir_socket()
 
         while True:
             try:
-                data, address = sock.recvfrom(4096)
-                pacote = json.loads(data.decode("utf-8"))
-                if pacote is not None:
-                    self.processar_pacote(pacote)
-            except Exception as e:
-                
-                print(f"[{self._router_id}] Erro ao processar pacote: {e}")
-                traceback.print_exc()
+                primeiro = sock.recvfrom(65535)
+            except OSError as e:
+                # Um erro de um datagrama (ICMP repassado pelo kernel, por exemplo) não pode
+                # derrubar a thread de recepção; só um socket fechado a encerra.
+                if sock.fileno() < 0:
+                    return
+                self._erro_recepcao(e)
+                continue
+            self.processar_lote(self._ler_lote(sock, primeiro))
+
+    def _drenar_socket(self, sock: socket.socket):
+        lote = self._ler_lote(sock)
+        if lote:
+            self.processar_lote(lote)
+
+    def iniciar_servidor_metricas(self):
+        if self._porta_metricas and self._servidor_metricas is None:
+            self._servidor_metricas = ServidorMetricas(self, self._porta_metricas, self._endereco_metricas)
+            with em_namespace(self._namespace):
+                self._servidor_metricas.iniciar()
 
     def iniciar(self):
         threading.Thread(target=self.receber_pacotes, daemon=True).start()
+        self.iniciar_servidor_metricas()
         self.iniciar_comunicacao()
+        threading.Event().wait()
 
-        while True:
-            time.sleep(25)
+    async def executar_async(self):
+        """
+        Executa o roteador em um único loop asyncio: um socket UDP reaproveitado durante toda
+        a execução para receber e enviar, e a roda de temporização, acionada pelo loop, no lugar
+        das threads de HELLO, LSA e SPF. O número de threads não cresce com a quantidade de
+        interfaces ou vizinhos.
+        O socket é lido diretamente pelo loop, que a cada despertar esvazia a fila em um lote.
+        """
+        loop = asyncio.get_running_loop()
+        sock = self._abrir_socket()
+        sock.setblocking(False)
+        # Sem bloqueio, uma rajada maior que o buffer de envio (a LSDB inteira mandada a um
+        # vizinho novo) falharia com EAGAIN; o buffer de envio ganha o mesmo tamanho do de recepção.
+        self._ampliar_buffer(sock, SO_SNDBUFFORCE, socket.SO_SNDBUF)
+        loop.add_reader(sock.fileno(), self._drenar_socket, sock)
+
+        envio = TransporteUDP(sock)
+        self._transporte = envio
+        self._emissor_hello.definir_transporte(envio)
+        temporizador = TemporizadorAsyncio(loop)
+        self._agendador_spf.definir_temporizador(temporizador)
+        for emissor in self._emissores_lsa.values():
+            emissor.definir_transporte(envio)
+            emissor.definir_temporizador(temporizador)
+        self._gerenciador_vizinhos.definir_temporizador(temporizador)
+        self._roda.definir_temporizador(temporizador)
+        self.iniciar_servidor_metricas()
+        self.iniciar_comunicacao()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.parar_comunicacao()
+            loop.remove_reader(sock.fileno())
+            sock.close()
+
+    def iniciar_asyncio(self):
+        asyncio.run(self.executar_async())
+
+
+def parametros_ambiente(ambiente=None):
+    """
+    Converte as variáveis de ambiente do roteador (as do docker-compose.yml gerado pelo
+    gerar_composer.py) nos parâmetros de Roteador. Também é usada pelo supervisor.py, que
+    monta o ambiente de cada roteador a partir do manifesto dos namespaces.
+
+    Args:
+        ambiente (Mapping[str, str]): Variáveis a usar; por padrão, as do processo.
+
+    Returns:
+        dict: Parâmetros nomeados de Roteador, sem o router_id.
+    """
+    ambiente = os.environ if ambiente is None else ambiente
+    intervalo_eco = ambiente.get("INTERVALO_ECO")
+    intervalo_hello_rapido = ambiente.get("INTERVALO_HELLO_RAPIDO")
+    intervalo_hello_maximo = ambiente.get("INTERVALO_HELLO_MAXIMO")
+    return dict(modo_codec=ambiente.get("CODEC_PACOTES", "auto"),
+                intervalo_eco=float(intervalo_eco) if intervalo_eco else None,
+                porta_metricas=int(ambiente.get("PORTA_METRICAS", "9100")),
+                endereco_metricas=ambiente.get("ENDERECO_METRICAS", "127.0.0.1"),
+                buffer_recepcao=int(ambiente.get("BUFFER_RECEPCAO", str(4 * 1024 * 1024))),
+                redes_hosts=ambiente.get("REDES_HOSTS", "192.168.0.0/16").split(","),
+                arquivo_vizinhos=ambiente.get("ARQUIVO_VIZINHOS", "vizinhos.csv"),
+                max_caminhos_ecmp=int(ambiente.get("MAX_CAMINHOS_ECMP", "4")),
+                agregar_rotas=ambiente.get("AGREGAR_ROTAS", "0") == "1",
+                redes_anunciadas=[rede for rede in ambiente.get("REDES_ANUNCIADAS", "").split(",") if rede],
+                arquivo_estado=ambiente.get("ARQUIVO_ESTADO", "estado.json") or None,
+                area=int(ambiente.get("AREA", "0")),
+                intervalo_hello_rapido=float(intervalo_hello_rapido) if intervalo_hello_rapido else None,
+                intervalo_hello_maximo=float(intervalo_hello_maximo) if intervalo_hello_maximo else None,
+                lsa_delta=ambiente.get("LSA_DELTA", "1") == "1",
+                lsdb_compacta=ambiente.get("LSDB_COMPACTA", "0") == "1")
 
 
 if __name__ == "__main__":
@@ -507,5 +4964,12 @@ if __name__ == "__main__":
         raise ValueError(
             "CONTAINER  NÃO ENCONTRADO."
         )
-    roteador = Roteador(router_id)
-    roteador.iniciar()
+    REGISTRO.configurar(nivel=os.getenv("LOG_NIVEL", "INFO"), nivel_anel=os.getenv("LOG_NIVEL_ANEL", "DEBUG"),
+                        tamanho_anel=int(os.getenv("LOG_ANEL", "10000")), formato=os.getenv("LOG_FORMATO", "texto"),
+                        amostragem=os.getenv("LOG_AMOSTRAGEM", ""))
+    REGISTRO.instalar_sinal()
+    roteador = Roteador(router_id, **parametros_ambiente())
+    if os.getenv("RUNTIME", "threads") == "asyncio":
+        roteador.iniciar_asyncio()
+    else:
+        roteador.iniciar()
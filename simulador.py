@@ -0,0 +1,716 @@
+import argparse
+import contextlib
+import csv
+import gc
+import heapq
+import ipaddress
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ]
+
+import networkx as nx
+
+import router as modulo_roteador
+from router import BackendRotasMemoria, ProgramadorRotas, Roteador
+
+"""
+Simulador de eventos discretos que executa muitos roteadores em um único processo para
+medir a convergência do protocolo em topologias grandes, sem Docker.
+
+Cada roteador é uma instância real de 'Roteador' / 'EstadoRoteador'. O simulador apenas
+substitui o que depende do sistema:
+- Sockets UDP por um transporte virtual que entrega os datagramas com atraso configurável.
+- O relógio e as threads por um relógio virtual com fila de eventos.
+- A descoberta de interfaces via psutil por interfaces geradas a partir da topologia.
+- O 'ip route' por um backend de rotas em memória.
+
+A topologia vem do mesmo gerador Watts–Strogatz do gerar_composer.py ou de um arquivo no
+formato do 'conexoes_rede.csv'. Com --areas, a topologia é dividida em áreas como no
+gerar_composer.py; como as rotas entre áreas são resumidas, a conferência final deixa de
+comparar distâncias com o networkx e passa a seguir os pacotes pelas FIBs (sem laços nem
+destinos sem rota), medindo o esticamento dos caminhos em relação ao ótimo.
+
+Uso:
+    python simulador.py --roteadores 1000
+    python simulador.py --roteadores 2000 --areas 8
+    python simulador.py --csv router/conexoes_rede.csv --json
+"""
+
+
+class EventoVirtual:
+    """
+    Evento agendado no relógio virtual. Pode ser cancelado antes de ocorrer.
+    """
+    __slots__ = ["cancelado"]
+
+    def __init__(self):
+        self.cancelado = False
+
+    def cancel(self):
+        self.cancelado = True
+
+
+class RelogioVirtual:
+    """
+    Relógio virtual com fila de eventos. Implementa a mesma interface dos temporizadores do
+    roteador (agora() e agendar()), então o AgendadorSPF funciona sem alterações.
+
+    Atributos:
+        _agora (float): Tempo virtual atual, em segundos.
+        _eventos (list): Heap de eventos (tempo, ordem, evento, função, argumentos).
+        _ordem (int): Desempate estável entre eventos no mesmo instante.
+        eventos_processados (int): Total de eventos executados.
+    """
+    __slots__ = ["_agora", "_eventos", "_ordem", "eventos_processados"]
+
+    def __init__(self):
+        self._agora = 0.0
+        self._eventos = []
+        self._ordem = 0
+        self.eventos_processados = 0
+
+    def agora(self):
+        return self._agora
+
+    def agendar(self, atraso: float, funcao, *args):
+        evento = EventoVirtual()
+        self._ordem += 1
+        heapq.heappush(self._eventos, (self._agora + atraso, self._ordem, evento, funcao, args))
+        return evento
+
+    def executar_ate(self, limite: float):
+        """
+        Executa todos os eventos com tempo menor ou igual ao limite e avança o relógio até ele.
+        """
+        eventos = self._eventos
+        while eventos and eventos[0][0] <= limite:
+            tempo, _, evento, funcao, args = heapq.heappop(eventos)
+            if evento.cancelado:
+                continue
+            self._agora = tempo
+            self.eventos_processados += 1
+            funcao(*args)
+        self._agora = limite
+
+
+class CodecVirtual:
+    """
+    Codec que entrega o próprio dicionário do pacote, sem serializar. Como os roteadores nunca
+    alteram um pacote recebido, o mesmo objeto pode ser compartilhado com segurança.
+    """
+    __slots__ = []
+
+    JSON = "json"
+
+    def codecs_suportados(self):
+        return [self.JSON]
+
+    def usar_binario(self, codecs_vizinhos):
+        return False
+
+    def codificar(self, pacote, binario):
+        return pacote
+
+    def decodificar(self, dados):
+        return dados
+
+
+class BackendRotasSimulado(BackendRotasMemoria):
+    """
+    Backend de rotas em memória que registra quando as rotas de um roteador mudaram pela última vez.
+
+    Atributos:
+        relogio (RelogioVirtual): Relógio usado para marcar as alterações.
+        ultima_alteracao (float): Instante virtual do último lote de rotas aplicado.
+    """
+    __slots__ = ["relogio", "ultima_alteracao"]
+
+    def __init__(self, relogio: RelogioVirtual):
+        super().__init__()
+        self.relogio = relogio
+        self.ultima_alteracao = 0.0
+
+    def executar(self, operacoes):
+        self.ultima_alteracao = self.relogio.agora()
+        return super().executar(operacoes)
+
+
+class RedeVirtual:
+    """
+    Transporte virtual compartilhado: resolve o IP de destino (unicast ou broadcast de um enlace)
+    para os roteadores que devem receber o datagrama e agenda a entrega no relógio virtual.
+
+    Como no socket real, os datagramas que chegam a um roteador no mesmo instante ficam na fila
+    dele e são entregues juntos, em um único Roteador.processar_lote().
+
+    Atributos:
+        _relogio (RelogioVirtual): Relógio onde as entregas são agendadas.
+        _atraso (float): Atraso de propagação de cada enlace, em segundos.
+        _roteadores (dict[str, Roteador]): Roteadores da simulação por ID.
+        _por_ip (dict[str, tuple[str, str]]): Roteador dono de cada IP e o broadcast do seu enlace.
+        _por_broadcast (dict[str, list[str]]): Roteadores presentes em cada domínio de broadcast.
+        _ip_origem (dict[tuple[str, str], str]): IP de origem de cada roteador em cada domínio de broadcast.
+        _filas (dict[str, list]): Datagramas aguardando a próxima leitura de cada roteador.
+        enviados (dict[str, int]): Mensagens enviadas por roteador.
+        entregues (int): Total de mensagens entregues.
+    """
+    __slots__ = ["_relogio", "_atraso", "_roteadores", "_por_ip", "_por_broadcast", "_ip_origem",
+                 "_filas", "enviados", "entregues"]
+
+    def __init__(self, relogio: RelogioVirtual, atraso: float):
+        self._relogio = relogio
+        self._atraso = atraso
+        self._roteadores = {}
+        self._por_ip = {}
+        self._por_broadcast = {}
+        self._ip_origem = {}
+        self._filas = {}
+        self.enviados = {}
+        self.entregues = 0
+
+    def registrar(self, id_roteador: str, roteador: Roteador, interfaces: list[dict[str, str]]):
+        self._roteadores[id_roteador] = roteador
+        self.enviados[id_roteador] = 0
+        for interface in interfaces:
+            self._por_ip[interface["address"]] = (id_roteador, interface["broadcast"])
+            self._por_broadcast.setdefault(interface["broadcast"], []).append(id_roteador)
+            self._ip_origem[(id_roteador, interface["broadcast"])] = interface["address"]
+
+    def transporte(self, id_roteador: str):
+        return TransporteVirtual(self, id_roteador)
+
+    def enviar(self, origem: str, dados, destino: tuple):
+        self.enviados[origem] += 1
+        ip, porta = destino
+        dono = self._por_ip.get(ip)
+        if dono is not None:
+            destinatarios = (dono[0],)
+            broadcast = dono[1]
+        else:
+            destinatarios = self._por_broadcast.get(ip, ())
+            broadcast = ip
+        endereco = (self._ip_origem.get((origem, broadcast), "0.0.0.0"), porta)
+        for id_destino in destinatarios:
+            if id_destino != origem:
+                self._relogio.agendar(self._atraso, self._entregar, id_destino, dados, endereco)
+
+    def _entregar(self, id_destino: str, dados, endereco: tuple):
+        self.entregues += 1
+        fila = self._filas.get(id_destino)
+        if fila is None:
+            fila = self._filas[id_destino] = []
+            self._relogio.agendar(0, self._ler_fila, id_destino)
+        fila.append((dados, endereco))
+
+    def _ler_fila(self, id_destino: str):
+        fila = self._filas.pop(id_destino)
+        roteador = self._roteadores[id_destino]
+        if roteador is not None:
+            roteador.processar_lote(fila)
+
+    def desligar(self, id_roteador: str):
+        """Tira o roteador da rede: os datagramas destinados a ele passam a ser descartados."""
+        self._roteadores[id_roteador] = None
+
+    def religar(self, id_roteador: str, roteador: Roteador):
+        """Recoloca um roteador já registrado na rede, com as mesmas interfaces."""
+        self._roteadores[id_roteador] = roteador
+
+    def dono(self, ip: str):
+        """
+        Returns:
+            str | None: Roteador que tem o IP em uma de suas interfaces.
+        """
+        dono = self._por_ip.get(ip)
+        return dono[0] if dono is not None else None
+
+
+class TransporteDesligado:
+    """Transporte de um roteador que saiu da rede; descarta tudo o que ele ainda tentar enviar."""
+    __slots__ = []
+
+    def enviar(self, dados, destino: tuple):
+        pass
+
+
+class TransporteVirtual:
+    """
+    Transporte de um roteador na rede virtual, com a mesma interface do TransporteUDP.
+    """
+    __slots__ = ["_rede", "_origem"]
+
+    def __init__(self, rede: RedeVirtual, origem: str):
+        self._rede = rede
+        self._origem = origem
+
+    def enviar(self, dados, destino: tuple):
+        self._rede.enviar(self._origem, dados, destino)
+
+
+def carregar_topologia_csv(caminho: str):
+    """
+    Lê um arquivo no formato do 'conexoes_rede.csv'.
+
+    Returns:
+        tuple[nx.Graph, dict[str, int]]: Grafo de roteadores com os custos e a quantidade de hosts por roteador.
+    """
+    grafo = nx.Graph()
+    hosts = {}
+    with open(caminho, newline='') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            if linha['Custo'] == '-':
+                hosts[linha['Destino']] = hosts.get(linha['Destino'], 0) + 1
+                grafo.add_node(linha['Destino'])
+            else:
+                grafo.add_edge(linha['Origem'], linha['Destino'], weight=int(linha['Custo']))
+    return grafo, hosts
+
+
+def gerar_topologia(num_roteadores: int, grau: int, probabilidade: float, semente: int, hosts_por_roteador: int,
+                    areas: int = 1):
+    """
+    Gera a topologia com o mesmo gerador Watts–Strogatz do gerar_composer.py, usando os nomes
+    'routerN' e mantendo as áreas de roteadores e enlaces, se houver.
+    """
+    from gerar_composer import gerar_grafo
+
+    base = gerar_grafo(num_roteadores, k=grau, p=probabilidade, semente=semente, areas=areas)
+    grafo = nx.Graph()
+    for r, dados in base.nodes(data=True):
+        grafo.add_node(f"router{r + 1}", **dados)
+    for u, v, dados in base.edges(data=True):
+        grafo.add_edge(f"router{u + 1}", f"router{v + 1}", **dados)
+    return grafo, {roteador: hosts_por_roteador for roteador in grafo.nodes()}
+
+
+def montar_interfaces(grafo: nx.Graph, hosts: dict[str, int]):
+    """
+    Atribui endereços virtuais com o mesmo alocador do gerar_composer.py: uma sub-rede /29 por
+    enlace e uma /24 por rede de host.
+
+    Returns:
+        dict[str, list[dict[str, str]]]: Interfaces de cada roteador, no formato de obter_interfaces_com_broadcast().
+    """
+    from gerar_composer import POOL_ENLACES, POOL_HOSTS, AlocadorEnderecos
+
+    interfaces = {roteador: [] for roteador in grafo.nodes()}
+    redes_hosts = AlocadorEnderecos(POOL_HOSTS, 24)
+    redes_hosts.reservar(sum(hosts.values()), "as redes de hosts")
+    indice = 0
+    for roteador in grafo.nodes():
+        for _ in range(hosts.get(roteador, 0)):
+            interfaces[roteador].append({
+                "interface": f"host{len(interfaces[roteador])}",
+                "address": redes_hosts.sub_rede(indice),
+                "broadcast": redes_hosts.broadcast(indice),
+            })
+            indice += 1
+
+    redes_enlaces = AlocadorEnderecos(POOL_ENLACES, 29)
+    redes_enlaces.reservar(grafo.number_of_edges(), "os enlaces")
+    for i, (u, v) in enumerate(grafo.edges()):
+        for posicao, roteador in enumerate((u, v)):
+            interfaces[roteador].append({
+                "interface": f"eth{len(interfaces[roteador])}",
+                "address": redes_enlaces.endereco(i, posicao),
+                "broadcast": redes_enlaces.broadcast(i),
+            })
+    return interfaces
+
+
+class Simulador:
+    """
+    Monta e executa a simulação de uma topologia completa.
+
+    Atributos:
+        _grafo (nx.Graph): Topologia de roteadores com os custos dos enlaces.
+        _relogio (RelogioVirtual): Relógio virtual da simulação.
+        _rede (RedeVirtual): Transporte virtual compartilhado.
+        _roteadores (dict[str, Roteador]): Roteadores simulados.
+        _backends (dict[str, BackendRotasSimulado]): Backend de rotas de cada roteador.
+        _rotas_esperadas (dict[str, int]): Quantidade de rotas que cada roteador deve ter ao convergir.
+        _geracoes (dict[str, int]): Quantas vezes cada roteador foi (re)criado.
+        _diretorio_estado (str): Diretório dos arquivos de estado para o reinício a quente, ou None.
+        _com_areas (bool): A topologia é dividida em áreas; as rotas entre áreas são resumidas, então
+            a FIB completa é conferida pela cobertura dos endereços, e não pela quantidade de rotas.
+        _enderecos (list[tuple[int, int, str]]): Endereço, tamanho de prefixo e dono de cada
+            interface, usados na conferência da cobertura e do encaminhamento.
+        _completos (dict[str, float]): Instante da última alteração de rotas em que a cobertura de
+            cada roteador foi confirmada.
+        _lsdb_compacta (bool): Os roteadores rodam o SPF sobre a LSDB compacta (GrafoCSR).
+    """
+
+    def __init__(self, grafo: nx.Graph, hosts: dict[str, int], intervalo_envio: float = 10,
+                 atraso_enlace: float = 0.001, codec: str = "virtual", semente: int = 0,
+                 diretorio_estado: str = None, lsdb_compacta: bool = False):
+        self._grafo = grafo
+        self._relogio = RelogioVirtual()
+        self._rede = RedeVirtual(self._relogio, atraso_enlace)
+        self._roteadores = {}
+        self._backends = {}
+        self._geracoes = {}
+        self._intervalo_envio = intervalo_envio
+        self._codec = codec
+        self._diretorio_estado = diretorio_estado
+        self._lsdb_compacta = lsdb_compacta
+        self._aleatorio = random.Random(semente)
+
+        self._interfaces = montar_interfaces(grafo, hosts)
+        total_enderecos = sum(len(lista) for lista in self._interfaces.values())
+        self._rotas_esperadas = {roteador: total_enderecos - len(self._interfaces[roteador])
+                                 for roteador in grafo.nodes()}
+        self._com_areas = any("area" in dados for _, dados in grafo.nodes(data=True))
+        self._enderecos = []
+        for roteador, lista in self._interfaces.items():
+            for interface in lista:
+                rede = ipaddress.IPv4Network(interface["address"], strict=False)
+                self._enderecos.append((int(rede.network_address), rede.prefixlen, roteador))
+        self._completos = {}
+
+        for id_roteador in grafo.nodes():
+            self._criar_roteador(id_roteador)
+
+    def _criar_roteador(self, id_roteador: str):
+        backend = BackendRotasSimulado(self._relogio)
+        roteador = Roteador(
+            id_roteador,
+            intervalo_envio=self._intervalo_envio,
+            modo_codec="json" if self._codec == "virtual" else self._codec,
+            interfaces=self._interfaces[id_roteador],
+            custos_enlaces={vizinho: dados['weight'] for vizinho, dados in self._grafo[id_roteador].items()},
+            area=self._grafo.nodes[id_roteador].get("area", 0),
+            areas_enlaces={vizinho: dados['area'] for vizinho, dados in self._grafo[id_roteador].items()
+                           if 'area' in dados} or None,
+            programador_rotas=ProgramadorRotas(backend),
+            temporizador=self._relogio,
+            transporte=self._rede.transporte(id_roteador),
+            codec=CodecVirtual() if self._codec == "virtual" else None,
+            semente=self._aleatorio.randrange(2 ** 32),
+            arquivo_estado=(os.path.join(self._diretorio_estado, f"{id_roteador}.json")
+                            if self._diretorio_estado else None),
+            lsdb_compacta=self._lsdb_compacta,
+        )
+        self._roteadores[id_roteador] = roteador
+        self._backends[id_roteador] = backend
+        self._geracoes[id_roteador] = self._geracoes.get(id_roteador, -1) + 1
+        if self._geracoes[id_roteador] == 0:
+            self._rede.registrar(id_roteador, roteador, self._interfaces[id_roteador])
+        else:
+            self._rede.religar(id_roteador, roteador)
+        return roteador
+
+    def reiniciar(self, id_roteador: str, tempo_desligado: float, passo: float, tempo_maximo: float):
+        """
+        Derruba o roteador como em uma queda do processo (sem gravar nada na saída e perdendo as
+        rotas do kernel), recria-o depois de tempo_desligado e simula até ele e a rede voltarem
+        a ter todas as rotas. Com diretorio_estado, o roteador novo faz o reinício a quente a
+        partir do último estado gravado; sem ele, parte do zero.
+
+        Returns:
+            dict: Rotas instaladas logo após o reinício, mínimo de rotas do roteador durante a
+                recuperação, tempo até ele voltar a ter todas as rotas e tempo até a rede inteira
+                reconvergir, ambos contados a partir do reinício.
+        """
+        antigo = self._roteadores[id_roteador]
+        antigo._persistencia = None
+        antigo._emissor_hello.definir_transporte(TransporteDesligado())
+        for emissor in antigo._emissores_lsa.values():
+            emissor.definir_transporte(TransporteDesligado())
+        antigo.parar_comunicacao()
+        self._rede.desligar(id_roteador)
+        self._relogio.executar_ate(self._relogio.agora() + tempo_desligado)
+
+        instante = self._relogio.agora()
+        self._criar_roteador(id_roteador)
+        self._roteadores[id_roteador].iniciar_comunicacao(fase=0)
+        backend = self._backends[id_roteador]
+        esperadas = None if self._com_areas else self._rotas_esperadas[id_roteador]
+        rotas_iniciais = minimo = len(backend.rotas)
+        completas = 0.0 if self._rotas_completas(id_roteador) else None
+        convergiu = False
+        while self._relogio.agora() < instante + tempo_maximo:
+            self._relogio.executar_ate(self._relogio.agora() + passo)
+            minimo = min(minimo, len(backend.rotas))
+            if completas is None and self._rotas_completas(id_roteador):
+                completas = backend.ultima_alteracao - instante
+            if self._convergiu():
+                convergiu = True
+                break
+        return {
+            "reinicio_roteador": id_roteador,
+            "reinicio_quente": self._diretorio_estado is not None,
+            "reinicio_rotas_iniciais": rotas_iniciais,
+            "reinicio_rotas_minimo": minimo,
+            "reinicio_rotas_esperadas": esperadas,
+            "reinicio_convergiu": convergiu,
+            "tempo_rotas_completas": completas,
+            "tempo_reconvergencia": max(b.ultima_alteracao for b in self._backends.values()) - instante,
+        }
+
+    def _tabela_lpm(self, id_roteador: str):
+        """
+        Returns:
+            dict[int, dict[int, str | tuple[str]]]: Rotas do roteador por tamanho de prefixo
+                (prefixo -> endereço da rede, como inteiro -> gateway), do mais longo ao mais curto.
+        """
+        tabela = {}
+        for prefixo, gateway in self._backends[id_roteador].rotas.items():
+            rede = ipaddress.IPv4Network(prefixo, strict=False)
+            tabela.setdefault(rede.prefixlen, {})[int(rede.network_address)] = gateway
+        return dict(sorted(tabela.items(), reverse=True))
+
+    @staticmethod
+    def _buscar(tabela: dict, endereco: int, tamanho: int):
+        """Busca do prefixo mais longo que contém o bloco (endereco, tamanho)."""
+        for comprimento, redes in tabela.items():
+            if comprimento <= tamanho:
+                gateway = redes.get(endereco >> (32 - comprimento) << (32 - comprimento) if comprimento else 0)
+                if gateway is not None:
+                    return gateway
+        return None
+
+    def _rotas_completas(self, id_roteador: str):
+        """
+        Sem áreas, o roteador tem uma rota para cada endereço dos outros; com áreas, cada um desses
+        endereços precisa estar coberto por alguma rota (os resumos são supernets).
+        """
+        backend = self._backends[id_roteador]
+        if not self._com_areas:
+            return len(backend.rotas) == self._rotas_esperadas[id_roteador]
+        if self._completos.get(id_roteador) == backend.ultima_alteracao:
+            return True
+        tabela = self._tabela_lpm(id_roteador)
+        for endereco, tamanho, dono in self._enderecos:
+            if dono != id_roteador and self._buscar(tabela, endereco, tamanho) is None:
+                return False
+        self._completos[id_roteador] = backend.ultima_alteracao
+        return True
+
+    def _convergiu(self):
+        """
+        A rede convergiu quando todo roteador tem rotas para todos os endereços e nenhum SPF
+        pendente mudaria a topologia (restam apenas reanúncios com os mesmos links).
+        """
+        for roteador in self._roteadores.values():
+            if any(estado.alteracoes_pendentes() for estado in roteador._estados_area.values()):
+                return False
+        return all(self._rotas_completas(id_roteador) for id_roteador in self._backends)
+
+    def verificar(self, amostra: int):
+        """
+        Compara as distâncias calculadas por uma amostra de roteadores com o Dijkstra do networkx.
+
+        Returns:
+            list[str]: Roteadores cujas distâncias divergem da referência.
+        """
+        divergentes = []
+        roteadores = list(self._roteadores)
+        for id_roteador in self._aleatorio.sample(roteadores, min(amostra, len(roteadores))):
+            referencia = nx.single_source_dijkstra_path_length(self._grafo, id_roteador)
+            calculado = self._roteadores[id_roteador]._estado_roteador._distancias
+            if any(calculado.get(destino) != custo for destino, custo in referencia.items()):
+                divergentes.append(id_roteador)
+        return divergentes
+
+    def verificar_encaminhamento(self, amostra: int):
+        """
+        Segue pelas FIBs instaladas, a partir de uma amostra de roteadores, o caminho até cada
+        endereço da rede, por todos os gateways de cada rota ECMP, e compara o custo do pior
+        caminho com o do caminho mínimo no networkx.
+
+        Returns:
+            tuple[list[str], float, float]: Roteadores de onde algum endereço cai em um laço ou em
+                um roteador sem rota, e o esticamento médio e máximo (custo seguido / custo mínimo).
+        """
+        tabelas = {id_roteador: self._tabela_lpm(id_roteador) for id_roteador in self._backends}
+        divergentes = []
+        esticamentos = []
+        roteadores = list(self._roteadores)
+        for origem in self._aleatorio.sample(roteadores, min(amostra, len(roteadores))):
+            referencia = nx.single_source_dijkstra_path_length(self._grafo, origem)
+            falhou = False
+            for endereco, tamanho, dono in self._enderecos:
+                custos = {}
+
+                def custo_ate(roteador, caminho):
+                    """Pior custo daqui até o dono; None em laço ou sem rota."""
+                    if roteador == dono:
+                        return 0
+                    if roteador in caminho:
+                        return None
+                    if roteador not in custos:
+                        gateway = self._buscar(tabelas[roteador], endereco, tamanho)
+                        if gateway is None:
+                            custos[roteador] = None
+                            return None
+                        pior = 0
+                        for ip in gateway if isinstance(gateway, tuple) else (gateway,):
+                            proximo = self._rede.dono(ip)
+                            if proximo is None or not self._grafo.has_edge(roteador, proximo):
+                                pior = None
+                                break
+                            resto = custo_ate(proximo, caminho | {roteador})
+                            if resto is None:
+                                pior = None
+                                break
+                            pior = max(pior, self._grafo[roteador][proximo]["weight"] + resto)
+                        custos[roteador] = pior
+                    return custos[roteador]
+
+                custo = custo_ate(origem, frozenset())
+                if custo is None:
+                    falhou = True
+                elif referencia[dono] > 0:
+                    esticamentos.append(custo / referencia[dono])
+            if falhou:
+                divergentes.append(origem)
+        if not esticamentos:
+            return divergentes, 1.0, 1.0
+        return divergentes, sum(esticamentos) / len(esticamentos), max(esticamentos)
+
+    def executar(self, tempo_maximo: float = 300, passo: float = 0.5, amostra_verificacao: int = 20,
+                 tempo_estavel: float = 0, reiniciar: bool = False, tempo_desligado: float = 1.0,
+                 silenciar: bool = True):
+        """
+        Executa a simulação até todos os roteadores terem rotas completas ou até o tempo máximo.
+        Com tempo_estavel, continua por esse tempo depois da convergência e mede as mensagens e
+        execuções de SPF da rede já estável. Com reiniciar, em seguida derruba e recria um
+        roteador sorteado (ver reiniciar()) e acrescenta ao relatório a recuperação dele.
+
+        Com silenciar, o registro de eventos dos roteadores fica desligado (saída e anel): com
+        milhares de roteadores no mesmo processo, até os eventos de INFO custariam mais que a
+        própria simulação.
+
+        Returns:
+            dict: Relatório com tempo de convergência, mensagens e execuções de SPF.
+        """
+        inicio = time.perf_counter()
+        # Os objetos da simulação não formam ciclos; desligar o coletor evita varreduras
+        # repetidas sobre milhões de entradas de LSDB.
+        coletor_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            with modulo_roteador.REGISTRO.silenciado() if silenciar else contextlib.nullcontext():
+                for roteador in self._roteadores.values():
+                    roteador.iniciar_comunicacao()
+                convergiu = False
+                while self._relogio.agora() < tempo_maximo:
+                    self._relogio.executar_ate(self._relogio.agora() + passo)
+                    if self._convergiu():
+                        convergiu = True
+                        break
+                tempo_convergido = self._relogio.agora()
+                mensagens_convergido = sum(self._rede.enviados.values())
+                spf_convergido = sum(r._agendador_spf.execucoes for r in self._roteadores.values())
+                if convergiu and tempo_estavel > 0:
+                    self._relogio.executar_ate(tempo_convergido + tempo_estavel)
+                recuperacao = {}
+                if convergiu and reiniciar:
+                    recuperacao = self.reiniciar(self._aleatorio.choice(sorted(self._roteadores)),
+                                                 tempo_desligado, passo, tempo_maximo)
+        finally:
+            if coletor_ativo:
+                gc.enable()
+        tempo_parede = time.perf_counter() - inicio
+
+        enviados = list(self._rede.enviados.values())
+        execucoes_spf = [r._agendador_spf.execucoes for r in self._roteadores.values()]
+        agrupadas_spf = [r._agendador_spf.agrupadas for r in self._roteadores.values()]
+        return {
+            "roteadores": len(self._roteadores),
+            "enlaces": self._grafo.number_of_edges(),
+            "convergiu": convergiu,
+            "tempo_convergencia": max(b.ultima_alteracao for b in self._backends.values()),
+            "tempo_simulado": self._relogio.agora(),
+            "tempo_parede": tempo_parede,
+            "eventos": self._relogio.eventos_processados,
+            "mensagens_total": sum(enviados),
+            "mensagens_por_roteador_media": sum(enviados) / len(enviados),
+            "mensagens_por_roteador_max": max(enviados),
+            "spf_total": sum(execucoes_spf),
+            "spf_por_roteador_media": sum(execucoes_spf) / len(execucoes_spf),
+            "spf_por_roteador_max": max(execucoes_spf),
+            "spf_agrupados": sum(agrupadas_spf),
+            "mensagens_regime": sum(enviados) - mensagens_convergido,
+            "spf_regime": sum(execucoes_spf) - spf_convergido,
+            "tempo_regime": self._relogio.agora() - tempo_convergido,
+            **self._conferir(convergiu, amostra_verificacao),
+            **recuperacao,
+        }
+
+    def _conferir(self, convergiu: bool, amostra: int):
+        if not convergiu:
+            return {"divergentes": None}
+        if not self._com_areas:
+            return {"divergentes": self.verificar(amostra)}
+        divergentes, medio, maximo = self.verificar_encaminhamento(amostra)
+        lsdb = [sum(e.tamanho_lsdb() for e in r._estados_area.values()) for r in self._roteadores.values()]
+        return {"divergentes": divergentes, "esticamento_medio": medio, "esticamento_max": maximo,
+                "lsdb_por_roteador_media": sum(lsdb) / len(lsdb), "lsdb_por_roteador_max": max(lsdb)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula a convergência de uma topologia em um único processo.")
+    parser.add_argument("--csv", help="Arquivo no formato do conexoes_rede.csv. Se omitido, gera uma topologia.")
+    parser.add_argument("--roteadores", type=int, default=1000)
+    parser.add_argument("--grau", type=int, default=2, help="Parâmetro k do Watts–Strogatz.")
+    parser.add_argument("--prob-religacao", type=float, default=0.7, help="Parâmetro p do Watts–Strogatz.")
+    parser.add_argument("--hosts-por-roteador", type=int, default=2)
+    parser.add_argument("--areas", type=int, default=1,
+                        help="Divide a topologia gerada em áreas ligadas por um backbone (1: sem áreas).")
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--intervalo", type=float, default=10, help="Intervalo de HELLO/LSA, em segundos.")
+    parser.add_argument("--atraso-enlace", type=float, default=0.001)
+    parser.add_argument("--codec", choices=["virtual", "json", "binario", "auto"], default="virtual",
+                        help="'virtual' entrega os pacotes sem serializar; os demais usam o codec real.")
+    parser.add_argument("--tempo-maximo", type=float, default=300)
+    parser.add_argument("--verificar", type=int, default=20, help="Quantos roteadores conferir contra o networkx.")
+    parser.add_argument("--tempo-estavel", type=float, default=0,
+                        help="Segundos simulados após a convergência para medir o tráfego em regime.")
+    parser.add_argument("--reinicio", choices=["quente", "frio"],
+                        help="Após convergir, reinicia um roteador sorteado com ou sem o estado gravado.")
+    parser.add_argument("--tempo-desligado", type=float, default=1.0,
+                        help="Segundos simulados entre a queda e o reinício do roteador.")
+    parser.add_argument("--log", help="Nível do registro de eventos dos roteadores, escrito no stderr "
+                                      "(ex.: 'INFO' ou 'INFO,lsa=DEBUG'). Por padrão fica desligado.")
+    parser.add_argument("--lsdb-compacta", action="store_true",
+                        help="Roda o SPF dos roteadores sobre a LSDB compacta (IDs internados, adjacências em arrays).")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON.")
+    args = parser.parse_args()
+    if args.log:
+        modulo_roteador.REGISTRO.configurar(nivel=args.log, saida=sys.stderr)
+
+    if args.csv:
+        grafo, hosts = carregar_topologia_csv(args.csv)
+    else:
+        grafo, hosts = gerar_topologia(args.roteadores, args.grau, args.prob_religacao,
+                                       args.semente, args.hosts_por_roteador, args.areas)
+
+    diretorio_estado = tempfile.mkdtemp(prefix="estado_") if args.reinicio == "quente" else None
+    try:
+        simulador = Simulador(grafo, hosts, args.intervalo, args.atraso_enlace, args.codec, args.semente,
+                              diretorio_estado, args.lsdb_compacta)
+        relatorio = simulador.executar(args.tempo_maximo, amostra_verificacao=args.verificar,
+                                       tempo_estavel=args.tempo_estavel, reiniciar=args.reinicio is not None,
+                                       tempo_desligado=args.tempo_desligado, silenciar=not args.log)
+        modulo_roteador.REGISTRO.drenar()
+    finally:
+        if diretorio_estado:
+            shutil.rmtree(diretorio_estado, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(relatorio, indent=2))
+        return
+    for chave, valor in relatorio.items():
+        print(f"{chave:32} {valor:.3f}" if isinstance(valor, float) else f"{chave:32} {valor}")
+
+
+if __name__ == "__main__":
+    main()
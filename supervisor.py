@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ]
+
+import psutil
+
+from router import DIRETORIO_NETNS, REGISTRO, Roteador, TemporizadorAsyncio, parametros_ambiente
+
+"""
+Executa muitos roteadores em um único processo, cada um no próprio namespace de rede do Linux,
+no lugar de um container (com o próprio interpretador Python, módulos e threads) por roteador.
+
+A topologia vem do gerar_composer.py com --saida namespaces. O script gerado cria os namespaces
+e os pares veth. O manifesto traz, para cada roteador, o namespace, o índice de vizinhos e as
+variáveis de ambiente que o container receberia, interpretadas por parametros_ambiente como no
+router.py; as variáveis do próprio supervisor valem para todos os roteadores (por exemplo,
+CODEC_PACOTES ou LSDB_COMPACTA), e o manifesto tem precedência.
+
+Todos os roteadores rodam em um único loop asyncio, com o runtime de Roteador.executar_async.
+O socket UDP e as interfaces de cada roteador são abertos e lidos dentro do namespace dele, e as
+rotas são instaladas com 'ip -n <namespace> -batch'. Os temporizadores (roda de HELLOs e LSAs,
+SPF, persistência) são agendados no loop, então o número de threads não cresce com a topologia.
+A cada --intervalo-resumo segundos, o supervisor registra quantos roteadores têm vizinhos e
+rotas e o RSS do processo.
+
+Um loop usa um único núcleo. Com --processos N, os roteadores são repartidos entre N processos,
+cada um com o próprio loop; o custo fixo passa a ser de N interpretadores, e não de um por
+roteador. Como o anel de eventos é compartilhado por todos os roteadores de um processo, ele
+guarda por padrão só INFO ou acima (LOG_NIVEL_ANEL): em DEBUG, os eventos por pacote de centenas
+de roteadores custam CPU e se sobrescrevem em frações de segundo.
+
+Exige root (setns e 'ip -n').
+
+Uso:
+    python gerar_composer.py --roteadores 300 --saida namespaces --sem-imagem
+    sudo sh rede_namespaces.sh criar
+    sudo python supervisor.py [--manifesto router/namespaces.json] [--processos 4] [--metricas] [--diretorio-estado estado]
+    sudo python testar_conectividade.py --manifesto router/namespaces.json --origens hosts --destinos hosts
+    sudo sh rede_namespaces.sh remover
+"""
+
+log = REGISTRO.canal("supervisor")
+
+
+def ler_manifesto(caminho: str):
+    """
+    Lê o manifesto escrito pelo gerar_composer.py, com os caminhos dos índices de vizinhos
+    resolvidos a partir do diretório do manifesto.
+
+    Returns:
+        list[dict]: Entradas dos roteadores ('id', 'namespace', 'vizinhos', 'ambiente').
+    """
+    with open(caminho) as arquivo:
+        roteadores = json.load(arquivo)["roteadores"]
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    for entrada in roteadores:
+        entrada["vizinhos"] = os.path.join(diretorio, entrada["vizinhos"])
+    return roteadores
+
+
+def criar_roteador(entrada: dict, temporizador, diretorio_estado: str = None, metricas: bool = False):
+    """
+    Cria o roteador de uma entrada do manifesto no namespace dela.
+
+    Args:
+        entrada (dict): Entrada do manifesto.
+        temporizador: Relógio compartilhado por todos os roteadores.
+        diretorio_estado (str): Diretório dos arquivos de estado para o reinício a quente; None desliga.
+        metricas (bool): Abre o endpoint de métricas de cada roteador dentro do namespace dele.
+    """
+    ambiente = dict(os.environ, **entrada["ambiente"])
+    ambiente["ARQUIVO_VIZINHOS"] = entrada["vizinhos"]
+    ambiente["ARQUIVO_ESTADO"] = (os.path.join(diretorio_estado, f"{entrada['id']}.json")
+                                  if diretorio_estado else "")
+    parametros = parametros_ambiente(ambiente)
+    if not metricas:
+        parametros["porta_metricas"] = None
+    return Roteador(entrada["id"], temporizador=temporizador, namespace=entrada["namespace"], **parametros)
+
+
+def resumir(roteadores: list[Roteador], processo: psutil.Process):
+    """
+    Returns:
+        dict: Roteadores com alguma adjacência ativa e com rotas instaladas, total de rotas e RSS.
+    """
+    rotas = [len(roteador._estado_roteador._programador_rotas.instaladas) for roteador in roteadores]
+    return {
+        "roteadores": len(roteadores),
+        "com_vizinhos": sum(1 for roteador in roteadores if roteador._vizinhos_reconhecidos),
+        "com_rotas": sum(1 for quantidade in rotas if quantidade),
+        "rotas": sum(rotas),
+        "rss_mb": processo.memory_info().rss / 2 ** 20,
+    }
+
+
+async def executar(entradas: list[dict], diretorio_estado: str = None, metricas: bool = False,
+                   intervalo_resumo: float = 10, processo_id: int = 0):
+    loop = asyncio.get_running_loop()
+    temporizador = TemporizadorAsyncio(loop)
+    processo = psutil.Process()
+    inicio = time.perf_counter()
+    roteadores = [criar_roteador(entrada, temporizador, diretorio_estado, metricas) for entrada in entradas]
+    log.info("Processo %d: %d roteadores criados em %.1fs; RSS %.0f MB", processo_id, len(roteadores),
+             time.perf_counter() - inicio, processo.memory_info().rss / 2 ** 20)
+
+    tarefas = asyncio.gather(*(roteador.executar_async() for roteador in roteadores))
+
+    def encerrar():
+        # Para as emissões de todos antes de fechar os sockets, para que nenhum roteador ainda
+        # ativo tente enviar por um socket já fechado.
+        for roteador in roteadores:
+            roteador.parar_comunicacao()
+        tarefas.cancel()
+
+    for numero in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(numero, encerrar)
+
+    async def resumir_periodicamente():
+        while True:
+            await asyncio.sleep(intervalo_resumo)
+            resumo = resumir(roteadores, processo)
+            log.info("Processo %d: %d/%d com vizinhos, %d com rotas, %d rotas, RSS %.0f MB", processo_id,
+                     resumo["com_vizinhos"], resumo["roteadores"], resumo["com_rotas"], resumo["rotas"],
+                     resumo["rss_mb"])
+
+    relatorio = loop.create_task(resumir_periodicamente()) if intervalo_resumo else None
+    try:
+        await tarefas
+    except asyncio.CancelledError:
+        log.info("Processo %d: encerrando %d roteadores", processo_id, len(roteadores))
+    finally:
+        if relatorio is not None:
+            relatorio.cancel()
+
+
+def executar_processo(entradas: list[dict], diretorio_estado: str, metricas: bool, intervalo_resumo: float,
+                      processo_id: int):
+    asyncio.run(executar(entradas, diretorio_estado, metricas, intervalo_resumo, processo_id))
+    REGISTRO.drenar()
+
+
+def executar_repartido(entradas: list[dict], processos: int, *parametros):
+    """
+    Reparte os roteadores entre processos filhos, cada um com o próprio loop, e espera por eles.
+    Um SIGINT ou SIGTERM no supervisor é repassado aos filhos.
+    """
+    contexto = multiprocessing.get_context("fork")
+    filhos = [contexto.Process(target=executar_processo, args=(entradas[i::processos], *parametros, i))
+              for i in range(processos)]
+    for filho in filhos:
+        filho.start()
+
+    def repassar(numero, quadro):
+        for filho in filhos:
+            if filho.is_alive():
+                os.kill(filho.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, repassar)
+    signal.signal(signal.SIGTERM, repassar)
+    for filho in filhos:
+        filho.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os roteadores de um manifesto de namespaces em um único processo.")
+    parser.add_argument("--manifesto", default="router/namespaces.json")
+    parser.add_argument("--roteadores", help="IDs separados por vírgula; por padrão, todos os do manifesto.")
+    parser.add_argument("--diretorio-estado", help="Grava o estado de cada roteador para o reinício a quente.")
+    parser.add_argument("--metricas", action="store_true",
+                        help="Abre o endpoint de métricas de cada roteador (PORTA_METRICAS) no namespace dele.")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="Processos entre os quais os roteadores são repartidos (um loop, e um núcleo, por processo).")
+    parser.add_argument("--intervalo-resumo", type=float, default=10,
+                        help="Segundos entre os resumos de convergência e memória (0 desliga).")
+    args = parser.parse_args()
+
+    REGISTRO.configurar(nivel=os.getenv("LOG_NIVEL", "INFO"), nivel_anel=os.getenv("LOG_NIVEL_ANEL", "INFO"),
+                        tamanho_anel=int(os.getenv("LOG_ANEL", "10000")), formato=os.getenv("LOG_FORMATO", "texto"),
+                        amostragem=os.getenv("LOG_AMOSTRAGEM", ""))
+    REGISTRO.instalar_sinal()
+
+    entradas = ler_manifesto(args.manifesto)
+    if args.roteadores:
+        selecionados = set(args.roteadores.split(","))
+        entradas = [entrada for entrada in entradas if entrada["id"] in selecionados]
+    ausentes = [entrada["namespace"] for entrada in entradas
+                if not os.path.exists(os.path.join(DIRETORIO_NETNS, entrada["namespace"]))]
+    if ausentes:
+        parser.error(f"{len(ausentes)} namespaces não existem (por exemplo, {ausentes[0]}); "
+                     f"crie-os com o script gerado pelo gerar_composer.py --saida namespaces")
+    if args.diretorio_estado:
+        os.makedirs(args.diretorio_estado, exist_ok=True)
+
+    processos = max(1, min(args.processos, len(entradas)))
+    if processos == 1:
+        executar_processo(entradas, args.diretorio_estado, args.metricas, args.intervalo_resumo, 0)
+    else:
+        executar_repartido(entradas, processos, args.diretorio_estado, args.metricas, args.intervalo_resumo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+"""
+Teste de conectividade em malha completa entre os containers da topologia, com matriz de
+alcance e de RTT. Substitui o ping.sh e o ping_host.sh.
+
+Os alvos e os IPs vêm do docker-compose.yml gerado pelo gerar_composer.py (sem nenhum
+'docker inspect'); o conexoes_rede.csv, quando existe, separa roteadores de hosts. As sondas
+rodam em paralelo, em um pool de tamanho limitado, e cada uma é um 'ping' executado dentro do
+container de origem. Para um roteador alvo, os IPs dele são tentados em ordem até o primeiro
+que responder, como no ping.sh.
+
+O executor dos comandos é substituível: ExecutorDocker usa 'docker exec', ExecutorNamespaces usa
+'ip netns exec' na topologia em namespaces do supervisor.py (com --manifesto, os alvos e IPs vêm
+do manifesto gerado pelo gerar_composer.py --saida namespaces), e ExecutorMemoria responde às
+sondas a partir de uma tabela, para testar a ferramenta sem Docker.
+
+Uso:
+    python testar_conectividade.py                                # roteadores -> todos (ping.sh)
+    python testar_conectividade.py --origens hosts --destinos hosts   # hosts -> hosts (ping_host.sh)
+    python testar_conectividade.py --json matriz.json --csv-saida matriz.csv --paralelismo 64
+    sudo python testar_conectividade.py --manifesto router/namespaces.json --origens hosts --destinos hosts
+"""
+
+PADRAO_PERDA = re.compile(r"([\d.]+)% packet loss")
+PADRAO_RTT = re.compile(r"= [\d.]+/([\d.]+)/")
+
+
+def executar_comando(comando: list[str], timeout: float):
+    """
+    Returns:
+        tuple[int, str]: Código de saída e saída padrão do comando; 124 se ele estourar o timeout.
+    """
+    try:
+        resultado = subprocess.run(comando, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return 124, ""
+    except OSError as e:
+        return 127, str(e)
+    return resultado.returncode, resultado.stdout
+
+
+class ExecutorDocker:
+    """
+    Executa comandos dentro dos containers com 'docker exec'.
+
+    Atributos:
+        _comando_docker (list[str]): Comando base usado para invocar o Docker.
+    """
+    __slots__ = ["_comando_docker"]
+
+    def __init__(self, comando_docker: list[str] = None):
+        self._comando_docker = comando_docker or ["docker"]
+
+    def executar(self, container: str, comando: list[str], timeout: float):
+        return executar_comando(self._comando_docker + ["exec", container] + comando, timeout)
+
+
+class ExecutorNamespaces:
+    """
+    Executa comandos dentro dos namespaces de rede da topologia do supervisor.py com
+    'ip netns exec'; o nome de cada alvo é o do namespace.
+
+    Atributos:
+        _comando_ip (list[str]): Comando base usado para invocar o iproute2.
+    """
+    __slots__ = ["_comando_ip"]
+
+    def __init__(self, comando_ip: list[str] = None):
+        self._comando_ip = comando_ip or ["ip"]
+
+    def executar(self, container: str, comando: list[str], timeout: float):
+        return executar_comando(self._comando_ip + ["netns", "exec", container] + comando, timeout)
+
+
+class ExecutorMemoria:
+    """
+    Executor que responde a 'ping' a partir de uma tabela de alcance, sem containers. A saída
+    imita o resumo do ping do iputils, então o mesmo código de análise é exercitado.
+
+    Atributos:
+        rtts (dict[tuple[str, str], float]): RTT, em ms, de cada par (container de origem, IP)
+            alcançável; pares ausentes não respondem.
+        comandos (list[tuple[str, list[str]]]): Comandos recebidos, na ordem de execução.
+    """
+    __slots__ = ["rtts", "comandos"]
+
+    def __init__(self, rtts: dict[tuple[str, str], float] = None):
+        self.rtts = rtts if rtts is not None else {}
+        self.comandos = []
+
+    def executar(self, container: str, comando: list[str], timeout: float):
+        self.comandos.append((container, list(comando)))
+        ip = comando[-1]
+        rtt = self.rtts.get((container, ip))
+        if rtt is None:
+            return 1, f"--- {ip} ping statistics ---\n1 packets transmitted, 0 received, 100% packet loss\n"
+        return 0, (f"--- {ip} ping statistics ---\n1 packets transmitted, 1 received, 0% packet loss\n"
+                   f"rtt min/avg/max/mdev = {rtt:.3f}/{rtt:.3f}/{rtt:.3f}/0.000 ms\n")
+
+
+def ler_compose(caminho: str):
+    """
+    Lê os containers e os IPs de cada um do docker-compose.yml no formato escrito pelo
+    gerar_composer.py, linha a linha, sem carregar o YAML inteiro.
+
+    Returns:
+        dict[str, list[str]]: Nome do container -> IPs, na ordem das redes no compose.
+    """
+    containers = {}
+    em_servicos = False
+    atual = None
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            conteudo = linha.strip()
+            if not conteudo or conteudo.startswith("#"):
+                continue
+            recuo = len(linha) - len(linha.lstrip(" "))
+            if recuo == 0:
+                em_servicos = conteudo == "services:"
+                atual = None
+            elif not em_servicos:
+                continue
+            elif recuo == 2 and conteudo.endswith(":"):
+                atual = conteudo[:-1]
+                containers[atual] = []
+            elif atual is not None and conteudo.startswith("container_name:"):
+                containers[conteudo.split(":", 1)[1].strip()] = containers.pop(atual)
+                atual = conteudo.split(":", 1)[1].strip()
+            elif atual is not None and conteudo.startswith("ipv4_address:"):
+                containers[atual].append(conteudo.split(":", 1)[1].strip())
+    return containers
+
+
+def ler_manifesto(caminho: str):
+    """
+    Lê os namespaces e os IPs de cada um do manifesto escrito pelo gerar_composer.py com
+    --saida namespaces.
+
+    Returns:
+        tuple[dict[str, list[str]], list[str], list[str]]: Namespace -> IPs, roteadores e hosts.
+    """
+    with open(caminho) as arquivo:
+        manifesto = json.load(arquivo)
+    containers = {entrada["namespace"]: entrada["ips"] for entrada in manifesto["roteadores"] + manifesto["hosts"]}
+    return (containers, [entrada["namespace"] for entrada in manifesto["roteadores"]],
+            [entrada["namespace"] for entrada in manifesto["hosts"]])
+
+
+def classificar(containers: dict[str, list[str]], caminho_csv: str = None):
+    """
+    Separa roteadores de hosts. Com o conexoes_rede.csv, hosts são as origens das linhas sem
+    custo ('-'); sem ele, valem os nomes gerados (routerN e routerN_hostM).
+
+    Returns:
+        tuple[list[str], list[str]]: Roteadores e hosts, na ordem do compose.
+    """
+    if caminho_csv and os.path.exists(caminho_csv):
+        with open(caminho_csv, newline="") as arquivo:
+            hosts = {linha["Origem"] for linha in csv.DictReader(arquivo) if linha["Custo"] == "-"}
+    else:
+        hosts = {nome for nome in containers if re.search(r"_host\d+$", nome)}
+    roteadores = [nome for nome in containers if nome not in hosts]
+    return roteadores, [nome for nome in containers if nome in hosts]
+
+
+def sondar(executor, origem: str, destino: str, ips: list[str], contagem: int, timeout: float):
+    """
+    Pinga o destino a partir da origem, tentando cada IP dele até o primeiro que responder.
+
+    Returns:
+        dict: Resultado da sonda: alcançável, IP que respondeu (ou o último tentado), RTT médio
+            em ms e perda em %.
+    """
+    resultado = {"origem": origem, "destino": destino, "alcancavel": False, "ip": None,
+                 "rtt_ms": None, "perda": 100.0}
+    for ip in ips:
+        codigo, saida = executor.executar(
+            origem, ["ping", "-q", "-n", "-c", str(contagem), "-W", str(max(1, round(timeout))), ip],
+            timeout=contagem * timeout + 5)
+        perda = PADRAO_PERDA.search(saida)
+        rtt = PADRAO_RTT.search(saida)
+        resultado.update(ip=ip, perda=float(perda.group(1)) if perda else 100.0,
+                         rtt_ms=float(rtt.group(1)) if rtt else None)
+        if codigo == 0 and rtt:
+            resultado["alcancavel"] = True
+            break
+    return resultado
+
+
+def testar(executor, containers: dict[str, list[str]], origens: list[str], destinos: list[str],
+           paralelismo: int = 32, contagem: int = 1, timeout: float = 1.0, ao_concluir=None):
+    """
+    Executa as sondas de cada origem para cada destino (exceto ela mesma) em um pool de
+    paralelismo threads.
+
+    Args:
+        ao_concluir: Chamada com o resultado de cada sonda assim que ela termina.
+
+    Returns:
+        list[dict]: Resultados das sondas, na ordem (origem, destino).
+    """
+    pares = [(origem, destino) for origem in origens for destino in destinos if origem != destino]
+    resultados = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, paralelismo)) as pool:
+        futuros = {pool.submit(sondar, executor, origem, destino, containers[destino], contagem, timeout): (origem, destino)
+                   for origem, destino in pares}
+        for futuro in concurrent.futures.as_completed(futuros):
+            resultado = futuro.result()
+            resultados[futuros[futuro]] = resultado
+            if ao_concluir is not None:
+                ao_concluir(resultado)
+    return [resultados[par] for par in pares]
+
+
+def montar_matriz(resultados: list[dict]):
+    """
+    Returns:
+        dict[str, dict[str, float | None]]: origem -> destino -> RTT em ms (None se inalcançável).
+    """
+    matriz = {}
+    for r in resultados:
+        matriz.setdefault(r["origem"], {})[r["destino"]] = r["rtt_ms"] if r["alcancavel"] else None
+    return matriz
+
+
+def escrever_csv(resultados: list[dict], caminho: str):
+    with open(caminho, "w", newline="") as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(["Origem", "Destino", "IP", "Alcancavel", "RTT_ms", "Perda"])
+        for r in resultados:
+            writer.writerow([r["origem"], r["destino"], r["ip"] or "", int(r["alcancavel"]),
+                             "" if r["rtt_ms"] is None else f"{r['rtt_ms']:.3f}", f"{r['perda']:g}"])
+
+
+def selecionar(grupo: str, roteadores: list[str], hosts: list[str]):
+    return {"roteadores": roteadores, "hosts": hosts, "todos": roteadores + hosts}[grupo]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de conectividade em malha completa com matriz de RTT.")
+    parser.add_argument("--compose", default="docker-compose.yml")
+    parser.add_argument("--manifesto", help="Testa a topologia em namespaces do supervisor.py descrita neste manifesto.")
+    parser.add_argument("--csv", default="router/conexoes_rede.csv",
+                        help="Topologia usada para separar roteadores de hosts.")
+    parser.add_argument("--origens", choices=["roteadores", "hosts", "todos"], default="roteadores")
+    parser.add_argument("--destinos", choices=["roteadores", "hosts", "todos"], default="todos")
+    parser.add_argument("--paralelismo", type=int, default=32, help="Sondas executadas ao mesmo tempo.")
+    parser.add_argument("--contagem", type=int, default=1, help="Pacotes por sonda.")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Espera por resposta, em segundos.")
+    parser.add_argument("--json", help="Arquivo onde gravar resultados, matriz e resumo em JSON.")
+    parser.add_argument("--csv-saida", help="Arquivo onde gravar os resultados em CSV.")
+    parser.add_argument("--silencioso", action="store_true", help="Não imprime as falhas à medida que ocorrem.")
+    args = parser.parse_args()
+
+    if args.manifesto:
+        containers, roteadores, hosts = ler_manifesto(args.manifesto)
+        executor = ExecutorNamespaces()
+    else:
+        containers = ler_compose(args.compose)
+        roteadores, hosts = classificar(containers, args.csv)
+        executor = ExecutorDocker()
+    origens = selecionar(args.origens, roteadores, hosts)
+    destinos = selecionar(args.destinos, roteadores, hosts)
+
+    def ao_concluir(resultado):
+        if not resultado["alcancavel"] and not args.silencioso:
+            print(f"  ✗ {resultado['origem']} -> {resultado['destino']} ({resultado['ip'] or 'sem IP'})")
+
+    print(f"Testando {len(origens)} origens x {len(destinos)} destinos com {args.paralelismo} sondas em paralelo...")
+    inicio = time.perf_counter()
+    resultados = testar(executor, containers, origens, destinos, args.paralelismo,
+                        args.contagem, args.timeout, ao_concluir)
+    duracao = time.perf_counter() - inicio
+
+    alcancados = [r for r in resultados if r["alcancavel"]]
+    rtts = sorted(r["rtt_ms"] for r in alcancados)
+    resumo = {
+        "sondas": len(resultados),
+        "sucessos": len(alcancados),
+        "falhas": len(resultados) - len(alcancados),
+        "taxa_sucesso": len(alcancados) / len(resultados) if resultados else 1.0,
+        "rtt_medio_ms": sum(rtts) / len(rtts) if rtts else None,
+        "rtt_maximo_ms": rtts[-1] if rtts else None,
+        "duracao_s": duracao,
+    }
+
+    if args.json:
+        with open(args.json, "w") as arquivo:
+            json.dump({"resumo": resumo, "matriz_rtt_ms": montar_matriz(resultados), "sondas": resultados},
+                      arquivo, indent=2)
+    if args.csv_saida:
+        escrever_csv(resultados, args.csv_saida)
+
+    print(f"\nSondas: {resumo['sondas']}  sucessos: {resumo['sucessos']}  falhas: {resumo['falhas']}  "
+          f"taxa: {resumo['taxa_sucesso']:.0%}  tempo: {duracao:.1f}s")
+    if rtts:
+        print(f"RTT médio: {resumo['rtt_medio_ms']:.2f} ms  máximo: {resumo['rtt_maximo_ms']:.2f} ms")
+    if resumo["falhas"] == 0:
+        print("✓ REDE TOTALMENTE CONECTADA")
+    else:
+        print("✗ HÁ DESTINOS INALCANÇÁVEIS")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
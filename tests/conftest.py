@@ -0,0 +1,16 @@
+import os
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(RAIZ, "router"), RAIZ]
+
+import pytest
+
+import router as modulo_roteador
+
+
+@pytest.fixture(autouse=True)
+def registro_silenciado():
+    """Desliga o registro de eventos para que os testes não escrevam no terminal."""
+    with modulo_roteador.REGISTRO.silenciado():
+        yield
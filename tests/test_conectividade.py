@@ -0,0 +1,123 @@
+import json
+
+import networkx as nx
+
+import gerar_composer
+import testar_conectividade as conectividade
+from testar_conectividade import ExecutorMemoria, classificar, ler_compose, ler_manifesto, montar_matriz, sondar
+
+COMPOSE = """\
+version: '3.8'
+# gerado para o teste
+services:
+  r1:
+    build: ./router
+    container_name: router1
+    environment:
+      CONTAINER_NAME: router1
+    networks:
+      router1_host1_net:
+        ipv4_address: 10.128.0.3
+      router1_router2_net:
+        ipv4_address: 10.0.0.2
+  router1_host1:
+    build: ./host
+    networks:
+      router1_host1_net:
+        ipv4_address: 10.128.0.2
+  router2:
+    build: ./router
+    container_name: router2
+    networks:
+      router1_router2_net:
+        ipv4_address: 10.0.0.3
+networks:
+  router1_router2_net:
+    ipam:
+      config:
+      - subnet: 10.0.0.0/29
+"""
+
+
+def test_ler_compose(tmp_path):
+    caminho = tmp_path / "docker-compose.yml"
+    caminho.write_text(COMPOSE)
+    assert ler_compose(str(caminho)) == {
+        "router1": ["10.128.0.3", "10.0.0.2"],
+        "router1_host1": ["10.128.0.2"],
+        "router2": ["10.0.0.3"],
+    }
+
+
+def test_ler_manifesto(tmp_path):
+    caminho = tmp_path / "namespaces.json"
+    caminho.write_text(json.dumps({
+        "roteadores": [{"id": "router1", "namespace": "router1", "ips": ["10.128.0.3", "10.0.0.2"]},
+                       {"id": "router2", "namespace": "router2", "ips": ["10.0.0.3"]}],
+        "hosts": [{"id": "router1_host1", "namespace": "router1_host1", "ips": ["10.128.0.2"],
+                   "gateway": "10.128.0.3"}],
+    }))
+    containers, roteadores, hosts = ler_manifesto(str(caminho))
+    assert containers == {"router1": ["10.128.0.3", "10.0.0.2"], "router2": ["10.0.0.3"],
+                          "router1_host1": ["10.128.0.2"]}
+    assert roteadores == ["router1", "router2"]
+    assert hosts == ["router1_host1"]
+
+
+def test_ler_compose_e_manifesto_gerados(tmp_path, monkeypatch):
+    """Lê o que o gerar_composer.py de fato escreve, nas duas saídas."""
+    monkeypatch.chdir(tmp_path)
+    grafo = nx.cycle_graph(3)
+    nx.set_edge_attributes(grafo, 1, "weight")
+    (tmp_path / "router").mkdir()
+    gerar_composer.escrever_topologia(grafo, 1)
+    gerar_composer.escrever_namespaces(grafo, 1)
+
+    containers = ler_compose("docker-compose.yml")
+    roteadores, hosts = classificar(containers, "router/conexoes_rede.csv")
+    assert sorted(roteadores) == ["router1", "router2", "router3"]
+    assert sorted(hosts) == ["router1_host1", "router2_host1", "router3_host1"]
+    assert all(len(containers[nome]) == 3 for nome in roteadores)
+
+    containers_ns, roteadores_ns, hosts_ns = ler_manifesto("router/namespaces.json")
+    assert sorted(roteadores_ns) == sorted(roteadores)
+    assert sorted(hosts_ns) == sorted(hosts)
+    assert {nome: sorted(ips) for nome, ips in containers_ns.items()} == \
+        {nome: sorted(ips) for nome, ips in containers.items()}
+
+
+def test_classificar_sem_csv_usa_os_nomes():
+    containers = {"router1": [], "router1_host1": [], "router2": [], "router2_host3": []}
+    assert classificar(containers, "inexistente.csv") == (["router1", "router2"], ["router1_host1", "router2_host3"])
+
+
+def test_sondar_tenta_os_ips_em_ordem():
+    executor = ExecutorMemoria({("router1", "10.0.0.6"): 2.5})
+    resultado = sondar(executor, "router1", "router2", ["10.0.0.3", "10.0.0.6", "10.0.0.9"], 1, 1.0)
+    assert resultado == {"origem": "router1", "destino": "router2", "alcancavel": True, "ip": "10.0.0.6",
+                         "rtt_ms": 2.5, "perda": 0.0}
+    assert [comando[-1] for _, comando in executor.comandos] == ["10.0.0.3", "10.0.0.6"]
+
+
+def test_testar_e_montar_matriz():
+    containers = {"router1": ["10.0.0.2"], "router2": ["10.0.0.3"], "router1_host1": ["10.128.0.2"]}
+    executor = ExecutorMemoria({
+        ("router1", "10.0.0.3"): 1.0,
+        ("router1", "10.128.0.2"): 0.5,
+        ("router2", "10.0.0.2"): 1.5,
+    })
+    concluidas = []
+    resultados = conectividade.testar(executor, containers, ["router1", "router2"], list(containers),
+                                      paralelismo=4, ao_concluir=concluidas.append)
+
+    assert [(r["origem"], r["destino"]) for r in resultados] == [
+        ("router1", "router2"), ("router1", "router1_host1"),
+        ("router2", "router1"), ("router2", "router1_host1")]
+    assert len(concluidas) == len(resultados)
+    falha = resultados[3]
+    assert not falha["alcancavel"] and falha["ip"] == "10.128.0.2" and falha["perda"] == 100.0
+
+    assert montar_matriz(resultados) == {
+        "router1": {"router2": 1.0, "router1_host1": 0.5},
+        "router2": {"router1": 1.5, "router1_host1": None},
+    }
@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+
+from router import (BackendRotasMemoria, CodecBinario, CodecPacotes, EstadoRoteador, ProgramadorRotas,
+                    Roteador, calcular_checksum_lsa)
+
+
+class TransporteNulo:
+    def enviar(self, *args, **kwargs):
+        pass
+
+
+class CodecIdentidade:
+    """Entrega o próprio dicionário, sem passar pela validação dos decodificadores."""
+
+    def decodificar(self, dados):
+        return dados
+
+
+def criar_roteador(codec=None):
+    return Roteador("router1", interfaces=[], custos_enlaces={"router9": 1},
+                    programador_rotas=ProgramadorRotas(BackendRotasMemoria()),
+                    transporte=TransporteNulo(), codec=codec)
+
+
+def lsa(numero_sequencia, **campos):
+    pacote = {"tipo": "LSA", "id_rota": "router9", "ip_address": "10.0.0.9", "timestamp": 0.0,
+              "numero_sequencia": numero_sequencia, "enderecos": [], "links": {}}
+    pacote.update(campos)
+    return pacote
+
+
+def processar_com_limite(roteador, datagramas, limite=5.0):
+    """Processa o lote em outra thread e falha se ele não terminar dentro do limite."""
+    thread = threading.Thread(target=roteador.processar_lote, args=(datagramas,), daemon=True)
+    thread.start()
+    thread.join(limite)
+    assert not thread.is_alive(), "processar_lote não terminou"
+
+
+@pytest.mark.parametrize("base", [5, 6])
+def test_lote_com_delta_de_base_nao_anterior_termina(base):
+    roteador = criar_roteador()
+    processar_com_limite(roteador, [(json.dumps(lsa(5, base=base)).encode("utf-8"), ("10.0.0.9", 5000))])
+    assert roteador._metricas.contadores[("erros_pacotes_total", "decodificacao")] == 1
+    assert roteador._estado_roteador.obter_entrada("router9") is None
+
+
+def test_lote_com_deltas_que_apontam_um_para_o_outro_termina():
+    roteador = criar_roteador(codec=CodecIdentidade())
+    processar_com_limite(roteador, [(lsa(5, base=6), ("10.0.0.9", 5000)), (lsa(6, base=5), ("10.0.0.9", 5000))])
+    assert roteador._estado_roteador.obter_entrada("router9") is None
+
+
+def test_lote_com_cadeia_de_deltas_valida_aplica_todos():
+    roteador = criar_roteador(codec=CodecIdentidade())
+    completo = lsa(1, links={"router1": 1}, checksum=calcular_checksum_lsa([], {"router1": 1}))
+    links = {"router1": 1, "router3": 2}
+    delta = lsa(2, base=1, links={"router3": 2}, checksum=calcular_checksum_lsa([], links))
+    processar_com_limite(roteador, [(delta, ("10.0.0.9", 5000)), (completo, ("10.0.0.9", 5000))])
+    entrada = roteador._estado_roteador.obter_entrada("router9")
+    assert entrada["numero_sequencia"] == 2
+    assert entrada["links"] == links
+
+
+@pytest.mark.parametrize("base", [7, 8, -1, "6"])
+def test_decodificadores_recusam_base_invalida(base):
+    with pytest.raises(ValueError):
+        CodecPacotes("json").decodificar(json.dumps(lsa(7, base=base)).encode("utf-8"))
+    if isinstance(base, int) and base >= 0:
+        with pytest.raises(ValueError):
+            CodecBinario.decodificar(CodecBinario.codificar(lsa(7, base=base)))
+
+
+def test_decodificador_binario_aceita_base_anterior():
+    assert CodecBinario.decodificar(CodecBinario.codificar(lsa(7, base=6)))["base"] == 6
+
+
+def test_aplicar_delta_recusa_base_nao_anterior():
+    estado = EstadoRoteador("router1", {"router9": "10.0.0.9"},
+                            programador_rotas=ProgramadorRotas(BackendRotasMemoria()))
+    estado.atualizar_tabela(lsa(5, links={"router1": 1}))
+    assert estado.atualizar_tabela(lsa(6, base=6)) is False
+    assert estado.obter_entrada("router9")["numero_sequencia"] == 5
@@ -0,0 +1,28 @@
+import json
+import urllib.request
+
+from router import BackendRotasMemoria, ProgramadorRotas, Roteador, ServidorMetricas, parametros_ambiente
+
+
+class TransporteNulo:
+    def enviar(self, *args, **kwargs):
+        pass
+
+
+def test_servidor_de_metricas_escuta_so_no_loopback_por_padrao():
+    roteador = Roteador("router1", interfaces=[], custos_enlaces={},
+                        programador_rotas=ProgramadorRotas(BackendRotasMemoria()), transporte=TransporteNulo())
+    servidor = ServidorMetricas(roteador, 0)
+    servidor.iniciar()
+    try:
+        endereco, porta = servidor._servidor.server_address
+        assert endereco == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{porta}/rotas", timeout=5) as resposta:
+            json.loads(resposta.read())
+    finally:
+        servidor.encerrar()
+
+
+def test_endereco_de_metricas_vem_do_ambiente():
+    assert parametros_ambiente({})["endereco_metricas"] == "127.0.0.1"
+    assert parametros_ambiente({"ENDERECO_METRICAS": "0.0.0.0"})["endereco_metricas"] == "0.0.0.0"
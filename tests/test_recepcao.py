@@ -0,0 +1,70 @@
+import errno
+import json
+import socket
+
+from router import BackendRotasMemoria, ProgramadorRotas, Roteador
+
+
+class TransporteNulo:
+    def enviar(self, *args, **kwargs):
+        pass
+
+
+class SocketRoteiro:
+    """
+    Socket falso que devolve, a cada recvfrom, o próximo item do roteiro: um datagrama ou uma
+    exceção a ser levantada. Sem MSG_DONTWAIT, o fim do roteiro fecha o socket.
+    """
+
+    def __init__(self, bloqueantes, sem_espera=()):
+        self._bloqueantes = list(bloqueantes)
+        self._sem_espera = list(sem_espera)
+        self._aberto = True
+
+    def fileno(self):
+        return 3 if self._aberto else -1
+
+    def recvfrom(self, tamanho, flags=0):
+        roteiro = self._sem_espera if flags & socket.MSG_DONTWAIT else self._bloqueantes
+        if not roteiro:
+            if flags & socket.MSG_DONTWAIT:
+                raise BlockingIOError(errno.EAGAIN, "vazio")
+            self._aberto = False
+            raise OSError(errno.EBADF, "socket fechado")
+        item = roteiro.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+
+def hello(id_rota):
+    pacote = {"tipo": "HELLO", "id_rota": id_rota, "ip_address": "10.0.0.9", "timestamp": 0.0,
+              "vizinhos_conhecidos": []}
+    return json.dumps(pacote).encode("utf-8"), ("10.0.0.9", 5000)
+
+
+def criar_roteador(sock):
+    roteador = Roteador("router1", interfaces=[], custos_enlaces={"router9": 1},
+                        programador_rotas=ProgramadorRotas(BackendRotasMemoria()), transporte=TransporteNulo())
+    roteador._abrir_socket = lambda: sock
+    lotes = []
+    roteador.processar_lote = lotes.append
+    return roteador, lotes
+
+
+def test_recepcao_continua_depois_de_oserror():
+    sock = SocketRoteiro([OSError(errno.ECONNREFUSED, "recusado"), hello("router9"),
+                          OSError(errno.EIO, "falha"), hello("router7")])
+    roteador, lotes = criar_roteador(sock)
+    roteador.receber_pacotes()
+    assert [[dados for dados, _ in lote] for lote in lotes] == [[hello("router9")[0]], [hello("router7")[0]]]
+    assert roteador._metricas.contadores[("erros_pacotes_total", "recepcao")] == 2
+
+
+def test_erro_ao_esvaziar_a_fila_entrega_o_que_ja_foi_lido():
+    sock = SocketRoteiro([hello("router9")], sem_espera=[hello("router7"), OSError(errno.EIO, "falha"),
+                                                          hello("router5")])
+    roteador, lotes = criar_roteador(sock)
+    roteador.receber_pacotes()
+    assert [len(lote) for lote in lotes] == [2]
+    assert roteador._metricas.contadores[("erros_pacotes_total", "recepcao")] == 1
@@ -0,0 +1,152 @@
+import subprocess
+
+import router as modulo_roteador
+from router import BackendRotasIpBatch, BackendRotasMemoria, EstadoRoteador, ProgramadorRotas
+
+
+def lsa(id_rota, numero_sequencia, links, enderecos):
+    return {"id_rota": id_rota, "numero_sequencia": numero_sequencia, "timestamp": 0.0,
+            "enderecos": enderecos, "links": links}
+
+
+def test_sincronizar_adiciona_altera_e_remove():
+    backend = BackendRotasMemoria()
+    programador = ProgramadorRotas(backend)
+
+    programador.sincronizar({"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.3"})
+    assert backend.rotas == {"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.3"}
+
+    adicionadas, alteradas, removidas = programador.sincronizar(
+        {"10.0.1.0/24": "10.0.0.4", "10.0.3.0/24": "10.0.0.2"})
+    assert adicionadas == {"10.0.3.0/24": "10.0.0.2"}
+    assert alteradas == {"10.0.1.0/24": "10.0.0.4"}
+    assert removidas == {"10.0.2.0/24": "10.0.0.3"}
+    assert backend.rotas == {"10.0.1.0/24": "10.0.0.4", "10.0.3.0/24": "10.0.0.2"}
+    assert programador.instaladas == backend.rotas
+    # Um único lote por sincronização, com as remoções por último.
+    assert backend.lotes[-1] == [("replace", "10.0.3.0/24", "10.0.0.2"),
+                                 ("replace", "10.0.1.0/24", "10.0.0.4"),
+                                 ("del", "10.0.2.0/24", "10.0.0.3")]
+
+
+def test_sincronizar_sem_diferenca_nao_envia_lote():
+    backend = BackendRotasMemoria()
+    programador = ProgramadorRotas(backend)
+    programador.sincronizar({"10.0.1.0/24": "10.0.0.2"})
+    assert programador.sincronizar({"10.0.1.0/24": "10.0.0.2"}) == ({}, {}, {})
+    assert len(backend.lotes) == 1
+
+
+def test_multipath_troca_de_caminhos_conta_como_alteracao():
+    backend = BackendRotasMemoria()
+    programador = ProgramadorRotas(backend)
+    programador.sincronizar({"10.0.1.0/24": ("10.0.0.2", "10.0.0.3")})
+    assert backend.rotas == {"10.0.1.0/24": ("10.0.0.2", "10.0.0.3")}
+
+    _, alteradas, _ = programador.sincronizar({"10.0.1.0/24": ("10.0.0.2", "10.0.0.4")})
+    assert alteradas == {"10.0.1.0/24": ("10.0.0.2", "10.0.0.4")}
+
+    _, alteradas, _ = programador.sincronizar({"10.0.1.0/24": "10.0.0.2"})
+    assert alteradas == {"10.0.1.0/24": "10.0.0.2"}
+    assert backend.rotas == {"10.0.1.0/24": "10.0.0.2"}
+
+
+def test_falha_parcial_mantem_a_rota_fora_das_instaladas():
+    backend = BackendRotasMemoria()
+    backend.falhas.add("10.0.2.0/24")
+    programador = ProgramadorRotas(backend)
+
+    programador.sincronizar({"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.2"})
+    assert programador.instaladas == {"10.0.1.0/24": "10.0.0.2"}
+
+    # A rota que falhou volta a ser tentada na próxima sincronização.
+    backend.falhas.clear()
+    adicionadas, _, _ = programador.sincronizar({"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.2"})
+    assert adicionadas == {"10.0.2.0/24": "10.0.0.2"}
+    assert programador.instaladas == backend.rotas
+
+
+def test_remocao_que_falha_continua_instalada():
+    backend = BackendRotasMemoria()
+    programador = ProgramadorRotas(backend)
+    programador.sincronizar({"10.0.1.0/24": "10.0.0.2"})
+    backend.falhas.add("10.0.1.0/24")
+
+    programador.sincronizar({})
+    assert programador.instaladas == {"10.0.1.0/24": "10.0.0.2"}
+    backend.falhas.clear()
+    _, _, removidas = programador.sincronizar({})
+    assert removidas == {"10.0.1.0/24": "10.0.0.2"}
+    assert backend.rotas == {}
+
+
+def test_restaurar_vira_base_do_proximo_delta():
+    backend = BackendRotasMemoria()
+    programador = ProgramadorRotas(backend)
+    programador.restaurar({"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.3"})
+    assert backend.lotes == [[("replace", "10.0.1.0/24", "10.0.0.2"),
+                              ("replace", "10.0.2.0/24", "10.0.0.3")]]
+
+    _, _, removidas = programador.sincronizar({"10.0.1.0/24": "10.0.0.2"})
+    assert removidas == {"10.0.2.0/24": "10.0.0.3"}
+    assert backend.rotas == {"10.0.1.0/24": "10.0.0.2"}
+
+
+def test_destino_inalcancavel_tem_as_rotas_retiradas():
+    backend = BackendRotasMemoria()
+    estado = EstadoRoteador("router1", {"router2": "10.0.0.2"}, programador_rotas=ProgramadorRotas(backend))
+    estado.atualizar_tabela(lsa("router1", 1, {"router2": 1}, ["10.0.0.1"]))
+    estado.atualizar_tabela(lsa("router2", 1, {"router1": 1, "router3": 1}, ["10.0.0.2", "10.0.1.1"]))
+    estado.atualizar_tabela(lsa("router3", 1, {"router2": 1}, ["10.0.1.2", "10.128.5.0/24"]))
+    assert backend.rotas["10.128.5.0/24"] == "10.0.0.2"
+
+    # O router2 deixa de anunciar o enlace com o router3, que fica sem caminho.
+    estado.atualizar_tabela(lsa("router2", 2, {"router1": 1}, ["10.0.0.2"]))
+    assert backend.rotas == {"10.0.0.2": "10.0.0.2"}
+    assert ("del", "10.128.5.0/24", "10.0.0.2") in backend.lotes[-1]
+
+
+def test_formatar_linhas_do_ip_batch():
+    formatar = BackendRotasIpBatch._formatar
+    assert formatar("replace", "10.0.1.0/24", "10.0.0.2") == "route replace 10.0.1.0/24 via 10.0.0.2"
+    assert formatar("del", "10.0.1.0/24", "10.0.0.2") == "route del 10.0.1.0/24 via 10.0.0.2"
+    assert formatar("replace", "10.0.1.0/24", ("10.0.0.2", "10.0.0.3")) == \
+        "route replace 10.0.1.0/24 nexthop via 10.0.0.2 nexthop via 10.0.0.3"
+    assert formatar("del", "10.0.1.0/24", ("10.0.0.2", "10.0.0.3")) == "route del 10.0.1.0/24"
+
+
+def test_ip_batch_marca_as_linhas_que_falharam(monkeypatch):
+    chamadas = []
+
+    def executar(comando, input, **kwargs):
+        chamadas.append((comando, input))
+        return subprocess.CompletedProcess(comando, 1, stdout="", stderr=(
+            "RTNETLINK answers: Network is unreachable\nCommand failed -:2\n"
+            "RTNETLINK answers: No such process\nCommand failed -:3\n"))
+
+    monkeypatch.setattr(modulo_roteador.subprocess, "run", executar)
+    backend = BackendRotasIpBatch()
+    sucesso = backend.executar([("replace", "10.0.1.0/24", "10.0.0.2"),
+                                ("replace", "10.0.2.0/24", ("10.0.0.2", "10.0.0.3")),
+                                ("del", "10.0.3.0/24", "10.0.0.2")])
+    assert sucesso == [True, False, False]
+    assert chamadas == [(["ip", "-force", "-batch", "-"],
+                         "route replace 10.0.1.0/24 via 10.0.0.2\n"
+                         "route replace 10.0.2.0/24 nexthop via 10.0.0.2 nexthop via 10.0.0.3\n"
+                         "route del 10.0.3.0/24 via 10.0.0.2\n")]
+
+
+def test_ip_batch_ignora_linha_fora_do_lote(monkeypatch):
+    monkeypatch.setattr(modulo_roteador.subprocess, "run", lambda comando, **kwargs:
+                        subprocess.CompletedProcess(comando, 1, stdout="", stderr="Command failed -:9\n"))
+    assert BackendRotasIpBatch().executar([("replace", "10.0.1.0/24", "10.0.0.2")]) == [True]
+
+
+def test_ip_batch_sem_o_executavel_falha_o_lote_inteiro(monkeypatch):
+    def executar(comando, **kwargs):
+        raise FileNotFoundError(comando[0])
+
+    monkeypatch.setattr(modulo_roteador.subprocess, "run", executar)
+    programador = ProgramadorRotas(BackendRotasIpBatch())
+    programador.sincronizar({"10.0.1.0/24": "10.0.0.2", "10.0.2.0/24": "10.0.0.3"})
+    assert programador.instaladas == {}
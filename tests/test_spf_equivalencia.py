@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from router import BackendRotasMemoria, EstadoRoteador, ProgramadorRotas
+
+NOS = [f"router{i}" for i in range(1, 13)]
+VIZINHOS_RAIZ = {"router2": "10.0.0.2", "router3": "10.0.0.3", "router4": "10.0.0.4"}
+MODOS = {
+    "incremental": {"spf_incremental": True},
+    "completo": {"spf_incremental": False},
+    "compacta": {"lsdb_compacta": True},
+}
+
+
+def criar_estado(max_caminhos, **opcoes):
+    backend = BackendRotasMemoria()
+    estado = EstadoRoteador("router1", VIZINHOS_RAIZ, programador_rotas=ProgramadorRotas(backend),
+                            max_caminhos=max_caminhos, **opcoes)
+    return estado, backend
+
+
+def enderecos(no):
+    indice = NOS.index(no) + 1
+    return [f"10.0.{indice}.1", f"10.{100 + indice}.0.0/24"]
+
+
+def topologia_inicial(aleatorio):
+    """Anel com cordas aleatórias e custos 1 ou 2, para que sobrem caminhos de mesmo custo."""
+    links = {no: {} for no in NOS}
+    for i, no in enumerate(NOS):
+        links[no][NOS[(i + 1) % len(NOS)]] = aleatorio.randint(1, 2)
+    for _ in range(len(NOS)):
+        origem, destino = aleatorio.sample(NOS, 2)
+        links[origem][destino] = aleatorio.randint(1, 2)
+    links["router1"] = {vizinho: aleatorio.randint(1, 2) for vizinho in VIZINHOS_RAIZ}
+    return links
+
+
+def alterar_links(aleatorio, no, links):
+    """Sorteia uma mudança nos links de um roteador: custo novo, enlace removido ou enlace novo."""
+    links = dict(links)
+    candidatos = list(VIZINHOS_RAIZ) if no == "router1" else [n for n in NOS if n != no]
+    operacao = aleatorio.choice(("custo", "remover", "adicionar"))
+    if operacao == "remover" and links:
+        del links[aleatorio.choice(sorted(links))]
+    elif operacao == "adicionar":
+        links[aleatorio.choice(candidatos)] = aleatorio.randint(1, 2)
+    elif links:
+        links[aleatorio.choice(sorted(links))] = aleatorio.randint(1, 2)
+    return links
+
+
+@pytest.mark.parametrize("max_caminhos", [1, 2, 4])
+@pytest.mark.parametrize("semente", range(5))
+def test_modos_do_spf_instalam_as_mesmas_rotas(semente, max_caminhos):
+    aleatorio = random.Random(semente)
+    links = topologia_inicial(aleatorio)
+    sequencias = dict.fromkeys(NOS, 0)
+    estados = {nome: criar_estado(max_caminhos, **opcoes) for nome, opcoes in MODOS.items()}
+
+    def anunciar(no):
+        sequencias[no] += 1
+        pacote = {"id_rota": no, "numero_sequencia": sequencias[no], "timestamp": 0.0,
+                  "enderecos": enderecos(no), "links": dict(links[no])}
+        for estado, _ in estados.values():
+            estado.atualizar_tabela(dict(pacote))
+
+    for no in aleatorio.sample(NOS, len(NOS)):
+        anunciar(no)
+
+    multipath = 0
+    for passo in range(60):
+        no = aleatorio.choice(NOS)
+        links[no] = alterar_links(aleatorio, no, links[no])
+        anunciar(no)
+
+        rotas = {nome: backend.rotas for nome, (_, backend) in estados.items()}
+        assert rotas["completo"] == rotas["incremental"], f"passo {passo}"
+        assert rotas["completo"] == rotas["compacta"], f"passo {passo}"
+        for estado, backend in estados.values():
+            assert estado._programador_rotas.instaladas == backend.rotas
+        multipath += sum(isinstance(gateway, tuple) for gateway in rotas["completo"].values())
+
+    # Com ECMP ligado, a sequência sorteada precisa ter passado por rotas multipath.
+    assert (multipath > 0) == (max_caminhos > 1)
+
+    # Um roteador novo que recebe só a LSDB final chega às mesmas rotas.
+    referencia, backend_referencia = criar_estado(max_caminhos, spf_incremental=False)
+    for no in NOS:
+        referencia.atualizar_tabela({"id_rota": no, "numero_sequencia": sequencias[no], "timestamp": 0.0,
+                                     "enderecos": enderecos(no), "links": dict(links[no])})
+    assert backend_referencia.rotas == estados["incremental"][1].rotas
+